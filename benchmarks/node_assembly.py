@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark the in-memory and the streaming node assembly.
+
+Synthetic sorted node files are generated for a number of processors with
+overlapping groundings, and each assembly runs in a fresh process to measure
+its wall time and peak resident memory:
+
+.. code-block:: sh
+
+    python benchmarks/node_assembly.py --nodes 2000000 --processors 4
+
+``in-memory`` loads all node pickles into a
+:class:`indra_cogex.assembly.NodeAssembler` and sorts the result the way node
+assembly used to work, ``streaming`` is
+:func:`indra_cogex.sources.cli.assemble_type` reading the Arrow node files.
+"""
+
+import csv
+import gzip
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from indra_cogex.assembly import (
+    NodeAssembler,
+    dump_arrow_nodes,
+    dump_pickled_nodes,
+    iter_pickled_nodes,
+)
+from indra_cogex.representation import Node
+
+
+def _make_node_files(directory: Path, n_nodes: int, n_processors: int, seed: int):
+    rng = random.Random(seed)
+    paths = {"pickle": [], "arrow": []}
+    for idx in range(n_processors):
+        db_ids = sorted(
+            {str(rng.randrange(2 * n_nodes)) for _ in range(n_nodes // n_processors)}
+        )
+        nodes = [
+            Node(
+                "PUBCHEM",
+                db_id,
+                ["BioEntity"],
+                {"name": f"gene{db_id}", f"source_{idx}:int": idx},
+            )
+            for db_id in db_ids
+        ]
+        paths["pickle"].append(directory.joinpath(f"nodes_{idx}.pkl"))
+        dump_pickled_nodes(nodes, paths["pickle"][-1])
+        paths["arrow"].append(directory.joinpath(f"nodes_{idx}.arrow"))
+        dump_arrow_nodes(nodes, paths["arrow"][-1])
+    return paths
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _assemble_in_memory(paths, assembled_path):
+    from indra_cogex.sources.processor import Processor
+
+    na = NodeAssembler()
+    for path in paths:
+        na.add_nodes(list(iter_pickled_nodes(path)))
+    assembled_nodes = sorted(na.assemble_nodes(), key=lambda x: (x.db_ns, x.db_id))
+    if na.conflicts:
+        with gzip.open(assembled_path.with_suffix(".conflicts"), "wt") as fh:
+            writer = csv.writer(fh, delimiter="\t")
+            for conflict in na.conflicts:
+                writer.writerow([conflict.key, conflict.val1, conflict.val2])
+    Processor._dump_nodes_to_path_static(
+        "assembled nodes", assembled_nodes, assembled_path, ["BioEntity"]
+    )
+
+
+def _assemble_streaming(paths, assembled_path):
+    from indra_cogex.sources.cli import assemble_type
+
+    assemble_type(paths, assembled_path, "BioEntity", force_assemble=True)
+
+
+#: The assembly methods and the node files they read
+METHODS = {
+    "in-memory": (_assemble_in_memory, "pickle"),
+    "streaming": (_assemble_streaming, "arrow"),
+}
+
+
+def _run(method, paths, assembled_path, queue):
+    # Importing the processors takes memory too, measure it separately
+    import indra_cogex.sources.cli  # noqa:F401
+
+    baseline = _peak_rss_mb()
+    start = time.time()
+    METHODS[method][0](paths, assembled_path)
+    queue.put((time.time() - start, baseline, _peak_rss_mb()))
+
+
+@click.command()
+@click.option("--nodes", type=int, default=1_000_000, show_default=True)
+@click.option("--processors", type=int, default=4, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+def main(nodes: int, processors: int, seed: int):
+    """Compare the wall time and peak memory of node assembly methods."""
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        click.echo(f"Generating {nodes} nodes from {processors} processors")
+        paths = _make_node_files(directory, nodes, processors, seed)
+        click.echo(f"{'method':<12}{'seconds':>10}{'base MB':>10}{'peak MB':>10}")
+        outputs = {}
+        for method, (_, file_type) in METHODS.items():
+            outputs[method] = directory.joinpath(f"{method}.tsv.gz")
+            queue = ctx.Queue()
+            process = ctx.Process(
+                target=_run, args=(method, paths[file_type], outputs[method], queue)
+            )
+            process.start()
+            seconds, baseline, peak = queue.get()
+            process.join()
+            click.echo(f"{method:<12}{seconds:>10.1f}{baseline:>10.0f}{peak:>10.0f}")
+        with gzip.open(outputs["in-memory"], "rb") as a, gzip.open(
+            outputs["streaming"], "rb"
+        ) as b:
+            if a.read() != b.read():
+                click.secho("The assembled nodes differ", fg="red")
+
+
+if __name__ == "__main__":
+    main()
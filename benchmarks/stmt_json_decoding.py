@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark loading statement json strings.
+
+The corpus is made of the raw statement json strings in
+``tests/test_doubly_escaped_json_str.py``, which have single, double and
+quadruple escapes, and their re-serialized forms without double escapes,
+which are the most common in the INDRA database dumps:
+
+.. code-block:: sh
+
+    python benchmarks/stmt_json_decoding.py --repeat 20000
+
+``previous`` always cleans the string and loads it with :func:`json.loads`,
+the way :func:`indra_cogex.util.load_stmt_json_str` used to work,
+``stdlib`` is the current implementation without orjson, ``orjson`` the
+current implementation with orjson (if it is installed) and ``batch``
+:func:`indra_cogex.util.load_stmt_json_strs` with orjson.
+"""
+
+import ast
+import json
+import time
+from pathlib import Path
+from unittest import mock
+
+import click
+
+from indra_cogex import util
+from indra_cogex.util import (
+    UnicodeEscapeError,
+    clean_stmt_json_str,
+    load_stmt_json_str,
+    load_stmt_json_strs,
+)
+
+HERE = Path(__file__).parent.resolve()
+TEST_PATH = HERE.parent.joinpath("tests", "test_doubly_escaped_json_str.py")
+
+
+def get_corpus():
+    """Get the statement json strings assigned to ``sjs`` in the tests."""
+    tree = ast.parse(TEST_PATH.read_text())
+    raw = [
+        node.value.value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Assign)
+        and any(getattr(target, "id", None) == "sjs" for target in node.targets)
+        and isinstance(node.value, ast.Constant)
+    ]
+    return raw + [json.dumps(load_stmt_json_str(sjs)) for sjs in raw]
+
+
+def _load_previous(stmt_json_str):
+    try:
+        return json.loads(clean_stmt_json_str(stmt_json_str))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        try:
+            return json.loads(stmt_json_str)
+        except Exception as err:
+            raise UnicodeEscapeError(str(err)) from err
+
+
+def _run_each(func, corpus):
+    return [func(sjs) for sjs in corpus]
+
+
+def _run_stdlib(corpus):
+    with mock.patch.object(util, "orjson", None):
+        return _run_each(load_stmt_json_str, corpus)
+
+
+METHODS = {
+    "previous": lambda corpus: _run_each(_load_previous, corpus),
+    "stdlib": _run_stdlib,
+    "orjson": lambda corpus: _run_each(load_stmt_json_str, corpus),
+    "batch": load_stmt_json_strs,
+}
+
+
+@click.command()
+@click.option("--repeat", type=int, default=10_000, show_default=True)
+def main(repeat: int):
+    """Compare the time it takes to load statement json strings."""
+    corpus = get_corpus()
+    strings = corpus * repeat
+    size = sum(map(len, strings)) / 2**20
+    click.echo(f"Loading {len(strings)} strings ({size:.0f} MiB)")
+    if util.orjson is None:
+        click.secho("orjson is not installed", fg="yellow")
+    expected = METHODS["previous"](corpus)
+    click.echo(f"{'method':<10}{'seconds':>10}{'MiB/s':>10}")
+    for method, func in METHODS.items():
+        if func(corpus) != expected:
+            click.secho(f"{method} loads different json", fg="red")
+        start = time.perf_counter()
+        func(strings)
+        seconds = time.perf_counter() - start
+        click.echo(f"{method:<10}{seconds:>10.2f}{size / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
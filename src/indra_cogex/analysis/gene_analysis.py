@@ -1,12 +1,13 @@
+import asyncio
 import logging
 import re
-from typing import Dict, Optional, Union, Tuple, List, Iterable, Collection
+from typing import Callable, Dict, Optional, Union, Tuple, List, Iterable, Collection
 
 import pandas as pd
 
 from indra.databases import hgnc_client
 from indra_cogex.client.enrichment.utils import get_statement_metadata_for_pairs, enrich_with_optimized_metadata
-from indra_cogex.client.neo4j_client import autoclient, Neo4jClient
+from indra_cogex.client.neo4j_client import autoclient, Neo4jClient, run_coroutine
 from indra_cogex.client.enrichment.continuous import (
     get_human_scores,
     get_mouse_scores,
@@ -35,6 +36,28 @@ from indra.databases import uniprot_client
 logger = logging.getLogger(__name__)
 
 
+async def _gather_analyses(
+    analyses: List[Tuple[str, Callable[..., pd.DataFrame]]],
+    *,
+    client: Neo4jClient,
+    minimum_evidence_count: int,
+    minimum_belief: float,
+    **kwargs,
+) -> List[pd.DataFrame]:
+    """Run the given ORA functions concurrently, each in a worker thread."""
+    tasks = []
+    for analysis_name, analysis_func in analyses:
+        analysis_kwargs = dict(kwargs, client=client)
+        # Only the INDRA ORAs are filtered by statement quality
+        if analysis_name.startswith("indra"):
+            analysis_kwargs.update(
+                minimum_evidence_count=minimum_evidence_count,
+                minimum_belief=minimum_belief,
+            )
+        tasks.append(asyncio.to_thread(analysis_func, **analysis_kwargs))
+    return await asyncio.gather(*tasks)
+
+
 @autoclient()
 def discrete_analysis(
     gene_list: List[str],
@@ -91,52 +114,48 @@ def discrete_analysis(
         background_genes, _ = parse_gene_list(background_gene_list)
         background_gene_ids = list(background_genes)
 
-    results = {}
-
-    # Run all analyses (unchanged)
-    for analysis_name, analysis_func in [
+    # The analyses are independent, so their queries are run concurrently
+    analyses = [
         ("go", go_ora),
         ("wikipathways", wikipathways_ora),
         ("reactome", reactome_ora),
         ("phenotype", phenotype_ora),
-        ("indra-upstream", indra_upstream_ora),
-        ("indra-downstream", indra_downstream_ora)
-    ]:
-        # Non-INDRA ORAs
-        if analysis_name in {"go", "wikipathways", "reactome", "phenotype"}:
-            analysis_result = analysis_func(
-                client=client, gene_ids=gene_set, method=method, alpha=alpha,
-                keep_insignificant=keep_insignificant,
-                background_gene_ids=background_gene_ids
-            )
-            results[analysis_name] = analysis_result
-
-        # INDRA ORAs
-        elif indra_path_analysis:
-            analysis_result = analysis_func(
-                client=client, gene_ids=gene_set, method=method, alpha=alpha,
-                keep_insignificant=keep_insignificant,
-                minimum_evidence_count=minimum_evidence_count,
-                minimum_belief=minimum_belief,
-                background_gene_ids=background_gene_ids
-            )
-
-            # Extract kinases and TFs
-            if analysis_name == "indra-upstream" and analysis_result is not None:
-                results[analysis_name] = analysis_result
-
-                # Fast vectorized extraction (replaces the slow concatenation loop)
-                if not analysis_result.empty:
-                    hgnc_mask = analysis_result['curie'].str.lower().str.startswith('hgnc:')
-                    kinase_mask = hgnc_mask & analysis_result['name'].apply(is_kinase)
-                    tf_mask = hgnc_mask & analysis_result['name'].apply(is_transcription_factor)
+    ]
+    if indra_path_analysis:
+        analyses += [
+            ("indra-upstream", indra_upstream_ora),
+            ("indra-downstream", indra_downstream_ora),
+        ]
+    analysis_results = run_coroutine(
+        _gather_analyses(
+            analyses,
+            client=client,
+            gene_ids=gene_set,
+            method=method,
+            alpha=alpha,
+            keep_insignificant=keep_insignificant,
+            minimum_evidence_count=minimum_evidence_count,
+            minimum_belief=minimum_belief,
+            background_gene_ids=background_gene_ids,
+        )
+    )
 
-                    if kinase_mask.any():
-                        results["indra-upstream-kinases"] = analysis_result[kinase_mask].copy()
-                    if tf_mask.any():
-                        results["indra-upstream-tfs"] = analysis_result[tf_mask].copy()
-            else:
-                results[analysis_name] = analysis_result
+    results = {}
+    for (analysis_name, _), analysis_result in zip(analyses, analysis_results):
+        results[analysis_name] = analysis_result
+
+        # Extract kinases and TFs
+        if analysis_name == "indra-upstream" and analysis_result is not None:
+            # Fast vectorized extraction (replaces the slow concatenation loop)
+            if not analysis_result.empty:
+                hgnc_mask = analysis_result['curie'].str.lower().str.startswith('hgnc:')
+                kinase_mask = hgnc_mask & analysis_result['name'].apply(is_kinase)
+                tf_mask = hgnc_mask & analysis_result['name'].apply(is_transcription_factor)
+
+                if kinase_mask.any():
+                    results["indra-upstream-kinases"] = analysis_result[kinase_mask].copy()
+                if tf_mask.any():
+                    results["indra-upstream-tfs"] = analysis_result[tf_mask].copy()
 
     # Optimized statement metadata enrichment
     if indra_path_analysis:
@@ -8,6 +8,7 @@ determining if any of the proteins belong to the same protein family/complex
 as the target, and using gene set enrichment on intermediates between
 the source and the target.
 """
+import asyncio
 import json
 import base64
 import logging
@@ -29,6 +30,8 @@ from indra.databases import hgnc_client
 from indra.statements import *
 
 from indra_cogex.client import *
+from indra_cogex.client.neo4j_client import process_identifier, run_coroutine
+from indra_cogex.representation import norm_id
 from ..client.enrichment.discrete import (
     indra_upstream_ora,
     go_ora,
@@ -138,33 +141,38 @@ def get_stmts_from_source(source_id, *, client, source_ns='HGNC', target_protein
         Contains INDRA relationships for source protein filtered by
         "target_proteins"
     """
-    # Get indra_rel objects for protiens that have a direct INDRA relationship
-    # with the source protein
-    res = client.get_target_relations(
-        source=(source_ns, source_id),
-        relation='indra_rel',
-        source_type='BioEntity',
-        target_type='BioEntity',
-    )
+    # Get indra_rel properties for protiens that have a direct INDRA
+    # relationship with the source protein, directly as columns
+    query = """\
+        MATCH (s:BioEntity)-[r:indra_rel]->(t:BioEntity)
+        WHERE s.id = $source
+        RETURN
+            t.name AS name,
+            r.stmt_json AS stmt_json,
+            t.id AS target_curie,
+            r.stmt_type AS stmt_type,
+            r.evidence_count AS evidence_count,
+            r.stmt_hash AS stmt_hash,
+            r.source_counts AS source_counts
+    """
+    stmts_by_protein_df = client.query_df(query, source=norm_id(source_ns, source_id))
     # TODO: we should look up additional evidence for these
     # statements and add them here
 
-    # Extract necessary information from the result and creates dictionary
-    records = [
-        {
-            "name": entry.target_name,
-            "stmt_json": entry.data["stmt_json"],
-            "target_type": entry.target_ns,
-            "target_id": entry.target_id,
-            "stmt_type": entry.data["stmt_type"],
-            "evidence_count": entry.data["evidence_count"],
-            "stmt_hash": entry.data["stmt_hash"],
-            "source_counts": json.loads(entry.data["source_counts"]),
-        }
-        for entry in res
-    ]
-
-    stmts_by_protein_df = pd.DataFrame.from_records(records)
+    # Split the target CURIEs into namespace and identifier once per target
+    target_curies = stmts_by_protein_df.pop("target_curie")
+    targets = {
+        curie: process_identifier(curie) for curie in target_curies.unique()
+    }
+    stmts_by_protein_df.insert(
+        2, "target_type", target_curies.map(lambda curie: targets[curie][0])
+    )
+    stmts_by_protein_df.insert(
+        3, "target_id", target_curies.map(lambda curie: targets[curie][1])
+    )
+    stmts_by_protein_df["source_counts"] = stmts_by_protein_df["source_counts"].map(
+        json.loads
+    )
 
     # If there are target proteins filters data frame based on that list
     if target_proteins:
@@ -579,6 +587,53 @@ def convert_plot_to_base64(fig):
     return plot_data
 
 
+async def _gather_downstream_analyses(source_hgnc_id, target_hgnc_ids, *, client):
+    """Run the queries of the downstream analysis concurrently.
+
+    Each analysis runs in a worker thread, and the ones that depend on the
+    result of another query are chained.
+    """
+    async def _statements_and_upstream():
+        stmts_df, filtered_df = await asyncio.to_thread(
+            get_stmts_from_source,
+            source_hgnc_id,
+            target_proteins=target_hgnc_ids,
+            client=client,
+        )
+        upstream = await asyncio.to_thread(
+            shared_upstream_bioentities_from_targets,
+            stmts_df,
+            target_hgnc_ids,
+            client=client,
+        )
+        return stmts_df, filtered_df, upstream
+
+    async def _go_terms():
+        source_go_terms, _ = await asyncio.to_thread(
+            get_go_terms_for_source, source_hgnc_id
+        )
+        shared_go_df = await asyncio.to_thread(
+            find_shared_go_terms, source_go_terms, target_hgnc_ids, client=client
+        )
+        return source_go_terms, shared_go_df
+
+    hgnc_map = {hgnc_id: hgnc_client.get_hgnc_name(hgnc_id) for hgnc_id in target_hgnc_ids}
+    return await asyncio.gather(
+        _statements_and_upstream(),
+        asyncio.to_thread(discrete_analysis, hgnc_map, client=client),
+        asyncio.to_thread(
+            shared_pathways_between_gene_sets, [source_hgnc_id], target_hgnc_ids
+        ),
+        asyncio.to_thread(
+            shared_protein_families, target_hgnc_ids, source_hgnc_id, client=client
+        ),
+        _go_terms(),
+        asyncio.to_thread(
+            combine_target_gene_pathways, source_hgnc_id, target_hgnc_ids, client=client
+        ),
+    )
+
+
 @autoclient()
 def run_explain_downstream_analysis(
     source_hgnc_id,
@@ -623,8 +678,20 @@ def run_explain_downstream_analysis(
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    # The queries of the analyses are independent of each other, so they are
+    # run concurrently and the results are written out below
+    (
+        (stmts_df, filtered_df, (shared_proteins, shared_entities)),
+        discrete_result,
+        shared_pathways_result,
+        shared_families_result,
+        (source_go_terms, shared_go_df),
+        pathways_df,
+    ) = run_coroutine(
+        _gather_downstream_analyses(source_hgnc_id, target_hgnc_ids, client=client)
+    )
+
     # 1. Get statements and create visualizations
-    stmts_df, filtered_df = get_stmts_from_source(source_hgnc_id, target_proteins=target_hgnc_ids)
 
     # Create and convert interaction plot
     interaction_fig = plot_stmts_by_type(filtered_df)
@@ -702,30 +769,24 @@ def run_explain_downstream_analysis(
                 json.dump(stmt_data, f, default=str, indent=2)
 
     # 2. Run discrete analysis
-    hgnc_map = {hgnc_id: hgnc_client.get_hgnc_name(hgnc_id) for hgnc_id in target_hgnc_ids}
-    discrete_result = discrete_analysis(hgnc_map, client=client)
     results['discrete_analysis'] = discrete_result
     if output_dir:
         with open(os.path.join(output_dir, 'discrete_analysis.json'), 'w') as f:
             json.dump(discrete_result, f, default=str, indent=2)
 
     # 3. Find shared pathways
-    shared_pathways_result = shared_pathways_between_gene_sets([source_hgnc_id], target_hgnc_ids)
     results['shared_pathways'] = shared_pathways_result
     if output_dir:
         with open(os.path.join(output_dir, 'shared_pathways.json'), 'w') as f:
             json.dump(shared_pathways_result, f, default=str, indent=2)
 
     # 4. Analyze protein families
-    shared_families_result = shared_protein_families(target_hgnc_ids, source_hgnc_id)
     results['protein_families'] = shared_families_result
     if output_dir:
         with open(os.path.join(output_dir, 'protein_families.json'), 'w') as f:
             json.dump(shared_families_result, f, default=str, indent=2)
 
     # 5. GO terms analysis
-    source_go_terms, _ = get_go_terms_for_source(source_hgnc_id)
-    shared_go_df = find_shared_go_terms(source_go_terms, target_hgnc_ids)
     results['go_terms'] = {
         'source_terms': source_go_terms,
         'shared_terms': shared_go_df
@@ -745,10 +806,6 @@ def run_explain_downstream_analysis(
             shared_go_df.to_html(os.path.join(go_terms_dir, 'shared_terms.html'))
 
     # 6. Additional analyses
-    shared_proteins, shared_entities = shared_upstream_bioentities_from_targets(
-        stmts_df,
-        target_hgnc_ids
-    )
     results['upstream'] = {
         'shared_proteins': shared_proteins,
         'shared_entities': shared_entities
@@ -762,7 +819,6 @@ def run_explain_downstream_analysis(
             json.dump(shared_entities, f, default=str, indent=2)
 
     # 7. Get combined pathway analysis
-    pathways_df = combine_target_gene_pathways(source_hgnc_id, target_hgnc_ids)
     results['combined_pathways'] = pathways_df
     if output_dir and not pathways_df.empty:
         pathways_df.to_csv(os.path.join(output_dir, 'combined_pathways.csv'))
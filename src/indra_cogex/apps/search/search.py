@@ -1,6 +1,7 @@
+import asyncio
 import json
 import logging
-from typing import Dict, List, Mapping, Optional, Tuple, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 import bioregistry
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session
@@ -16,7 +17,7 @@ from wtforms.validators import DataRequired
 
 from indra.util.statement_presentation import reverse_source_mappings
 from indra_cogex.apps.utils import render_statements, resolve_email
-from indra_cogex.client import Neo4jClient, autoclient
+from indra_cogex.client import Neo4jClient, autoclient, run_coroutine
 from indra_cogex.client.queries import *
 from indra_cogex.representation import norm_id
 
@@ -284,6 +285,44 @@ def gilda_ground(
         return {"error": f"Grounding failed: {err}"}
 
 
+def _get_ora_relations_query(rel_type: str, is_downstream: bool) -> str:
+    # Main query for getting statements
+    if is_downstream:
+        pattern = f"p = (u:BioEntity)-[r:{rel_type}]->(d:BioEntity {{id: $target_id}})"
+    else:
+        pattern = f"p = (d:BioEntity {{id: $target_id}})-[r:{rel_type}]->(u:BioEntity)"
+    belief_filter = "AND r.belief > $minimum_belief" if rel_type == "indra_rel" else ""
+    return f"""
+    MATCH {pattern}
+    WHERE u.id STARTS WITH "hgnc"
+    AND NOT u.obsolete
+    AND u.id IN $genes
+    {belief_filter}
+    WITH distinct r.stmt_hash AS hash, collect(p) as pp
+    RETURN pp
+    """
+
+
+async def _gather_ora_relations(
+    rel_types: List[str],
+    is_downstream: bool,
+    params: Mapping[str, Any],
+    *,
+    client: Neo4jClient,
+) -> List[List]:
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                client.query_tx,
+                _get_ora_relations_query(rel_type, is_downstream),
+                **params,
+            )
+            for rel_type in rel_types
+        )
+    )
+    return [row for rel_type_results in results for row in rel_type_results]
+
+
 @autoclient()
 def get_ora_statements(
     target_id: str,
@@ -339,37 +378,16 @@ def get_ora_statements(
         normalized_target = target_id.lower()
         rel_types = ["indra_rel"]
 
-    # Main query for getting statements
-    query = """
-    MATCH p = (d:BioEntity {id: $target_id})-[r]->(u:BioEntity)
-    WHERE type(r) IN $rel_types
-    AND u.id STARTS WITH "hgnc"
-    AND NOT u.obsolete
-    AND u.id IN $genes
-    AND (type(r) <> 'indra_rel' OR r.belief > $minimum_belief)
-    WITH distinct r.stmt_hash AS hash, collect(p) as pp
-    RETURN pp
-    """
-
-    if is_downstream:
-        query = """
-        MATCH p = (u:BioEntity)-[r]->(d:BioEntity {id: $target_id})
-        WHERE type(r) IN $rel_types
-        AND u.id STARTS WITH "hgnc"
-        AND NOT u.obsolete
-        AND u.id IN $genes
-        AND (type(r) <> 'indra_rel' OR r.belief > $minimum_belief)
-        WITH distinct r.stmt_hash AS hash, collect(p) as pp
-        RETURN pp
-        """
-
     params = {
         "target_id": normalized_target,
         "genes": normalized_genes,
-        "rel_types": rel_types,
         "minimum_belief": minimum_belief
     }
-    results = client.query_tx(query, **params)
+    # The relation types are queried separately and concurrently, so each
+    # query can use the relationship type index
+    results = run_coroutine(
+        _gather_ora_relations(rel_types, is_downstream, params, client=client)
+    )
     flattened_rels = [client.neo4j_to_relation(i[0]) for rel in results for i in rel]
 
     # Filter relations based on minimum_evidence
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
 """Assembly of Node objects."""
+import heapq
+import itertools
+import pickle
 import pystow
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 from indra_cogex.representation import Node
 
@@ -82,11 +85,338 @@ class NodeAssembler:
             for data_key, data_val in node.data.items():
                 previous_val = data.get(data_key)
                 if previous_val and previous_val != data_val:
-                    self.conflicts.append(Conflict(data_key, previous_val, data_val))
+                    self.add_conflict(Conflict(data_key, previous_val, data_val))
                 else:
                     data[data_key] = data_val
         return Node(db_ns, db_id, sorted(labels), data, validate_data=True)
 
+    def add_conflict(self, conflict: "Conflict"):
+        """Record a conflict between the data values of nodes.
+
+        Parameters
+        ----------
+        conflict :
+            The conflict to record.
+        """
+        self.conflicts.append(conflict)
+
+
+class StreamingNodeAssembler(NodeAssembler):
+    """Assembles streams of Node objects sorted by their grounding.
+
+    The streams are merged with a heap and one group of nodes with the same
+    grounding is aggregated at a time, so only one node per stream and the
+    current group are held in memory.
+    """
+
+    def __init__(
+        self,
+        node_streams: Iterable[Iterable[Node]],
+        on_conflict: Optional[Callable[["Conflict"], None]] = None,
+    ):
+        """Initialize a new StreamingNodeAssembler object.
+
+        Parameters
+        ----------
+        node_streams :
+            Iterables of Node objects, each sorted by ``(db_ns, db_id)``.
+        on_conflict :
+            A function called with each conflict as it is found. If not
+            given, the conflicts are collected in :attr:`conflicts`.
+        """
+        super().__init__()
+        self.node_streams = list(node_streams)
+        self.on_conflict = on_conflict
+
+    def add_nodes(self, nodes: Iterable[Node]):
+        """Add a sorted stream of Node objects to the assembler.
+
+        Parameters
+        ----------
+        nodes :
+            An iterable of Node objects sorted by ``(db_ns, db_id)``.
+        """
+        self.node_streams.append(nodes)
+
+    def add_conflict(self, conflict: "Conflict"):
+        """Pass a conflict to the conflict handler or record it.
+
+        Parameters
+        ----------
+        conflict :
+            The conflict to pass on.
+        """
+        if self.on_conflict is None:
+            super().add_conflict(conflict)
+        else:
+            self.on_conflict(conflict)
+
+    def iter_assembled_nodes(self) -> Iterator[Node]:
+        """Iterate over the assembled nodes in the order of their grounding.
+
+        Yields
+        ------
+        :
+            The Node objects assembled from the nodes with the same grounding.
+
+        Raises
+        ------
+        ValueError
+            If one of the streams is not sorted by ``(db_ns, db_id)``.
+        """
+        merged = heapq.merge(
+            *(_check_sorted(stream) for stream in self.node_streams),
+            key=_node_sort_key,
+        )
+        for (db_ns, db_id), node_group in itertools.groupby(merged, key=_node_sort_key):
+            node_group = list(node_group)
+            # Nodes without duplicates only need a new node if their labels
+            # aren't in the order of an aggregate node
+            if len(node_group) == 1 and _has_sorted_labels(node_group[0]):
+                yield node_group[0]
+            else:
+                yield self.get_aggregate_node(db_ns, db_id, node_group)
+
+    def assemble_nodes(self) -> List[Node]:
+        """Assemble the nodes in the assembler.
+
+        Returns
+        -------
+        nodes :
+            A list of Node objects sorted by their grounding.
+        """
+        return list(self.iter_assembled_nodes())
+
+
+def _node_sort_key(node: Node):
+    return node.db_ns, node.db_id
+
+
+def _has_sorted_labels(node: Node) -> bool:
+    labels = list(node.labels)
+    return all(a < b for a, b in zip(labels, labels[1:]))
+
+
+def _check_sorted(nodes: Iterable[Node]) -> Iterator[Node]:
+    previous = None
+    for node in nodes:
+        key = _node_sort_key(node)
+        if previous is not None and key < previous:
+            raise ValueError(f"Nodes are not sorted, got {key} after {previous}")
+        previous = key
+        yield node
+
+
+#: The number of nodes pickled together in a node pickle file
+NODE_PICKLE_BLOCK_SIZE = 10_000
+
+
+def dump_pickled_nodes(nodes: Iterable[Node], path: Path) -> None:
+    """Pickle nodes in blocks so that they can be loaded as a stream.
+
+    Parameters
+    ----------
+    nodes :
+        The nodes to pickle.
+    path :
+        The path to the output pickle file.
+    """
+    nodes = iter(nodes)
+    with open(path, "wb") as fh:
+        while True:
+            block = list(itertools.islice(nodes, NODE_PICKLE_BLOCK_SIZE))
+            if not block:
+                break
+            pickle.dump(block, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def iter_pickled_nodes(path: Path) -> Iterator[Node]:
+    """Iterate over the nodes pickled by :func:`dump_pickled_nodes`.
+
+    Files with a single pickled list of nodes are read as well.
+
+    Parameters
+    ----------
+    path :
+        The path to the pickle file.
+
+    Yields
+    ------
+    :
+        The pickled nodes in the order they were dumped.
+    """
+    with open(path, "rb") as fh:
+        while True:
+            try:
+                block = pickle.load(fh)
+            except EOFError:
+                return
+            yield from block
+
+
+#: The number of nodes in a record batch of a node Arrow file
+NODE_ARROW_BATCH_SIZE = 50_000
+#: The metadata marking columns of pickled values in a node Arrow file
+PICKLE_ENCODING = {b"encoding": b"pickle"}
+#: The field metadata key of the columns marking which nodes have a data key
+#: in a node Arrow file, whose value is the data key
+PRESENCE_METADATA = b"present"
+#: Python types stored as native Arrow columns if all values of a column
+#: have the same one, other columns store pickled values
+NATIVE_ARROW_TYPES = {str, int, float, bool}
+
+
+def dump_arrow_nodes(nodes: List[Node], path: Path) -> None:
+    """Dump nodes to an Arrow IPC file with one column per data key.
+
+    The file has the columns ``db_ns``, ``db_id`` and ``labels`` followed by
+    the data keys in sorted order. A column is stored with its native Arrow
+    type if all of its values have the same Python type, otherwise as pickled
+    values so that they are read back unchanged. Missing data values are
+    stored as nulls. For the data keys with a value of None on any node, a
+    boolean column after the data columns marks the nodes that have the key,
+    so that a None value is read back as None while a missing key is left
+    out. This requires the optional dependency ``pyarrow``.
+
+    Parameters
+    ----------
+    nodes :
+        The nodes to dump.
+    path :
+        The path to the output Arrow file.
+    """
+    import pyarrow as pa
+
+    keys = sorted({key for node in nodes for key in node.data})
+    null_keys = {
+        key for node in nodes for key, value in node.data.items() if value is None
+    }
+    fields = [
+        _get_arrow_column("db_ns", [node.db_ns for node in nodes]),
+        _get_arrow_column("db_id", [node.db_id for node in nodes]),
+        (
+            pa.field("labels", pa.list_(pa.string())),
+            pa.array([list(node.labels) for node in nodes], pa.list_(pa.string())),
+        ),
+    ]
+    for key in keys:
+        fields.append(_get_arrow_column(key, [node.data.get(key) for node in nodes]))
+    for key in keys:
+        if key in null_keys:
+            fields.append(
+                (
+                    pa.field(
+                        f"{key}:present",
+                        pa.bool_(),
+                        metadata={PRESENCE_METADATA: key.encode("utf-8")},
+                    ),
+                    pa.array([key in node.data for node in nodes], pa.bool_()),
+                )
+            )
+    table = pa.Table.from_arrays(
+        [array for _, array in fields],
+        schema=pa.schema([field for field, _ in fields]),
+    )
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=NODE_ARROW_BATCH_SIZE)
+
+
+def _get_arrow_column(name: str, values: List[Any]):
+    import pyarrow as pa
+
+    value_types = {type(value) for value in values if value is not None}
+    if len(value_types) <= 1 and value_types <= NATIVE_ARROW_TYPES:
+        try:
+            array = pa.array(values, type=None if value_types else pa.string())
+            return pa.field(name, array.type), array
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            # E.g., integers that don't fit into 64 bits
+            pass
+    array = pa.array(
+        [None if value is None else pickle.dumps(value) for value in values],
+        type=pa.binary(),
+    )
+    return pa.field(name, pa.binary(), metadata=PICKLE_ENCODING), array
+
+
+def iter_arrow_nodes(path: Path) -> Iterator[Node]:
+    """Iterate over the nodes dumped by :func:`dump_arrow_nodes`.
+
+    The file is memory mapped and read one record batch at a time, so only
+    the nodes of the current batch are in memory. This requires the optional
+    dependency ``pyarrow``.
+
+    Parameters
+    ----------
+    path :
+        The path to the Arrow file.
+
+    Yields
+    ------
+    :
+        The nodes in the order they were dumped.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        schema = reader.schema
+        presence_fields = {
+            field.metadata[PRESENCE_METADATA].decode("utf-8"): idx
+            for idx, field in enumerate(schema)
+            if field.metadata and PRESENCE_METADATA in field.metadata
+        }
+        data_keys = schema.names[3:len(schema) - len(presence_fields)]
+        for batch_idx in range(reader.num_record_batches):
+            batch = reader.get_batch(batch_idx)
+            columns = [
+                _read_arrow_column(schema.field(idx), batch.column(idx))
+                for idx in range(3 + len(data_keys))
+            ]
+            # Whether each node has each data key, None for the keys that
+            # are never set to None, which nodes have if their value isn't
+            # null
+            presences = [
+                batch.column(presence_fields[key]).to_pylist()
+                if key in presence_fields
+                else None
+                for key in data_keys
+            ]
+            for row, (db_ns, db_id, labels, *values) in enumerate(zip(*columns)):
+                data = {
+                    key: value
+                    for key, value, presence in zip(data_keys, values, presences)
+                    if (value is not None if presence is None else presence[row])
+                }
+                yield Node(db_ns, db_id, labels, data)
+
+
+def _read_arrow_column(field, array) -> List[Any]:
+    values = array.to_pylist()
+    if field.metadata == PICKLE_ENCODING:
+        return [None if value is None else pickle.loads(value) for value in values]
+    return values
+
+
+def iter_nodes_from_path(path: Path) -> Iterator[Node]:
+    """Iterate over the nodes in an intermediate node file of a processor.
+
+    Parameters
+    ----------
+    path :
+        The path to an Arrow file written by :func:`dump_arrow_nodes` or a
+        pickle file written by :func:`dump_pickled_nodes`.
+
+    Yields
+    ------
+    :
+        The nodes in the order they were dumped.
+    """
+    if Path(path).suffix == ".arrow":
+        return iter_arrow_nodes(path)
+    return iter_pickled_nodes(path)
+
 
 class Conflict:
     def __init__(self, key, val1, val2):
@@ -1,9 +1,10 @@
 """Tools for INDRA curation."""
 
+import json
 import logging
 from functools import lru_cache
 from itertools import chain
-from typing import Iterable, List, Mapping, Optional, Set, Tuple, Type
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Type
 
 import pandas as pd
 from indra.assemblers.indranet import IndraNetAssembler
@@ -170,6 +171,18 @@ def _limit_line(limit: Optional[int] = None) -> str:
     return f"LIMIT {limit}"
 
 
+def _query_source_counts(client: Neo4jClient, query: str) -> Dict[int, Dict[str, int]]:
+    # The query returns the stmt_hash and source_counts columns, which are
+    # read as columns instead of one row at a time
+    df = client.query_df(query)
+    return dict(
+        zip(
+            df["stmt_hash"].tolist(),
+            map(json.loads, df["source_counts"].tolist()),
+        )
+    )
+
+
 @autoclient()
 def get_ppi_source_counts(
     *,
@@ -208,9 +221,9 @@ def get_ppi_source_counts(
             AND a.id < b.id
             {"" if include_db_evidence else "AND NOT r.has_database_evidence"}
             AND r.evidence_count > {minimum_evidences}
-        RETURN r.stmt_hash, r.source_counts
+        RETURN r.stmt_hash AS stmt_hash, r.source_counts AS source_counts
     """
-    return client.query_dict_value_json(query)
+    return _query_source_counts(client, query)
 
 
 @autoclient()
@@ -246,11 +259,11 @@ def get_goa_source_counts(
             AND r.evidence_count > {minimum_evidences}
             {"" if include_db_evidence else "AND NOT r.has_database_evidence"}
             AND NOT r.medscan_only
-        RETURN r.stmt_hash, r.source_counts
+        RETURN r.stmt_hash AS stmt_hash, r.source_counts AS source_counts
         ORDER BY r.has_database_evidence DESC, r.evidence_count DESC
     """
 
-    result = client.query_dict_value_json(query)
+    result = _query_source_counts(client, query)
 
     return result
 
@@ -451,10 +464,10 @@ def _help(
             AND a.id <> b.id
             AND r.evidence_count > {minimum_evidences} 
             AND r.source_counts IS NOT NULL
-        RETURN r.stmt_hash, r.source_counts 
+        RETURN r.stmt_hash AS stmt_hash, r.source_counts AS source_counts 
         {_limit_line(limit)}
     """
-    result = client.query_dict_value_json(query)
+    result = _query_source_counts(client, query)
 
     return result
 
@@ -474,11 +487,11 @@ def get_entity_source_counts(
             a.id = "{prefix}:{identifier}"
             {"" if include_db_evidence else "AND NOT r.has_database_evidence"}
             AND a.id <> b.id
-        RETURN r.stmt_hash, r.source_counts
+        RETURN r.stmt_hash AS stmt_hash, r.source_counts AS source_counts
         ORDER BY r.evidence_count DESC
         {_limit_line(limit)}
     """
-    return client.query_dict_value_json(query)
+    return _query_source_counts(client, query)
 
 
 @autoclient()
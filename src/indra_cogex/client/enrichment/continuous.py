@@ -5,10 +5,13 @@
 For example, this could be applied to the log_2 fold scores from differential gene
 expression experiments.
 
+GSEA is run with the NumPy implementation in
+:mod:`indra_cogex.client.enrichment.prerank`.
+
 .. warning::
 
-    This module requires the optional dependency ``gseapy``. Install with
-    ``pip install gseapy``.
+    Writing enrichment plots (i.e., when passing a ``directory``) requires
+    the optional dependency ``gseapy``. Install with ``pip install gseapy``.
 """
 
 
@@ -16,7 +19,6 @@ from typing import Any, Dict, Optional, Set, Tuple, Union
 from indra.databases import hgnc_client
 from pathlib import Path
 import logging
-import gseapy
 import pandas as pd
 
 from indra_cogex.client.enrichment.utils import (
@@ -27,6 +29,7 @@ from indra_cogex.client.enrichment.utils import (
     get_reactome,
     get_wikipathways, get_statement_metadata_for_pairs,
 )
+from indra_cogex.client.enrichment.prerank import prerank
 from indra_cogex.client.neo4j_client import Neo4jClient, autoclient
 
 logger = logging.getLogger(__name__)
@@ -244,7 +247,8 @@ def wikipathways_gsea(
         Specify the directory if the results should be saved, including
         both a dataframe and plots for each gen set
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -280,7 +284,8 @@ def reactome_gsea(
         Specify the directory if the results should be saved, including
         both a dataframe and plots for each gen set
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -316,7 +321,8 @@ def phenotype_gsea(
         Specify the directory if the results should be saved, including
         both a dataframe and plots for each gen set
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -352,7 +358,8 @@ def go_gsea(
         Specify the directory if the results should be saved, including
         both a dataframe and plots for each gen set
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -397,7 +404,8 @@ def indra_upstream_gsea(
         The minimum belief for a relationship to count it as a regulator.
         Defaults to 0.0 (i.e., cutoff not applied).
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -456,7 +464,8 @@ def indra_downstream_gsea(
         The minimum belief for a relationship to count it as a regulator.
         Defaults to 0.0 (i.e., cutoff not applied).
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -536,7 +545,8 @@ def gsea(
     is_downstream :
         Whether this is downstream analysis (gene → regulator)
     kwargs :
-        Remaining keyword arguments to pass through to :func:`gseapy.prerank`
+        Remaining keyword arguments to pass through to
+        :func:`indra_cogex.client.enrichment.prerank.prerank`
 
     Returns
     -------
@@ -545,12 +555,6 @@ def gsea(
     """
     if alpha is None:
         alpha = 0.05
-    if directory is not None:
-        if isinstance(directory, str):
-            directory = Path(directory)
-        directory.mkdir(exist_ok=True, parents=True)
-        directory = directory.as_posix()
-
     # Extract curie to name mapping and convert gene sets format
     curie_to_name = dict(gene_sets.keys())
 
@@ -561,7 +565,7 @@ def gsea(
         for (curie, _), hgnc_gene_ids in gene_sets.items()
     }
 
-    # Set default parameters for gseapy
+    # Set default parameters for prerank
     kwargs.setdefault("permutation_num", 100)
     kwargs.setdefault("format", "svg")
 
@@ -569,28 +573,18 @@ def gsea(
     kwargs.setdefault("min_size", 1)
     kwargs.setdefault("max_size", 50000)
 
-    # Convert gene sets to ensure they're regular sets of strings
-    curie_to_gene_sets_final = {
-        curie: set(str(gene_id) for gene_id in gene_set)
-        for curie, gene_set in curie_to_gene_sets.items()
-    }
-
-    # Run GSEA analysis
-    res = gseapy.prerank(
-        rnk=pd.Series(scores),
-        gene_sets=curie_to_gene_sets_final,
+    # Run GSEA analysis, plots are only made if a directory is given
+    rv = prerank(
+        scores=scores,
+        gene_sets=curie_to_gene_sets,
         outdir=directory,
         **kwargs,
     )
-
-    # Process results
-    # Full column list as of gseapy 1.1.2:
-    # Name, Term, ES, NES, NOM p-val, FDR q-val, FWER p-val, Tag %, Gene %,
-    # Lead_genes
-    rv = res.res2d.reset_index()
     rv["Name"] = rv["Term"].map(curie_to_name)
-    rv["matched_size"] = rv['Tag %'].apply(lambda s: s.split('/')[0])
-    rv["geneset_size"] = rv['Tag %'].apply(lambda s: s.split('/')[1])
+    # The sizes were parsed from the "Tag %" strings of gseapy, they are kept
+    # as strings so that the JSON output doesn't change
+    rv["matched_size"] = rv["matched_size"].astype(str)
+    rv["geneset_size"] = rv["geneset_size"].astype(str)
 
     # Filter columns BEFORE adding statements (statements not in original GSEA_RETURN_COLUMNS)
     base_columns = [col for col in GSEA_RETURN_COLUMNS if col != "statements"]
@@ -6,16 +6,13 @@ from typing import Collection, Iterable, List, Mapping, Optional, Set, Tuple, Un
 import logging
 import numpy as np
 import pandas as pd
-from scipy.stats import fisher_exact
+from scipy.stats import fisher_exact, hypergeom
 from statsmodels.stats.multitest import multipletests
 
+from indra_cogex.client.enrichment.gene_set_matrix import GeneSetMatrix
 from indra_cogex.client.enrichment.utils import (
-    get_entity_to_regulators,
-    get_entity_to_targets,
-    get_go,
-    get_phenotype_gene_sets,
-    get_reactome,
-    get_wikipathways,
+    get_confidence_gene_set_matrix,
+    get_gene_set_matrix,
     get_kinase_phosphosites,
 )
 from indra_cogex.client.neo4j_client import Neo4jClient, autoclient
@@ -149,8 +146,60 @@ def gene_ontology_single_ora(
     return fisher_exact(table, alternative="greater")[1]
 
 
+def _ora_pvalues(
+    gene_set_matrix: GeneSetMatrix,
+    query_set: Set[Union[str, Tuple[str, str]]],
+    count: int,
+) -> np.ndarray:
+    """Calculate the one-sided Fisher's exact test p-value for every gene set.
+
+    This is a vectorized equivalent of applying :func:`fisher_exact` with
+    ``alternative="greater"`` on the table from
+    :func:`_prepare_hypergeometric_test` for each gene set, and gives the
+    same p-values.
+
+    Parameters
+    ----------
+    gene_set_matrix :
+        The gene sets to test against.
+    query_set :
+        Input gene set to test against each gene set.
+    count :
+        Size of the background gene set.
+
+    Returns
+    -------
+    :
+        An array of p-values, one for each gene set in the matrix.
+    """
+    overlap = gene_set_matrix.overlaps(query_set)
+    query_size = len(query_set)
+    target_sizes = gene_set_matrix.sizes
+    # The cells of the 2x2 contingency table that are needed for the test,
+    # the overlap is the top-left cell of the table
+    query_only = query_size - overlap
+    neither = count - (query_size + target_sizes - overlap)
+    if (neither < 0).any():
+        raise ValueError("All values in `table` must be nonnegative.")
+    pvalues = np.atleast_1d(
+        hypergeom.cdf(query_only, count, query_size, count - target_sizes)
+    ).astype(float)
+    # Like fisher_exact, return 1 if any row or column of the table sums to 0
+    degenerate = (
+        (query_size == 0)
+        | (query_size == count)
+        | (target_sizes == 0)
+        | (target_sizes == count)
+    )
+    pvalues[degenerate] = 1.0
+    return np.minimum(pvalues, 1.0)
+
+
 def _do_ora(
-    curie_to_target_sets: Mapping[Tuple[str, str], Set[Union[str, Tuple[str, str]]]],
+    curie_to_target_sets: Union[
+        GeneSetMatrix,
+        Mapping[Tuple[str, str], Set[Union[str, Tuple[str, str]]]],
+    ],
     query: Iterable[Union[str, Tuple[str, str]]],
     count: int,
     method: Optional[str] = "fdr_bh",
@@ -159,19 +208,20 @@ def _do_ora(
 ) -> pd.DataFrame:
     if alpha is None:
         alpha = 0.05
+    if isinstance(curie_to_target_sets, GeneSetMatrix):
+        gene_set_matrix = curie_to_target_sets
+    else:
+        gene_set_matrix = GeneSetMatrix.from_gene_sets(curie_to_target_sets)
     query_set = set(query)
-    rows = []
-    for (curie, name), target_set in curie_to_target_sets.items():
-        table = _prepare_hypergeometric_test(
-            query_set=query_set,
-            target_set=target_set,
-            universe_size=count,
-        )
-        _, pvalue = fisher_exact(table, alternative="greater")
-        rows.append((curie, name, pvalue))
-    df = pd.DataFrame(rows, columns=["curie", "name", "p"]).sort_values(
-        "p", ascending=True
-    )
+    pvalues = _ora_pvalues(gene_set_matrix, query_set=query_set, count=count)
+    df = pd.DataFrame(
+        {
+            "curie": [curie for curie, _ in gene_set_matrix.keys],
+            "name": [name for _, name in gene_set_matrix.keys],
+            "p": pvalues,
+        },
+        columns=["curie", "name", "p"],
+    ).sort_values("p", ascending=True)
     df["mlp"] = -np.log10(df["p"])
     if method:
         correction_results = multipletests(
@@ -220,8 +270,12 @@ def go_ora(
         else len(background_gene_ids)
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
-    return _do_ora(get_go(client=client, background_gene_ids=bg_genes),
-                   query=gene_ids, count=count, **kwargs)
+    return _do_ora(
+        get_gene_set_matrix(
+            "go", client=client, background_gene_ids=bg_genes
+        ),
+        query=gene_ids, count=count, **kwargs
+    )
 
 
 def wikipathways_ora(
@@ -257,7 +311,9 @@ def wikipathways_ora(
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
     return _do_ora(
-        get_wikipathways(client=client, background_gene_ids=bg_genes),
+        get_gene_set_matrix(
+            "wikipathways", client=client, background_gene_ids=bg_genes
+        ),
         query=gene_ids, count=count, **kwargs
     )
 
@@ -294,8 +350,12 @@ def reactome_ora(
         else len(background_gene_ids)
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
-    return _do_ora(get_reactome(client=client, background_gene_ids=bg_genes),
-                   query=gene_ids, count=count, **kwargs)
+    return _do_ora(
+        get_gene_set_matrix(
+            "reactome", client=client, background_gene_ids=bg_genes
+        ),
+        query=gene_ids, count=count, **kwargs
+    )
 
 
 @autoclient()
@@ -333,7 +393,9 @@ def phenotype_ora(
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
     return _do_ora(
-        get_phenotype_gene_sets(client=client, background_gene_ids=bg_genes),
+        get_gene_set_matrix(
+            "phenotypes", client=client, background_gene_ids=bg_genes
+        ),
         query=gene_ids, count=count, **kwargs
     )
 
@@ -381,7 +443,8 @@ def indra_downstream_ora(
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
     return _do_ora(
-        get_entity_to_regulators(
+        get_confidence_gene_set_matrix(
+            "entity_to_regulators",
             client=client,
             minimum_evidence_count=minimum_evidence_count,
             minimum_belief=minimum_belief,
@@ -436,7 +499,8 @@ def indra_upstream_ora(
     )
     bg_genes = frozenset(background_gene_ids) if background_gene_ids else None
     return _do_ora(
-        get_entity_to_targets(
+        get_confidence_gene_set_matrix(
+            "entity_to_targets",
             client=client,
             minimum_evidence_count=minimum_evidence_count,
             minimum_belief=minimum_belief,
@@ -494,9 +558,8 @@ def kinase_ora(
         minimum_belief=minimum_belief
     )
 
-    all_known_phosphosites = set()
-    for phosphosites in kinase_to_phosphosites.values():
-        all_known_phosphosites.update(phosphosites)
+    kinase_matrix = GeneSetMatrix.from_gene_sets(kinase_to_phosphosites)
+    all_known_phosphosites = set(kinase_matrix.genes)
 
     known_overlap = input_phosphosites & all_known_phosphosites
     if bg_phosphosites:
@@ -540,7 +603,7 @@ def kinase_ora(
 
     # Perform ORA
     df = _do_ora(
-        curie_to_target_sets=kinase_to_phosphosites,
+        curie_to_target_sets=kinase_matrix,
         query=query_for_ora,
         count=count,
         **kwargs
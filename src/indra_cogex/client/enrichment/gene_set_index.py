@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+
+"""A compact, memory-mapped binary index of gene sets.
+
+The index is written next to the SQLite cache by
+:func:`indra_cogex.client.enrichment.utils.build_sqlite_cache` and holds,
+for each gene set dataset (e.g., GO, Reactome), a CSR incidence matrix
+with integer-encoded gene identifiers along with string tables for the
+term CURIEs, term names and gene identifiers. Gene sets with confidences
+(e.g., the targets of each INDRA regulator) are stored in the same layout
+with parallel belief and evidence count arrays.
+
+The file consists of a short header followed by raw, 8-byte aligned
+arrays. Loading the index only parses the header and maps the file
+read-only, so all processes using the same file (e.g., gunicorn workers)
+share a single copy of it in the page cache.
+"""
+
+import json
+import logging
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from indra_cogex.client.enrichment.gene_set_matrix import (
+    ConfidenceGeneSets,
+    GeneSetMatrix,
+)
+
+__all__ = [
+    "GeneSetIndex",
+    "confidence_gene_set_arrays",
+    "get_gene_set_index_path",
+    "load_gene_set_index",
+    "write_gene_set_index",
+]
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"COGEXIDX"
+VERSION = 1
+ALIGNMENT = 8
+
+
+def get_gene_set_index_path(sqlite_db_path: Union[Path, str]) -> Path:
+    """Return the path of the binary index belonging to a SQLite cache."""
+    return Path(sqlite_db_path).with_suffix(".idx")
+
+
+def encode_strings(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as a UTF-8 byte blob and an array of offsets into it."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Decode strings encoded with :func:`encode_strings`."""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [
+        data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def write_arrays(path: Union[Path, str], arrays: Mapping[str, np.ndarray]):
+    """Write named arrays into a single file that can be memory-mapped.
+
+    Parameters
+    ----------
+    path :
+        The path of the file to write.
+    arrays :
+        A dictionary of array names to one-dimensional arrays.
+    """
+    entries = {}
+    offset = 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        entries[name] = {
+            "dtype": values.dtype.str,
+            "length": int(values.size),
+            "offset": offset,
+        }
+        offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"version": VERSION, "arrays": entries}).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % ALIGNMENT)
+    data_start = len(MAGIC) + 8 + len(header)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(np.uint64(len(header)).tobytes())
+        fh.write(header)
+        for name, values in arrays.items():
+            fh.seek(data_start + entries[name]["offset"])
+            fh.write(np.ascontiguousarray(values).tobytes())
+        fh.truncate(data_start + offset)
+    # Replace atomically so processes that already mapped the old file
+    # keep a consistent view of it
+    tmp_path.replace(path)
+
+
+def map_arrays(path: Union[Path, str]) -> Dict[str, np.ndarray]:
+    """Memory-map the named arrays written with :func:`write_arrays`.
+
+    Parameters
+    ----------
+    path :
+        The path of the file to read.
+
+    Returns
+    -------
+    :
+        A dictionary of array names to read-only arrays backed by the file.
+    """
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if mm[: len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError(f"{path} is not a CoGEx binary index")
+    header_length = int(mm[len(MAGIC): len(MAGIC) + 8].view(np.uint64)[0])
+    header_start = len(MAGIC) + 8
+    header = json.loads(mm[header_start: header_start + header_length].tobytes())
+    if header["version"] != VERSION:
+        raise ValueError(
+            f"{path} has index version {header['version']}, expected {VERSION}"
+        )
+    data_start = header_start + header_length
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        start = data_start + entry["offset"]
+        arrays[name] = mm[start: start + entry["length"] * dtype.itemsize].view(
+            dtype
+        )
+    return arrays
+
+
+def gene_set_arrays(
+    cache_name: str,
+    gene_sets: Mapping[Tuple[str, Optional[str]], Iterable[str]],
+) -> Dict[str, np.ndarray]:
+    """Encode gene sets into the arrays stored in the index.
+
+    Terms are sorted by CURIE and name, and the genes of each term are
+    sorted, matching the order of the SQLite gene set cache.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the dataset, used as a prefix for the array names.
+    gene_sets :
+        A dictionary whose keys are 2-tuples of CURIE and name and whose
+        values are sets of gene identifiers.
+
+    Returns
+    -------
+    :
+        A dictionary of array names to arrays.
+    """
+    keys = sorted(gene_sets, key=lambda x: (x[0], x[1] or x[0]))
+    genes = sorted({gene for key in keys for gene in gene_sets[key]})
+    gene_codes = {gene: idx for idx, gene in enumerate(genes)}
+    indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum([len(gene_sets[key]) for key in keys], out=indptr[1:])
+    indices = np.fromiter(
+        (gene_codes[gene] for key in keys for gene in sorted(gene_sets[key])),
+        dtype=np.int32,
+        count=int(indptr[-1]),
+    )
+    arrays = {
+        f"{cache_name}/indptr": indptr,
+        f"{cache_name}/indices": indices,
+        f"{cache_name}/data": np.ones(len(indices), dtype=bool),
+    }
+    # Names are stored the same way as in the SQLite cache, where missing
+    # names are replaced by the CURIE
+    for field, strings in [
+        ("curies", [curie for curie, _ in keys]),
+        ("names", [name or curie for curie, name in keys]),
+        ("genes", genes),
+    ]:
+        blob, offsets = encode_strings(strings)
+        arrays[f"{cache_name}/{field}"] = blob
+        arrays[f"{cache_name}/{field}_offsets"] = offsets
+    return arrays
+
+
+def confidence_gene_set_arrays(
+    cache_name: str,
+    rows: Iterable[Tuple[str, str, str, float, int]],
+) -> Dict[str, np.ndarray]:
+    """Encode gene sets with confidences into the arrays stored in the index.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the dataset, used as a prefix for the array names.
+    rows :
+        An iterable of (CURIE, name, member, belief, evidence count) tuples,
+        grouped by CURIE and name, e.g., the rows of the SQLite cache ordered
+        by its primary key. Members are strings, with the parts of composite
+        members (e.g., phosphosites) separated by ``|``.
+
+    Returns
+    -------
+    :
+        A dictionary of array names to arrays. It is empty if there are no
+        rows, so that the dataset is left out of the index.
+    """
+    curies: List[str] = []
+    names: List[str] = []
+    gene_codes: Dict[str, int] = {}
+    indptr = array("q", [0])
+    indices = array("i")
+    beliefs = array("f")
+    evidence_counts = array("i")
+    last_key = None
+    for curie, name, member, belief, ev_count in rows:
+        if (curie, name) != last_key:
+            if last_key is not None:
+                indptr.append(len(indices))
+            curies.append(curie)
+            names.append(name)
+            last_key = (curie, name)
+        indices.append(gene_codes.setdefault(member, len(gene_codes)))
+        beliefs.append(belief)
+        evidence_counts.append(ev_count)
+    if last_key is None:
+        return {}
+    indptr.append(len(indices))
+    arrays = {
+        f"{cache_name}/indptr": np.frombuffer(indptr, dtype=np.int64),
+        f"{cache_name}/indices": np.frombuffer(indices, dtype=np.int32),
+        f"{cache_name}/beliefs": np.frombuffer(beliefs, dtype=np.float32),
+        f"{cache_name}/evidence_counts": np.frombuffer(
+            evidence_counts, dtype=np.int32
+        ),
+    }
+    for field, strings in [
+        ("curies", curies),
+        ("names", names),
+        ("genes", list(gene_codes)),
+    ]:
+        blob, offsets = encode_strings(strings)
+        arrays[f"{cache_name}/{field}"] = blob
+        arrays[f"{cache_name}/{field}_offsets"] = offsets
+    return arrays
+
+
+def write_gene_set_index(
+    path: Union[Path, str],
+    datasets: Mapping[str, Mapping[Tuple[str, Optional[str]], Iterable[str]]],
+    confidence_datasets: Optional[
+        Mapping[str, Iterable[Tuple[str, str, str, float, int]]]
+    ] = None,
+):
+    """Write the gene sets of several datasets into a binary index.
+
+    Parameters
+    ----------
+    path :
+        The path of the index file.
+    datasets :
+        A dictionary from dataset names (e.g., "go") to gene sets.
+    confidence_datasets :
+        A dictionary from dataset names (e.g., "entity_to_targets") to rows
+        of gene sets with confidences as taken by
+        :func:`confidence_gene_set_arrays`.
+    """
+    arrays = {}
+    for cache_name, gene_sets in datasets.items():
+        arrays.update(gene_set_arrays(cache_name, gene_sets))
+    for cache_name, rows in (confidence_datasets or {}).items():
+        arrays.update(confidence_gene_set_arrays(cache_name, rows))
+    write_arrays(path, arrays)
+    logger.info(
+        "Wrote gene set index with %d datasets to %s",
+        len(datasets) + len(confidence_datasets or {}),
+        path,
+    )
+
+
+class GeneSetIndex:
+    """A read-only, memory-mapped index of gene sets.
+
+    Parameters
+    ----------
+    path :
+        The path of the index file written by :func:`write_gene_set_index`.
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        """Map the index file."""
+        self.path = Path(path)
+        self.arrays = map_arrays(self.path)
+        self._matrices: Dict[str, GeneSetMatrix] = {}
+        self._confidence_gene_sets: Dict[Tuple, ConfidenceGeneSets] = {}
+
+    def __contains__(self, cache_name: str) -> bool:
+        return f"{cache_name}/indptr" in self.arrays
+
+    def has_confidences(self, cache_name: str) -> bool:
+        """Return True if the index has gene sets with confidences for the dataset."""
+        return f"{cache_name}/beliefs" in self.arrays
+
+    def get_confidence_gene_sets(
+        self,
+        cache_name: str,
+        member_key: Optional[Callable[[Hashable], Hashable]] = None,
+    ) -> ConfidenceGeneSets:
+        """Get the gene sets with confidences of a dataset.
+
+        The object is created once per process and keeps the incidence
+        matrices of the most recently used thresholds.
+
+        Parameters
+        ----------
+        cache_name :
+            The name of the dataset, e.g., "entity_to_targets".
+        member_key :
+            A function mapping each member to its label in the filtered gene
+            sets, see :class:`ConfidenceGeneSets`.
+
+        Returns
+        -------
+        :
+            The gene sets with confidences. Composite members stored with
+            ``|`` separators are returned as tuples, like in
+            :func:`indra_cogex.client.enrichment.utils.get_sqlite_genes_with_confidence_cache`.
+        """
+        if not self.has_confidences(cache_name):
+            raise ValueError(f"No entries found in index for {cache_name}")
+        confidence_gene_sets = self._confidence_gene_sets.get((cache_name, member_key))
+        if confidence_gene_sets is None:
+            keys = list(
+                zip(
+                    self._strings(cache_name, "curies"),
+                    self._strings(cache_name, "names"),
+                )
+            )
+            genes = [
+                tuple(gene.split("|")) if "|" in gene else gene
+                for gene in self._strings(cache_name, "genes")
+            ]
+            confidence_gene_sets = ConfidenceGeneSets(
+                keys=keys,
+                genes=genes,
+                indptr=self.arrays[f"{cache_name}/indptr"],
+                indices=self.arrays[f"{cache_name}/indices"],
+                beliefs=self.arrays[f"{cache_name}/beliefs"],
+                evidence_counts=self.arrays[f"{cache_name}/evidence_counts"],
+                member_key=member_key,
+            )
+            self._confidence_gene_sets[cache_name, member_key] = confidence_gene_sets
+        return confidence_gene_sets
+
+    def _strings(self, cache_name: str, field: str) -> List[str]:
+        return decode_strings(
+            self.arrays[f"{cache_name}/{field}"],
+            self.arrays[f"{cache_name}/{field}_offsets"],
+        )
+
+    def get_matrix(
+        self,
+        cache_name: str,
+        background_gene_ids: Optional[Iterable[str]] = None,
+    ) -> GeneSetMatrix:
+        """Get the gene sets of a dataset as an incidence matrix.
+
+        Parameters
+        ----------
+        cache_name :
+            The name of the dataset, e.g., "go".
+        background_gene_ids :
+            If given, genes outside the background are removed from the
+            gene sets, and gene sets left empty are dropped, like in
+            :func:`indra_cogex.client.enrichment.utils.get_sqlite_gene_set_cache`.
+
+        Returns
+        -------
+        :
+            The gene set matrix. Its sparse structure is backed by the
+            memory-mapped file.
+        """
+        if cache_name not in self or self.has_confidences(cache_name):
+            raise ValueError(f"No entries found in index for {cache_name}")
+        matrix = self._matrices.get(cache_name)
+        if matrix is None:
+            curies = self._strings(cache_name, "curies")
+            names = self._strings(cache_name, "names")
+            keys = [
+                (curie, None if name == curie else name)
+                for curie, name in zip(curies, names)
+            ]
+            genes = self._strings(cache_name, "genes")
+            sparse = csr_matrix(
+                (
+                    self.arrays[f"{cache_name}/data"],
+                    self.arrays[f"{cache_name}/indices"],
+                    self.arrays[f"{cache_name}/indptr"],
+                ),
+                shape=(len(keys), len(genes)),
+                copy=False,
+            )
+            matrix = GeneSetMatrix(keys=keys, genes=genes, matrix=sparse)
+            self._matrices[cache_name] = matrix
+        if not background_gene_ids:
+            return matrix
+        return _restrict_to_background(matrix, background_gene_ids)
+
+    def get_gene_sets(
+        self,
+        cache_name: str,
+        background_gene_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[Tuple[str, Optional[str]], Set[str]]:
+        """Get the gene sets of a dataset as a dictionary.
+
+        Parameters
+        ----------
+        cache_name :
+            The name of the dataset, e.g., "go".
+        background_gene_ids :
+            If given, genes outside the background are removed from the
+            gene sets, and gene sets left empty are dropped.
+
+        Returns
+        -------
+        :
+            A dictionary whose keys are 2-tuples of CURIE and name and whose
+            values are sets of gene identifiers.
+        """
+        return self.get_matrix(cache_name, background_gene_ids).to_gene_sets()
+
+
+def _restrict_to_background(
+    matrix: GeneSetMatrix, background_gene_ids: Iterable[Hashable]
+) -> GeneSetMatrix:
+    """Remove genes outside the background and the gene sets left empty."""
+    background_gene_ids = set(background_gene_ids)
+    columns = np.array(
+        [idx for idx, gene in enumerate(matrix.genes) if gene in background_gene_ids],
+        dtype=np.int64,
+    )
+    sparse = matrix.matrix[:, columns]
+    rows = np.flatnonzero(np.diff(sparse.indptr))
+    return GeneSetMatrix(
+        keys=[matrix.keys[row] for row in rows],
+        genes=[matrix.genes[idx] for idx in columns],
+        matrix=sparse[rows],
+    )
+
+
+@lru_cache(maxsize=4)
+def _load_gene_set_index(path: Path, mtime_ns: int) -> GeneSetIndex:
+    return GeneSetIndex(path)
+
+
+def load_gene_set_index(path: Union[Path, str]) -> Optional[GeneSetIndex]:
+    """Load the gene set index at the given path, if it exists.
+
+    The index is loaded once per process and reloaded if the file changes.
+
+    Parameters
+    ----------
+    path :
+        The path of the index file.
+
+    Returns
+    -------
+    :
+        The gene set index, or None if the file does not exist.
+    """
+    path = Path(path)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load_gene_set_index(path, mtime_ns)
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+"""Sparse incidence matrix representation of a collection of gene sets."""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+__all__ = [
+    "GeneSetMatrix",
+    "ConfidenceGeneSets",
+]
+
+#: The number of (belief, evidence count) threshold combinations for which
+#: the filtered incidence matrix is kept by :class:`ConfidenceGeneSets`
+MAX_CACHED_THRESHOLDS = 8
+
+
+class GeneSetMatrix:
+    """A collection of gene sets stored as a CSR incidence matrix.
+
+    Rows of the matrix correspond to the gene set keys (2-tuples of CURIE and
+    name) and columns correspond to the members of the gene sets (e.g., HGNC
+    gene identifiers or (gene, site) tuples for phosphosites).
+
+    Parameters
+    ----------
+    keys :
+        A list of 2-tuples of CURIE and name, one for each row of the matrix.
+    genes :
+        A list of gene set members, one for each column of the matrix.
+    matrix :
+        A sparse boolean matrix of shape ``(len(keys), len(genes))`` whose
+        entry at (i, j) is True if ``genes[j]`` is a member of the gene set
+        ``keys[i]``.
+    gene_index :
+        A dictionary from genes to their column in the matrix. If not given,
+        it is built from ``genes``.
+    """
+
+    def __init__(
+        self,
+        keys: List[Tuple[str, Optional[str]]],
+        genes: Sequence[Hashable],
+        matrix: csr_matrix,
+        gene_index: Optional[Dict[Hashable, int]] = None,
+    ):
+        """Initialize the gene set matrix."""
+        if matrix.shape != (len(keys), len(genes)):
+            raise ValueError(
+                f"Matrix shape {matrix.shape} does not match {len(keys)} keys "
+                f"and {len(genes)} genes"
+            )
+        self.keys = keys
+        self.genes = genes
+        self.matrix = matrix
+        if gene_index is None:
+            gene_index = {gene: idx for idx, gene in enumerate(genes)}
+        self.gene_index: Dict[Hashable, int] = gene_index
+        #: The number of members in each gene set
+        self.sizes = np.diff(matrix.indptr).astype(np.int64)
+
+    @classmethod
+    def from_gene_sets(
+        cls, gene_sets: Mapping[Tuple[str, Optional[str]], Set[Hashable]]
+    ) -> "GeneSetMatrix":
+        """Build a gene set matrix from a dictionary of gene sets.
+
+        Parameters
+        ----------
+        gene_sets :
+            A dictionary whose keys are 2-tuples of CURIE and name and whose
+            values are sets of gene set members. The order of the keys is
+            preserved in the rows of the matrix.
+
+        Returns
+        -------
+        :
+            The gene set matrix.
+        """
+        keys = list(gene_sets)
+        gene_index: Dict[Hashable, int] = {}
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(
+                (len(members) for members in gene_sets.values()),
+                dtype=np.int64,
+                count=len(keys),
+            ),
+            out=indptr[1:],
+        )
+        indices = np.fromiter(
+            (
+                gene_index.setdefault(gene, len(gene_index))
+                for members in gene_sets.values()
+                for gene in members
+            ),
+            dtype=np.int32,
+            count=int(indptr[-1]),
+        )
+        matrix = csr_matrix(
+            (np.ones(len(indices), dtype=bool), indices, indptr),
+            shape=(len(keys), len(gene_index)),
+        )
+        return cls(keys=keys, genes=list(gene_index), matrix=matrix)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def query_vector(self, query: Iterable[Hashable]) -> np.ndarray:
+        """Return the indicator vector of the query over the matrix columns.
+
+        Parameters
+        ----------
+        query :
+            A collection of gene set members. Members not appearing in any
+            gene set are ignored.
+
+        Returns
+        -------
+        :
+            An integer array with one entry per column that is 1 if the
+            corresponding gene is in the query and 0 otherwise.
+        """
+        vector = np.zeros(len(self.genes), dtype=np.int32)
+        idx = [self.gene_index[gene] for gene in query if gene in self.gene_index]
+        vector[idx] = 1
+        return vector
+
+    def overlaps(self, query: Iterable[Hashable]) -> np.ndarray:
+        """Return the number of query members in each gene set.
+
+        Parameters
+        ----------
+        query :
+            A collection of gene set members.
+
+        Returns
+        -------
+        :
+            An integer array with the size of the overlap between the query
+            and each gene set, in the order of :attr:`keys`.
+        """
+        return (self.matrix @ self.query_vector(query)).astype(np.int64)
+
+    def columns(self, query: Sequence[Hashable]) -> csr_matrix:
+        """Return the incidence of the query members in each gene set.
+
+        Parameters
+        ----------
+        query :
+            A sequence of gene set members.
+
+        Returns
+        -------
+        :
+            A sparse boolean matrix of shape ``(len(self), len(query))`` whose
+            entry at (i, j) is True if ``query[j]`` is a member of the gene set
+            in row i. Columns of members not appearing in any gene set are
+            empty.
+        """
+        rows, cols = [], []
+        for col, gene in enumerate(query):
+            idx = self.gene_index.get(gene)
+            if idx is not None:
+                rows.append(idx)
+                cols.append(col)
+        selection = csr_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols)),
+            shape=(len(self.genes), len(query)),
+        )
+        return (self.matrix @ selection).tocsr()
+
+    def members(self, row: int) -> List[Hashable]:
+        """Return the members of the gene set in the given row."""
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return [self.genes[idx] for idx in self.matrix.indices[start:end]]
+
+    def to_gene_sets(self) -> Dict[Tuple[str, Optional[str]], Set[Hashable]]:
+        """Return the gene sets as a dictionary from keys to sets of members."""
+        return {key: set(self.members(row)) for row, key in enumerate(self.keys)}
+
+
+class ConfidenceGeneSets:
+    """A collection of gene sets whose members carry a belief and evidence count.
+
+    The members of all gene sets are stored as parallel arrays of gene
+    indices, beliefs and evidence counts, with the entries of each gene set
+    delimited by offsets (like the rows of a CSR matrix). Filtering by
+    minimum belief and evidence count is a vectorized mask over these arrays
+    and the resulting incidence matrices are kept for the most recently used
+    threshold combinations.
+
+    Parameters
+    ----------
+    keys :
+        A list of 2-tuples of CURIE and name, one for each gene set.
+    genes :
+        A list of the members of the gene sets.
+    indptr :
+        The offsets of the entries of each gene set, of length
+        ``len(keys) + 1``.
+    indices :
+        The index in ``genes`` of each entry.
+    beliefs :
+        The belief of each entry.
+    evidence_counts :
+        The evidence count of each entry.
+    member_key :
+        A function mapping each member to the label used for it in the
+        filtered gene sets, e.g., to map a (substrate id, substrate name,
+        site) phosphosite to (substrate name, site). Members sharing a
+        label are merged. If not given, the members are used as is.
+    """
+
+    def __init__(
+        self,
+        keys: List[Tuple[str, Optional[str]]],
+        genes: Sequence[Hashable],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        beliefs: np.ndarray,
+        evidence_counts: np.ndarray,
+        member_key: Optional[Callable[[Hashable], Hashable]] = None,
+    ):
+        """Initialize the confidence gene sets."""
+        self.keys = keys
+        self.genes = genes
+        self.indptr = indptr
+        self.indices = indices
+        self.beliefs = beliefs
+        self.evidence_counts = evidence_counts
+        self._label_codes: Optional[np.ndarray] = None
+        if member_key is None:
+            self.labels = genes
+        else:
+            label_index: Dict[Hashable, int] = {}
+            self._label_codes = np.fromiter(
+                (
+                    label_index.setdefault(member_key(gene), len(label_index))
+                    for gene in genes
+                ),
+                dtype=np.int32,
+                count=len(genes),
+            )
+            self.labels = list(label_index)
+        self._label_index: Optional[Dict[Hashable, int]] = None
+        self._matrices: "OrderedDict[Tuple, GeneSetMatrix]" = OrderedDict()
+        # The gene sets are shared by the requests handled in parallel
+        self._matrices_lock = threading.Lock()
+
+    @classmethod
+    def from_gene_sets(
+        cls,
+        gene_sets: Mapping[
+            Tuple[str, Optional[str]], Mapping[Hashable, Tuple[float, int]]
+        ],
+        member_key: Optional[Callable[[Hashable], Hashable]] = None,
+    ) -> "ConfidenceGeneSets":
+        """Build confidence gene sets from a dictionary.
+
+        Parameters
+        ----------
+        gene_sets :
+            A dictionary whose keys are 2-tuples of CURIE and name and whose
+            values are dictionaries from members to (belief, evidence count)
+            tuples, as returned by e.g.
+            :func:`indra_cogex.client.enrichment.utils.get_entity_to_targets_raw`.
+        member_key :
+            A function mapping each member to its label in the filtered
+            gene sets. If not given, the members are used as is.
+
+        Returns
+        -------
+        :
+            The confidence gene sets.
+        """
+        keys = list(gene_sets)
+        gene_index: Dict[Hashable, int] = {}
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(
+                (len(members) for members in gene_sets.values()),
+                dtype=np.int64,
+                count=len(keys),
+            ),
+            out=indptr[1:],
+        )
+        nnz = int(indptr[-1])
+        indices = np.fromiter(
+            (
+                gene_index.setdefault(gene, len(gene_index))
+                for members in gene_sets.values()
+                for gene in members
+            ),
+            dtype=np.int32,
+            count=nnz,
+        )
+        beliefs = np.fromiter(
+            (
+                belief
+                for members in gene_sets.values()
+                for belief, _ in members.values()
+            ),
+            dtype=np.float32,
+            count=nnz,
+        )
+        evidence_counts = np.fromiter(
+            (
+                ev_count
+                for members in gene_sets.values()
+                for _, ev_count in members.values()
+            ),
+            dtype=np.int32,
+            count=nnz,
+        )
+        return cls(
+            keys=keys,
+            genes=list(gene_index),
+            indptr=indptr,
+            indices=indices,
+            beliefs=beliefs,
+            evidence_counts=evidence_counts,
+            member_key=member_key,
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def mask(
+        self,
+        minimum_belief: Optional[float] = None,
+        minimum_evidence_count: Optional[int] = None,
+    ) -> np.ndarray:
+        """Return a boolean mask of the entries passing the given thresholds.
+
+        Beliefs are stored in single precision, so the belief threshold is
+        compared in single precision as well.
+        """
+        mask = self.beliefs >= np.float32(minimum_belief or 0.0)
+        if minimum_evidence_count:
+            mask &= self.evidence_counts >= minimum_evidence_count
+        return mask
+
+    def get_matrix(
+        self,
+        minimum_belief: Optional[float] = None,
+        minimum_evidence_count: Optional[int] = None,
+        drop_empty: bool = False,
+    ) -> GeneSetMatrix:
+        """Get the incidence matrix of the members passing the given thresholds.
+
+        Parameters
+        ----------
+        minimum_belief :
+            Minimum belief to include a member in a gene set. If None, no
+            filtering is applied.
+        minimum_evidence_count :
+            Minimum evidence count to include a member in a gene set. If None,
+            no filtering is applied.
+        drop_empty :
+            If True, gene sets with no members passing the thresholds are
+            left out of the matrix. Default: False.
+
+        Returns
+        -------
+        :
+            The gene set matrix. Its columns are the member labels.
+        """
+        cache_key = (
+            float(minimum_belief or 0.0),
+            int(minimum_evidence_count or 0),
+            drop_empty,
+        )
+        with self._matrices_lock:
+            matrix = self._matrices.get(cache_key)
+            if matrix is not None:
+                self._matrices.move_to_end(cache_key)
+                return matrix
+
+        mask = self.mask(minimum_belief, minimum_evidence_count)
+        passed = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.cumsum(mask, out=passed[1:])
+        indptr = passed[self.indptr]
+        indices = self.indices[mask]
+        if self._label_codes is not None:
+            indices = self._label_codes[indices]
+        sparse = csr_matrix(
+            (np.ones(len(indices), dtype=bool), indices, indptr),
+            shape=(len(self.keys), len(self.labels)),
+        )
+        keys = self.keys
+        if self._label_codes is not None:
+            # Several members can share a label within a gene set
+            sparse.sum_duplicates()
+        if drop_empty:
+            rows = np.flatnonzero(np.diff(sparse.indptr))
+            if len(rows) < len(keys):
+                keys = [keys[row] for row in rows]
+                sparse = sparse[rows]
+        if self._label_index is None:
+            self._label_index = {
+                label: idx for idx, label in enumerate(self.labels)
+            }
+        matrix = GeneSetMatrix(
+            keys=keys,
+            genes=self.labels,
+            matrix=sparse,
+            gene_index=self._label_index,
+        )
+        with self._matrices_lock:
+            self._matrices[cache_key] = matrix
+            self._matrices.move_to_end(cache_key)
+            if len(self._matrices) > MAX_CACHED_THRESHOLDS:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def restrict(self, keep: Callable[[Hashable], bool]) -> "ConfidenceGeneSets":
+        """Return the confidence gene sets restricted to the given members.
+
+        Gene sets left without members are dropped.
+
+        Parameters
+        ----------
+        keep :
+            A function that returns True for the members to keep.
+
+        Returns
+        -------
+        :
+            A new object with the entries for the kept members.
+        """
+        keep_genes = np.fromiter(
+            (keep(gene) for gene in self.genes), dtype=bool, count=len(self.genes)
+        )
+        entry_mask = keep_genes[self.indices]
+        passed = np.zeros(len(entry_mask) + 1, dtype=np.int64)
+        np.cumsum(entry_mask, out=passed[1:])
+        counts = np.diff(passed[self.indptr])
+        rows = np.flatnonzero(counts)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts[rows], out=indptr[1:])
+
+        restricted = copy.copy(self)
+        restricted.keys = [self.keys[row] for row in rows]
+        restricted.indptr = indptr
+        restricted.indices = self.indices[entry_mask]
+        restricted.beliefs = self.beliefs[entry_mask]
+        restricted.evidence_counts = self.evidence_counts[entry_mask]
+        restricted._matrices = OrderedDict()
+        restricted._matrices_lock = threading.Lock()
+        return restricted
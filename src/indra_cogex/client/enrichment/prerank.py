@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+
+"""A NumPy implementation of pre-ranked gene set enrichment analysis (GSEA).
+
+This follows the algorithm of [subramanian2005]_ as implemented by
+:func:`gseapy.prerank` with gene set permutations, but scores all gene sets
+at once instead of one at a time:
+
+1. The enrichment score (ES) of a gene set only depends on the positions of
+   its members in the ranked gene list. The extrema of the running sum are
+   reached either right at a hit or right before one, so all enrichment
+   scores are computed from cumulative sums over the hit positions without
+   materializing the running sum over the full ranking.
+2. Since the gene set permutation null distribution of a gene set only
+   depends on its number of members, the null distribution is sampled once
+   per distinct gene set size. The sampling is split into batches of
+   permutations that are run across a process pool.
+
+.. [subramanian2005] Subramanian, A., *et al.* (2005). `Gene set enrichment
+   analysis: A knowledge-based approach for interpreting genome-wide
+   expression profiles <https://doi.org/10.1073/pnas.0506580102>`_. PNAS,
+   102(43), 15545–15550.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "prerank",
+    "running_enrichment_score",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The maximum number of permutations sampled in one task of the process pool
+PERMUTATION_BATCH_SIZE = 250
+
+#: The columns of the data frame returned by :func:`prerank`
+PRERANK_COLUMNS = [
+    "Term",
+    "ES",
+    "NES",
+    "NOM p-val",
+    "FDR q-val",
+    "geneset_size",
+    "matched_size",
+]
+
+
+def prerank(
+    scores: Mapping[str, float],
+    gene_sets: Mapping[str, Iterable[str]],
+    permutation_num: int = 1000,
+    weight: float = 1.0,
+    min_size: int = 15,
+    max_size: int = 500,
+    seed: int = 123,
+    threads: int = 1,
+    outdir: Union[None, Path, str] = None,
+    format: str = "pdf",
+    graph_num: int = 20,
+) -> pd.DataFrame:
+    """Run pre-ranked GSEA with gene set permutations.
+
+    Parameters
+    ----------
+    scores :
+        A mapping from gene identifiers to floating point scores. Genes are
+        ranked by decreasing score.
+    gene_sets :
+        A mapping from gene set identifiers to their member genes. Members
+        that are not in ``scores`` are ignored.
+    permutation_num :
+        The number of gene set permutations used to estimate the null
+        distribution of each enrichment score.
+    weight :
+        The exponent applied to the absolute value of the scores when
+        computing the running sum. 0 gives the classic (unweighted) statistic.
+    min_size :
+        The minimum number of members a gene set needs to have in the ranking
+        to be tested.
+    max_size :
+        The maximum number of members a gene set can have in the ranking to be
+        tested.
+    seed :
+        The seed for the permutations. Results don't depend on ``threads``.
+    threads :
+        The number of processes used for sampling the null distributions.
+        Defaults to 1, which samples them in this process without starting a
+        pool, e.g., in the request workers of the web app. Batch callers can
+        set it to the number of CPUs.
+    outdir :
+        If given, the results table and enrichment plots for the top gene
+        sets (FDR q-value at most 0.25) are written to this directory. This
+        requires ``gseapy``.
+    format :
+        The file format of the enrichment plots.
+    graph_num :
+        The maximum number of enrichment plots to write.
+
+    Returns
+    -------
+    :
+        A data frame with one row per tested gene set, sorted by decreasing
+        absolute normalized enrichment score, with the columns "Term", "ES",
+        "NES", "NOM p-val", "FDR q-val", "geneset_size" (the number of members
+        in the ranking) and "matched_size" (the number of members in the
+        leading edge).
+    """
+    ranking = pd.Series(scores, dtype=float).dropna()
+    ranking = ranking[~ranking.index.duplicated()].sort_values(
+        ascending=False, kind="stable"
+    )
+    genes = ranking.index
+    gene_index = {gene: idx for idx, gene in enumerate(genes)}
+    n = len(gene_index)
+    if weight == 0:
+        weights = np.ones(n)
+    else:
+        weights = np.abs(ranking.to_numpy()) ** weight
+
+    terms, positions = [], []
+    for term, members in gene_sets.items():
+        hits = np.array(
+            sorted({gene_index[gene] for gene in members if gene in gene_index}),
+            dtype=np.int64,
+        )
+        # A gene set covering the whole ranking has no misses to normalize by
+        if min_size <= len(hits) <= max_size and len(hits) < n:
+            terms.append(term)
+            positions.append(hits)
+    if not terms:
+        logger.warning("No gene sets with between %d and %d ranked genes", min_size, max_size)
+        return pd.DataFrame(columns=PRERANK_COLUMNS)
+
+    sizes = np.array([len(hits) for hits in positions], dtype=np.int64)
+    unique_sizes, size_inverse = np.unique(sizes, return_inverse=True)
+
+    # Score the observed gene sets, stacking the gene sets of the same size
+    es = np.empty(len(terms))
+    leading_edge = np.empty(len(terms), dtype=np.int64)
+    for size_idx, size in enumerate(unique_sizes):
+        rows = np.flatnonzero(size_inverse == size_idx)
+        stacked = np.vstack([positions[row] for row in rows])
+        es[rows], leading_edge[rows] = _enrichment_scores(stacked, weights, n)
+
+    nulls = _sample_nulls(
+        weights=weights,
+        sizes=unique_sizes.tolist(),
+        permutation_num=permutation_num,
+        seed=seed,
+        threads=threads,
+    )
+    nes, pvalues, fdrs = _significance(es, nulls, size_inverse)
+
+    rv = pd.DataFrame(
+        {
+            "Term": terms,
+            "ES": es,
+            "NES": nes,
+            "NOM p-val": pvalues,
+            "FDR q-val": fdrs,
+            "geneset_size": sizes,
+            "matched_size": leading_edge,
+        }
+    )
+    rv = rv.reindex(
+        rv["NES"].abs().sort_values(ascending=False, kind="stable").index
+    ).reset_index(drop=True)
+
+    if outdir is not None:
+        _write_outputs(
+            rv,
+            ranking=ranking,
+            positions=dict(zip(terms, positions)),
+            weights=weights,
+            outdir=Path(outdir),
+            format=format,
+            graph_num=graph_num,
+        )
+    return rv
+
+
+def running_enrichment_score(
+    positions: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """Return the running enrichment score of a gene set over a ranking.
+
+    Parameters
+    ----------
+    positions :
+        The sorted positions of the gene set members in the ranking.
+    weights :
+        The weights of each ranked gene, i.e., the absolute values of the
+        scores raised to the power of the weight exponent.
+
+    Returns
+    -------
+    :
+        An array with the value of the running sum at each position of the
+        ranking.
+    """
+    n = len(weights)
+    hit = np.zeros(n, dtype=bool)
+    hit[positions] = True
+    steps = np.where(
+        hit, weights / weights[hit].sum(), -1.0 / (n - len(positions))
+    )
+    return np.cumsum(steps)
+
+
+def _enrichment_scores(
+    positions: np.ndarray, weights: np.ndarray, n: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the enrichment scores of gene sets of the same size.
+
+    Parameters
+    ----------
+    positions :
+        An integer array of shape (number of gene sets, gene set size) whose
+        rows are the sorted positions of the members of each gene set in the
+        ranking.
+    weights :
+        The weights of each ranked gene.
+    n :
+        The number of ranked genes.
+
+    Returns
+    -------
+    :
+        The enrichment score of each gene set and the number of its members
+        in the leading edge.
+    """
+    size = positions.shape[1]
+    hit_weights = weights[positions]
+    norm = hit_weights.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        steps = hit_weights / norm
+    cumulative = np.cumsum(steps, axis=1)
+    miss_step = 1.0 / (n - size)
+    # The number of misses before each hit
+    misses = positions - np.arange(size)
+    # The running sum right at each hit and right before each hit
+    peaks = cumulative - misses * miss_step
+    troughs = cumulative - steps - misses * miss_step
+
+    rows = np.arange(len(positions))
+    max_idx = peaks.argmax(axis=1)
+    min_idx = troughs.argmin(axis=1)
+    es_max = peaks[rows, max_idx]
+    es_min = troughs[rows, min_idx]
+    positive = np.abs(es_max) > np.abs(es_min)
+    es = np.where(positive, es_max, es_min)
+    leading_edge = np.where(positive, max_idx + 1, size - min_idx)
+    return es, leading_edge
+
+
+def _sample_positions(
+    rng: np.random.Generator, n: int, size: int, count: int
+) -> np.ndarray:
+    """Sample sorted positions of random gene sets of a given size."""
+    if size * size <= n:
+        # For small gene sets, sampling with replacement and redrawing the
+        # few gene sets with duplicates is much cheaper than shuffling
+        positions = np.sort(rng.integers(0, n, size=(count, size)), axis=1)
+        redraw = np.flatnonzero((np.diff(positions, axis=1) == 0).any(axis=1))
+        while len(redraw):
+            draws = np.sort(rng.integers(0, n, size=(len(redraw), size)), axis=1)
+            positions[redraw] = draws
+            redraw = redraw[(np.diff(draws, axis=1) == 0).any(axis=1)]
+        return positions
+    keys = rng.random((count, n))
+    return np.sort(np.argpartition(keys, size - 1, axis=1)[:, :size], axis=1)
+
+
+def _null_task(
+    weights: np.ndarray, sizes: List[int], batch: int, count: int, seed: int
+) -> Dict[int, np.ndarray]:
+    """Sample a batch of null enrichment scores for each of the given sizes."""
+    rv = {}
+    for size in sizes:
+        # Seeding by size and batch makes the sample independent of how the
+        # work is split across processes
+        rng = np.random.default_rng([seed, size, batch])
+        positions = _sample_positions(rng, len(weights), size, count)
+        rv[size], _ = _enrichment_scores(positions, weights, len(weights))
+    return rv
+
+
+def _sample_nulls(
+    weights: np.ndarray,
+    sizes: List[int],
+    permutation_num: int,
+    seed: int,
+    threads: int,
+) -> np.ndarray:
+    """Sample the null distribution of enrichment scores for each size.
+
+    Returns
+    -------
+    :
+        An array of shape (number of sizes, number of permutations).
+    """
+    if permutation_num < 1:
+        raise ValueError("permutation_num must be positive")
+
+    batches = [
+        (batch, min(PERMUTATION_BATCH_SIZE, permutation_num - start))
+        for batch, start in enumerate(range(0, permutation_num, PERMUTATION_BATCH_SIZE))
+    ]
+    # Interleave the sizes so that each group gets a similar amount of work
+    n_groups = max(1, min(len(sizes), 4 * threads // len(batches)))
+    groups = [sizes[i::n_groups] for i in range(n_groups)]
+    tasks = [
+        (weights, group, batch, count, seed)
+        for batch, count in batches
+        for group in groups
+    ]
+
+    if threads > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(threads, len(tasks))) as executor:
+            results = list(executor.map(_null_task, *zip(*tasks)))
+    else:
+        results = [_null_task(*task) for task in tasks]
+
+    batch_results: Dict[int, List[np.ndarray]] = {size: [] for size in sizes}
+    # Results are in batch order, so concatenation keeps the permutations in order
+    for result in results:
+        for size, null in result.items():
+            batch_results[size].append(null)
+    return np.vstack([np.concatenate(batch_results[size]) for size in sizes])
+
+
+def _significance(
+    es: np.ndarray, nulls: np.ndarray, size_inverse: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute normalized enrichment scores, nominal p-values and FDRs.
+
+    Parameters
+    ----------
+    es :
+        The enrichment score of each gene set.
+    nulls :
+        The null enrichment scores for each gene set size, of shape (number
+        of sizes, number of permutations).
+    size_inverse :
+        The row in ``nulls`` corresponding to each gene set.
+
+    Returns
+    -------
+    :
+        The normalized enrichment scores, the nominal p-values and the FDR
+        q-values of each gene set.
+    """
+    permutation_num = nulls.shape[1]
+    positive_null = nulls >= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        positive_mean = np.where(positive_null, nulls, 0).sum(axis=1) / positive_null.sum(axis=1)
+        negative_mean = -np.where(positive_null, 0, nulls).sum(axis=1) / (~positive_null).sum(axis=1)
+        # Scores are normalized separately by the mean of the null scores
+        # with the same sign, keeping their sign
+        nes = np.where(
+            es >= 0, es / positive_mean[size_inverse], es / negative_mean[size_inverse]
+        )
+        null_nes = np.where(
+            positive_null, nulls / positive_mean[:, None], nulls / negative_mean[:, None]
+        )
+
+    # The nominal p-value uses the part of the null with the same sign as the ES
+    sorted_nulls = np.sort(nulls, axis=1)
+    n_negative = (~positive_null).sum(axis=1)
+    pvalues = np.empty(len(es))
+    for size_idx in range(len(nulls)):
+        rows = np.flatnonzero(size_inverse == size_idx)
+        row_es = es[rows]
+        below = np.searchsorted(sorted_nulls[size_idx], row_es, side="left")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pvalues[rows] = np.where(
+                row_es >= 0,
+                (permutation_num - below) / (permutation_num - n_negative[size_idx]),
+                below / n_negative[size_idx],
+            )
+
+    # The FDR uses the normalized null scores of all gene sets pooled
+    # together. Gene sets of the same size share their null scores, so each
+    # null score is counted once for each gene set of its size.
+    set_counts = np.bincount(size_inverse, minlength=len(nulls))
+    null_values = null_nes.ravel()
+    order = np.argsort(null_values, kind="stable")
+    null_values = null_values[order]
+    null_weights = np.repeat(set_counts, permutation_num)[order]
+    cumulative_weights = np.concatenate([[0], np.cumsum(null_weights)])
+    total_weight = cumulative_weights[-1]
+    observed = np.sort(nes)
+
+    def _weight_below(values, side):
+        return cumulative_weights[np.searchsorted(null_values, values, side=side)]
+
+    def _count_below(values, side):
+        return np.searchsorted(observed, values, side=side)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        null_negative = _weight_below(0, "left")
+        observed_negative = _count_below(0, "left")
+        positive_fdr = (
+            (total_weight - _weight_below(nes, "left")) / (total_weight - null_negative)
+        ) / (
+            (len(nes) - _count_below(nes, "left")) / (len(nes) - observed_negative)
+        )
+        negative_fdr = (_weight_below(nes, "right") / null_negative) / (
+            _count_below(nes, "right") / observed_negative
+        )
+    fdrs = np.where(nes >= 0, positive_fdr, negative_fdr)
+    # An undefined FDR, e.g., when the null has no scores of the same sign, is
+    # reported as not significant
+    fdrs = np.where(np.isfinite(fdrs), np.minimum(fdrs, 1.0), 1.0)
+    return nes, pvalues, fdrs
+
+
+def _write_outputs(
+    results: pd.DataFrame,
+    ranking: pd.Series,
+    positions: Mapping[str, np.ndarray],
+    weights: np.ndarray,
+    outdir: Path,
+    format: str,
+    graph_num: int,
+) -> None:
+    """Write the results table and the enrichment plots of the top gene sets."""
+    from gseapy.plot import gseaplot
+
+    outdir.mkdir(exist_ok=True, parents=True)
+    results.to_csv(outdir.joinpath("prerank.report.csv"), index=False)
+    top = results[results["FDR q-val"] <= 0.25].head(graph_num)
+    for _, record in top.iterrows():
+        hits = positions[record["Term"]]
+        term = record["Term"].replace("/", "-").replace(":", "_")
+        gseaplot(
+            term=record["Term"],
+            hits=hits.tolist(),
+            nes=record["NES"],
+            pval=record["NOM p-val"],
+            fdr=record["FDR q-val"],
+            RES=running_enrichment_score(hits, weights),
+            rank_metric=ranking.to_numpy(),
+            ofname=outdir.joinpath(f"{term}.{format}").as_posix(),
+        )
@@ -4,16 +4,16 @@
 
 from pathlib import Path
 from textwrap import dedent
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import pystow
-import scipy.stats
+from scipy.sparse import csr_matrix
+from scipy.stats import binom
 
-from indra_cogex.client.enrichment.utils import (
-    get_negative_stmt_sets,
-    get_positive_stmt_sets,
-)
+from indra_cogex.client.enrichment.gene_set_matrix import GeneSetMatrix
+from indra_cogex.client.enrichment.utils import get_confidence_gene_set_matrix
 from indra_cogex.client.neo4j_client import Neo4jClient, autoclient
 
 HERE = Path(__file__).parent.resolve()
@@ -74,76 +74,127 @@ def reverse_causal_reasoning(
     """
     if alpha is None:
         alpha = 0.05
-    positive_hgnc_ids = set(positive_hgnc_ids)
-    negative_hgnc_ids = set(negative_hgnc_ids)
-    database_positive = get_positive_stmt_sets(
+    positive_hgnc_ids = sorted(set(positive_hgnc_ids))
+    negative_hgnc_ids = sorted(set(negative_hgnc_ids))
+    database_positive = get_confidence_gene_set_matrix(
+        "positive_statements",
         client=client,
         minimum_belief=minimum_belief,
         minimum_evidence_count=minimum_evidence_count,
     )
-    database_negative = get_negative_stmt_sets(
+    database_negative = get_confidence_gene_set_matrix(
+        "negative_statements",
         client=client,
         minimum_belief=minimum_belief,
         minimum_evidence_count=minimum_evidence_count,
     )
-    entities = set(database_positive).union(database_negative)
-
-    rows = []
-    for entity in entities:
-        entity_positive: set[str] = database_positive.get(entity, set())
-        entity_negative: set[str] = database_negative.get(entity, set())
-        if len(entity_positive) + len(entity_negative) < minimum_size:
-            continue  # skip this hypothesis
-        correct, incorrect, ambiguous = 0, 0, 0
-        for hgnc_id in positive_hgnc_ids:
-            if hgnc_id in entity_positive and hgnc_id in entity_negative:
-                ambiguous += 1
-            elif hgnc_id in entity_positive:
-                correct += 1
-            elif hgnc_id in entity_negative:
-                incorrect += 1
-            else:
-                ambiguous += 1
-        for hgnc_id in negative_hgnc_ids:
-            if hgnc_id in entity_positive and hgnc_id in entity_negative:
-                ambiguous += 1
-            elif hgnc_id in entity_positive:
-                incorrect += 1
-            elif hgnc_id in entity_negative:
-                correct += 1
-            else:
-                ambiguous += 1
-
-        if correct + incorrect:
-            res = scipy.stats.binomtest(
-                correct, correct + incorrect, alternative="greater"
-            )
-            res_p = res.pvalue
-            res_ambig = scipy.stats.binomtest(
-                correct, correct + incorrect + ambiguous, alternative="greater"
-            )
-            res_ambig_p = res_ambig.pvalue
-        else:
-            res_p, res_ambig_p = None, None
-        rows.append((*entity, correct, incorrect, ambiguous, res_p, res_ambig_p))
+    entities, correct, incorrect, ambiguous = _count_rcr_predictions(
+        database_positive,
+        database_negative,
+        positive_hgnc_ids=positive_hgnc_ids,
+        negative_hgnc_ids=negative_hgnc_ids,
+        minimum_size=minimum_size,
+    )
+
+    # P(X >= correct) for X ~ Binomial(n, 0.5), as in a one-sided binomial
+    # test, for all hypotheses at once
+    total = correct + incorrect
+    with np.errstate(invalid="ignore"):
+        binom_pvalue = np.where(total > 0, binom.sf(correct - 1, total, 0.5), np.nan)
+        binom_ambig_pvalue = np.where(
+            total > 0, binom.sf(correct - 1, total + ambiguous, 0.5), np.nan
+        )
 
     df = pd.DataFrame(
-        rows,
-        columns=[
-            "curie",
-            "name",
-            "correct",
-            "incorrect",
-            "ambiguous",
-            "binom_pvalue",
-            "binom_ambig_pvalue",
-        ],
+        {
+            "curie": [curie for curie, _ in entities],
+            "name": [name for _, name in entities],
+            "correct": correct,
+            "incorrect": incorrect,
+            "ambiguous": ambiguous,
+            "binom_pvalue": binom_pvalue,
+            "binom_ambig_pvalue": binom_ambig_pvalue,
+        },
     ).sort_values("binom_pvalue")
     if not keep_insignificant:
         df = df[df["binom_pvalue"] < alpha]
     return df
 
 
+def _count_rcr_predictions(
+    database_positive: GeneSetMatrix,
+    database_negative: GeneSetMatrix,
+    positive_hgnc_ids: Sequence[str],
+    negative_hgnc_ids: Sequence[str],
+    minimum_size: int,
+) -> Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    """Count the correct, incorrect and ambiguous predictions of each entity.
+
+    An entity predicts a positive-signed gene correctly if it is only in
+    the entity's positive set and incorrectly if it is only in its negative
+    set, and vice versa for negative-signed genes. Genes in both or neither
+    of the sets are ambiguous.
+
+    Parameters
+    ----------
+    database_positive :
+        The genes positively regulated by each entity.
+    database_negative :
+        The genes negatively regulated by each entity.
+    positive_hgnc_ids :
+        The positive-signed HGNC gene identifiers.
+    negative_hgnc_ids :
+        The negative-signed HGNC gene identifiers.
+    minimum_size :
+        The minimum total size of the positive and negative sets of an entity
+        for it to be used as a hypothesis.
+
+    Returns
+    -------
+    :
+        The 2-tuples of CURIE and name of the entities used as hypotheses
+        and arrays with the number of correct, incorrect and ambiguous
+        predictions of each of them.
+    """
+    # Align the rows of both matrices to the union of their entities
+    entities = list(dict.fromkeys([*database_positive.keys, *database_negative.keys]))
+    entity_index = {entity: idx for idx, entity in enumerate(entities)}
+
+    def _align(matrix: GeneSetMatrix) -> csr_matrix:
+        rows = [entity_index[key] for key in matrix.keys]
+        return csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, np.arange(len(rows)))),
+            shape=(len(entities), len(matrix)),
+        )
+
+    align_positive = _align(database_positive)
+    align_negative = _align(database_negative)
+    sizes = align_positive @ database_positive.sizes + align_negative @ database_negative.sizes
+
+    def _counts(hgnc_ids: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        # The number of genes only in the positive and only in the negative set
+        in_positive = align_positive @ database_positive.columns(hgnc_ids).astype(np.int64)
+        in_negative = align_negative @ database_negative.columns(hgnc_ids).astype(np.int64)
+        in_both = np.asarray(in_positive.multiply(in_negative).sum(axis=1)).ravel()
+        positive_only = np.asarray(in_positive.sum(axis=1)).ravel() - in_both
+        negative_only = np.asarray(in_negative.sum(axis=1)).ravel() - in_both
+        return positive_only, negative_only
+
+    up_positive, up_negative = _counts(positive_hgnc_ids)
+    down_positive, down_negative = _counts(negative_hgnc_ids)
+    correct = up_positive + down_negative
+    incorrect = up_negative + down_positive
+    ambiguous = len(positive_hgnc_ids) + len(negative_hgnc_ids) - correct - incorrect
+
+    keep = np.flatnonzero(sizes >= minimum_size)
+    return (
+        [entities[idx] for idx in keep],
+        correct[keep],
+        incorrect[keep],
+        ambiguous[keep],
+    )
+
+
 # Examples taken as top 40 up and down
 # genes from dz:135 in CREEDS (prostate cancer)
 # fmt: off
@@ -6,12 +6,14 @@ import pandas as pd
 import sqlite3
 from tqdm import tqdm
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from textwrap import dedent
 from typing import (
     DefaultDict,
     Dict,
     Iterable,
+    Iterator,
     Optional,
     Set,
     Tuple,
@@ -24,6 +26,15 @@ from indra.databases.identifiers import get_ns_id_from_identifiers
 from indra.ontology.bio import bio_ontology
 from indra_cogex.util import load_stmt_json_str
 from indra_cogex.apps.constants import PYOBO_RESOURCE_FILE_VERSIONS, APP_CACHE_MODULE
+from indra_cogex.client.enrichment.gene_set_index import (
+    get_gene_set_index_path,
+    load_gene_set_index,
+    write_gene_set_index,
+)
+from indra_cogex.client.enrichment.gene_set_matrix import (
+    ConfidenceGeneSets,
+    GeneSetMatrix,
+)
 from indra_cogex.client.neo4j_client import Neo4jClient, autoclient
 from indra_cogex.representation import norm_id
 
@@ -33,6 +44,9 @@ __all__ = [
     "get_wikipathways",
     "get_reactome",
     "get_phenotype_gene_sets",
+    "get_gene_set_matrix",
+    "get_confidence_gene_sets",
+    "get_confidence_gene_set_matrix",
     "get_entity_to_targets",
     "get_entity_to_regulators",
     "get_kinase_phosphosites",
@@ -89,10 +103,7 @@ def collect_gene_sets(
         item and whose values are sets of HGNC gene identifiers (as strings)
     """
     curie_to_hgnc_ids: DefaultDict[Tuple[str, str], Set[str]] = defaultdict(set)
-    query_res = client.query_tx(query)
-    if query_res is None:
-        raise ValueError
-    for curie, name, hgnc_curies in query_res:
+    for curie, name, hgnc_curies in client.query_iter(query):
         curie_to_hgnc_ids[curie, name].update(
             hgnc_curie.lower().replace("hgnc:", "")
             if hgnc_curie.lower().startswith("hgnc:")
@@ -160,33 +171,7 @@ def collect_genes_with_confidence(
         pointing to the maximum belief and evidence count associated with
         the given HGNC gene.
     """
-    curie_to_hgnc_ids = defaultdict(dict)
-    max_beliefs: Dict[Tuple[str, str, str], float] = {}
-    max_ev_counts: Dict[Tuple[str, str, str], int] = {}
-    query_res = client.query_tx(query)
-    if query_res is None:
-        raise RuntimeError("Query returned no results")
-    for result in query_res:
-        curie = result[0]
-        name = result[1]
-        hgnc_ids = set()
-        for hgnc_curie, belief, ev_count in result[2]:
-            hgnc_id = hgnc_curie.lower().replace("hgnc:", "")
-            max_beliefs[(curie, name, hgnc_id)] = max(
-                belief, max_beliefs.get((curie, name, hgnc_id), 0.0)
-            )
-            max_ev_counts[(curie, name, hgnc_id)] = max(
-                ev_count, max_ev_counts.get((curie, name, hgnc_id), 0)
-            )
-            hgnc_ids.add(hgnc_id)
-        curie_to_hgnc_ids[(curie, name)] = {
-            hgnc_id: (
-                max_beliefs[(curie, name, hgnc_id)],
-                max_ev_counts[(curie, name, hgnc_id)],
-            )
-            for hgnc_id in hgnc_ids
-        }
-    curie_to_hgnc_ids = dict(curie_to_hgnc_ids)
+    curie_to_hgnc_ids = dict(iter_genes_with_confidence(query, client=client))
 
     # We now apply filtering to the background gene set if necessary
     if background_gene_ids:
@@ -199,6 +184,41 @@ def collect_genes_with_confidence(
     return curie_to_hgnc_ids
 
 
+def iter_genes_with_confidence(
+    query: str,
+    *,
+    client: Neo4jClient,
+) -> Iterator[Tuple[Tuple[str, str], Dict[str, Tuple[float, int]]]]:
+    """Lazily yield gene sets with confidences from the given query.
+
+    The query results are streamed from Neo4j, so only one gene set is held
+    in memory at a time.
+
+    Parameters
+    ----------
+    query :
+        A Cypher query collecting gene sets, returning one row per item with
+        its CURIE, its name and a list of (HGNC CURIE, belief, evidence
+        count) triples.
+    client :
+        The Neo4j client.
+
+    Yields
+    ------
+    :
+        2-tuples of CURIE and name of each queried item and a dict of HGNC
+        gene identifiers (as strings) pointing to the maximum belief and
+        evidence count associated with the given HGNC gene.
+    """
+    for curie, name, members in client.query_iter(query):
+        hgnc_dict: Dict[str, Tuple[float, int]] = {}
+        for hgnc_curie, belief, ev_count in members:
+            hgnc_id = hgnc_curie.lower().replace("hgnc:", "")
+            max_belief, max_ev_count = hgnc_dict.get(hgnc_id, (0.0, 0))
+            hgnc_dict[hgnc_id] = (max(belief, max_belief), max(ev_count, max_ev_count))
+        yield (curie, name), hgnc_dict
+
+
 def _phosphosite_in_background(
     phosphosite: Tuple[str, str, str],
     background_phosphosites: Set[Tuple[str, str]],
@@ -211,6 +231,23 @@ def _phosphosite_in_background(
     )
 
 
+def _phosphosite_label(phosphosite: Tuple[str, str, str]) -> Tuple[str, str]:
+    """Map raw (substrate_id, substrate_name, site) to (substrate_name, site)."""
+    return phosphosite[1], phosphosite[2]
+
+
+def _member_in_background(
+    member: Union[str, Tuple[str, ...]],
+    background_gene_ids: Set,
+) -> bool:
+    """Check if a member of a gene set with confidences is in the background."""
+    if isinstance(member, tuple):
+        if len(member) == 3:
+            return _phosphosite_in_background(member, background_gene_ids)
+        return member[0] in background_gene_ids
+    return member in background_gene_ids
+
+
 def collect_phosphosites_with_confidence(
     client: Neo4jClient,
     query: str,
@@ -235,13 +272,6 @@ def collect_phosphosites_with_confidence(
         tuples to a tuple of (max_belief, max_evidence_count) for that
         phosphosite.
     """
-    # Execute the query
-    raw_results = client.query_tx(query)
-
-    if raw_results is None:
-        logger.warning("Phosphosite query returned no results")
-        return {}
-
     # Process results to extract phosphosite information
     kinase_map = defaultdict(dict)
     max_beliefs: Dict[Tuple[str, str, str, str, str], float] = {}
@@ -250,7 +280,7 @@ def collect_phosphosites_with_confidence(
     # Cache for fplx entities to avoid repeated lookups
     fplx_kinase_cache = {}
 
-    for row in raw_results:
+    for row in client.query_iter(query):
         # kinase id, kinase name,
         #   [substrate.id, substrate.name, r.belief, r.evidence_count, r.stmt_json]
         phosphosites = set()
@@ -413,7 +443,38 @@ def get_sqlite_gene_set_cache(
     background_gene_ids: Optional[Iterable[str]] = None,
     sqlite_db_path: Union[Path, str] = SQLITE_CACHE_PATH,
     limit: Optional[int] = None,
+    use_index: bool = True,
 ) -> Dict[Tuple[str, str], Set[str]]:
+    """Get gene sets from the SQLite cache.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the cache to retrieve.
+    background_gene_ids :
+        List of HGNC gene identifiers for the background gene set to filter the
+        returned values on. If not given, no filtering is applied.
+    sqlite_db_path :
+        Path to the SQLite database to use for caching. Default:
+        APP_CACHE_MODULE found in `indra_cogex.apps.constants`.
+    limit :
+        If given, limit the number of entries returned to this number.
+    use_index :
+        If True, read the gene sets from the memory-mapped binary index built
+        alongside the SQLite database, if it exists. The index is not used
+        when a limit is given. Default: True.
+
+    Returns
+    -------
+    :
+        A dictionary whose keys are 2-tuples of CURIE and name of each gene set
+        and whose values are sets of HGNC gene identifiers (as strings)
+    """
+    if use_index and limit is None:
+        index = load_gene_set_index(get_gene_set_index_path(sqlite_db_path))
+        if index is not None and cache_name in index:
+            return index.get_gene_sets(cache_name, background_gene_ids)
+
     # Connect to the SQLite database
     conn = sqlite3.connect(sqlite_db_path)
     cursor = conn.cursor()
@@ -491,21 +552,57 @@ def get_sqlite_genes_with_confidence_cache(
     # if necessary
     for curie, name, gene_id, belief, evidence_count in rows:
         # For kinase_phosphosites, we need to split on '|'
-        if '|' in gene_id:
-            inner_key = tuple(gene_id.split('|'))
-            if len(inner_key) == 3 and background_gene_ids:
-                if not _phosphosite_in_background(inner_key, background_gene_ids):
-                    continue
-            elif background_gene_ids and inner_key[0] not in background_gene_ids:
-                continue
-        else:
-            inner_key = gene_id
-        if background_gene_ids and isinstance(inner_key, str) and inner_key not in background_gene_ids:
+        inner_key = tuple(gene_id.split('|')) if '|' in gene_id else gene_id
+        if background_gene_ids and not _member_in_background(
+            inner_key, background_gene_ids
+        ):
             continue
         gene_sets.setdefault((curie, name), {})[inner_key] = (belief, evidence_count)
     return gene_sets
 
 
+def get_confidence_gene_sets(
+    cache_name: ConfidenceGeneSet,
+    background_gene_ids: Optional[Iterable] = None,
+    sqlite_db_path: Union[Path, str] = SQLITE_CACHE_PATH,
+) -> Optional[ConfidenceGeneSets]:
+    """Get gene sets with confidence from the binary gene set index.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the cache to retrieve.
+    background_gene_ids :
+        List of HGNC gene identifiers (or (gene, site) tuples for
+        kinase_phosphosites) for the background to filter the returned
+        values on. If not given, no filtering is applied.
+    sqlite_db_path :
+        Path to the SQLite database next to which the index is stored.
+        Default: APP_CACHE_MODULE found in `indra_cogex.apps.constants`.
+
+    Returns
+    -------
+    :
+        The gene sets with confidences, or None if the index does not exist
+        or does not contain the given cache.
+    """
+    index = load_gene_set_index(get_gene_set_index_path(sqlite_db_path))
+    if index is None or not index.has_confidences(cache_name):
+        return None
+    member_key = (
+        _phosphosite_label if cache_name == "kinase_phosphosites" else None
+    )
+    confidence_gene_sets = index.get_confidence_gene_sets(
+        cache_name, member_key=member_key
+    )
+    if background_gene_ids:
+        background_gene_ids = set(background_gene_ids)
+        confidence_gene_sets = confidence_gene_sets.restrict(
+            lambda member: _member_in_background(member, background_gene_ids)
+        )
+    return confidence_gene_sets
+
+
 @autoclient()
 def get_wikipathways(
     *,
@@ -649,10 +746,14 @@ def get_kinase_phosphosites(
         A mapping from (kinase_curie, kinase_name) to a set of
         (substrate name, site) tuples representing phosphosites.
     """
-    phosphosites_with_confidence = get_kinase_phosphosites_raw(
-        client=client,
-        background_phosphosites=background_phosphosites,
+    phosphosites_with_confidence = get_confidence_gene_sets(
+        "kinase_phosphosites", background_phosphosites
     )
+    if phosphosites_with_confidence is None:
+        phosphosites_with_confidence = get_kinase_phosphosites_raw(
+            client=client,
+            background_phosphosites=background_phosphosites,
+        )
 
     return filter_phosphosite_set_confidences(
         phosphosites_with_confidence,
@@ -802,8 +903,123 @@ def get_phenotype_gene_sets(
     return gene_sets
 
 
+@autoclient()
+def get_gene_set_matrix(
+    cache_name: GeneSets,
+    *,
+    client: Neo4jClient,
+    background_gene_ids: Optional[Iterable[str]] = None,
+    use_sqlite_cache: bool = True,
+    sqlite_db_path: Union[Path, str] = SQLITE_CACHE_PATH,
+) -> GeneSetMatrix:
+    """Get the gene sets of a dataset as an incidence matrix.
+
+    If the binary gene set index built by :func:`build_sqlite_cache` exists,
+    the matrix is memory-mapped from it, otherwise it is built from the gene
+    sets returned by the corresponding getter, e.g., :func:`get_go`.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the gene set dataset, e.g., "go".
+    client :
+        The Neo4j client.
+    background_gene_ids :
+        List of HGNC gene identifiers for the background gene set. If not
+        given, all genes with HGNC IDs are used as the background.
+    use_sqlite_cache :
+        If True, use the SQLite cache and its binary index if they exist.
+        Default: True.
+    sqlite_db_path :
+        Path to the SQLite database to use for caching. Default:
+        APP_CACHE_MODULE found in `indra_cogex.apps.constants`.
+
+    Returns
+    -------
+    :
+        The gene sets as a matrix whose rows are 2-tuples of CURIE and name
+        of each gene set and whose columns are HGNC gene identifiers.
+    """
+    if use_sqlite_cache:
+        index = load_gene_set_index(get_gene_set_index_path(sqlite_db_path))
+        if index is not None and cache_name in index:
+            return index.get_matrix(cache_name, background_gene_ids)
+    gene_sets = gene_set_table_datasets[cache_name](
+        client=client,
+        background_gene_ids=background_gene_ids,
+        use_sqlite_cache=use_sqlite_cache,
+        sqlite_db_path=sqlite_db_path,
+    )
+    return GeneSetMatrix.from_gene_sets(gene_sets)
+
+
+@autoclient()
+def get_confidence_gene_set_matrix(
+    cache_name: ConfidenceGeneSet,
+    *,
+    client: Neo4jClient,
+    background_gene_ids: Optional[Iterable[str]] = None,
+    minimum_evidence_count: Optional[int] = 1,
+    minimum_belief: Optional[float] = 0.0,
+    use_sqlite_cache: bool = True,
+    sqlite_db_path: Union[Path, str] = SQLITE_CACHE_PATH,
+) -> GeneSetMatrix:
+    """Get gene sets with confidence filtered by thresholds as an incidence matrix.
+
+    If the binary gene set index built by :func:`build_sqlite_cache` exists,
+    the filtering is a vectorized mask over its arrays and, when no background
+    is given, the matrix is reused across calls with the same thresholds.
+
+    Parameters
+    ----------
+    cache_name :
+        The name of the dataset, e.g., "entity_to_targets".
+    client :
+        The Neo4j client.
+    background_gene_ids :
+        List of HGNC gene identifiers for the background gene set. If not
+        given, all genes with HGNC IDs are used as the background.
+    minimum_evidence_count :
+        The minimum number of evidences for a relationship to include it.
+        Defaults to 1 (i.e., cutoff not applied).
+    minimum_belief :
+        The minimum belief for a relationship to include it.
+        Defaults to 0.0 (i.e., cutoff not applied).
+    use_sqlite_cache :
+        If True, use the SQLite cache and its binary index if they exist.
+        Default: True.
+    sqlite_db_path :
+        Path to the SQLite database to use for caching. Default:
+        APP_CACHE_MODULE found in `indra_cogex.apps.constants`.
+
+    Returns
+    -------
+    :
+        The gene sets as a matrix whose rows are 2-tuples of CURIE and name
+        of each entity and whose columns are HGNC gene identifiers.
+    """
+    genes_with_confidence = None
+    if use_sqlite_cache:
+        genes_with_confidence = get_confidence_gene_sets(
+            cache_name, background_gene_ids, sqlite_db_path=sqlite_db_path
+        )
+    if genes_with_confidence is None:
+        genes_with_confidence = ConfidenceGeneSets.from_gene_sets(
+            genes_with_confidence_datasets[cache_name](
+                client=client,
+                background_gene_ids=background_gene_ids,
+                use_sqlite_cache=use_sqlite_cache,
+                sqlite_db_path=sqlite_db_path,
+            )
+        )
+    return genes_with_confidence.get_matrix(minimum_belief, minimum_evidence_count)
+
+
 def filter_gene_set_confidences(
-    data: Dict[Tuple[str, str], Dict[str, Tuple[float, int]]],
+    data: Union[
+        ConfidenceGeneSets,
+        Dict[Tuple[str, str], Dict[str, Tuple[float, int]]],
+    ],
     minimum_belief: Optional[float] = None,
     minimum_evidence_count: Optional[int] = None,
 ) -> Dict[Tuple[str, str], Set[str]]:
@@ -813,7 +1029,9 @@ def filter_gene_set_confidences(
     ----------
     data :
         A dictionary mapping keys are 2-tuples of CURIE and name to dictionaries
-        mapping keys of IDs to (belief, evidence_count) tuples.
+        mapping keys of IDs to (belief, evidence_count) tuples, or the
+        equivalent :class:`ConfidenceGeneSets`, which is filtered without
+        visiting each entry in Python.
     minimum_belief :
         Minimum belief to include a gene in the set. If None, no filtering
         is applied.
@@ -827,6 +1045,8 @@ def filter_gene_set_confidences(
         A dictionary mapping keys are 2-tuples of CURIE and name to sets
         of IDs that pass the filtering criteria.
     """
+    if isinstance(data, ConfidenceGeneSets):
+        return data.get_matrix(minimum_belief, minimum_evidence_count).to_gene_sets()
     if minimum_belief is None:
         minimum_belief = 0.0
     if minimum_evidence_count is None:
@@ -842,7 +1062,10 @@ def filter_gene_set_confidences(
 
 
 def filter_phosphosite_set_confidences(
-    data: Dict[Tuple[str, str], Dict[Tuple[str, str, str], Tuple[float, int]]],
+    data: Union[
+        ConfidenceGeneSets,
+        Dict[Tuple[str, str], Dict[Tuple[str, str, str], Tuple[float, int]]],
+    ],
     minimum_belief: Optional[float] = 0.0,
     minimum_evidence_count: Optional[int] = 0,
 ) -> Dict[Tuple[str, str], Set[Tuple[str, str]]]:
@@ -853,7 +1076,9 @@ def filter_phosphosite_set_confidences(
     data :
         A dictionary mapping keys are 2-tuples of (kinase_curie, kinase_name)
         to dictionaries mapping keys of (substrate id, substrate name, site)
-        tuples to (belief, evidence_count) tuples.
+        tuples to (belief, evidence_count) tuples, or the equivalent
+        :class:`ConfidenceGeneSets` whose members are labeled by
+        (substrate name, site).
     minimum_belief :
         Minimum belief to include a phosphosite in the set. If None, no filtering
         is applied.
@@ -868,6 +1093,10 @@ def filter_phosphosite_set_confidences(
         to sets of (substrate id, substrate name, site) tuples that pass the
         filtering criteria.
     """
+    if isinstance(data, ConfidenceGeneSets):
+        return data.get_matrix(
+            minimum_belief, minimum_evidence_count, drop_empty=True
+        ).to_gene_sets()
     if minimum_belief is None:
         minimum_belief = 0.0
     if minimum_evidence_count is None:
@@ -916,10 +1145,14 @@ def get_entity_to_targets(
         A dictionary whose keys are 2-tuples of CURIE and name of each entity
         and whose values are sets of HGNC gene identifiers (as strings)
     """
-    genes_with_confidence = get_entity_to_targets_raw(
-        client=client,
-        background_gene_ids=background_gene_ids,
+    genes_with_confidence = get_confidence_gene_sets(
+        "entity_to_targets", background_gene_ids
     )
+    if genes_with_confidence is None:
+        genes_with_confidence = get_entity_to_targets_raw(
+            client=client,
+            background_gene_ids=background_gene_ids,
+        )
     return filter_gene_set_confidences(
         genes_with_confidence,
         minimum_belief=minimum_belief,
@@ -927,6 +1160,48 @@ def get_entity_to_targets(
     )
 
 
+def _entity_to_targets_query(limit: Optional[int] = None) -> str:
+    """Return a query over the human gene targets of each entity."""
+    query = dedent(
+        f"""\
+        MATCH (regulator:BioEntity)-[r:indra_rel]->(gene:BioEntity)
+        WHERE
+            gene.id STARTS WITH "hgnc"                  // Collecting human genes only
+            AND NOT gene.obsolete                       // Skip obsolete
+            AND r.stmt_type <> "Complex"                // Ignore complexes since they are non-directional
+            AND NOT regulator.id STARTS WITH "uniprot"  // This is a simple way to ignore non-human proteins
+        RETURN
+            regulator.id,
+            regulator.name,
+            collect([gene.id, r.belief, r.evidence_count])
+    """
+    )
+    if limit is not None:
+        query += f"\nLIMIT {limit}"
+    return query
+
+
+def _entity_to_regulators_query(limit: Optional[int] = None) -> str:
+    """Return a query over the human gene regulators of each entity."""
+    query = dedent(
+        f"""\
+        MATCH (gene:BioEntity)-[r:indra_rel]->(target:BioEntity)
+        WHERE
+            gene.id STARTS WITH "hgnc"               // Collecting human genes only
+            AND NOT gene.obsolete                    // Skip obsolete
+            AND r.stmt_type <> "Complex"             // Ignore complexes since they are non-directional
+            AND NOT target.id STARTS WITH "uniprot"  // This is a simple way to ignore non-human proteins
+        RETURN
+            target.id,
+            target.name,
+            collect([gene.id, r.belief, r.evidence_count])
+    """
+    )
+    if limit is not None:
+        query += f"\nLIMIT {limit}"
+    return query
+
+
 def get_entity_to_targets_raw(
     client: Optional[Neo4jClient] = None,
     background_gene_ids: Optional[Iterable[str]] = None,
@@ -967,22 +1242,7 @@ def get_entity_to_targets_raw(
             limit=limit
         )
     else:
-        query = dedent(
-            f"""\
-            MATCH (regulator:BioEntity)-[r:indra_rel]->(gene:BioEntity)
-            WHERE
-                gene.id STARTS WITH "hgnc"                  // Collecting human genes only
-                AND NOT gene.obsolete                       // Skip obsolete
-                AND r.stmt_type <> "Complex"                // Ignore complexes since they are non-directional
-                AND NOT regulator.id STARTS WITH "uniprot"  // This is a simple way to ignore non-human proteins
-            RETURN
-                regulator.id,
-                regulator.name,
-                collect([gene.id, r.belief, r.evidence_count])
-        """
-        )
-        if limit is not None:
-            query += f"\nLIMIT {limit}"
+        query = _entity_to_targets_query(limit=limit)
         genes_with_confidence = collect_genes_with_confidence(
             client=client,
             query=query,
@@ -1022,10 +1282,14 @@ def get_entity_to_regulators(
         A dictionary whose keys are 2-tuples of CURIE and name of each
         entity and whose values are sets of HGNC gene identifiers (as strings).
     """
-    genes_with_confidence = get_entity_to_regulators_raw(
-        client=client,
-        background_gene_ids=background_gene_ids,
+    genes_with_confidence = get_confidence_gene_sets(
+        "entity_to_regulators", background_gene_ids
     )
+    if genes_with_confidence is None:
+        genes_with_confidence = get_entity_to_regulators_raw(
+            client=client,
+            background_gene_ids=background_gene_ids,
+        )
     return filter_gene_set_confidences(
         genes_with_confidence,
         minimum_belief=minimum_belief,
@@ -1075,22 +1339,7 @@ def get_entity_to_regulators_raw(
             limit=limit
         )
     else:
-        query = dedent(
-            f"""\
-            MATCH (gene:BioEntity)-[r:indra_rel]->(target:BioEntity)
-            WHERE
-                gene.id STARTS WITH "hgnc"               // Collecting human genes only
-                AND NOT gene.obsolete                    // Skip obsolete
-                AND r.stmt_type <> "Complex"             // Ignore complexes since they are non-directional
-                AND NOT target.id STARTS WITH "uniprot"  // This is a simple way to ignore non-human proteins
-            RETURN
-                target.id,
-                target.name,
-                collect([gene.id, r.belief, r.evidence_count])
-        """
-        )
-        if limit is not None:
-            query += f"\nLIMIT {limit}"
+        query = _entity_to_regulators_query(limit=limit)
         genes_with_confidence = collect_genes_with_confidence(
             client=client,
             query=query,
@@ -1193,10 +1442,12 @@ def get_positive_stmt_sets(
         A dictionary whose keys are 2-tuples of CURIE and name of each entity
         and whose values are sets of HGNC gene identifiers (as strings)
     """
-    res = get_positive_stmt_sets_raw(
-        client=client,
-        background_gene_ids=background_gene_ids,
-    )
+    res = get_confidence_gene_sets("positive_statements", background_gene_ids)
+    if res is None:
+        res = get_positive_stmt_sets_raw(
+            client=client,
+            background_gene_ids=background_gene_ids,
+        )
 
     return filter_gene_set_confidences(
         res,
@@ -1287,10 +1538,12 @@ def get_negative_stmt_sets(
         A dictionary whose keys are 2-tuples of CURIE and name of each entity
         and whose values are sets of HGNC gene identifiers (as strings)
     """
-    res = get_negative_stmt_sets_raw(
-        client=client,
-        background_gene_ids=background_gene_ids,
-    )
+    res = get_confidence_gene_sets("negative_statements", background_gene_ids)
+    if res is None:
+        res = get_negative_stmt_sets_raw(
+            client=client,
+            background_gene_ids=background_gene_ids,
+        )
     return filter_gene_set_confidences(
         res,
         minimum_belief=minimum_belief,
@@ -1643,13 +1896,17 @@ def build_sqlite_cache(
         If return_cache is True, returns a dictionary with the data used to
         populate the SQLite cache. Otherwise, returns None.
     """
+    index_path = get_gene_set_index_path(db_path)
     if db_path.exists() and not force:
         logger.info(f"SQLite cache already exists at {db_path}. Skipping build.")
+        if not index_path.exists():
+            build_gene_set_index(db_path)
         return
 
     if force:
         logger.info(f"Force rebuilding SQLite cache at {db_path}.")
         db_path.unlink(missing_ok=True)
+        index_path.unlink(missing_ok=True)
 
     client = Neo4jClient()
     if not client.ping():
@@ -1701,77 +1958,132 @@ def build_sqlite_cache(
     for cache_name, func in tqdm(
         gene_set_table_datasets.items(), desc="Populating gene set cache"
     ):
-        data = func(use_sqlite_cache=False, limit=limit)
+        data = func(client=client, use_sqlite_cache=False, limit=limit)
 
         # Store in return cache if requested
         if return_cache:
             cache_data[SQLITE_GENE_SET_TABLE][cache_name] = data
 
-        # Prepare data for insertion
-        to_insert = []
-        sorted_keys = sorted(data.keys(), key=lambda x: (x[0], x[1]))
-        for (curie, name) in sorted_keys:
-            values = data[(curie, name)]
-            for value in sorted(values):
-                # Set name to curie if name is None or empty
-                if not name:
-                    name = curie
-                to_insert.append((cache_name, curie, name, value))
-
-        # Insert data into the database
+        # Insert data into the database, generating the rows as they are
+        # consumed instead of building a second copy of the data.
+        # Set name to curie if name is None or empty
+        rows = (
+            (cache_name, curie, name or curie, value)
+            for curie, name in sorted(data)
+            for value in sorted(data[curie, name])
+        )
         cursor.executemany(
             f"INSERT OR IGNORE INTO {SQLITE_GENE_SET_TABLE} "
             f"(cache_name, curie, name, value) VALUES (?, ?, ?, ?);",
-            to_insert
+            rows
         )
         conn.commit()
+        del data
 
     logger.info("Populating SQLite genes with confidence cache")
     for cache_name, func in tqdm(
         genes_with_confidence_datasets.items(),
         desc="Populating genes with confidence cache"
     ):
-        data = func(use_sqlite_cache=False, limit=limit)
-
-        # Store in return cache if requested
-        if return_cache:
-            cache_data[SQLITE_GENES_WITH_CONFIDENCE_TABLE][cache_name] = data
-
-        if cache_name == "kinase_phosphosites":
-            # Make the inner key 3-tuple a string (curie, name, site)
-            flat_key_data = {}
-            for (curie, name), values in data.items():
-                for (gene_curie, gene_name, site), (belief, ev_count) in values.items():
-                    inner_key = f"{gene_curie}|{gene_name}|{site}"
-                    if (curie, name) not in flat_key_data:
-                        flat_key_data[(curie, name)] = {}
-                    flat_key_data[(curie, name)][inner_key] = (belief, ev_count)
-            data = flat_key_data
-
-        # Prepare data for insertion
-        to_insert = []
-        sorted_keys = sorted(data.keys(), key=lambda x: (x[0], x[1]))
-        for (curie, name) in sorted_keys:
-            inner_dict = data[(curie, name)]
-            for inner_key in sorted(inner_dict.keys()):
-                belief, ev_count = inner_dict[inner_key]
-                to_insert.append((cache_name, curie, name, inner_key, belief, ev_count))
+        if cache_name in genes_with_confidence_queries:
+            # Stream the gene sets from Neo4j straight into the database
+            query = genes_with_confidence_queries[cache_name](limit=limit)
+            items = iter_genes_with_confidence(query, client=client)
+            if return_cache:
+                data = cache_data[SQLITE_GENES_WITH_CONFIDENCE_TABLE][cache_name] = {}
+                items = _record_items(items, data)
+        else:
+            data = func(client=client, use_sqlite_cache=False, limit=limit)
+
+            # Store in return cache if requested
+            if return_cache:
+                cache_data[SQLITE_GENES_WITH_CONFIDENCE_TABLE][cache_name] = data
+
+            if cache_name == "kinase_phosphosites":
+                # Make the inner key 3-tuple a string (curie, name, site)
+                items = (
+                    (
+                        key,
+                        {
+                            f"{gene_curie}|{gene_name}|{site}": confidence
+                            for (gene_curie, gene_name, site), confidence in values.items()
+                        },
+                    )
+                    for key, values in sorted(data.items())
+                )
+            else:
+                items = sorted(data.items())
 
         # Insert data into the database
+        rows = (
+            (cache_name, curie, name, inner_key, *inner_dict[inner_key])
+            for (curie, name), inner_dict in items
+            for inner_key in sorted(inner_dict)
+        )
         cursor.executemany(
             f"INSERT OR IGNORE INTO {SQLITE_GENES_WITH_CONFIDENCE_TABLE} "
             f"(cache_name, curie, name, inner_key, belief, ev_count) "
             f"VALUES (?, ?, ?, ?, ?, ?);",
-            to_insert
+            rows
         )
         conn.commit()
 
     conn.close()
     logger.info(f"Finished building and populating SQLite cache at {db_path}.")
 
+    # An index built from a limited cache would be incomplete
+    if limit is None:
+        build_gene_set_index(db_path)
+
     return cache_data or None
 
 
+def _record_items(items, data: Dict):
+    """Pass through key-value pairs while recording them in a dictionary."""
+    for key, value in items:
+        data[key] = value
+        yield key, value
+
+
+def build_gene_set_index(db_path: Path = SQLITE_CACHE_PATH):
+    """Build the binary gene set index from the SQLite cache.
+
+    The index is written next to the SQLite database and is memory-mapped
+    read-only by :func:`get_gene_set_matrix`, :func:`get_sqlite_gene_set_cache`
+    and :func:`get_confidence_gene_sets` so that all processes share one copy
+    of it.
+
+    Parameters
+    ----------
+    db_path :
+        The path to the SQLite database file. Default: SQLITE_CACHE_PATH.
+    """
+    datasets = {
+        cache_name: get_sqlite_gene_set_cache(
+            cache_name, sqlite_db_path=db_path, use_index=False
+        )
+        for cache_name in gene_set_table_datasets
+    }
+    conn = sqlite3.connect(db_path)
+    confidence_datasets = {
+        cache_name: conn.execute(
+            f"SELECT curie, name, inner_key, belief, ev_count FROM "
+            f"{SQLITE_GENES_WITH_CONFIDENCE_TABLE} WHERE cache_name = ? "
+            f"ORDER BY curie, name, inner_key",
+            (cache_name,),
+        )
+        for cache_name in genes_with_confidence_datasets
+    }
+    try:
+        write_gene_set_index(
+            get_gene_set_index_path(db_path),
+            datasets,
+            confidence_datasets=confidence_datasets,
+        )
+    finally:
+        conn.close()
+
+
 gene_set_table_datasets = {
     # Returns set of gene IDs
     "go": get_go,
@@ -1779,6 +2091,14 @@ gene_set_table_datasets = {
     "wikipathways": get_wikipathways,
     "phenotypes": get_phenotype_gene_sets,
 }
+# Queries for the genes with confidence datasets whose raw results can be
+# streamed into the SQLite cache row by row
+genes_with_confidence_queries = {
+    "entity_to_targets": _entity_to_targets_query,
+    "entity_to_regulators": _entity_to_regulators_query,
+    "positive_statements": partial(_query, POSITIVE_STMT_TYPES),
+    "negative_statements": partial(_query, NEGATIVE_STMT_TYPES),
+}
 genes_with_confidence_datasets = {
     # Returns dict of gene ID to (belief, evidence_count)
     "entity_to_targets": get_entity_to_targets_raw,
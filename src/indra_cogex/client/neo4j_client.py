@@ -1,13 +1,21 @@
 """Neo4j client module."""
 
+import asyncio
 import inspect
 import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache, wraps
-from itertools import count
+from itertools import count, islice
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
@@ -19,23 +27,100 @@ from typing import (
 import json
 
 import neo4j.graph
+import pandas as pd
 from indra.config import get_config
 from indra.databases import identifiers
 from indra.ontology.standardize import get_standard_agent
 from indra.statements import Agent
-from neo4j import GraphDatabase, ManagedTransaction, unit_of_work
+from neo4j import (
+    AsyncGraphDatabase,
+    AsyncManagedTransaction,
+    GraphDatabase,
+    ManagedTransaction,
+    unit_of_work,
+)
 
+from indra_cogex.client.query_cache import QueryCache, get_query_cache_from_config
 from indra_cogex.representation import Node, Relation, norm_id, \
     triple_query, triple_parameter_query
 
-__all__ = ["Neo4jClient", "autoclient", "process_identifier"]
+__all__ = [
+    "Neo4jClient",
+    "AsyncNeo4jClient",
+    "autoclient",
+    "async_autoclient",
+    "get_shared_client",
+    "get_shared_async_client",
+    "process_identifier",
+    "run_coroutine",
+]
 
 logger = logging.getLogger(__name__)
 
+#: The default maximum number of connections in the driver's connection pool
+DEFAULT_MAX_CONNECTION_POOL_SIZE = 100
+#: The default time in seconds to wait for a connection from the pool
+DEFAULT_CONNECTION_ACQUISITION_TIMEOUT = 60.0
+#: The default number of records fetched from the server at a time
+DEFAULT_FETCH_SIZE = 1000
+
+
+def _get_numeric_config(key: str, default, cast):
+    value = get_config(key)
+    if value is None or value == "":
+        return default
+    return cast(value)
+
+
+def _resolve_connection_config(
+    url: Optional[str],
+    auth: Optional[Tuple[str, str]],
+    max_connection_pool_size: Optional[int],
+    connection_acquisition_timeout: Optional[float],
+    fetch_size: Optional[int],
+):
+    """Fill in the connection settings that aren't given from the config."""
+    if not url:
+        INDRA_NEO4J_URL = get_config("INDRA_NEO4J_URL")
+        if INDRA_NEO4J_URL:
+            url = INDRA_NEO4J_URL
+            logger.debug("Using configured URL for INDRA neo4j connection")
+        else:
+            logger.info("INDRA_NEO4J_URL not configured")
+    if not auth:
+        INDRA_NEO4J_USER = get_config("INDRA_NEO4J_USER")
+        INDRA_NEO4J_PASSWORD = get_config("INDRA_NEO4J_PASSWORD")
+        if INDRA_NEO4J_USER and INDRA_NEO4J_PASSWORD:
+            auth = (INDRA_NEO4J_USER, INDRA_NEO4J_PASSWORD)
+            logger.debug("Using configured credentials for INDRA neo4j connection")
+        else:
+            logger.info("INDRA_NEO4J_USER and INDRA_NEO4J_PASSWORD not configured")
+    if max_connection_pool_size is None:
+        max_connection_pool_size = _get_numeric_config(
+            "INDRA_NEO4J_MAX_CONNECTION_POOL_SIZE",
+            DEFAULT_MAX_CONNECTION_POOL_SIZE,
+            int,
+        )
+    if connection_acquisition_timeout is None:
+        connection_acquisition_timeout = _get_numeric_config(
+            "INDRA_NEO4J_CONNECTION_ACQUISITION_TIMEOUT",
+            DEFAULT_CONNECTION_ACQUISITION_TIMEOUT,
+            float,
+        )
+    if fetch_size is None:
+        fetch_size = _get_numeric_config(
+            "INDRA_NEO4J_FETCH_SIZE", DEFAULT_FETCH_SIZE, int
+        )
+    return url, auth, max_connection_pool_size, connection_acquisition_timeout, fetch_size
+
 
 class Neo4jClient:
     """A client to communicate with an INDRA CogEx neo4j instance
 
+    The driver (and its connection pool) is created again on first use in a
+    forked process (e.g., a gunicorn worker), since connections can't be
+    shared across processes.
+
     Parameters
     ----------
     url :
@@ -45,6 +130,22 @@ class Neo4jClient:
         A tuple consisting of the user name and password for the neo4j instance to
         override INDRA_NEO4J_USER and
         INDRA_NEO4J_PASSWORD set as environment variables or set in the INDRA config file.
+    max_connection_pool_size :
+        The maximum number of connections in the connection pool to override
+        INDRA_NEO4J_MAX_CONNECTION_POOL_SIZE set as an environment variable or
+        set in the INDRA config file. Defaults to 100.
+    connection_acquisition_timeout :
+        The number of seconds to wait for a connection from the pool to
+        override INDRA_NEO4J_CONNECTION_ACQUISITION_TIMEOUT set as an
+        environment variable or set in the INDRA config file. Defaults to 60.
+    fetch_size :
+        The number of records fetched from the server at a time by each
+        session to override INDRA_NEO4J_FETCH_SIZE set as an environment
+        variable or set in the INDRA config file. Defaults to 1000.
+    query_cache :
+        An optional cache for the results of read-only queries run with
+        :meth:`query_tx` and the methods built on it. No results are cached
+        by default.
     """
 
     #: The session
@@ -54,49 +155,84 @@ class Neo4jClient:
         self,
         url: Optional[str] = None,
         auth: Optional[Tuple[str, str]] = None,
+        *,
+        max_connection_pool_size: Optional[int] = None,
+        connection_acquisition_timeout: Optional[float] = None,
+        fetch_size: Optional[int] = None,
+        query_cache: Optional[QueryCache] = None,
     ):
         """Initialize the Neo4j client."""
-        self.driver = None
+        self._driver = None
+        self._driver_pid = None
         self.session = None
-        if not url:
-            INDRA_NEO4J_URL = get_config("INDRA_NEO4J_URL")
-            if INDRA_NEO4J_URL:
-                url = INDRA_NEO4J_URL
-                logger.debug("Using configured URL for INDRA neo4j connection")
-            else:
-                logger.info("INDRA_NEO4J_URL not configured")
-        if not auth:
-            INDRA_NEO4J_USER = get_config("INDRA_NEO4J_USER")
-            INDRA_NEO4J_PASSWORD = get_config("INDRA_NEO4J_PASSWORD")
-            if INDRA_NEO4J_USER and INDRA_NEO4J_PASSWORD:
-                auth = (INDRA_NEO4J_USER, INDRA_NEO4J_PASSWORD)
-                logger.debug("Using configured credentials for INDRA neo4j connection")
-            else:
-                logger.info("INDRA_NEO4J_USER and INDRA_NEO4J_PASSWORD not configured")
-        # Set max_connection_lifetime to something smaller than the timeouts
-        # on the server or on the way to the server. See
-        # https://github.com/neo4j/neo4j-python-driver/issues/316#issuecomment-564020680
-        self.driver = GraphDatabase.driver(
+        self.query_cache = query_cache
+        (
+            url,
+            auth,
+            max_connection_pool_size,
+            connection_acquisition_timeout,
+            fetch_size,
+        ) = _resolve_connection_config(
             url,
-            auth=auth,
-            max_connection_lifetime=3 * 60,
+            auth,
+            max_connection_pool_size,
+            connection_acquisition_timeout,
+            fetch_size,
         )
+        self.url = url
+        self._auth = auth
+        self.max_connection_pool_size = max_connection_pool_size
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.fetch_size = fetch_size
         self.driver.verify_connectivity()
         logger.info("Connected to neo4j graph at %s", url)
 
+    @property
+    def driver(self) -> neo4j.Driver:
+        """The driver, created on first use in each process."""
+        if self._driver is None or self._driver_pid != os.getpid():
+            if self._driver is not None:
+                # The connections belong to the parent process, so the
+                # driver is dropped without closing them
+                logger.debug("Creating a new neo4j driver after fork")
+                self.session = None
+            # Set max_connection_lifetime to something smaller than the timeouts
+            # on the server or on the way to the server. See
+            # https://github.com/neo4j/neo4j-python-driver/issues/316#issuecomment-564020680
+            self._driver = GraphDatabase.driver(
+                self.url,
+                auth=self._auth,
+                max_connection_lifetime=3 * 60,
+                max_connection_pool_size=self.max_connection_pool_size,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+            )
+            self._driver_pid = os.getpid()
+        return self._driver
+
+    def new_session(self, **kwargs) -> neo4j.Session:
+        """Return a new session with the configured fetch size.
+
+        Parameters
+        ----------
+        kwargs :
+            Session configuration passed to :meth:`neo4j.Driver.session`,
+            overriding the defaults.
+        """
+        kwargs.setdefault("fetch_size", self.fetch_size)
+        return self.driver.session(**kwargs)
+
     def __del__(self):
         # Safely shut down the driver as a Neo4jClient object is garbage collected
         # https://neo4j.com/docs/api/python-driver/current/api.html#driver-object-lifetime
-        if self.driver is not None:
-            self.driver.close()
+        if self._driver is not None and self._driver_pid == os.getpid():
+            self._driver.close()
 
     def load_agent_cache(self):
         """Load all agents into a dictionary cache for quick lookup."""
         query = ("MATCH (n:BioEntity) - [r: indra_rel] - (:BioEntity) "
                  "RETURN n.id AS id, n.name AS name")
-        result = self.query_tx(query)
         agent_cache = set()
-        for row in result:
+        for row in self.query_iter(query):
             if row[0]:  # Cache by ID if exists
                 agent_cache.add(row[0])
             if row[1]:  # Cache by name if exists
@@ -115,7 +251,8 @@ class Neo4jClient:
             True if the ping was successful, otherwise False.
         """
         try:
-            res = self.query_tx("CALL db.ping()")
+            # The ping is never answered from the query cache
+            _, res = self._query_tx_with_keys("CALL db.ping()")
             if res:
                 return res[0][0]
             else:
@@ -139,7 +276,7 @@ class Neo4jClient:
         query_params :
             Parameters associated with the query.
         """
-        with self.driver.session() as session:
+        with self.new_session() as session:
             return session.execute_write(
                 do_cypher_tx, query, query_params=query_params
             )
@@ -152,7 +289,7 @@ class Neo4jClient:
         """Run a read-only query that generates a dictionary."""
         return {
             key: json.loads(j)
-            for key, j in self.query_tx(query, **query_params)
+            for key, j in self.query_iter(query, **query_params)
         }
 
     def query_tx(
@@ -200,12 +337,259 @@ class Neo4jClient:
             - column_names: List of column names from RETURN clause
             - rows: List of result rows (each row is a list of values)
         """
-        with self.driver.session() as session:
+        if self.query_cache is not None:
+            return self.query_cache.get_or_run(
+                query, query_params, self._query_tx_with_keys
+            )
+        return self._query_tx_with_keys(query, **query_params)
+
+    def _query_tx_with_keys(
+        self, query: str, **query_params
+    ) -> Tuple[List[str], List[List[Any]]]:
+        with self.new_session() as session:
             keys, values = session.execute_read(
                 do_cypher_tx_with_keys, query, **query_params
             )
         return keys, values
 
+    def query_iter(
+        self,
+        query: str,
+        squeeze: bool = False,
+        fetch_size: Optional[int] = None,
+        **query_params,
+    ) -> Iterator[Any]:
+        """Run a read-only query and lazily yield the results.
+
+        Records are pulled from the server in chunks as the iterator is
+        consumed, so the full result is never held in memory. The session
+        and its transaction stay open until the iterator is exhausted or
+        closed.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        squeeze :
+            If true, unpacks the 0-indexed element in each value returned.
+            Useful when only returning value per row of the results.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        query_params :
+            kwargs to pass to query
+
+        Yields
+        ------
+        :
+            Each result as a list of one or more objects, or the first
+            object of each result if ``squeeze`` is true.
+        """
+        if fetch_size is None:
+            fetch_size = self.fetch_size
+        with self.new_session(
+            default_access_mode=neo4j.READ_ACCESS, fetch_size=fetch_size
+        ) as session:
+            with session.begin_transaction() as tx:
+                for record in tx.run(query, parameters=query_params):
+                    values = record.values()
+                    yield values[0] if squeeze else values
+
+    def query_batches(
+        self,
+        query: str,
+        batch_size: int = 10_000,
+        squeeze: bool = False,
+        fetch_size: Optional[int] = None,
+        **query_params,
+    ) -> Iterator[List[Any]]:
+        """Run a read-only query and lazily yield the results in batches.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        batch_size :
+            The number of results in each batch. The last batch can be
+            smaller.
+        squeeze :
+            If true, unpacks the 0-indexed element in each value returned.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        query_params :
+            kwargs to pass to query
+
+        Yields
+        ------
+        :
+            Lists of up to ``batch_size`` results, see :meth:`query_iter`.
+        """
+        results = self.query_iter(
+            query, squeeze=squeeze, fetch_size=fetch_size, **query_params
+        )
+        while batch := list(islice(results, batch_size)):
+            yield batch
+
+    def query_df(
+        self,
+        query: str,
+        batch_size: int = 100_000,
+        fetch_size: Optional[int] = None,
+        dtypes: Optional[Mapping[str, Any]] = None,
+        **query_params,
+    ) -> pd.DataFrame:
+        """Run a read-only query and return the results as a data frame.
+
+        The records are streamed from the server and each batch is turned
+        into columns directly, without building a dictionary or list for
+        each row. The columns are named after the keys of the ``RETURN``
+        clause and their types are inferred from the values.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed. Return properties rather than
+            nodes or relations to get typed columns.
+        batch_size :
+            The number of records converted to columns at a time.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        dtypes :
+            An optional mapping from column names to data types the columns
+            are cast to, e.g., ``{"position": "Int64"}``.
+        query_params :
+            kwargs to pass to query
+
+        Returns
+        -------
+        :
+            A data frame with one row per record.
+        """
+        frames = list(
+            self.query_df_batches(
+                query, batch_size=batch_size, fetch_size=fetch_size, **query_params
+            )
+        )
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if dtypes:
+            df = df.astype(dtypes)
+        return df
+
+    def query_df_batches(
+        self,
+        query: str,
+        batch_size: int = 100_000,
+        fetch_size: Optional[int] = None,
+        **query_params,
+    ) -> Iterator[pd.DataFrame]:
+        """Run a read-only query and lazily yield the results as data frames.
+
+        This is the streaming counterpart of :meth:`query_df` for results
+        that should be reduced batch by batch, e.g., to drop large columns
+        after extracting what is needed from them.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        batch_size :
+            The maximum number of rows in each data frame.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        query_params :
+            kwargs to pass to query
+
+        Yields
+        ------
+        :
+            Data frames with up to ``batch_size`` rows whose columns are named
+            after the keys of the ``RETURN`` clause. At least one, possibly
+            empty, data frame is yielded.
+        """
+        for keys, records in self._query_record_batches(
+            query, batch_size=batch_size, fetch_size=fetch_size, **query_params
+        ):
+            yield _records_to_df(keys, records)
+
+    def query_arrow(
+        self,
+        query: str,
+        batch_size: int = 100_000,
+        fetch_size: Optional[int] = None,
+        schema=None,
+        **query_params,
+    ):
+        """Run a read-only query and return the results as an Arrow table.
+
+        This requires the optional dependency ``pyarrow``.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed. It should return properties
+            (e.g., strings, numbers, lists or maps) rather than nodes or
+            relations.
+        batch_size :
+            The number of records converted to an Arrow record batch at a
+            time.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        schema :
+            An optional :class:`pyarrow.Schema` for the table. If not given,
+            the type of each column is inferred from the values.
+        query_params :
+            kwargs to pass to query
+
+        Returns
+        -------
+        :
+            A :class:`pyarrow.Table` with one row per record.
+        """
+        import pyarrow as pa
+
+        tables = [
+            _records_to_arrow(keys, records, schema=schema)
+            for keys, records in self._query_record_batches(
+                query, batch_size=batch_size, fetch_size=fetch_size, **query_params
+            )
+        ]
+        if len(tables) == 1:
+            return tables[0]
+        # Columns that are all null in a batch are promoted to the type
+        # inferred from the other batches
+        return pa.concat_tables(tables, promote_options="default")
+
+    def _query_record_batches(
+        self,
+        query: str,
+        batch_size: int,
+        fetch_size: Optional[int] = None,
+        **query_params,
+    ) -> Iterator[Tuple[List[str], List[neo4j.Record]]]:
+        """Yield the keys of a read-only query along with batches of records.
+
+        At least one (possibly empty) batch is yielded, so the keys of
+        queries without results are available too.
+        """
+        if fetch_size is None:
+            fetch_size = self.fetch_size
+        with self.new_session(
+            default_access_mode=neo4j.READ_ACCESS, fetch_size=fetch_size
+        ) as session:
+            with session.begin_transaction() as tx:
+                result = tx.run(query, parameters=query_params)
+                keys = list(result.keys())
+                records = result.fetch(batch_size)
+                yield keys, records
+                while len(records) == batch_size:
+                    records = result.fetch(batch_size)
+                    if records:
+                        yield keys, records
+
     def query_nodes(self, query: str, **query_params) -> List[Node]:
         """Run a read-only query for nodes.
 
@@ -263,7 +647,7 @@ class Neo4jClient:
             A neo4j session.
         """
         if self.session is None or renew:
-            sess = self.driver.session()
+            sess = self.new_session()
             self.session = sess
         return self.session
 
@@ -1397,6 +1781,349 @@ class Neo4jClient:
         return id_to_name
 
 
+class AsyncNeo4jClient:
+    """An asyncio client to communicate with an INDRA CogEx neo4j instance
+
+    Queries are run with the neo4j async driver so that independent queries
+    can be awaited concurrently, e.g., with :func:`asyncio.gather`. Since the
+    connections of an async driver are bound to an event loop, a driver is
+    created on first use in each event loop (e.g., the ones started with
+    :func:`asyncio.run` by the requests of a synchronous web app) and is
+    closed when the loop shuts down its async generators, which
+    :func:`asyncio.run` does before closing the loop.
+
+    Parameters
+    ----------
+    url :
+        The bolt URL to the neo4j instance to override INDRA_NEO4J_URL
+        set as an environment variable or set in the INDRA config file.
+    auth :
+        A tuple consisting of the user name and password for the neo4j instance to
+        override INDRA_NEO4J_USER and
+        INDRA_NEO4J_PASSWORD set as environment variables or set in the INDRA config file.
+    max_connection_pool_size :
+        The maximum number of connections in the connection pool, see
+        :class:`Neo4jClient`.
+    connection_acquisition_timeout :
+        The number of seconds to wait for a connection from the pool, see
+        :class:`Neo4jClient`.
+    fetch_size :
+        The number of records fetched from the server at a time by each
+        session, see :class:`Neo4jClient`.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        *,
+        max_connection_pool_size: Optional[int] = None,
+        connection_acquisition_timeout: Optional[float] = None,
+        fetch_size: Optional[int] = None,
+    ):
+        """Initialize the async Neo4j client."""
+        self._drivers = weakref.WeakKeyDictionary()
+        (
+            self.url,
+            self._auth,
+            self.max_connection_pool_size,
+            self.connection_acquisition_timeout,
+            self.fetch_size,
+        ) = _resolve_connection_config(
+            url,
+            auth,
+            max_connection_pool_size,
+            connection_acquisition_timeout,
+            fetch_size,
+        )
+
+    @property
+    def driver(self) -> neo4j.AsyncDriver:
+        """The driver of the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        driver, _ = self._drivers.get(loop, (None, None))
+        if driver is None:
+            driver = AsyncGraphDatabase.driver(
+                self.url,
+                auth=self._auth,
+                max_connection_lifetime=3 * 60,
+                max_connection_pool_size=self.max_connection_pool_size,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+            )
+            # The loop only keeps a weak reference to the closer, so it is
+            # kept with the driver
+            self._drivers[loop] = driver, self._start_closer(loop, driver)
+        return driver
+
+    def _start_closer(
+        self, loop: asyncio.AbstractEventLoop, driver: neo4j.AsyncDriver
+    ) -> AsyncIterator[None]:
+        # Running the async generator to its first yield registers it with
+        # the loop, which closes it when it shuts down its async generators
+        closer = self._close_on_shutdown(loop, driver)
+        try:
+            closer.asend(None).send(None)
+        except StopIteration:
+            pass
+        return closer
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, driver: neo4j.AsyncDriver
+    ) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            if self._drivers.get(loop, (None,))[0] is driver:
+                del self._drivers[loop]
+            await driver.close()
+
+    def new_session(self, **kwargs) -> neo4j.AsyncSession:
+        """Return a new async session with the configured fetch size.
+
+        Parameters
+        ----------
+        kwargs :
+            Session configuration passed to :meth:`neo4j.AsyncDriver.session`,
+            overriding the defaults.
+        """
+        kwargs.setdefault("fetch_size", self.fetch_size)
+        return self.driver.session(**kwargs)
+
+    async def close(self):
+        """Close the driver of the running event loop, if any."""
+        driver, closer = self._drivers.pop(
+            asyncio.get_running_loop(), (None, None)
+        )
+        if driver is not None:
+            await closer.aclose()
+
+    async def __aenter__(self) -> "AsyncNeo4jClient":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def ping(self) -> bool:
+        """Ping the neo4j instance.
+
+        Returns
+        -------
+        ping :
+            True if the ping was successful, otherwise False.
+        """
+        try:
+            res = await self.query_tx("CALL db.ping()")
+            if res:
+                return res[0][0]
+            else:
+                logger.warning("`CALL db.ping()` returned no results")
+                return False
+        except Exception as err:
+            logger.warning("Could not ping neo4j: %s", err, exc_info=True)
+            return False
+
+    async def query_dict(self, query: str, **query_params) -> Dict:
+        """Run a read-only query that generates a dictionary."""
+        return dict(await self.query_tx(query, **query_params))
+
+    async def query_tx(
+        self, query: str, squeeze: bool = False, **query_params
+    ) -> List[List[Any]]:
+        """Run a read-only query and return the results.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        squeeze :
+            If true, unpacks the 0-indexed element in each value returned.
+        query_params :
+            kwargs to pass to query
+
+        Returns
+        -------
+        values :
+            A list of results, see :meth:`Neo4jClient.query_tx`.
+        """
+        _, values = await self.query_tx_with_keys(query, **query_params)
+        if squeeze:
+            values = [value[0] for value in values]
+        return values
+
+    async def query_tx_with_keys(
+        self, query: str, **query_params
+    ) -> Tuple[List[str], List[List[Any]]]:
+        """Run a read-only query and return column names plus results.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        query_params :
+            kwargs to pass to query
+
+        Returns
+        -------
+        :
+            Tuple of column names and rows, see
+            :meth:`Neo4jClient.query_tx_with_keys`.
+        """
+        async with self.new_session() as session:
+            return await session.execute_read(
+                do_async_cypher_tx_with_keys, query, **query_params
+            )
+
+    async def query_iter(
+        self,
+        query: str,
+        squeeze: bool = False,
+        fetch_size: Optional[int] = None,
+        **query_params,
+    ) -> AsyncIterator[Any]:
+        """Run a read-only query and lazily yield the results.
+
+        This is the async counterpart of :meth:`Neo4jClient.query_iter` and
+        is consumed with ``async for``.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        squeeze :
+            If true, unpacks the 0-indexed element in each value returned.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        query_params :
+            kwargs to pass to query
+
+        Yields
+        ------
+        :
+            Each result as a list of one or more objects, or the first
+            object of each result if ``squeeze`` is true.
+        """
+        if fetch_size is None:
+            fetch_size = self.fetch_size
+        async with self.new_session(
+            default_access_mode=neo4j.READ_ACCESS, fetch_size=fetch_size
+        ) as session:
+            async with await session.begin_transaction() as tx:
+                result = await tx.run(query, parameters=query_params)
+                async for record in result:
+                    values = record.values()
+                    yield values[0] if squeeze else values
+
+    async def query_df(
+        self,
+        query: str,
+        fetch_size: Optional[int] = None,
+        dtypes: Optional[Mapping[str, Any]] = None,
+        **query_params,
+    ) -> pd.DataFrame:
+        """Run a read-only query and return the results as a data frame.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed, see :meth:`Neo4jClient.query_df`.
+        fetch_size :
+            The number of records pulled from the server at a time. Defaults
+            to the fetch size of the client.
+        dtypes :
+            An optional mapping from column names to data types the columns
+            are cast to.
+        query_params :
+            kwargs to pass to query
+
+        Returns
+        -------
+        :
+            A data frame with one row per record.
+        """
+        if fetch_size is None:
+            fetch_size = self.fetch_size
+        async with self.new_session(
+            default_access_mode=neo4j.READ_ACCESS, fetch_size=fetch_size
+        ) as session:
+            async with await session.begin_transaction() as tx:
+                result = await tx.run(query, parameters=query_params)
+                keys = list(await result.keys())
+                records = [record async for record in result]
+        df = _records_to_df(keys, records)
+        if dtypes:
+            df = df.astype(dtypes)
+        return df
+
+    async def query_nodes(self, query: str, **query_params) -> List[Node]:
+        """Run a read-only query for nodes.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed.
+        query_params :
+            Query parameters to pass to cypher
+
+        Returns
+        -------
+        values :
+            A list of :class:`Node` instances corresponding
+            to the results of the query
+        """
+        return [
+            Neo4jClient.neo4j_to_node(res)
+            for res in await self.query_tx(query, squeeze=True, **query_params)
+        ]
+
+    async def query_relations(self, query: str, **query_params) -> List[Relation]:
+        """Run a read-only query for relations.
+
+        Parameters
+        ----------
+        query :
+            The query string to be executed, see
+            :meth:`Neo4jClient.query_relations`.
+        query_params :
+            Query parameters to pass to query transaction function that will
+            fill out the placeholders in the cypher query
+
+        Returns
+        -------
+        values :
+            A list of :class:`Relation` instances corresponding
+            to the results of the query
+        """
+        return [
+            Neo4jClient.neo4j_to_relation(res)
+            for res in await self.query_tx(query, squeeze=True, **query_params)
+        ]
+
+
+def _records_to_df(keys: List[str], records: List[neo4j.Record]) -> pd.DataFrame:
+    """Build a data frame from records by transposing them into columns."""
+    if not records:
+        return pd.DataFrame(columns=keys)
+    # Records are tuples, so this transposes without copying any row
+    return pd.DataFrame(dict(zip(keys, zip(*records))), columns=keys)
+
+
+def _records_to_arrow(keys: List[str], records: List[neo4j.Record], schema=None):
+    """Build an Arrow table from records by transposing them into columns."""
+    import pyarrow as pa
+
+    columns = list(zip(*records)) if records else [()] * len(keys)
+    if schema is None:
+        return pa.Table.from_arrays([pa.array(column) for column in columns], names=keys)
+    return pa.Table.from_arrays(
+        [
+            pa.array(column, type=schema.field(key).type)
+            for key, column in zip(keys, columns)
+        ],
+        schema=schema,
+    )
+
+
 def process_identifier(identifier: str) -> Tuple[str, str]:
     """Process a neo4j-internal identifier string into an INDRA namespace and ID.
 
@@ -1425,9 +2152,51 @@ def process_identifier(identifier: str) -> Tuple[str, str]:
     return db_ns, db_id
 
 
+_shared_client: Optional[Neo4jClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> Neo4jClient:
+    """Return the process-wide client, creating it on first use.
+
+    The client is configured from the environment or the INDRA config file
+    (see :class:`Neo4jClient`) and its connection pool is reused by all
+    functions wrapped with :func:`autoclient` that aren't given a client.
+    After a fork, the client creates a new driver on first use. Its query
+    results are cached as configured by
+    :func:`indra_cogex.client.query_cache.get_query_cache_from_config`.
+
+    Returns
+    -------
+    :
+        The shared Neo4j client.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = Neo4jClient(
+                    query_cache=get_query_cache_from_config()
+                )
+    return _shared_client
+
+
+def _reset_shared_client_lock():
+    # The lock may have been held by another thread at the time of the fork
+    global _shared_client_lock
+    _shared_client_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_shared_client_lock)
+
+
 def autoclient(*, cache: bool = False, maxsize: Optional[int] = 128):
     """Wrap a function that takes a client for easier usage.
 
+    If the ``client`` argument isn't given, the shared client from
+    :func:`get_shared_client` is used, so repeated calls reuse the same
+    connection pool.
+
     Arguments
     ---------
     cache :
@@ -1491,13 +2260,9 @@ def autoclient(*, cache: bool = False, maxsize: Optional[int] = 128):
 
         @wraps(func)
         def _wrapped(*args, **kwargs):
-            client = kwargs.get("client")
-            if client is None:
-                kwargs["client"] = Neo4jClient()
-            rv = func(*args, **kwargs)
-            if client is None:
-                kwargs["client"].close_session()
-            return rv
+            if kwargs.get("client") is None:
+                kwargs["client"] = get_shared_client()
+            return func(*args, **kwargs)
 
         if cache:
             _wrapped = lru_cache(maxsize=maxsize)(_wrapped)
@@ -1507,6 +2272,108 @@ def autoclient(*, cache: bool = False, maxsize: Optional[int] = 128):
     return _decorator
 
 
+_shared_async_client: Optional[AsyncNeo4jClient] = None
+
+
+def get_shared_async_client() -> AsyncNeo4jClient:
+    """Return the process-wide async client, creating it on first use.
+
+    The client is configured like the one from :func:`get_shared_client` and
+    is used by all coroutine functions wrapped with :func:`async_autoclient`
+    that aren't given a client.
+
+    Returns
+    -------
+    :
+        The shared async Neo4j client.
+    """
+    global _shared_async_client
+    if _shared_async_client is None:
+        with _shared_client_lock:
+            if _shared_async_client is None:
+                _shared_async_client = AsyncNeo4jClient()
+    return _shared_async_client
+
+
+def async_autoclient():
+    """Wrap a coroutine function that takes an async client for easier usage.
+
+    This is the counterpart of :func:`autoclient` for coroutine functions
+    taking an :class:`AsyncNeo4jClient`. If the ``client`` argument isn't
+    given, the shared client from :func:`get_shared_async_client` is used.
+    Results can't be cached, since a coroutine can only be awaited once.
+
+    Returns
+    -------
+    :
+        A decorator object that will wrap the coroutine function
+
+    Examples
+    --------
+    .. code-block:: python
+
+        @async_autoclient()
+        async def get_node_count(*, client: AsyncNeo4jClient) -> int:
+            return (await client.query_tx("MATCH (n) RETURN count(*)"))[0][0]
+
+        count, pong = await asyncio.gather(get_node_count(), client.ping())
+    """
+
+    def _decorator(func):
+        if not inspect.iscoroutinefunction(func):
+            raise ValueError(
+                "the async_autoclient decorator can only be applied to a"
+                " coroutine function."
+            )
+        client_param = inspect.signature(func).parameters.get("client")
+        if client_param is None:
+            raise ValueError(
+                "the async_autoclient decorator can't be applied to a function"
+                " that doesn't take a neo4j client."
+            )
+        if client_param.kind != inspect.Parameter.KEYWORD_ONLY:
+            raise ValueError(
+                "the async_autoclient decorator can't be applied to a function"
+                " whose `client` argument isn't keyword-only"
+            )
+
+        @wraps(func)
+        async def _wrapped(*args, **kwargs):
+            if kwargs.get("client") is None:
+                kwargs["client"] = get_shared_async_client()
+            return await func(*args, **kwargs)
+
+        return _wrapped
+
+    return _decorator
+
+
+def run_coroutine(coroutine: Awaitable):
+    """Run a coroutine to completion from synchronous code.
+
+    This lets synchronous functions (e.g., the handlers of the web app)
+    await several independent queries concurrently. If an event loop is
+    already running in this thread (e.g., in a notebook), the coroutine is
+    run in a new event loop in a separate thread instead of failing.
+
+    Parameters
+    ----------
+    coroutine :
+        The coroutine to run.
+
+    Returns
+    -------
+    :
+        The result of the coroutine.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 # Follows example here:
 # https://neo4j.com/docs/api/python-driver/6.0/api.html#neo4j.unit_of_work
 @unit_of_work()
@@ -1530,3 +2397,14 @@ def do_cypher_tx_with_keys(
     result = tx.run(query, parameters=query_params)
     keys = list(result.keys())
     return keys, [record.values() for record in result]
+
+
+async def do_async_cypher_tx_with_keys(
+        tx: AsyncManagedTransaction,
+        query: str,
+        **query_params
+) -> Tuple[List[str], List[List]]:
+    """Variant of do_cypher_tx_with_keys for async transactions."""
+    result = await tx.run(query, parameters=query_params)
+    keys = list(await result.keys())
+    return keys, [record.values() async for record in result]
@@ -0,0 +1,507 @@
+"""A cache for the results of read-only Cypher queries.
+
+Results are cached by the normalized query and its parameters, along with the
+version of the graph build they were read from. The version comes from the
+``BuildInfo`` node written at import time by the sources CLI, so importing a
+new graph invalidates all previously cached results. Entries are kept in a
+bounded in-memory LRU and/or a shared on-disk SQLite tier, e.g., for all the
+workers of the web app.
+
+Results with many rows, or whose estimated size is larger than any tier, are
+returned without being pickled at all, so queries whose results can't be
+cached don't pay for serializing them.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, List, Mapping, Optional, Tuple, Union
+
+from indra.config import get_config
+
+__all__ = [
+    "QueryCache",
+    "QueryCacheBackend",
+    "MemoryCacheBackend",
+    "SqliteCacheBackend",
+    "get_query_cache_from_config",
+    "normalize_query",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The default maximum size in bytes of the in-memory cache of each process
+DEFAULT_MEMORY_CACHE_SIZE = 64 * 1024**2
+#: The default maximum size in bytes of the on-disk cache
+DEFAULT_DISK_CACHE_SIZE = 4 * 1024**3
+#: The default number of seconds the graph version is trusted before checking again
+DEFAULT_VERSION_TTL = 60.0
+#: The default maximum number of rows of a cached result
+DEFAULT_MAX_ROWS = 10_000
+#: The number of rows pickled to estimate the size of a result
+SIZE_SAMPLE_ROWS = 16
+
+#: Get the version stamp of the graph build, see indra_cogex.sources.cli
+GRAPH_VERSION_QUERY = """\
+MATCH (n:BuildInfo)
+RETURN n.version AS version
+ORDER BY version DESC
+LIMIT 1
+"""
+#: Identify the database store for graphs imported without a version stamp
+DATABASE_INFO_QUERY = """\
+CALL db.info() YIELD id, creationDate
+RETURN id + "@" + toString(creationDate) AS version
+"""
+
+_QUERY_TOKEN_RE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+"""
+)
+
+#: A cached query result, i.e., the column names and the rows
+Result = Tuple[List[str], List[List[Any]]]
+
+
+def normalize_query(query: str) -> str:
+    """Collapse the whitespace of a Cypher query outside of string literals.
+
+    Parameters
+    ----------
+    query :
+        A Cypher query.
+
+    Returns
+    -------
+    :
+        The query with each run of whitespace replaced by a single space,
+        so differently indented versions of a query share their cache entry.
+    """
+    return _QUERY_TOKEN_RE.sub(lambda match: match.group(1) or " ", query).strip()
+
+
+def _canonicalize(value):
+    if isinstance(value, Mapping):
+        return {str(key): _canonicalize(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Tuples are sent to neo4j as lists
+        return [_canonicalize(val) for val in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonicalize(val) for val in value), key=repr)
+    return value
+
+
+def get_cache_key(version: str, query: str, query_params: Mapping[str, Any]) -> str:
+    """Return the cache key of a query in a given version of the graph.
+
+    Parameters
+    ----------
+    version :
+        The version stamp of the graph.
+    query :
+        A Cypher query.
+    query_params :
+        The parameters of the query.
+
+    Returns
+    -------
+    :
+        A hex digest of the version, the normalized query and the parameters.
+    """
+    params = json.dumps(
+        _canonicalize(query_params), sort_keys=True, default=repr, ensure_ascii=False
+    )
+    digest = hashlib.sha256()
+    for part in (version, normalize_query(query), params):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class QueryCacheBackend(ABC):
+    """A storage tier for pickled query results."""
+
+    #: The maximum total size in bytes of the pickled results
+    max_size: int
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the pickled result stored under the key, if any."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, version: str):
+        """Store a pickled result read from the given version of the graph."""
+
+    @abstractmethod
+    def discard_stale(self, version: str):
+        """Remove the results that weren't read from the given version."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all results."""
+
+
+class MemoryCacheBackend(QueryCacheBackend):
+    """An in-memory LRU cache bounded by the total size of its results.
+
+    Parameters
+    ----------
+    max_size :
+        The maximum total size in bytes of the pickled results. The least
+        recently used results are evicted to stay under this size, and
+        results larger than it aren't stored.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MEMORY_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, version: str):
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._entries[key] = (value, version)
+            self.size += len(value)
+            while self.size > self.max_size:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def discard_stale(self, version: str):
+        with self._lock:
+            for key in [
+                key for key, (_, entry_version) in self._entries.items()
+                if entry_version != version
+            ]:
+                value, _ = self._entries.pop(key)
+                self.size -= len(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class SqliteCacheBackend(QueryCacheBackend):
+    """An on-disk LRU cache in a SQLite database.
+
+    The database can be shared by several processes, e.g., the workers of
+    the web app, so a result only needs to be queried once per graph build.
+
+    Parameters
+    ----------
+    path :
+        The path to the SQLite database, created if it doesn't exist.
+    max_size :
+        The maximum total size in bytes of the pickled results. The least
+        recently used results are evicted to stay under this size.
+    """
+
+    def __init__(self, path: Union[str, Path], max_size: int = DEFAULT_DISK_CACHE_SIZE):
+        self.path = Path(path)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, "
+                "version TEXT, accessed REAL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+            )
+            self.conn.commit()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection, opened on first use in each process."""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: bytes, version: str):
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), version, time.time()),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        (size,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if size <= self.max_size:
+            return
+        # Delete the least recently used results that add up to the excess
+        self.conn.execute(
+            """\
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed, key ROWS UNBOUNDED PRECEDING
+                    ) - size AS preceding
+                    FROM results
+                ) WHERE preceding < ?
+            )
+            """,
+            (size - self.max_size,),
+        )
+
+    def discard_stale(self, version: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM results WHERE version != ?", (version,))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM results")
+            self.conn.commit()
+
+
+class QueryCache:
+    """A cache of read-only query results keyed by the graph version.
+
+    The backends are looked up in order, and a result found in a later
+    (e.g., on-disk) backend is added to the earlier ones. Results are
+    stored pickled, so each hit returns a fresh copy.
+
+    Parameters
+    ----------
+    backends :
+        The storage tiers, fastest first. Defaults to a single in-memory
+        tier.
+    version_ttl :
+        The number of seconds the version of the graph is trusted before it
+        is looked up again. Results cached for an older graph are discarded
+        once a new version is seen.
+    max_rows :
+        The maximum number of rows of a cached result. Larger results aren't
+        cached. If None, only the estimated size of results is checked.
+    """
+
+    def __init__(
+        self,
+        backends: Optional[List[QueryCacheBackend]] = None,
+        version_ttl: float = DEFAULT_VERSION_TTL,
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    ):
+        self.backends = backends if backends is not None else [MemoryCacheBackend()]
+        self.version_ttl = version_ttl
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self._lock = threading.Lock()
+
+    def get_version(self, run_query: Callable[[str], Result]) -> Optional[str]:
+        """Return the version stamp of the graph, checking it if it's expired.
+
+        Parameters
+        ----------
+        run_query :
+            A function that runs an uncached read-only query.
+
+        Returns
+        -------
+        :
+            The version of the graph, or None if it couldn't be looked up.
+        """
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked < self.version_ttl:
+            return self._version
+        with self._lock:
+            if self._version is not None and now - self._version_checked < self.version_ttl:
+                return self._version
+            try:
+                version = _lookup_version(run_query)
+            except Exception as err:
+                logger.warning("Could not look up the graph version: %s", err)
+                return None
+            if version != self._version:
+                if self._version is not None:
+                    logger.info(
+                        "Graph version changed from %s to %s, discarding cached results",
+                        self._version,
+                        version,
+                    )
+                for backend in self.backends:
+                    backend.discard_stale(version)
+                self._version = version
+            self._version_checked = now
+            return version
+
+    def get_or_run(
+        self,
+        query: str,
+        query_params: Mapping[str, Any],
+        run_query: Callable[..., Result],
+    ) -> Result:
+        """Return the cached result of a query or run it and cache it.
+
+        Parameters
+        ----------
+        query :
+            The Cypher query.
+        query_params :
+            The parameters of the query.
+        run_query :
+            A function that runs an uncached read-only query and returns its
+            column names and rows, called like ``run_query(query, **params)``.
+
+        Returns
+        -------
+        :
+            The column names and rows of the result.
+        """
+        version = self.get_version(run_query)
+        if version is None:
+            return run_query(query, **query_params)
+        key = get_cache_key(version, query, query_params)
+        for i, backend in enumerate(self.backends):
+            value = backend.get(key)
+            if value is not None:
+                self.hits += 1
+                for faster_backend in self.backends[:i]:
+                    faster_backend.set(key, value, version)
+                return pickle.loads(value)
+        self.misses += 1
+        result = run_query(query, **query_params)
+        if not self._may_fit(result):
+            return result
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        for backend in self.backends:
+            backend.set(key, value, version)
+        return result
+
+    def _may_fit(self, result: Result) -> bool:
+        # Check the number of rows and the size of the pickled result,
+        # estimated from a sample of its rows, before pickling all of it
+        _, rows = result
+        if self.max_rows is not None and len(rows) > self.max_rows:
+            return False
+        if len(rows) <= SIZE_SAMPLE_ROWS:
+            return True
+        step = len(rows) // SIZE_SAMPLE_ROWS
+        sample = rows[::step][:SIZE_SAMPLE_ROWS]
+        row_size = len(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL))
+        estimate = row_size * len(rows) // len(sample)
+        return estimate <= max(backend.max_size for backend in self.backends)
+
+    def clear(self):
+        """Remove all cached results from all backends."""
+        for backend in self.backends:
+            backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _lookup_version(run_query: Callable[[str], Result]) -> str:
+    _, rows = run_query(GRAPH_VERSION_QUERY)
+    if rows and rows[0][0]:
+        return rows[0][0]
+    # Graphs imported without a version stamp are identified by their store
+    _, rows = run_query(DATABASE_INFO_QUERY)
+    return rows[0][0]
+
+
+def _get_size_config(key: str, default: int) -> int:
+    value = get_config(key)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def get_query_cache_from_config() -> Optional[QueryCache]:
+    """Return a query cache configured from the environment or INDRA config.
+
+    The following keys are used:
+
+    - ``INDRA_NEO4J_QUERY_CACHE_SIZE``: the maximum size in bytes of the
+      in-memory tier of each process. No in-memory tier is used if it isn't
+      set, since each worker of a multi-worker deployment would keep its own
+      copy. 64 MiB is a reasonable size for a single process.
+    - ``INDRA_NEO4J_QUERY_CACHE_PATH``: the path to a SQLite database used
+      as an on-disk tier, which the workers share. No on-disk tier is used
+      if it isn't set.
+    - ``INDRA_NEO4J_QUERY_CACHE_DISK_SIZE``: the maximum size in bytes of
+      the on-disk tier. Defaults to 4 GiB.
+    - ``INDRA_NEO4J_QUERY_CACHE_VERSION_TTL``: the number of seconds the
+      graph version is trusted before checking it again. Defaults to 60.
+    - ``INDRA_NEO4J_QUERY_CACHE_MAX_ROWS``: the maximum number of rows of a
+      cached result. Defaults to 10,000.
+
+    Returns
+    -------
+    :
+        The query cache, or None if neither tier is configured.
+    """
+    backends: List[QueryCacheBackend] = []
+    memory_size = _get_size_config("INDRA_NEO4J_QUERY_CACHE_SIZE", 0)
+    if memory_size > 0:
+        backends.append(MemoryCacheBackend(memory_size))
+    path = get_config("INDRA_NEO4J_QUERY_CACHE_PATH")
+    if path:
+        backends.append(
+            SqliteCacheBackend(
+                path,
+                _get_size_config(
+                    "INDRA_NEO4J_QUERY_CACHE_DISK_SIZE", DEFAULT_DISK_CACHE_SIZE
+                ),
+            )
+        )
+    if not backends:
+        return None
+    version_ttl = get_config("INDRA_NEO4J_QUERY_CACHE_VERSION_TTL")
+    return QueryCache(
+        backends,
+        version_ttl=float(version_ttl) if version_ttl else DEFAULT_VERSION_TTL,
+        max_rows=_get_size_config("INDRA_NEO4J_QUERY_CACHE_MAX_ROWS", DEFAULT_MAX_ROWS),
+    )
@@ -2,14 +2,16 @@
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Tuple, Union
 
 import pandas as pd
 from tqdm import tqdm
 
 from indra_cogex.sources.indra_db import DbProcessor
 from indra_cogex.sources.depmap import DepmapProcessor
+from indra_cogex.sources.gzip_io import open_gzip
 from indra_cogex.client import Neo4jClient
+from indra_cogex.client.neo4j_client import process_identifier
 from indra_cogex.util import load_stmt_json_str
 
 STMTS_EDGE_FILE = DbProcessor.edges_path
@@ -19,6 +21,31 @@ ASSEMBLED_NODES_FILE = Z_SCORE_FILE.parents[1] / "assembled" / "nodes_BioEntity.
 
 logger = logging.getLogger(__name__)
 
+SIF_COLUMNS = [
+    "agA_ns",
+    "agA_id",
+    "agA_name",
+    "agB_ns",
+    "agB_id",
+    "agB_name",
+    "stmt_type",
+    "evidence_count",
+    "stmt_hash",
+    "residue",
+    "position",
+    "source_counts",
+    "belief",
+]
+Z_SCORE_COLUMNS = [
+    "agA_ns",
+    "agA_id",
+    "agA_name",
+    "agB_ns",
+    "agB_id",
+    "agB_name",
+    "logp",
+]
+
 
 def sif_with_logp(
     method: Literal["ingestion_files", "graph"] = "ingestion_files",
@@ -56,8 +83,10 @@ def sif_with_logp_ingestion_files(
     if not Path(assembled_nodes_file).exists():
         raise FileNotFoundError(f"Assembled nodes file not found: {assembled_nodes_file}")
 
-    stmts_edges_df = pd.read_csv(stmts_edge_file, sep="\t")
-    z_score_df = pd.read_csv(z_score_file, sep="\t")
+    with open_gzip(stmts_edge_file, "rt") as fh:
+        stmts_edges_df = pd.read_csv(fh, sep="\t")
+    with open_gzip(z_score_file, "rt") as fh:
+        z_score_df = pd.read_csv(fh, sep="\t")
 
     # For each row, get residue and position from the stmt_json column
     def extract_residue_position(stmt_json_str):
@@ -130,9 +159,8 @@ def sif_with_logp_ingestion_files(
 
     # Get names for agA and agB from the assembled nodes_BioEntity.tsv.gz file
     # Only get the id:ID and name columns
-    assembled_nodes_df = pd.read_csv(
-        assembled_nodes_file, sep="\t", compression="gzip", usecols=["id:ID", "name"]
-    )
+    with open_gzip(assembled_nodes_file, "rt") as fh:
+        assembled_nodes_df = pd.read_csv(fh, sep="\t", usecols=["id:ID", "name"])
     assembled_nodes_df.drop_duplicates(inplace=True)
 
     # Use the curie from the id:ID column of assembled_nodes_df to map
@@ -151,6 +179,24 @@ def sif_with_logp_ingestion_files(
     return merged_df
 
 
+def _get_residue_position(stmt_json_str: str) -> Tuple[Optional[str], Optional[int]]:
+    stmt_json = load_stmt_json_str(stmt_json_str)
+    position = stmt_json.get("position")
+    position = int(position) if position is not None else None
+    return stmt_json.get("residue"), position
+
+
+def _split_agent_curies(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the source and target CURIE columns by namespace and ID columns."""
+    for curie_column, prefix in [("source_curie", "agA"), ("target_curie", "agB")]:
+        curies = df.pop(curie_column)
+        # Many relations share agents, so each CURIE is only processed once
+        processed = {curie: process_identifier(curie) for curie in curies.unique()}
+        df[f"{prefix}_ns"] = curies.map(lambda curie: processed[curie][0])
+        df[f"{prefix}_id"] = curies.map(lambda curie: processed[curie][1])
+    return df
+
+
 def sif_with_logp_graph(
     client: Neo4jClient,
     limit: Optional[int] = None,
@@ -168,9 +214,9 @@ def sif_with_logp_graph(
         indra_rel and codependent_with relations. Use to test on a
         smaller subset of the data.
     batch_size :
-        The number of relations to fetch in each batch.
-        Defaults to 10,000. If the limit is set, this will be adjusted to the
-        limit.
+        The number of relations converted into a dataframe at a time while
+        the results are streamed as columns. Defaults to 10,000. If the
+        limit is set, this will be adjusted to the limit.
     Returns
     -------
     :
@@ -207,83 +253,45 @@ def sif_with_logp_graph(
         total_rels = limit
 
     indra_rel_query = """\
-    MATCH p=(source:BioEntity)-[rel:indra_rel]->(target:BioEntity)
-    RETURN DISTINCT p
-    SKIP $skip
-    LIMIT $limit
+    MATCH (source:BioEntity)-[rel:indra_rel]->(target:BioEntity)
+    RETURN
+        source.id AS source_curie,
+        source.name AS agA_name,
+        target.id AS target_curie,
+        target.name AS agB_name,
+        rel.stmt_type AS stmt_type,
+        rel.evidence_count AS evidence_count,
+        rel.stmt_hash AS stmt_hash,
+        rel.stmt_json AS stmt_json,
+        rel.source_counts AS source_counts,
+        rel.belief AS belief
     """
+    if limit is not None:
+        indra_rel_query += f"LIMIT {limit}\n"
 
-    # Batched retrieval of statement relations
+    # Stream the statement relations as columns, keeping only the current
+    # batch of statement JSONs in memory
     logger.info("Getting indra_rel relations")
-    stmt_rows = []
-    offset = 0
-    remaining = limit
+    stmt_dfs = []
     with tqdm(
         total=total_rels,
         desc="Creating indra_rel dataframe",
         unit="relation",
         unit_scale=True,
     ) as pbar:
-        while True:
-            current_limit = batch_size if remaining is None else min(batch_size, remaining)
-            results = client.query_relations(
-                indra_rel_query,
-                skip=offset,
-                limit=current_limit
+        for df in client.query_df_batches(indra_rel_query, batch_size=batch_size):
+            residues_positions = [
+                _get_residue_position(stmt_json) for stmt_json in df.pop("stmt_json")
+            ]
+            df["residue"] = [residue for residue, _ in residues_positions]
+            df["position"] = pd.array(
+                [position for _, position in residues_positions], dtype="Int64"
             )
-            if not results:
-                break
-            for rel in results:
-                stmt_json = load_stmt_json_str(rel.data["stmt_json"])
-                position = stmt_json.get("position")
-                position = int(position) if position is not None else None
-                stmt_rows.append(
-                    (
-                        rel.source_ns,
-                        rel.source_id,
-                        rel.source_name,
-                        rel.target_ns,
-                        rel.target_id,
-                        rel.target_name,
-                        rel.data["stmt_type"],
-                        rel.data["evidence_count"],  # int
-                        rel.data["stmt_hash"],  # int
-                        stmt_json.get("residue"),
-                        position,  # int or None
-                        rel.data["source_counts"],
-                        rel.data["belief"],  # float
-                    )
-                )
-            # Update progress bar and offset
-            new_rels = len(results)
-            offset += new_rels
-            pbar.update(new_rels)
-            if remaining is not None:
-                remaining -= new_rels
-                if remaining <= 0:
-                    break
-            # If we got fewer results than requested, we are done
-            if new_rels < current_limit:
-                break
+            stmt_dfs.append(_split_agent_curies(df)[SIF_COLUMNS])
+            pbar.update(len(df))
 
     # Create the dataframe
-    sif_df = pd.DataFrame(
-        stmt_rows, columns=[
-            "agA_ns",
-            "agA_id",
-            "agA_name",
-            "agB_ns",
-            "agB_id",
-            "agB_name",
-            "stmt_type",
-            "evidence_count",
-            "stmt_hash",
-            "residue",
-            "position",
-            "source_counts",
-            "belief",
-        ]
-    ).astype(
+    sif_df = pd.concat(stmt_dfs, ignore_index=True).astype(
         {
             "position": "Int64",  # nullable int
             "evidence_count": "int64",  # int
@@ -305,67 +313,30 @@ def sif_with_logp_graph(
 
     # Then get all the codependent_with relations
     z_score_query = """\
-    MATCH p=(source:BioEntity)-[rel:codependent_with]->(target:BioEntity)
-    RETURN DISTINCT p
-    SKIP $skip
-    LIMIT $limit
+    MATCH (source:BioEntity)-[rel:codependent_with]->(target:BioEntity)
+    RETURN
+        source.id AS source_curie,
+        source.name AS agA_name,
+        target.id AS target_curie,
+        target.name AS agB_name,
+        rel.logp AS logp
     """
+    if limit is not None:
+        z_score_query += f"LIMIT {limit}\n"
     logger.info("Getting codependent_with relations")
-    z_score_rows = []
-    offset = 0
-    remaining = limit
+    z_score_dfs = []
     with tqdm(
         total=total_z,
         desc="codependent_with batches",
         unit="relation",
         unit_scale=True,
     ) as pbar:
-        while True:
-            current_limit = batch_size if remaining is None else min(batch_size, remaining)
-            results = client.query_relations(
-                z_score_query,
-                skip=offset,
-                limit=current_limit
-            )
-            if not results:
-                break
-            for rel in results:
-                z_score_rows.append(
-                    (
-                        rel.source_ns,
-                        rel.source_id,
-                        rel.source_name,
-                        rel.target_ns,
-                        rel.target_id,
-                        rel.target_name,
-                        rel.data["logp"],
-                    )
-                )
-            # Update progress bar and offset
-            new_rels = len(results)
-            offset += new_rels
-            pbar.update(new_rels)
-            if remaining is not None:
-                remaining -= new_rels
-                if remaining <= 0:
-                    break
-            # If we got fewer results than requested, we are done
-            if new_rels < current_limit:
-                break
+        for df in client.query_df_batches(z_score_query, batch_size=batch_size):
+            z_score_dfs.append(_split_agent_curies(df)[Z_SCORE_COLUMNS])
+            pbar.update(len(df))
 
     # Create the dataframe
-    z_score_df = pd.DataFrame(
-        z_score_rows,
-        columns=[
-            "agA_ns",
-            "agA_id",
-            "agA_name",
-            "agB_ns",
-            "agB_id",
-            "agB_name",
-            "logp",
-        ],
-    ).astype(
+    z_score_df = pd.concat(z_score_dfs, ignore_index=True).astype(
         {
             "logp": "float64",  # float
         }
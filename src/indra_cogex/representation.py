@@ -32,6 +32,8 @@ from indra.ontology.standardize import standardize_name_db_refs
 from indra.statements.agent import get_grounding
 from indra.statements import stmts_from_json, Statement
 
+from indra_cogex.util import json_loads
+
 NodeJson = Dict[str, Union[Collection[str], Dict[str, Any]]]
 RelJson = Dict[str, Union[Mapping[str, Any], Dict]]
 
@@ -481,7 +483,7 @@ class StatementJSONDecodeError(Exception):
 
 def load_statement_json(json_str: str, attempt: int = 1, max_attempts: int = 5) -> json:
     try:
-        return json.loads(json_str)
+        return json_loads(json_str)
     except json.JSONDecodeError:
         if attempt < max_attempts:
             json_str = codecs.escape_decode(json_str)[0].decode()
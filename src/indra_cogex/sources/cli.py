@@ -2,36 +2,150 @@
 
 """Run the sources CLI."""
 
+import csv
 import json
-import pickle
 import os
 from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from textwrap import dedent
-from typing import Iterable, Optional, TextIO, Type
+from typing import Any, Iterable, List, Mapping, Optional, TextIO, Tuple, Type
 
 import click
 from more_click import verbose_option
-from tqdm import tqdm
 
-from indra_cogex.sources.processor_util import (
-    check_duplicated_nodes,
-    check_missing_node_ids_in_edges
-)
-from . import processor_resolver
+from . import ingestion_check, processor_resolver
+from .gzip_io import open_gzip
+from .manifest import Manifest, diff_manifests, get_stale_reasons
 from .processor import Processor
-from ..assembly import NodeAssembler, get_assembled_path
+from .scheduler import Outcome, Task, run_tasks
+from ..assembly import (
+    Conflict,
+    StreamingNodeAssembler,
+    get_assembled_path,
+    iter_nodes_from_path,
+)
+from ..info import get_git_hash
+
+#: The label of the node stamping the version of the graph build
+BUILD_INFO_LABEL = "BuildInfo"
 
 
 def _iter_processors() -> Iterable[Type[Processor]]:
     return iter(processor_resolver)
 
 
+def _run_processor(
+    processor_cls: Type[Processor],
+    kwargs: Mapping[str, Any],
+    dependency_manifest_paths: Optional[Mapping[str, Path]] = None,
+):
+    click.secho(f"Processing {processor_cls.name}...", fg="green")
+    processor = processor_cls(**kwargs)
+    # Dump the nodes and edges for processor
+    processor.dump()
+    # Record what the outputs were built from, the processors this one
+    # depends on have finished by now
+    processor_cls.write_manifest(
+        kwargs,
+        dependency_manifest_paths,
+        validation_reports=processor.validation_reports,
+    )
+
+
+def _get_dependency_manifest_paths(
+    processor_cls: Type[Processor], processor_classes: Mapping[str, Type[Processor]]
+) -> dict[str, Path]:
+    return {
+        name: processor_classes[name].manifest_path
+        for name in processor_cls.depends_on
+        if name in processor_classes
+    }
+
+
+def _is_assembly_stale(assembled_path: Path, node_paths: Iterable[Path]) -> bool:
+    # The assembled nodes are outdated if any processor contributing to them
+    # was rebuilt after they were assembled
+    assembled_mtime = assembled_path.stat().st_mtime
+    return any(
+        path.exists() and path.stat().st_mtime > assembled_mtime
+        for path in node_paths
+    )
+
+
+def _get_ingestion_changes(
+    previous_path: Path, manifests: Mapping[str, Optional[Manifest]]
+) -> dict[str, list[str]]:
+    # Compare the processor manifests with the ones of the previous build
+    if not previous_path.exists():
+        return {}
+    with open(previous_path) as fh:
+        previous = json.load(fh).get("processors", {})
+    changes = {}
+    for name in sorted(previous.keys() | manifests.keys()):
+        if name not in manifests:
+            changes[name] = ["removed"]
+        elif name not in previous:
+            changes[name] = ["added"]
+        elif manifests[name] is None or previous[name] is None:
+            changes[name] = ["no manifest"]
+        else:
+            reasons = diff_manifests(
+                Manifest.from_json(previous[name]), manifests[name]
+            )
+            if reasons:
+                changes[name] = reasons
+    return changes
+
+
+def _resolve_assembly_args(
+    sources: List[Tuple[str, Path]],
+    assembled_path: Path,
+    label: str,
+    outcomes: Mapping[str, Outcome],
+):
+    # Leave out the nodes of the processors that failed
+    node_paths = [
+        path for name, path in sources if name not in outcomes or outcomes[name].ok
+    ]
+    return node_paths, assembled_path, label
+
+
+def _assemble_nodes(node_paths: List[Path], assembled_path: Path, label: str):
+    if not node_paths:
+        click.secho(f"No nodes to assemble for {label}", fg="red")
+        return
+    click.secho(f"Assembling {label}", fg="green")
+    assemble_type(node_paths, assembled_path, label, force_assemble=True)
+
+
+def _dump_build_info() -> Path:
+    """Dump the node that stamps the version of the graph build.
+
+    The version is the UTC time of the build, so later builds sort after
+    earlier ones. Cached query results are keyed by this version (see
+    :mod:`indra_cogex.client.query_cache`), so importing a new graph
+    invalidates them.
+    """
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    build_info_path = get_assembled_path(BUILD_INFO_LABEL)
+    with open_gzip(build_info_path, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow(["id:ID", ":LABEL", "version", "git_hash"])
+        writer.writerow(
+            [f"indra_build:{version}", BUILD_INFO_LABEL, version, get_git_hash()]
+        )
+    return build_info_path
+
+
 @click.command()
 @click.option(
     "--process",
     is_flag=True,
-    help="If true, builds all missing resources.",
+    help="If true, builds all missing resources and rebuilds the ones whose inputs, "
+         "code, configuration or dependencies changed since they were built.",
 )
 @click.option(
     "--force-process",
@@ -41,7 +155,8 @@ def _iter_processors() -> Iterable[Type[Processor]]:
 @click.option(
     "--assemble",
     is_flag=True,
-    help="If true, assembles all (not yet assembled) nodes.",
+    help="If true, assembles all nodes that are not yet assembled or whose "
+         "processors were rebuilt since.",
 )
 @click.option(
     "--force-assemble",
@@ -79,13 +194,14 @@ def _iter_processors() -> Iterable[Type[Processor]]:
     "--check-ingestion-files",
     is_flag=True,
     help="If true, checks the ingestion data files for duplicated entries in node files "
-         "and missing entries in edge files.",
+         "and missing entries in edge files, and lists all problems found.",
 )
 @click.option(
     "--ingestion-manifest",
     type=click.Path(exists=False, path_type=Path),
     help="Path to a manifest file that will listing all node and edge files "
-         "that where imported."
+         "that where imported, the manifests of the processors and what changed "
+         "since the previous build with the same manifest file."
 )
 @click.option(
     "--database-name",
@@ -95,6 +211,22 @@ def _iter_processors() -> Iterable[Type[Processor]]:
          "database must already exist in the Neo4j instance. It is *not* created at "
          "import.",
 )
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="The number of processors and node assemblies to run in parallel, each in "
+         "its own process. Processors declare the processors they depend on, the "
+         "others run independently. Also the number of processes checking the "
+         "ingestion files.",
+)
+@click.option(
+    "--memory-budget",
+    type=float,
+    help="The total memory in GB the tasks running in parallel may use, based on "
+         "the estimates declared by the processors. No limit by default.",
+)
 @verbose_option
 def main(
     process: bool,
@@ -109,6 +241,8 @@ def main(
     check_ingestion_files: bool,
     ingestion_manifest: Optional[Path],
     database_name: str,
+    workers: int,
+    memory_budget: Optional[float],
 ):
     """Generate and import Neo4j nodes and edges tables."""
     # Check which nodes labels need to be assembled (i.e. have multiple
@@ -129,8 +263,19 @@ def main(
     # Paths to files with preprocessed nodes (e.g. assembled nodes or nodes that don't need to be assembled)
     nodes_paths_for_import = []
     config = {} if config is None else json.load(config)
+    all_processor_classes = {
+        processor_cls.name: processor_cls
+        for processor_cls in _iter_processors()
+        if processor_cls.importable
+    }
     edge_paths = []
-    node_assemblers = {}
+    # The processors to run and the node assemblies are scheduled as tasks
+    # that start as soon as the tasks they depend on have finished
+    tasks = {}
+    processor_classes = {}
+    processor_import_paths_by_name = {}
+    # The processors whose INDRA node files can be assembled by label
+    assembly_sources = defaultdict(list)
     for processor_cls in _iter_processors():
         if not processor_cls.importable:
             continue
@@ -146,7 +291,7 @@ def main(
                 _,
             ) = processor_cls._get_node_paths(node_type)
             if node_type in to_assemble:
-                # Store the INDRA nodes pickle path for assembly
+                # Store the INDRA node file path for assembly
                 processor_to_assemble_paths[node_type] = nodes_indra_path
             else:
                 # These will be imported directly
@@ -159,6 +304,8 @@ def main(
         if not processor_cls.edges_path.exists():
             processed = False
         edge_paths.append(processor_cls.edges_path)
+        processor_classes[processor_cls.name] = processor_cls
+        processor_import_paths_by_name[processor_cls.name] = processor_import_paths
         click.secho(
             f"Identified node paths for assembly: {[str(p) for p in processor_to_assemble_paths.values()]}",
             fg="blue",
@@ -168,60 +315,129 @@ def main(
             fg="blue",
         )
         # Run the processor if needed
-        if force_process or (process and not processed):
-            try:
-                processor = processor_cls(**config.get(processor_cls.name, {}))
-            except FileNotFoundError as e:
-                if not skip_failed_processors:
-                    raise
+        dependency_manifest_paths = _get_dependency_manifest_paths(
+            processor_cls, all_processor_classes
+        )
+        stale_reasons = []
+        if process and processed and not force_process:
+            stale_reasons = get_stale_reasons(
+                processor_cls,
+                config.get(processor_cls.name, {}),
+                dependency_manifest_paths,
+            )
+            if stale_reasons:
                 click.secho(
-                    f"Failed: {e}, skipping corresponding nodes and relations from further processing and import",
-                    fg="red",
+                    f"Outputs of {processor_cls.name} are outdated: "
+                    f"{'; '.join(stale_reasons)}",
+                    fg="yellow",
                 )
-                # Remove this processor's paths from the list of nodes/edges to import
-                for path in processor_import_paths:
-                    nodes_paths_for_import.remove(path)
-                edge_paths.pop()
-                continue
-            click.secho("Processing...", fg="green")
-            # First dump the nodes and edges for processor
-            _, nodes_by_type, _ = processor.dump()
-            # Add nodes to assembly if needed
-            for node_type, nodes in nodes_by_type.items():
-                if node_type in to_assemble:
-                    assembled_path = get_assembled_path(node_type)
-                    if force_assemble or (assemble and not assembled_path.exists()):
-                        # Instantiate the assembler or add nodes to existing assembler
-                        if node_type not in node_assemblers:
-                            node_assemblers[node_type] = NodeAssembler()
-                        node_assemblers[node_type].add_nodes(nodes)
-        elif processed:  # force_process=False, process=True/False
-            # If we don't need to assemble, we'll just skip this
-            for node_type, nodes_indra_path in processor_to_assemble_paths.items():
-                assembled_path = get_assembled_path(node_type)
-                if force_assemble or (assemble and not assembled_path.exists()):
-                    # Instantiate the assembler or add nodes to existing assembler
-                    if node_type not in node_assemblers:
-                        node_assemblers[node_type] = NodeAssembler()
-                    click.secho(
-                        f"Loading cached nodes from {nodes_indra_path}",
-                        fg="green",
-                    )
-                    with open(nodes_indra_path, "rb") as fh:
-                        nodes = pickle.load(fh)
-                    node_assemblers[node_type].add_nodes(nodes)
-
-    # Assemble nodes if we got any node assemblers above
-    for node_type, assembler in node_assemblers.items():
+        if force_process or (process and not processed) or stale_reasons:
+            tasks[processor_cls.name] = Task(
+                _run_processor,
+                (
+                    processor_cls,
+                    config.get(processor_cls.name, {}),
+                    dependency_manifest_paths,
+                ),
+                memory=processor_cls.memory,
+            )
+        elif not processed:
+            continue
+        for node_type, nodes_indra_path in processor_to_assemble_paths.items():
+            assembly_sources[node_type].append((processor_cls.name, nodes_indra_path))
+
+    # Processors are rebuilt if a processor they depend on is rebuilt
+    if process:
+        rebuilt = True
+        while rebuilt:
+            rebuilt = False
+            for name, processor_cls in processor_classes.items():
+                if name in tasks or not any(
+                    dependency in tasks for dependency in processor_cls.depends_on
+                ):
+                    continue
+                click.secho(
+                    f"Outputs of {name} are outdated: a dependency is rebuilt",
+                    fg="yellow",
+                )
+                tasks[name] = Task(
+                    _run_processor,
+                    (
+                        processor_cls,
+                        config.get(name, {}),
+                        _get_dependency_manifest_paths(
+                            processor_cls, all_processor_classes
+                        ),
+                    ),
+                    memory=processor_cls.memory,
+                )
+                rebuilt = True
+
+    # Processors only wait for the processors they depend on that are run
+    for name, task in tasks.items():
+        task.dependencies = [
+            dependency
+            for dependency in processor_classes[name].depends_on
+            if dependency in tasks
+        ]
+
+    # Assemble each label as soon as all processors contributing to it have
+    # finished, leaving out the ones that failed
+    for node_type, sources in assembly_sources.items():
         assembled_path = get_assembled_path(node_type)
-        click.secho(f"Assembling {node_type}", fg="green")
-        assembled_nodes = assembler.assemble_nodes()
-        assembled_nodes = sorted(assembled_nodes, key=lambda x: (x.db_ns, x.db_id))
-        Processor._dump_nodes_to_path_static(
-            "assembled nodes",
-            assembled_nodes,
-            assembled_path,
-            allowed_labels=[node_type],
+        # Only the labels with nodes from processors that are or were rebuilt
+        # since they were assembled are assembled again
+        if not (
+            force_assemble
+            or (
+                assemble
+                and (
+                    not assembled_path.exists()
+                    or any(name in tasks for name, _ in sources)
+                    or _is_assembly_stale(assembled_path, [p for _, p in sources])
+                )
+            )
+        ):
+            continue
+        tasks[f"assemble_{node_type}"] = Task(
+            _assemble_nodes,
+            dependencies=[name for name, _ in sources if name in tasks],
+            memory=sum(processor_classes[name].memory for name, _ in sources),
+            require_dependencies=False,
+            resolve_args=partial(
+                _resolve_assembly_args, sources, assembled_path, node_type
+            ),
+        )
+
+    def _on_error(name: str, error: BaseException) -> bool:
+        if (
+            name not in processor_classes
+            or not skip_failed_processors
+            or not isinstance(error, FileNotFoundError)
+        ):
+            return False
+        click.secho(
+            f"Failed: {error}, skipping corresponding nodes and relations from further processing and import",
+            fg="red",
+        )
+        # Remove this processor's paths from the list of nodes/edges to import
+        for path in processor_import_paths_by_name[name]:
+            nodes_paths_for_import.remove(path)
+        edge_paths.remove(processor_classes[name].edges_path)
+        return True
+
+    if tasks:
+        click.secho(
+            f"Running {len(tasks)} tasks with {workers} workers", fg="green", bold=True
+        )
+        run_tasks(
+            tasks,
+            workers=workers,
+            memory_budget=memory_budget,
+            on_error=_on_error,
+            on_done=lambda name, outcome: click.secho(
+                f"Finished {name} in {outcome.seconds:.0f} seconds", fg="green"
+            ),
         )
 
     # The assembled paths are added to the list of nodes to import separately
@@ -230,6 +446,10 @@ def main(
         if assembled_path.exists():
             nodes_paths_for_import.append(assembled_path)
 
+    # Stamp the version of the graph build
+    if run_import or ingestion_manifest:
+        nodes_paths_for_import.append(_dump_build_info())
+
     # Save the import paths
     if ingestion_manifest:
         if not ingestion_manifest.name.endswith(".json"):
@@ -237,33 +457,45 @@ def main(
         click.secho(
             f"Saving nodes paths for import to {ingestion_manifest}", fg="green", bold=True
         )
+        manifests = {
+            name: Manifest.load(processor_cls.manifest_path)
+            for name, processor_cls in processor_classes.items()
+            if processor_cls.edges_path in edge_paths
+        }
+        changes = _get_ingestion_changes(ingestion_manifest, manifests)
+        for name, reasons in changes.items():
+            click.secho(f"Changed since the previous build: {name}: {'; '.join(reasons)}")
         with open(ingestion_manifest, "w") as fh:
             _import_paths = {
-                "node_paths": nodes_paths_for_import,
-                "edge_paths": edge_paths,
+                "node_paths": [str(path) for path in nodes_paths_for_import],
+                "edge_paths": [str(path) for path in edge_paths],
+                "processors": {
+                    name: manifest.to_json() if manifest else None
+                    for name, manifest in manifests.items()
+                },
+                "changes": changes,
             }
-            json.dump(obj=_import_paths, fp=fh)
+            json.dump(obj=_import_paths, fp=fh, indent=2)
 
     if check_ingestion_files:
         click.secho("Checking ingestion files...", fg="green", bold=True)
-        # Check for duplicated node IDs across all node files
-        node_ids = set()
-        for node_path in tqdm(
-            nodes_paths_for_import, desc="Node duplication check", unit="node file"
-        ):
-            checked_nodes = check_duplicated_nodes(nodes_tsv_gz_file=node_path)
-            node_ids |= checked_nodes
-
-        # Check for missing node IDs in edge files. Any node IDs in edges
-        # that are not in the collected node_ids will be reported.
-        for edge_path in tqdm(
-            edge_paths, desc="Missing node check", unit="edge file"
-        ):
-            check_missing_node_ids_in_edges(
-                edges_tsv_gz_file=edge_path, node_ids=node_ids
+        # Check for duplicated node IDs across all node files and for node
+        # IDs in edge files that are missing from the node files
+        report = ingestion_check.check_ingestion_files(
+            nodes_paths_for_import, edge_paths, workers=workers
+        )
+        for problem in report.problems:
+            click.secho(str(problem), fg="red")
+        if not report.ok:
+            raise click.ClickException(
+                f"Found {report.n_problems} problems in the ingestion files "
+                f"({len(report.problems)} listed above)"
             )
         click.secho(
-            "Ingestion file check completed without errors.", fg="green", bold=True
+            f"Ingestion file check of {report.n_nodes} nodes and "
+            f"{report.n_edges} edges completed without errors.",
+            fg="green",
+            bold=True,
         )
 
     # Import the nodes
@@ -318,17 +550,18 @@ def get_pickle_paths() -> dict[str, list[Path]]:
 
 
 def assemble_type(
-    pickle_paths: list[Path],
+    node_paths: list[Path],
     assembled_path: Path,
     label: str,
     force_assemble: bool = False,
 ):
-    """Assemble nodes of a given type from the given pickle paths
+    """Assemble nodes of a given type from the given node files
 
     Parameters
     ----------
-    pickle_paths :
-        A list of the input paths to the pickled nodes
+    node_paths :
+        A list of the input paths to the intermediate node files of the
+        processors, see :func:`indra_cogex.assembly.iter_nodes_from_path`
     assembled_path :
         The path to the output file where the assembled nodes will be saved
     label :
@@ -339,38 +572,45 @@ def assemble_type(
     if assembled_path.exists() and not force_assemble:
         print(f"Skipping assembly, {assembled_path} already exists")
         return
-    na = NodeAssembler()
-    for pickle_path in pickle_paths:
-        print(f"Loading cached nodes from {pickle_path}")
-        with open(pickle_path, "rb") as fh:
-            nodes = pickle.load(fh)
-        na.add_nodes(nodes)
-
-    print(f"Assembling {len(na.nodes)} nodes")
-    assembled_nodes = na.assemble_nodes()
-    if na.conflicts:
-        import gzip
-        import csv
-        # Replace nodes_{node_type}.tsv.gz with nodes_{node_type}_conflicts.tsv.gz
-        conflict_path = assembled_path.with_name(
-            assembled_path.stem + "_conflicts" + assembled_path.suffix
-        )
-        print(f"Got {len(na.conflicts)} conflicts, please inspect")
-        with gzip.open(conflict_path, "wt", encoding="utf-8") as fh:
-            writer = csv.writer(fh, delimiter="\t")
-            writer.writerow(["key", "val1", "val2"])
-            for conflict in na.conflicts:
-                writer.writerow([conflict.key, conflict.val1, conflict.val2])
-
-    print(f"Sorting {len(assembled_nodes)} assembled nodes")
-    assembled_nodes = sorted(assembled_nodes, key=lambda x: (x.db_ns, x.db_id))
-    Processor._dump_nodes_to_path_static(
-        "assembled nodes", assembled_nodes, assembled_path, allowed_labels=[label]
+    # Replace nodes_{node_type}.tsv.gz with nodes_{node_type}_conflicts.tsv.gz
+    conflict_path = assembled_path.with_name(
+        assembled_path.stem + "_conflicts" + assembled_path.suffix
     )
+    if conflict_path.exists():
+        conflict_path.unlink()
+    with ExitStack() as stack:
+        conflict_writer = None
+
+        def _write_conflict(conflict: Conflict):
+            # The conflicts file is only created if there are conflicts
+            nonlocal conflict_writer
+            if conflict_writer is None:
+                fh = stack.enter_context(
+                    open_gzip(conflict_path, "wt", encoding="utf-8")
+                )
+                conflict_writer = csv.writer(fh, delimiter="\t")
+                conflict_writer.writerow(["key", "val1", "val2"])
+            conflict_writer.writerow([conflict.key, conflict.val1, conflict.val2])
+
+        # Each processor dumps its nodes sorted, so they are merged as streams
+        # rather than loaded into memory all at once
+        print(f"Assembling nodes from {len(node_paths)} sorted node files")
+        na = StreamingNodeAssembler(
+            [iter_nodes_from_path(node_path) for node_path in node_paths],
+            on_conflict=_write_conflict,
+        )
+        Processor._dump_nodes_to_path_static(
+            "assembled nodes",
+            na.iter_assembled_nodes(),
+            assembled_path,
+            allowed_labels=[label],
+        )
+    if conflict_writer is not None:
+        print(f"Got conflicts, please inspect {conflict_path}")
 
 
 def manual_assembly(force_assemble: bool = False):
-    """Assemble nodes of a given type from the given pickle paths
+    """Assemble the nodes of each label from the node files of the processors
 
     Parameters
     ----------
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""Blocked correlations of the gene dependencies across cell lines.
+
+Correlating all pairs of the ~18,000 genes in the CRISPR and RNAi screens
+gives gene by gene matrices of hundreds of millions of values, and the
+correlations, sample counts, p-values and z-scores of both screens were each
+kept as a full float64 matrix and written to HDF5. Only the significant pairs
+are kept in the end, so here the gene by gene matrices are never built:
+
+1. Each screen is written as a float32 gene by cell line matrix to a memory
+   mapped file, centered on the mean of each gene.
+2. The gene pairs are split in tiles of :data:`BLOCK_SIZE` by
+   :data:`BLOCK_SIZE` genes of the upper triangle, which are processed in
+   parallel. In each tile, the correlations over the cell lines screened for
+   both genes are calculated with matrix products, turned into z-scores and
+   combined between the screens. The pairs that are significant without
+   correction and aren't both mitochondrial genes are kept.
+3. The Bonferroni, Benjamini-Hochberg and Benjamini-Yekutieli critical values
+   are calculated on the kept pairs, with the number of comparisons counted
+   in the tiles.
+"""
+
+import logging
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Collection, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+from tqdm import tqdm
+
+from indra_cogex.sources.parallel import imap_chunks
+
+__all__ = [
+    "get_significant_pairs",
+    "get_correlations",
+    "get_z_scores",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The number of genes along each side of the tiles of gene pairs
+BLOCK_SIZE = 1024
+
+
+def _dump_gene_matrix(df: pd.DataFrame, genes: pd.Index, path: Path):
+    # Genes are rows, so the genes of a block are contiguous in the file
+    values = df[genes].to_numpy(dtype=np.float32).T
+    with np.errstate(invalid="ignore"):
+        # Centering doesn't change the correlations, but it keeps the sums of
+        # squares in float32 from losing the precision of the variance
+        values -= np.nanmean(values, axis=1, keepdims=True)
+    np.save(path, values)
+
+
+def get_correlations(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the Pearson correlations between two blocks of genes.
+
+    Like :meth:`pandas.DataFrame.corr`, each pair of genes is correlated over
+    the cell lines where both have a value.
+
+    Parameters
+    ----------
+    x :
+        A gene by cell line array, with NaN for missing values.
+    y :
+        Another gene by cell line array for the same cell lines.
+
+    Returns
+    -------
+    :
+        The x by y arrays of the correlations, NaN where they are undefined,
+        and of the number of cell lines where both genes have a value.
+    """
+    x_mask = np.isfinite(x)
+    y_mask = np.isfinite(y)
+    if x_mask.all() and y_mask.all():
+        n = np.full((len(x), len(y)), x.shape[1], dtype=np.float32)
+        x = x - x.mean(axis=1, keepdims=True)
+        y = y - y.mean(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (x @ y.T) / np.outer(
+                np.sqrt((x * x).sum(axis=1)), np.sqrt((y * y).sum(axis=1))
+            )
+    else:
+        # The sums over the cell lines where both genes have a value are
+        # products with the masks of the other genes
+        x_mask = x_mask.astype(x.dtype)
+        y_mask = y_mask.astype(y.dtype)
+        x = np.where(x_mask, x, 0)
+        y = np.where(y_mask, y, 0)
+        n = x_mask @ y_mask.T
+        x_sum = x @ y_mask.T
+        y_sum = x_mask @ y.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = x @ y.T - x_sum * y_sum / n
+            x_variance = (x * x) @ y_mask.T - x_sum * x_sum / n
+            y_variance = x_mask @ (y * y).T - y_sum * y_sum / n
+            r = covariance / np.sqrt(x_variance * y_variance)
+    r[(n < 2) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1, 1), n
+
+
+def get_z_scores(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Get the signed z-scores of correlations.
+
+    Parameters
+    ----------
+    r :
+        The Pearson correlations.
+    n :
+        The number of samples of each correlation.
+
+    Returns
+    -------
+    :
+        The z-scores with the same two-sided p-values as the correlations
+        and their signs, NaN where there are less than three samples.
+    """
+    r = r.astype(np.float64)
+    # Under independence, (1 + r) / 2 has a beta distribution with both
+    # parameters n / 2 - 1, as in scipy.stats.pearsonr
+    a = np.where(n > 2, n / 2 - 1, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_half_p = np.log(special.betainc(a, a, (1 - np.abs(r)) / 2))
+    return -special.ndtri_exp(log_half_p) * np.sign(r)
+
+
+def _get_tile_pairs(
+    tile: Tuple[int, int],
+    crispr_path: Path,
+    rnai_path: Path,
+    is_mito: np.ndarray,
+    block_size: int,
+    log_alpha: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    # Get the rows, columns and log p-values of the significant pairs of a
+    # tile, and the number of pairs with a p-value
+    start, end = tile
+    rows = slice(start, start + block_size)
+    columns = slice(end, end + block_size)
+    z = 0
+    for path in (crispr_path, rnai_path):
+        values = np.load(path, mmap_mode="r")
+        z = z + get_z_scores(*get_correlations(values[rows], values[columns]))
+    logp = np.log(2) + special.log_ndtr(-np.abs(z / np.sqrt(2)))
+
+    tested = ~np.isnan(logp)
+    if start == end:
+        tested &= np.triu(np.ones(logp.shape, dtype=bool), k=1)
+    keep = tested & (logp < log_alpha)
+    # Pairs of mitochondrial genes are expected to be codependent
+    keep &= ~(is_mito[rows, None] & is_mito[None, columns])
+    tile_rows, tile_columns = np.nonzero(keep)
+    return (
+        (tile_rows + start).astype(np.int32),
+        (tile_columns + end).astype(np.int32),
+        logp[tile_rows, tile_columns],
+        int(tested.sum()),
+    )
+
+
+def _iter_tiles(n_genes: int, block_size: int) -> Iterable[Tuple[int, int]]:
+    for start in range(0, n_genes, block_size):
+        for end in range(start, n_genes, block_size):
+            yield start, end
+
+
+def get_significant_pairs(
+    crispr_df: pd.DataFrame,
+    rnai_df: pd.DataFrame,
+    mitogenes: Collection[str],
+    alpha: float = 0.05,
+    block_size: int = BLOCK_SIZE,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Get the pairs of genes with significant combined codependencies.
+
+    Parameters
+    ----------
+    crispr_df :
+        The CRISPR gene effects, with cell lines as rows and genes as columns.
+    rnai_df :
+        The RNAi gene effects, with cell lines as rows and genes as columns.
+    mitogenes :
+        The symbols of the mitochondrial genes. Pairs of these aren't
+        included or counted as comparisons.
+    alpha :
+        The significance level.
+    block_size :
+        The number of genes along each side of the tiles of gene pairs.
+    workers :
+        The number of processes calculating tiles in parallel.
+
+    Returns
+    -------
+    :
+        The pairs with a log p-value below ``log(alpha)``, indexed by
+        ``geneA`` and ``geneB`` and sorted by their ``logp``, with their
+        ``rank`` and the ``bc_cutoff``, ``bh_crit_val`` and ``by_crit_val``
+        critical values of the Bonferroni, Benjamini-Hochberg and
+        Benjamini-Yekutieli corrections.
+    """
+    genes = crispr_df.columns.intersection(rnai_df.columns).sort_values()
+    is_mito = genes.isin(set(mitogenes))
+    n_tiles = len(list(_iter_tiles(len(genes), block_size)))
+    logger.info(
+        f"Correlating {len(genes)} genes in {n_tiles} tiles of "
+        f"{block_size}x{block_size} pairs"
+    )
+    with tempfile.TemporaryDirectory(prefix="depmap_") as directory:
+        crispr_path = Path(directory).joinpath("crispr.npy")
+        rnai_path = Path(directory).joinpath("rnai.npy")
+        _dump_gene_matrix(crispr_df, genes, crispr_path)
+        _dump_gene_matrix(rnai_df, genes, rnai_path)
+        get_tile_pairs = partial(
+            _get_tile_pairs,
+            crispr_path=crispr_path,
+            rnai_path=rnai_path,
+            is_mito=is_mito,
+            block_size=block_size,
+            log_alpha=np.log(alpha),
+        )
+        rows, columns, logps = [], [], []
+        total_comps = 0
+        for tile_rows, tile_columns, tile_logp, n_tested in tqdm(
+            imap_chunks(
+                get_tile_pairs, _iter_tiles(len(genes), block_size), workers=workers
+            ),
+            total=n_tiles,
+            desc="Correlating DepMap genes",
+            unit="tile",
+        ):
+            rows.append(tile_rows)
+            columns.append(tile_columns)
+            logps.append(tile_logp)
+            total_comps += n_tested
+
+    rows = np.concatenate(rows)
+    columns = np.concatenate(columns)
+    logp = np.concatenate(logps)
+    num_comps = total_comps - int(is_mito.sum()) ** 2
+    logger.info(f"Found {len(logp)} significant pairs in {num_comps} comparisons")
+
+    order = np.argsort(logp, kind="stable")
+    index = pd.MultiIndex.from_arrays(
+        [genes[rows[order]], genes[columns[order]]], names=["geneA", "geneB"]
+    )
+    sig_sorted = pd.DataFrame({"logp": logp[order]}, index=index)
+    sig_sorted["rank"] = stats.rankdata(sig_sorted["logp"])
+    sig_sorted["bc_cutoff"] = np.log(alpha / num_comps)
+    sig_sorted["bh_crit_val"] = np.log((sig_sorted["rank"] / num_comps) * alpha)
+    cm = np.log(num_comps) + np.euler_gamma + (1 / (2 * num_comps))
+    sig_sorted["by_crit_val"] = sig_sorted["bh_crit_val"] - np.log(cm)
+    return sig_sorted
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""Parallel gzip compression and decompression of the source files.
+
+The node and edge files for ``neo4j-admin import`` are gzipped TSV files of
+up to many GB, and compressing them in the process that generates the rows
+takes about as long as generating them. :func:`open_gzip` is a drop-in
+replacement for :func:`gzip.open` for these files:
+
+- Writing compresses blocks of the output in a pool of threads (zlib
+  releases the GIL) and writes each block as its own gzip member, in
+  order. Like the output of ``pigz --independent``, the file is a valid
+  multi-member gzip file that :mod:`gzip`, ``zcat`` and ``neo4j-admin
+  import`` read as one stream.
+- Reading decompresses the file in a background thread that reads ahead
+  of the rows being parsed.
+
+The compression level and the number of threads are set with the
+``INDRA_COGEX_GZIP_COMPRESSION_LEVEL`` and ``INDRA_COGEX_GZIP_THREADS``
+environment variables, or the ``gzip_compression_level`` and
+``gzip_threads`` keys of the ``indra_cogex`` section of the pystow
+configuration, so that processors running in their own processes use them
+too.
+"""
+
+import gzip
+import io
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Optional, Union
+
+import pystow
+
+__all__ = [
+    "open_gzip",
+    "get_compression_level",
+    "get_threads",
+    "ParallelGzipWriter",
+    "ReadAheadGzipReader",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The compression level used if none is configured. Level 9, the default
+#: of :func:`gzip.open`, is several times slower for files that are only a
+#: few percent smaller.
+DEFAULT_COMPRESSION_LEVEL = 6
+#: The number of uncompressed bytes compressed into each gzip member
+BLOCK_SIZE = 4 * 2**20
+
+
+def get_compression_level() -> int:
+    """Get the configured gzip compression level."""
+    return pystow.get_config(
+        "indra_cogex",
+        "gzip_compression_level",
+        dtype=int,
+        default=DEFAULT_COMPRESSION_LEVEL,
+    )
+
+
+def get_threads() -> int:
+    """Get the configured number of compression threads."""
+    return pystow.get_config(
+        "indra_cogex",
+        "gzip_threads",
+        dtype=int,
+        default=min(8, os.cpu_count() or 1),
+    )
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """A binary file that compresses blocks of its content in parallel."""
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        compresslevel: Optional[int] = None,
+        threads: Optional[int] = None,
+        block_size: int = BLOCK_SIZE,
+    ):
+        """Initialize the writer.
+
+        Parameters
+        ----------
+        fileobj :
+            The binary file the gzip members are written to. It is closed
+            with the writer.
+        compresslevel :
+            The gzip compression level. By default, the configured level,
+            see :func:`get_compression_level`.
+        threads :
+            The number of compression threads. By default, the configured
+            number, see :func:`get_threads`.
+        block_size :
+            The number of uncompressed bytes in each gzip member.
+        """
+        super().__init__()
+        self.fileobj = fileobj
+        self.compresslevel = (
+            get_compression_level() if compresslevel is None else compresslevel
+        )
+        self.threads = threads or get_threads()
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._members = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+
+    def writable(self) -> bool:  # noqa:D102
+        return True
+
+    def write(self, data) -> int:  # noqa:D102
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block: bytes):
+        # mtime=0 makes the output reproducible
+        self._pending.append(
+            self._executor.submit(gzip.compress, block, self.compresslevel, mtime=0)
+        )
+        # Bound the number of blocks in memory
+        while len(self._pending) > 2 * self.threads:
+            self._write_member(self._pending.popleft().result())
+
+    def _write_member(self, member: bytes):
+        self.fileobj.write(member)
+        self._members += 1
+
+    def close(self):  # noqa:D102
+        if self.closed:
+            return
+        try:
+            # An empty file still needs a gzip header to be a gzip file
+            if self._buffer or (not self._pending and not self._members):
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_member(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            self.fileobj.close()
+            super().close()
+
+
+def _read_blocks(
+    fh: IO[bytes], blocks: queue.Queue, block_size: int, stopped: threading.Event
+):
+    # Decompress blocks into the queue until the end of the file, an error or
+    # the reader is closed
+    try:
+        with fh:
+            while not stopped.is_set():
+                block = fh.read(block_size)
+                _put_block(blocks, block, stopped)
+                if not block:
+                    return
+    except BaseException as err:
+        _put_block(blocks, err, stopped)
+
+
+def _put_block(blocks: queue.Queue, item, stopped: threading.Event):
+    # Give up if the reader is closed before the blocks are consumed
+    while not stopped.is_set():
+        try:
+            blocks.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+class ReadAheadGzipReader(io.RawIOBase):
+    """A binary file that decompresses a gzip file in a background thread."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        block_size: int = BLOCK_SIZE,
+        max_blocks: int = 4,
+    ):
+        """Initialize the reader and start decompressing.
+
+        Parameters
+        ----------
+        path :
+            The path to the gzip file.
+        block_size :
+            The number of decompressed bytes passed from the background
+            thread at a time.
+        max_blocks :
+            The number of decompressed blocks read ahead.
+        """
+        super().__init__()
+        # The file is opened here so that a missing file raises right away
+        self._fh = gzip.open(path, "rb")
+        self.block_size = block_size
+        self._blocks = queue.Queue(maxsize=max_blocks)
+        self._block = memoryview(b"")
+        self._stopped = threading.Event()
+        self._eof = False
+        # The thread doesn't reference the reader, so that a reader that
+        # isn't closed can be garbage collected, which closes it
+        self._thread = threading.Thread(
+            target=_read_blocks,
+            args=(self._fh, self._blocks, block_size, self._stopped),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def readable(self) -> bool:  # noqa:D102
+        return True
+
+    def readinto(self, buffer) -> int:  # noqa:D102
+        while not self._block:
+            if self._eof:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, BaseException):
+                self._eof = True
+                raise block
+            if not block:
+                self._eof = True
+                return 0
+            self._block = memoryview(block)
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        return size
+
+    def close(self):  # noqa:D102
+        if self.closed:
+            return
+        self._stopped.set()
+        self._thread.join()
+        super().close()
+
+
+def open_gzip(
+    path: Union[str, Path],
+    mode: str = "rt",
+    compresslevel: Optional[int] = None,
+    threads: Optional[int] = None,
+    encoding: Optional[str] = None,
+    errors: Optional[str] = None,
+    newline: Optional[str] = None,
+) -> IO:
+    """Open a gzip file for parallel writing or read-ahead reading.
+
+    Parameters
+    ----------
+    path :
+        The path to the gzip file.
+    mode :
+        One of "rt", "rb", "wt", "wb", "at" or "ab", like for
+        :func:`gzip.open`, which are binary without the "t". Appending adds
+        gzip members to the end of the file.
+    compresslevel :
+        The compression level when writing. By default, the configured
+        level, see :func:`get_compression_level`.
+    threads :
+        The number of compression threads when writing. By default, the
+        configured number, see :func:`get_threads`.
+    encoding :
+        The text encoding in text mode.
+    errors :
+        The handling of encoding errors in text mode.
+    newline :
+        The handling of line endings in text mode, see
+        :class:`io.TextIOWrapper`.
+
+    Returns
+    -------
+    :
+        A binary or text file object, like the one :func:`gzip.open` returns.
+    """
+    if mode not in {"r", "rb", "rt", "w", "wb", "wt", "a", "ab", "at"}:
+        raise ValueError(f"Invalid mode: {mode!r}")
+    if mode.startswith("r"):
+        binary = io.BufferedReader(ReadAheadGzipReader(path), buffer_size=2**16)
+    else:
+        binary = io.BufferedWriter(
+            ParallelGzipWriter(
+                open(path, mode[0] + "b"),
+                compresslevel=compresslevel,
+                threads=threads,
+            ),
+            buffer_size=2**16,
+        )
+    if "t" not in mode:
+        return binary
+    return io.TextIOWrapper(binary, encoding=encoding, errors=errors, newline=newline)
@@ -3,18 +3,20 @@
 """Processor for the INDRA database."""
 
 import csv
-import gzip
 import json
 import logging
 import os
 import pickle
 import textwrap
+from array import array
 from collections import defaultdict
-from itertools import permutations
+from functools import partial
+from itertools import chain, permutations
 from pathlib import Path
-from typing import Iterable, Optional, Tuple, Union
+from typing import Iterable, List, Optional, Tuple, Union
 
-from indra.literature.pubmed_client import is_retracted
+import numpy as np
+import pandas as pd
 from indra.statements import (
     Agent,
     default_ns_order,
@@ -23,10 +25,14 @@ from indra.statements import (
     Conversion,
 )
 from indra.util import batch_iter
+from indra.literature.pubmed_client import RETRACTIONS_FILE
 from indra.sources import SOURCE_INFO
 from tqdm import tqdm
 
+from indra_cogex.assembly import dump_arrow_nodes
 from indra_cogex.representation import Node, Relation
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.parallel import imap_chunks
 from indra_cogex.sources.processor import Processor
 
 from indra.statements import stmts_from_json
@@ -34,11 +40,14 @@ from indra_cogex.sources.indra_db.locations import (
     belief_scores_pkl_fname,
     processed_stmts_fname,
     unique_stmts_fname,
-    source_counts_fname
+    source_counts_fname,
+    stmt_hash_pmids_fname,
 )
-from indra_cogex.sources.pubmed.locations import pmid_year_types_path
+from indra_cogex.sources.pubmed.locations import retracted_pmids_path
+from indra_cogex.sources.pubmed.publication_info import get_publication_info_table
+from indra_cogex.sources.pubmed.retractions import get_retraction_index
 from indra_cogex.sources.utils import get_bool
-from indra_cogex.util import load_stmt_json_str
+from indra_cogex.util import load_stmt_json_str, load_stmt_json_strs
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +65,9 @@ class DbProcessor(Processor):
 
     name = "database"
     node_types = ["BioEntity"]
+    memory = 32.0
 
-    def __init__(self, dir_path: Union[None, str, Path] = None):
+    def __init__(self, dir_path: Union[None, str, Path] = None, workers: int = 1):
         """Initialize the INDRA database processor.
 
         Parameters
@@ -66,7 +76,11 @@ class DbProcessor(Processor):
             The path to the directory containing unique and grounded
             statements as a \\*.tsv.gz file, source counts as a pickle file and
             belief scores as a pickle file.
+        workers :
+            The number of processes decoding statements. Set it with e.g.
+            ``{"database": {"workers": 16}}`` in the sources CLI ``--config``.
         """
+        self.workers = workers
         if dir_path is None:
             dir_path = unique_stmts_fname.parent
         elif isinstance(dir_path, str):
@@ -75,30 +89,41 @@ class DbProcessor(Processor):
         self.processed_stmts_fname = dir_path / processed_stmts_fname.name
         self.source_counts_fname = dir_path / source_counts_fname.name
         self.belief_scores_fname = dir_path / belief_scores_pkl_fname.name
+        self.stmt_hash_pmids_fname = dir_path / stmt_hash_pmids_fname.name
+
+    @classmethod
+    def get_input_paths(cls) -> List[Path]:  # noqa:D102
+        # The files in the default directory and the retraction index. Only
+        # the index is needed from the PubMed files, so this doesn't wait for
+        # the PublicationProcessor, and is rebuilt when the index changes
+        return [
+            unique_stmts_fname,
+            processed_stmts_fname,
+            source_counts_fname,
+            belief_scores_pkl_fname,
+            retracted_pmids_path,
+            Path(RETRACTIONS_FILE),
+        ]
 
     def get_nodes(self):  # noqa:D102
         # Read the unique statements from the file and yield unique agents
         # The file contains statements that have already been filtered for
         # ungrounded statements, so we can just use the agent list.
-        batch_size = 100000
-        with gzip.open(self.stmts_fname.as_posix(), "rt") as f:
+        with open_gzip(self.stmts_fname.as_posix(), "rt") as f:
             reader = csv.reader(f, delimiter="\t")
             seen_agents = set()  # Store ns:id pairs of seen agents
 
-            for batch in tqdm(
-                batch_iter(reader, batch_size=batch_size, return_func=list),
+            # The statements are decoded in parallel, the agents are
+            # deduplicated here in the order of the statements
+            chunks = batch_iter(reader, batch_size=STMT_CHUNK_SIZE, return_func=list)
+            for agents in tqdm(
+                imap_chunks(_get_chunk_agents, chunks, workers=self.workers),
                 desc="Getting BioEntity nodes",
             ):
-                sj_list = [load_stmt_json_str(sjs) for _, sjs in batch]
-                stmts = stmts_from_json(sj_list)
-                for stmt in stmts:
-                    for agent in stmt.real_agent_list():
-                        db_ns, db_id = get_ag_ns_id(agent)
-                        if db_ns and db_id and (db_ns, db_id) not in seen_agents:
-                            yield Node(
-                                db_ns, db_id, ["BioEntity"], dict(name=agent.name)
-                            )
-                            seen_agents.add((db_ns, db_id))
+                for db_ns, db_id, name in agents:
+                    if (db_ns, db_id) not in seen_agents:
+                        yield Node(db_ns, db_id, ["BioEntity"], dict(name=name))
+                        seen_agents.add((db_ns, db_id))
 
     def get_relations(self, max_complex_members: int = 3):  # noqa:D102
         rel_type = "indra_rel"
@@ -111,157 +136,135 @@ class DbProcessor(Processor):
         logger.info("Loading belief scores per hash")
         with self.belief_scores_fname.open("rb") as f:
             belief_scores = pickle.load(f)
+        # A statement has retracted evidence if any of its evidences in the
+        # processed statements cites a retracted PMID
         logger.info("Loading stmt hash - retraction boolean mapping")
-        has_retracted_pmid = {}
-        with gzip.open(self.processed_stmts_fname, "rt") as fh:
-            reader = csv.reader(fh, delimiter="\t")
-            for sh_str, stmt_json_str in tqdm(
-                    reader, desc="Reading statements", unit_scale=True
-            ):
-                stmt_hash = int(sh_str)
-                stmt_json = load_stmt_json_str(stmt_json_str)
-                evidence = stmt_json["evidence"][0]
-
-                # Get pmid
-                pmid = evidence.get("text_refs", {}).get("PMID") or \
-                    evidence.get("pmid")
-                # If we have a pmid, check if it is retracted.
-                # If this is the first time we see this statement hash,
-                # set the has_retracted_pmid flag to the retraction status,
-                # otherwise, only change it if the pmid is retracted.
-                if pmid is not None:
-                    if stmt_hash not in has_retracted_pmid:
-                        has_retracted_pmid[stmt_hash] = is_retracted(pmid)
-                    else:
-                        # Run OR on the current value and the new value
-                        has_retracted_pmid[stmt_hash] |= is_retracted(pmid)
+        hashes, pmids = get_stmt_hash_pmids(
+            self.processed_stmts_fname,
+            self.stmt_hash_pmids_fname,
+            workers=self.workers,
+        )
+        retractions = get_retraction_index()
+        retracted_hashes = set(hashes[retractions.retracted_mask(pmids)].tolist())
+        del hashes, pmids
+        logger.info(
+            f"Got {len(retracted_hashes)} statement hashes with retracted evidence"
+        )
 
         hashes_yielded = set()
-        with gzip.open(self.stmts_fname, "rt") as fh:
+        with open_gzip(self.stmts_fname, "rt") as fh:
             reader = csv.reader(fh, delimiter="\t")
-            for sh_str, stmt_json_str in tqdm(reader, desc="Reading statements"):
-                stmt_hash = int(sh_str)
-                if stmt_hash in hashes_yielded:
-                    continue
-
-                try:
-                    source_count = source_counts[stmt_hash]
-                    belief = belief_scores[stmt_hash]
-                except KeyError:
-                    # NOTE: this should not happen if files are generated
-                    # properly and are up to date.
-                    logger.warning(
-                        f"Could not find source count or belief score for "
-                        f"statement hash {stmt_hash}. Are the source files updated?"
-                    )
-                    continue
-                stmt_json = load_stmt_json_str(stmt_json_str)
-                if stmt_json["evidence"][0]["source_api"] == "medscan":
-                    stmt_json["evidence"] = []
-
-                # Set belief in the statement json
-                stmt_json["belief"] = belief
-
-                data = {
-                    "stmt_hash:int": stmt_hash,
-                    "source_counts:string": json.dumps(source_count),
-                    "evidence_count:int": sum(source_count.values()),
-                    "stmt_type:string": stmt_json["type"],
-                    "belief:float": belief,
-                    "stmt_json:string": json.dumps(stmt_json),
-                    "has_retracted_evidence:boolean": get_bool(
-                        has_retracted_pmid.get(stmt_hash)
-                    ),
-                    "has_database_evidence:boolean": get_bool(set(source_count) & db_sources),
-                    "has_reader_evidence:boolean": get_bool(set(source_count) & reader_sources),
-                    "medscan_only:boolean": get_bool(set(source_count) == {"medscan"}),
-                    "sparser_only:boolean": get_bool(set(source_count) == {"sparser"}),
-                }
-
-                # Get the agents from the statement
-                stmt = stmt_from_json(stmt_json)
-                agents = stmt.real_agent_list()
-
-                # We skip Conversions
-                if isinstance(stmt, Conversion):
-                    continue
-
-                # If we don't have at least 2 real agents, we skip it
-                if len(agents) < 2:
-                    continue
-
-                # We skip any Statements that have ungrounded Agents
-                agent_groundings = [get_ag_ns_id(agent) for agent in agents]
-                if any(
-                    ag_ns is None or ag_id is None for ag_ns, ag_id in agent_groundings
-                ):
-                    continue
-
-                # We need special handling for Complexes
-                if isinstance(stmt, Complex):
-                    if len(agents) > max_complex_members:
+            rows = self._iter_relation_rows(
+                tqdm(reader, desc="Reading statements"),
+                source_counts,
+                belief_scores,
+                retracted_hashes,
+                hashes_yielded,
+            )
+            chunks = batch_iter(rows, batch_size=STMT_CHUNK_SIZE, return_func=list)
+            get_chunk_relations = partial(
+                _get_chunk_relations, max_complex_members=max_complex_members
+            )
+            # The statements are decoded in parallel and the relations are
+            # yielded here in the order of the statements, so the first
+            # statement with a given hash that has relations is the one used
+            for chunk_relations in imap_chunks(
+                get_chunk_relations, chunks, workers=self.workers
+            ):
+                for stmt_hash, agent_pairs, data in chunk_relations:
+                    if stmt_hash in hashes_yielded:
                         continue
-                    for (ns_a, id_a), (ns_b, id_b) in permutations(agent_groundings, 2):
+                    for (ns_a, id_a), (ns_b, id_b) in agent_pairs:
                         yield Relation(ns_a, id_a, ns_b, id_b, rel_type, data)
-                        total_count += 1
-                # Otherwise we expect this to be a well behaved binary statement
-                # that we can simply turn into a relation
-                elif len(agents) == 2:
-                    yield Relation(
-                        *agent_groundings[0], *agent_groundings[1], rel_type, data
-                    )
-                    total_count += 1
-                else:
-                    continue
-
-                hashes_yielded.add(stmt_hash)
+                    total_count += len(agent_pairs)
+                    hashes_yielded.add(stmt_hash)
 
         logger.info(
             f"Got {total_count} total relations from {len(hashes_yielded)} unique statements"
         )
 
+    @staticmethod
+    def _iter_relation_rows(
+        reader, source_counts, belief_scores, retracted_hashes, hashes_yielded
+    ):
+        # Look up the data of each statement by its hash before it's sent to
+        # the workers, so they don't need a copy of these mappings
+        for sh_str, stmt_json_str in reader:
+            stmt_hash = int(sh_str)
+            # This is checked again when the relations are yielded since the
+            # hashes of the chunks being processed are not added yet
+            if stmt_hash in hashes_yielded:
+                continue
+
+            try:
+                source_count = source_counts[stmt_hash]
+                belief = belief_scores[stmt_hash]
+            except KeyError:
+                # NOTE: this should not happen if files are generated
+                # properly and are up to date.
+                logger.warning(
+                    f"Could not find source count or belief score for "
+                    f"statement hash {stmt_hash}. Are the source files updated?"
+                )
+                continue
+            yield (
+                stmt_hash,
+                stmt_json_str,
+                source_count,
+                belief,
+                stmt_hash in retracted_hashes,
+            )
+
 
 class EvidenceProcessor(Processor):
     name = "indra_db_evidence"
     node_types = ["Evidence", "Publication"]
+    # Reads the statement hashes from the DbProcessor edges and the PubMed
+    # files created by the PublicationProcessor
+    depends_on = ["database", "publication"]
+    memory = 32.0
 
-    def __init__(self):
-        """Initialize the Evidence processor"""
+    def __init__(self, workers: int = 1):
+        """Initialize the Evidence processor
+
+        Parameters
+        ----------
+        workers :
+            The number of processes decoding statements. Set it with e.g.
+            ``{"indra_db_evidence": {"workers": 16}}`` in the sources CLI
+            ``--config``.
+        """
+        self.workers = workers
         self.stmt_fname = processed_stmts_fname
         self._stmt_id_pmid_links = {}
         # Check if files exist without loading them
         if not self.stmt_fname.exists():
             raise FileNotFoundError(f"No such file: {self.stmt_fname}")
 
+    @classmethod
+    def get_input_paths(cls) -> List[Path]:  # noqa:D102
+        # The statement hashes come from the outputs of the DbProcessor and
+        # the publication info from the PublicationProcessor inputs, which
+        # are covered by the dependencies
+        return [processed_stmts_fname]
+
     def get_nodes(self, num_rows: Optional[int] = None) -> Iterable[list[Node]]:
         """Get INDRA Evidence and Publication nodes"""
         # First, we need to figure out which Statements were actually
         # selected in the DbProcessor and only include evidences for those.
-        included_hashes = set()
         logger.info("Loading relevant statement hashes...")
-        with gzip.open(DbProcessor.edges_path, "rt") as fh:
-            reader = csv.reader(fh, delimiter="\t")
-            header = next(reader)
-            hash_idx = header.index("stmt_hash:int")
-            for row in reader:
-                included_hashes.add(int(row[hash_idx]))
-
-        # Create pubmed source files if they don't exist
-        if not pmid_year_types_path.exists():
-            from indra_cogex.sources.pubmed import process_mesh_xml_to_csv
-            process_mesh_xml_to_csv()
-
-        # Load pmid -> year, pubtypes mapping (assumes pubmed source files
-        # exist)
-        with gzip.open(pmid_year_types_path, "rt") as fh:
-            pmid_years_pubtypes = {
-                pmid: (year, json.loads(types))
-                for pmid, year, types in csv.reader(fh, delimiter="\t")
-            }
+        included_hashes = get_included_hashes(DbProcessor.edges_path)
+        logger.info(f"Loaded {len(included_hashes)} relevant statement hashes")
+
+        retractions = get_retraction_index()
+
+        # Load the pmid -> year, pubtypes table, which also creates the
+        # pubmed source files if they don't exist
+        publication_info = get_publication_info_table()
 
         # Loop the grounded statements and get the evidence w text refs
         logger.info("Looping statements from statements file")
-        with gzip.open(self.stmt_fname.as_posix(), "rt") as fh:
+        with open_gzip(self.stmt_fname.as_posix(), "rt") as fh:
             # TODO test whether this is a reasonable size
             batch_size = 100000
             # TODO get number of batches from the total number of statements
@@ -270,29 +273,35 @@ class EvidenceProcessor(Processor):
             reader = csv.reader(fh, delimiter="\t")
             yield_index = 0
             yielded_pmid = set()
+            # The statements of the relations are filtered here and decoded
+            # in parallel, a batch of nodes is yielded for each batch of rows
+            chunks = (
+                _filter_chunk_hashes(chunk, included_hashes)
+                for chunk in batch_iter(
+                    reader, batch_size=STMT_CHUNK_SIZE, return_func=list
+                )
+            )
+            chunk_evidences = imap_chunks(
+                _get_chunk_evidences, chunks, workers=self.workers
+            )
             for batch in tqdm(
-                batch_iter(reader, batch_size=batch_size, return_func=list),
+                batch_iter(
+                    chunk_evidences,
+                    batch_size=max(1, batch_size // STMT_CHUNK_SIZE),
+                    return_func=list,
+                ),
                 total=total,
             ):
                 node_batch = []
-                for stmt_hash_str, stmt_json_str in batch:
-                    stmt_hash = int(stmt_hash_str)
-                    if stmt_hash not in included_hashes:
-                        continue
-                    stmt_json = load_stmt_json_str(stmt_json_str)
-
+                for stmt_hash, evidences in chain.from_iterable(batch):
                     # Loop all evidences
                     # NOTE: there should be a single evidence for each
                     # statement so looping is probably not necessary
-                    evidence_list = stmt_json["evidence"]
-                    for evidence in evidence_list:
-                        tr = evidence.get("text_refs", {})
-                        pmid = tr.get("PMID") or evidence.get("pmid")
-
+                    for pmid, tr, evidence_pmid, evidence_str, source_api in evidences:
                         # Only yield Pubmed nodes if we have PMID and it
                         # hasn't already been used
                         if pmid is not None and pmid not in yielded_pmid:
-                            year, pubtypes = pmid_years_pubtypes.get(pmid, (None, []))
+                            year, pubtypes = publication_info.get(pmid)
                             pubtypes_str = ";".join(pubtypes) or None
                             # If there are text refs, use them
                             if tr.get("PMID"):
@@ -310,12 +319,12 @@ class EvidenceProcessor(Processor):
                                         "year:int": year,
                                         "publication_type:string[]": pubtypes_str,
                                         "retracted:boolean": get_bool(
-                                            is_retracted(pmid)
+                                            pmid in retractions
                                         )
                                     },
                                 )
                             # Otherwise, just make a node with the evidence PMID
-                            elif evidence.get("pmid"):
+                            elif evidence_pmid:
                                 pubmed_node = Node(
                                     db_ns="PUBMED",
                                     db_id=pmid,
@@ -324,7 +333,7 @@ class EvidenceProcessor(Processor):
                                         "year:int": year,
                                         "publication_type:string[]": pubtypes_str,
                                         "retracted:boolean": get_bool(
-                                            is_retracted(pmid)
+                                            pmid in retractions
                                         )
                                     },
                                 )
@@ -357,11 +366,11 @@ class EvidenceProcessor(Processor):
                                 data={
                                     # Check retractions if there is a PMID
                                     "retracted:boolean": get_bool(
-                                        is_retracted(pmid) if pmid else False
+                                        pmid in retractions
                                     ),
-                                    "evidence:string": json.dumps(evidence),
+                                    "evidence:string": evidence_str,
                                     "stmt_hash:int": stmt_hash,
-                                    "source_api:string": evidence["source_api"],
+                                    "source_api:string": source_api,
                                 },
                             )
                         )
@@ -428,8 +437,7 @@ class EvidenceProcessor(Processor):
         pubmed_nodes = sorted(
             nodes_by_type[pmid_node_type], key=lambda x: (x.db_ns, x.db_id)
         )
-        with open(publication_nodes_indra_path, "wb") as fh:
-            pickle.dump(pubmed_nodes, fh)
+        dump_arrow_nodes(pubmed_nodes, publication_nodes_indra_path)
         self._dump_nodes_to_path(
             pubmed_nodes, publication_nodes_path, [pmid_node_type], publication_sample_path
         )
@@ -448,6 +456,54 @@ class EvidenceProcessor(Processor):
             )
 
 
+#: The number of edge rows whose statement hash is parsed at a time
+HASH_CHUNK_SIZE = 1_000_000
+
+
+def get_included_hashes(edges_path: Path) -> np.ndarray:
+    """Get the statement hashes of the relations of an edges file.
+
+    Only the hash column is parsed, in chunks, and the hashes are kept in
+    an array rather than a set of Python ints, which would take many GB.
+
+    Parameters
+    ----------
+    edges_path :
+        The gzipped edges TSV file with a ``stmt_hash:int`` column, e.g.,
+        the one of the :class:`DbProcessor`.
+
+    Returns
+    -------
+    :
+        The sorted, unique int64 statement hashes.
+    """
+    hashes = [
+        chunk["stmt_hash:int"].to_numpy()
+        for chunk in pd.read_csv(
+            edges_path,
+            sep="\t",
+            usecols=["stmt_hash:int"],
+            dtype=np.int64,
+            chunksize=HASH_CHUNK_SIZE,
+        )
+    ]
+    return np.unique(np.concatenate(hashes)) if hashes else np.array([], np.int64)
+
+
+def _filter_chunk_hashes(rows, included_hashes: np.ndarray) -> list:
+    # Get the statement rows of a chunk whose hash is in the sorted hashes
+    hashes = np.array([int(row[0]) for row in rows], dtype=np.int64)
+    if not len(included_hashes):
+        return []
+    positions = np.minimum(
+        np.searchsorted(included_hashes, hashes), len(included_hashes) - 1
+    )
+    return [
+        rows[index]
+        for index in np.flatnonzero(included_hashes[positions] == hashes)
+    ]
+
+
 def get_ag_ns_id(ag: Agent) -> Tuple[str, str]:
     """Return a namespace, identifier tuple for a given agent.
 
@@ -467,10 +523,213 @@ def get_ag_ns_id(ag: Agent) -> Tuple[str, str]:
     return None, None
 
 
+#: The number of statements sent to a worker process at a time
+STMT_CHUNK_SIZE = 10_000
+
+
+def _get_chunk_agents(rows) -> list[tuple[str, str, str]]:
+    # Get the grounded agents of a chunk of statements, deduplicated within
+    # the chunk in the order they appear
+    seen_agents = set()
+    agents = []
+    stmts = stmts_from_json(load_stmt_json_strs(sjs for _, sjs in rows))
+    for stmt in stmts:
+        for agent in stmt.real_agent_list():
+            db_ns, db_id = get_ag_ns_id(agent)
+            if db_ns and db_id and (db_ns, db_id) not in seen_agents:
+                agents.append((db_ns, db_id, agent.name))
+                seen_agents.add((db_ns, db_id))
+    return agents
+
+
+def _get_chunk_relations(rows, max_complex_members: int = 3):
+    # Get the pairs of agent groundings and the relation data for the
+    # statements of a chunk that are turned into relations
+    chunk_relations = []
+    for stmt_hash, stmt_json_str, source_count, belief, has_retracted in rows:
+        stmt_json = load_stmt_json_str(stmt_json_str)
+        if stmt_json["evidence"][0]["source_api"] == "medscan":
+            stmt_json["evidence"] = []
+
+        # Set belief in the statement json
+        stmt_json["belief"] = belief
+
+        # Get the agents from the statement
+        stmt = stmt_from_json(stmt_json)
+        agents = stmt.real_agent_list()
+
+        # We skip Conversions
+        if isinstance(stmt, Conversion):
+            continue
+
+        # If we don't have at least 2 real agents, we skip it
+        if len(agents) < 2:
+            continue
+
+        # We skip any Statements that have ungrounded Agents
+        agent_groundings = [get_ag_ns_id(agent) for agent in agents]
+        if any(ag_ns is None or ag_id is None for ag_ns, ag_id in agent_groundings):
+            continue
+
+        # We need special handling for Complexes
+        if isinstance(stmt, Complex):
+            if len(agents) > max_complex_members:
+                continue
+            agent_pairs = list(permutations(agent_groundings, 2))
+        # Otherwise we expect this to be a well behaved binary statement
+        # that we can simply turn into a relation
+        elif len(agents) == 2:
+            agent_pairs = [(agent_groundings[0], agent_groundings[1])]
+        else:
+            continue
+
+        data = {
+            "stmt_hash:int": stmt_hash,
+            "source_counts:string": json.dumps(source_count),
+            "evidence_count:int": sum(source_count.values()),
+            "stmt_type:string": stmt_json["type"],
+            "belief:float": belief,
+            "stmt_json:string": json.dumps(stmt_json),
+            "has_retracted_evidence:boolean": get_bool(has_retracted),
+            "has_database_evidence:boolean": get_bool(set(source_count) & db_sources),
+            "has_reader_evidence:boolean": get_bool(set(source_count) & reader_sources),
+            "medscan_only:boolean": get_bool(set(source_count) == {"medscan"}),
+            "sparser_only:boolean": get_bool(set(source_count) == {"sparser"}),
+        }
+        chunk_relations.append((stmt_hash, agent_pairs, data))
+    return chunk_relations
+
+
+def _get_chunk_evidences(rows):
+    # Get the PMID, text refs, evidence PMID, serialized evidence and source
+    # API of each evidence of the statements of a chunk
+    chunk_evidences = []
+    for stmt_hash_str, stmt_json_str in rows:
+        stmt_json = load_stmt_json_str(stmt_json_str)
+        evidences = []
+        for evidence in stmt_json["evidence"]:
+            tr = evidence.get("text_refs", {})
+            pmid = tr.get("PMID") or evidence.get("pmid")
+            evidences.append((
+                pmid,
+                tr,
+                evidence.get("pmid"),
+                json.dumps(evidence),
+                evidence["source_api"],
+            ))
+        chunk_evidences.append((int(stmt_hash_str), evidences))
+    return chunk_evidences
+
+
+def get_evidence_pmid(stmt_json) -> Optional[int]:
+    """Get the integer PMID cited by the first evidence of a statement json.
+
+    Parameters
+    ----------
+    stmt_json :
+        The json of a statement from the processed statements, which has a
+        single evidence.
+
+    Returns
+    -------
+    :
+        The PMID from the text refs or the PMID of the evidence, or None if
+        there is none or it isn't an integer.
+    """
+    evidence = stmt_json["evidence"][0]
+    pmid = evidence.get("text_refs", {}).get("PMID") or evidence.get("pmid")
+    if pmid is None:
+        return None
+    pmid = str(pmid)
+    return int(pmid) if pmid.isascii() and pmid.isdigit() else None
+
+
+def _get_chunk_hash_pmids(rows) -> list[tuple[int, int]]:
+    chunk_hash_pmids = []
+    for sh_str, stmt_json_str in rows:
+        pmid = get_evidence_pmid(load_stmt_json_str(stmt_json_str))
+        if pmid is not None:
+            chunk_hash_pmids.append((int(sh_str), pmid))
+    return chunk_hash_pmids
+
+
+def dump_stmt_hash_pmids(hashes: array, pmids: array, fname: Path):
+    """Save the statement hash and PMID of each evidence row.
+
+    Parameters
+    ----------
+    hashes :
+        The statement hashes as an ``array("q")``.
+    pmids :
+        The PMIDs of the evidences as an ``array("q")``, aligned with the
+        hashes.
+    fname :
+        The path to the ``.npz`` file to write.
+    """
+    # Written under a temporary name, so that an interrupted write isn't
+    # loaded later
+    tmp_fname = fname.with_name(f"{fname.name}.tmp")
+    with open(tmp_fname, "wb") as fh:
+        np.savez(
+            fh,
+            hashes=np.frombuffer(hashes, dtype=np.int64),
+            pmids=np.frombuffer(pmids, dtype=np.int64),
+        )
+    os.replace(tmp_fname, fname)
+
+
+def get_stmt_hash_pmids(
+    processed_fname: Path = processed_stmts_fname,
+    fname: Path = stmt_hash_pmids_fname,
+    workers: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Load the statement hash and PMID of each evidence, building them if needed.
+
+    The arrays are written by
+    :func:`indra_cogex.sources.indra_db.export_assembly.export_assembly` in
+    its pass over the processed statements. If they are missing or older than
+    the processed statements, they are built here with one more pass.
+
+    Parameters
+    ----------
+    processed_fname :
+        The processed statements, with one row per evidence.
+    fname :
+        The path to the ``.npz`` file with the arrays.
+    workers :
+        The number of processes decoding statements if the arrays are built.
+
+    Returns
+    -------
+    :
+        The int64 arrays of statement hashes and of the PMIDs of their
+        evidences. Evidences without an integer PMID are left out.
+    """
+    if (
+        not fname.exists()
+        or fname.stat().st_mtime < processed_fname.stat().st_mtime
+    ):
+        hashes, pmids = array("q"), array("q")
+        with open_gzip(processed_fname, "rt") as fh:
+            reader = csv.reader(fh, delimiter="\t")
+            chunks = batch_iter(reader, batch_size=STMT_CHUNK_SIZE, return_func=list)
+            for hash_pmids in tqdm(
+                imap_chunks(_get_chunk_hash_pmids, chunks, workers=workers),
+                desc="Getting evidence PMIDs",
+                unit="chunk",
+            ):
+                for stmt_hash, pmid in hash_pmids:
+                    hashes.append(stmt_hash)
+                    pmids.append(pmid)
+        dump_stmt_hash_pmids(hashes, pmids, fname)
+    with np.load(fname) as arrays:
+        return arrays["hashes"], arrays["pmids"]
+
+
 def load_text_refs_for_reading_dict(fname: str):
     text_refs = {}
     for line in tqdm(
-        gzip.open(fname, "rt", encoding="utf-8"),
+        open_gzip(fname, "rt", encoding="utf-8"),
         desc="Processing text refs for readings into a lookup dictionary",
     ):
         ids = line.strip().split("\t")
@@ -1,12 +1,14 @@
 import logging
 import csv
-import gzip
+from array import array
 from pathlib import Path
 
 import tqdm
 
 from indra.statements import stmt_from_json
 
+from indra_cogex.sources.indra_db import dump_stmt_hash_pmids, get_evidence_pmid
+from indra_cogex.sources.gzip_io import open_gzip
 from indra_cogex.sources.indra_db.locations import *
 from indra_cogex.util import load_stmt_json_str
 
@@ -82,13 +84,21 @@ def export_assembly(force: bool = False):
     )
 
     # Create grounded and unique dumps
-    # from processed statement in readonly pipeline
+    # from processed statement in readonly pipeline, and collect the PMID of
+    # each evidence for the retraction status of the statements. A missing
+    # PMID file alone doesn't rerun this, it is built from the processed
+    # statements when it is needed, see get_stmt_hash_pmids
     # Takes ~3.5 h on the server
-    if force or not grounded_stmts_fname.exists() or not unique_stmts_fname.exists():
-        with (gzip.open(processed_stmts_fname, "rt") as fh,
-              gzip.open(grounded_stmts_fname, "wt") as fh_out_gr,
-              gzip.open(unique_stmts_fname, "wt") as fh_out_uniq):
+    if (
+        force
+        or not grounded_stmts_fname.exists()
+        or not unique_stmts_fname.exists()
+    ):
+        with (open_gzip(processed_stmts_fname, "rt") as fh,
+              open_gzip(grounded_stmts_fname, "wt") as fh_out_gr,
+              open_gzip(unique_stmts_fname, "wt") as fh_out_uniq):
             seen_hashes = set()
+            hashes, pmids = array("q"), array("q")
             reader = csv.reader(fh, delimiter="\t")
             writer_gr = csv.writer(fh_out_gr, delimiter="\t")
             writer_uniq = csv.writer(fh_out_uniq, delimiter="\t")
@@ -99,7 +109,12 @@ def export_assembly(force: bool = False):
                 unit_scale=True,
                 unit="stmt"
             ):
-                stmt = stmt_from_json(load_stmt_json_str(stmt_json_str))
+                stmt_json = load_stmt_json_str(stmt_json_str)
+                pmid = get_evidence_pmid(stmt_json)
+                if pmid is not None:
+                    hashes.append(int(sh))
+                    pmids.append(pmid)
+                stmt = stmt_from_json(stmt_json)
                 if len(stmt.real_agent_list()) < 2:
                     continue
                 if all(
@@ -110,6 +125,7 @@ def export_assembly(force: bool = False):
                     if sh not in seen_hashes:
                         writer_uniq.writerow((sh, stmt_json_str))
                 seen_hashes.add(sh)
+        dump_stmt_hash_pmids(hashes, pmids, stmt_hash_pmids_fname)
     else:
         logger.info(
             f"Grounded and unique statements already dumped at "
@@ -14,6 +14,7 @@ __all__ = [
     "refinements_fname",
     "belief_scores_pkl_fname",
     "refinement_cycles_fname",
+    "stmt_hash_pmids_fname",
     "DUMP_BUCKET",
     "DUMP_PREFIX",
 ]
@@ -31,5 +32,6 @@ source_counts_fname = base_folder.join(name="source_counts.pkl")
 refinements_fname = base_folder.join(name="refinements.tsv.gz")
 belief_scores_pkl_fname = base_folder.join(name="belief_scores.pkl")
 refinement_cycles_fname = base_folder.join(name="refinement_cycles.pkl")
+stmt_hash_pmids_fname = base_folder.join(name="stmt_hash_pmids.npz")
 DUMP_BUCKET = "bigmech"
 DUMP_PREFIX = "indra-db/dumps/cogex_files/"
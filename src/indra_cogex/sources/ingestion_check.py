@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+
+"""Check the node and edge files before they are imported into Neo4j.
+
+``neo4j-admin import`` fails on duplicated node IDs and skips relationships
+to missing nodes, so the ingestion files are checked for both with
+``--check-ingestion-files``. There can be hundreds of millions of nodes, so
+instead of keeping all node ID strings in memory, each ID is reduced to a
+64-bit hash and the hashes of all nodes are kept in a sorted NumPy array:
+
+1. The node files are hashed in parallel, along with a second, independent
+   64-bit fingerprint of each ID, and the pairs are sorted. Equal adjacent
+   pairs are either duplicated IDs or collisions of both, which are told
+   apart by reading the IDs with these hashes again.
+2. The edge files are checked in parallel against the sorted pairs, which
+   the worker processes share through memory mapped files. An edge ID whose
+   hash is found is only taken as present if its fingerprint matches too,
+   so an edge ID that only has the same hash as a node ID is still reported
+   as missing.
+
+The ID strings aren't compared, so an edge ID that isn't a node ID but has
+the same hash and fingerprint as one isn't reported as missing. With 128
+bits in total, this happens with a probability of about one in 10\\
+:sup:`30` for each edge ID if there are 100 million nodes.
+
+All problems are collected in an :class:`IngestionReport` rather than
+raising on the first one.
+"""
+
+import csv
+import itertools
+import logging
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from tqdm import tqdm
+
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.parallel import imap_chunks
+from indra_cogex.sources.processor_util import (
+    DuplicateNodeIDError,
+    MissingNodeIDError,
+)
+
+__all__ = [
+    "IngestionProblem",
+    "IngestionReport",
+    "check_ingestion_files",
+    "fingerprint_ids",
+    "hash_ids",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The number of IDs hashed at a time
+ID_BATCH_SIZE = 100_000
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+#: The offset of the fingerprints, the FNV offset of a different seed
+FINGERPRINT_OFFSET = np.uint64(0x84222325CBF29CE4)
+#: The message of a missing node ID problem
+MISSING_MESSAGE = (
+    "Edge ({start})-[{type}]->({end}) references missing node ID {missing_id}."
+)
+
+
+@dataclass
+class IngestionProblem:
+    """A problem found in an ingestion file."""
+
+    #: The type of error the problem would have raised
+    error_type: Type[ValueError]
+    #: The file with the problem
+    path: Path
+    #: The number of the data row (not counting the header) with the problem
+    row: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}, row {self.row}: {self.message}"
+
+
+@dataclass
+class IngestionReport:
+    """The result of checking the ingestion files."""
+
+    n_nodes: int = 0
+    n_edges: int = 0
+    #: The number of problems, including the ones not listed in ``problems``
+    n_problems: int = 0
+    problems: List[IngestionProblem] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if no problems were found."""
+        return self.n_problems == 0
+
+
+def hash_ids(ids: Iterable[str]) -> np.ndarray:
+    """Get the 64-bit hashes of node IDs.
+
+    The IDs are hashed together in NumPy, by FNV-1a over their code points
+    followed by the MurmurHash3 finalizer to spread the bits.
+
+    Parameters
+    ----------
+    ids :
+        The node IDs, which don't contain null characters.
+
+    Returns
+    -------
+    :
+        An int64 array with the hash of each ID. The hashes don't depend on
+        the process, unlike :func:`hash`.
+    """
+    return _hash_code_points(ids, FNV_OFFSET, reverse=False)
+
+
+def fingerprint_ids(ids: Iterable[str]) -> np.ndarray:
+    """Get second 64-bit hashes of node IDs, independent of :func:`hash_ids`.
+
+    The fingerprints are calculated like the hashes, but over the code
+    points in reverse order and from a different offset, so IDs with the
+    same hash almost never have the same fingerprint.
+
+    Parameters
+    ----------
+    ids :
+        The node IDs, which don't contain null characters.
+
+    Returns
+    -------
+    :
+        An int64 array with the fingerprint of each ID.
+    """
+    return _hash_code_points(ids, FINGERPRINT_OFFSET, reverse=True)
+
+
+def _hash_code_points(ids: Iterable[str], offset: np.uint64, reverse: bool):
+    if not isinstance(ids, (list, np.ndarray)):
+        ids = list(ids)
+    ids = np.asarray(ids, dtype=str)
+    hashes = np.full(len(ids), offset, dtype=np.uint64)
+    if len(ids) and ids.dtype.itemsize:
+        # One column per code point, shorter IDs are padded with zeros
+        codes = ids.view(np.uint32).reshape(len(ids), -1)
+        columns = codes.T[::-1] if reverse else codes.T
+        for column in columns:
+            np.copyto(hashes, (hashes ^ column) * FNV_PRIME, where=column != 0)
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xFF51AFD7ED558CCD)
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xC4CEB9FE1A85EC53)
+    hashes ^= hashes >> np.uint64(33)
+    return hashes.view(np.int64)
+
+
+def _iter_batches(iterable: Iterable, batch_size: int) -> Iterable[list]:
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+def _iter_node_ids(path: Path) -> Iterable[str]:
+    with open_gzip(path, "rt") as fh:
+        reader = csv.reader(fh, delimiter="\t")
+        id_index = next(reader).index("id:ID")
+        for row in reader:
+            yield row[id_index]
+
+
+def _hash_node_file(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    # Get the hashes and fingerprints of the IDs of a node file
+    hashes, fingerprints = [], []
+    for batch in _iter_batches(_iter_node_ids(path), batch_size=ID_BATCH_SIZE):
+        ids = np.asarray(batch, dtype=str)
+        hashes.append(hash_ids(ids))
+        fingerprints.append(fingerprint_ids(ids))
+    if not hashes:
+        return np.array([], np.int64), np.array([], np.int64)
+    return np.concatenate(hashes), np.concatenate(fingerprints)
+
+
+def _find_node_ids(path: Path, hashes: np.ndarray) -> List[Tuple[str, Path, int]]:
+    # Get the IDs that have one of the given hashes and their rows
+    found = []
+    ids = _iter_node_ids(path)
+    row = 0
+    for batch in _iter_batches(ids, batch_size=ID_BATCH_SIZE):
+        for offset in np.flatnonzero(np.isin(hash_ids(batch), hashes)):
+            found.append((batch[offset], path, row + int(offset) + 1))
+        row += len(batch)
+    return found
+
+
+def _find_missing(
+    index: np.ndarray,
+    index_fingerprints: np.ndarray,
+    hashes: np.ndarray,
+    fingerprints: np.ndarray,
+) -> np.ndarray:
+    # Get the sorted offsets of the IDs whose hash and fingerprint aren't in
+    # the index of sorted (hash, fingerprint) pairs
+    # Sorted lookups are much faster in a large index
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    fingerprints = fingerprints[order]
+    starts = np.searchsorted(index, hashes, side="left")
+    ends = np.searchsorted(index, hashes, side="right")
+    counts = ends - starts
+    found = counts > 0
+    # Almost all found hashes belong to one node ID, whose fingerprint is
+    # compared directly
+    single = counts == 1
+    found[single] = (
+        index_fingerprints[starts[single]] == fingerprints[single]
+    )
+    # The hashes of several node IDs are looked up among their fingerprints
+    for offset in np.flatnonzero(counts > 1):
+        found[offset] = fingerprints[offset] in index_fingerprints[
+            starts[offset]:ends[offset]
+        ]
+    return np.sort(order[~found])
+
+
+def _check_edge_file(
+    path: Path,
+    index_path: Path,
+    fingerprints_path: Path,
+    max_problems: Optional[int],
+) -> Tuple[int, int, List[IngestionProblem]]:
+    # Get the number of edges, the number of problems and the listed
+    # problems of an edge file
+    index = np.load(index_path, mmap_mode="r")
+    index_fingerprints = np.load(fingerprints_path, mmap_mode="r")
+    n_edges = 0
+    n_problems = 0
+    problems = []
+    with open_gzip(path, "rt") as fh:
+        reader = csv.reader(fh, delimiter="\t")
+        header = next(reader)
+        start_index = header.index(":START_ID")
+        end_index = header.index(":END_ID")
+        type_index = header.index(":TYPE")
+        for rows in _iter_batches(reader, batch_size=ID_BATCH_SIZE):
+            for id_index in (start_index, end_index):
+                ids = np.asarray([row[id_index] for row in rows], dtype=str)
+                missing = _find_missing(
+                    index, index_fingerprints, hash_ids(ids), fingerprint_ids(ids)
+                )
+                n_problems += len(missing)
+                for offset in missing:
+                    if max_problems is not None and len(problems) >= max_problems:
+                        break
+                    row = rows[offset]
+                    problems.append(
+                        IngestionProblem(
+                            MissingNodeIDError,
+                            path,
+                            n_edges + int(offset) + 1,
+                            MISSING_MESSAGE.format(
+                                start=row[start_index],
+                                type=row[type_index],
+                                end=row[end_index],
+                                missing_id=row[id_index],
+                            ),
+                        )
+                    )
+            n_edges += len(rows)
+    return n_edges, n_problems, problems
+
+
+def check_ingestion_files(
+    node_paths: Sequence[Path],
+    edge_paths: Sequence[Path],
+    workers: int = 1,
+    max_problems: Optional[int] = 100,
+) -> IngestionReport:
+    """Check the ingestion files for duplicated and missing node IDs.
+
+    Parameters
+    ----------
+    node_paths :
+        The gzipped node TSV files, with an ``id:ID`` column.
+    edge_paths :
+        The gzipped edge TSV files, with ``:START_ID``, ``:END_ID`` and
+        ``:TYPE`` columns.
+    workers :
+        The number of processes hashing node files and checking edge files
+        in parallel.
+    max_problems :
+        The maximum number of missing node problems listed for each edge
+        file. All of them are counted. If None, all are listed.
+
+    Returns
+    -------
+    :
+        The report with all duplicated node IDs and the missing node IDs.
+    """
+    report = IngestionReport()
+
+    # Hash the IDs of all nodes and sort the hashes with their fingerprints
+    hash_arrays, fingerprint_arrays = [], []
+    for path, (hashes, fingerprints) in zip(
+        node_paths,
+        tqdm(
+            imap_chunks(_hash_node_file, node_paths, workers=workers),
+            total=len(node_paths),
+            desc="Hashing node IDs",
+            unit="node file",
+        ),
+    ):
+        logger.info(f"Hashed {len(hashes)} node IDs from {path}")
+        hash_arrays.append(hashes)
+        fingerprint_arrays.append(fingerprints)
+    if hash_arrays:
+        index = np.concatenate(hash_arrays)
+        fingerprints = np.concatenate(fingerprint_arrays)
+    else:
+        index = np.array([], np.int64)
+        fingerprints = np.array([], np.int64)
+    del hash_arrays, fingerprint_arrays
+    report.n_nodes = len(index)
+    order = np.lexsort((fingerprints, index))
+    index = index[order]
+    fingerprints = fingerprints[order]
+    del order
+
+    # Equal pairs are duplicated IDs or, very rarely, different IDs that have
+    # the same hash and fingerprint, so the IDs with these hashes are read
+    # again to compare them
+    is_repeated = (index[1:] == index[:-1]) & (fingerprints[1:] == fingerprints[:-1])
+    repeated = np.unique(index[1:][is_repeated])
+    if len(repeated):
+        logger.info(f"Verifying {len(repeated)} node ID hashes found more than once")
+        keep = np.concatenate(([True], ~is_repeated))
+        index = index[keep]
+        fingerprints = fingerprints[keep]
+        del keep
+        locations = defaultdict(list)
+        for found in imap_chunks(
+            partial(_find_node_ids, hashes=repeated), node_paths, workers=workers
+        ):
+            for node_id, path, row in found:
+                locations[node_id].append((path, row))
+        for node_id, id_locations in locations.items():
+            if len(id_locations) < 2:
+                continue
+            for path, row in id_locations[1:]:
+                report.n_problems += 1
+                report.problems.append(
+                    IngestionProblem(
+                        DuplicateNodeIDError,
+                        path,
+                        row,
+                        f"Duplicate node ID {node_id}, first found in "
+                        f"{id_locations[0][0]}, row {id_locations[0][1]}",
+                    )
+                )
+
+    # Check the edge files against the sorted hashes and fingerprints, which
+    # the worker processes read from memory mapped files
+    with tempfile.TemporaryDirectory(prefix="ingestion_check_") as directory:
+        index_path = Path(directory).joinpath("node_id_hashes.npy")
+        fingerprints_path = Path(directory).joinpath("node_id_fingerprints.npy")
+        np.save(index_path, index)
+        np.save(fingerprints_path, fingerprints)
+        del index, fingerprints
+        check_edge_file = partial(
+            _check_edge_file,
+            index_path=index_path,
+            fingerprints_path=fingerprints_path,
+            max_problems=max_problems,
+        )
+        for n_edges, n_problems, problems in tqdm(
+            imap_chunks(check_edge_file, edge_paths, workers=workers),
+            total=len(edge_paths),
+            desc="Checking edge files",
+            unit="edge file",
+        ):
+            report.n_edges += n_edges
+            report.n_problems += n_problems
+            report.problems.extend(problems)
+    return report
@@ -7,7 +7,6 @@ This was added in https://github.com/bgyori/indra_cogex/pull/125.
 .. seealso:: https://ftp.ebi.ac.uk/pub/databases/interpro/current_release/
 """
 
-import gzip
 import logging
 from collections import defaultdict
 from pathlib import Path
@@ -19,6 +18,7 @@ import requests
 from protmapper import uniprot_client
 from tqdm import tqdm
 
+from ..gzip_io import open_gzip
 from ..processor import Processor
 from ...representation import Node, Relation
 
@@ -218,7 +218,7 @@ def get_interpro_to_proteins(
         return dict(rv)
 
     path = module.ensure(url=INTERPRO_PROTEINS_URL, force=force)
-    with gzip.open(path, "rt") as file:
+    with open_gzip(path, "rt") as file:
         rv = _read_ipr2protein(file, interpro_ids)
 
     with cache_path.open("w") as file:
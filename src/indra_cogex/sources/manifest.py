@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""Manifests recording what the outputs of each processor were built from.
+
+After a processor dumps its nodes and edges, a manifest is written next to
+them with:
+
+- the checksums of the input files of the processor, see
+  :meth:`indra_cogex.sources.processor.Processor.get_input_paths`,
+- the version of the processor and the checksum of its source code,
+- the configuration the processor was initialized with, and
+- the digests of the manifests of the processors it depends on.
+
+It also records how the outputs were validated.
+
+The sources CLI compares the manifest with the current state to decide which
+processors to rebuild. Input files are only checksummed again if their size
+or modification time changed, so checking large inputs that didn't change is
+cheap.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Type
+
+if TYPE_CHECKING:
+    from indra_cogex.sources.processor import Processor
+
+__all__ = [
+    "InputFile",
+    "Manifest",
+    "build_manifest",
+    "diff_manifests",
+    "file_checksum",
+    "get_stale_reasons",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The number of bytes read at a time when checksumming files
+CHECKSUM_BLOCK_SIZE = 2**20
+
+
+@dataclass
+class InputFile:
+    """The state of an input file when a processor was run."""
+
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+@dataclass
+class Manifest:
+    """A record of what the outputs of a processor were built from."""
+
+    processor: str
+    version: str
+    code: str
+    config: Dict[str, Any] = field(default_factory=dict)
+    #: The input files by their path
+    inputs: Dict[str, InputFile] = field(default_factory=dict)
+    #: The digests of the manifests of the processors this one depends on
+    dependencies: Dict[str, Optional[str]] = field(default_factory=dict)
+    #: The UTC time the manifest was created, which isn't part of the digest
+    created: str = ""
+    #: The reports of the validation of the outputs by file name, which
+    #: aren't part of the digest, see :mod:`indra_cogex.sources.validation`
+    validation: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def digest(self) -> str:
+        """Get a checksum of everything the outputs depend on."""
+        content = {
+            "version": self.version,
+            "code": self.code,
+            "config": self.config,
+            "inputs": {path: f.sha256 for path, f in self.inputs.items()},
+            "dependencies": self.dependencies,
+        }
+        return hashlib.sha256(
+            json.dumps(content, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the JSON representation of the manifest."""
+        return {**asdict(self), "digest": self.digest}
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> "Manifest":
+        """Get a manifest from its JSON representation."""
+        data = dict(data)
+        data.pop("digest", None)
+        data["inputs"] = {
+            path: InputFile(**input_file)
+            for path, input_file in data.get("inputs", {}).items()
+        }
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Manifest"]:
+        """Load a manifest, or get None if the file doesn't exist."""
+        if not path.exists():
+            return None
+        with open(path) as fh:
+            return cls.from_json(json.load(fh))
+
+    def dump(self, path: Path):
+        """Write the manifest to a JSON file."""
+        with open(path, "w") as fh:
+            json.dump(self.to_json(), fh, indent=2, sort_keys=True, default=str)
+
+
+def file_checksum(path: Path) -> str:
+    """Get the SHA-256 checksum of a file."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(CHECKSUM_BLOCK_SIZE):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _get_input_file(path: Path, previous: Optional[InputFile]) -> InputFile:
+    stat = path.stat()
+    if (
+        previous is not None
+        and previous.size == stat.st_size
+        and previous.mtime_ns == stat.st_mtime_ns
+    ):
+        return previous
+    logger.info(f"Calculating the checksum of {path}")
+    return InputFile(stat.st_size, stat.st_mtime_ns, file_checksum(path))
+
+
+def get_code_checksum(processor_cls: Type["Processor"]) -> str:
+    """Get the checksum of the source file defining a processor."""
+    source_file = inspect.getsourcefile(processor_cls)
+    return file_checksum(Path(source_file)) if source_file else ""
+
+
+def build_manifest(
+    processor_cls: Type["Processor"],
+    config: Optional[Mapping[str, Any]] = None,
+    dependency_manifest_paths: Optional[Mapping[str, Path]] = None,
+    previous: Optional[Manifest] = None,
+) -> Manifest:
+    """Get the manifest of the current state of a processor's inputs.
+
+    Parameters
+    ----------
+    processor_cls :
+        The processor class.
+    config :
+        The keyword arguments the processor is initialized with.
+    dependency_manifest_paths :
+        The paths to the manifests of the processors it depends on, by their
+        name.
+    previous :
+        A previous manifest whose checksums are reused for input files with
+        the same size and modification time.
+
+    Returns
+    -------
+    :
+        The manifest.
+    """
+    previous_inputs = previous.inputs if previous else {}
+    inputs = {}
+    for path in sorted(processor_cls.get_input_paths()):
+        if path.is_file():
+            inputs[str(path)] = _get_input_file(path, previous_inputs.get(str(path)))
+    dependencies = {}
+    for name, manifest_path in sorted((dependency_manifest_paths or {}).items()):
+        dependency_manifest = Manifest.load(manifest_path)
+        dependencies[name] = dependency_manifest.digest if dependency_manifest else None
+    return Manifest(
+        processor=processor_cls.name,
+        version=str(processor_cls.version),
+        code=get_code_checksum(processor_cls),
+        # Round trip through JSON so it compares equal to a loaded manifest
+        config=json.loads(json.dumps(dict(config or {}), default=str)),
+        inputs=inputs,
+        dependencies=dependencies,
+        created=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def diff_manifests(old: Optional[Manifest], new: Manifest) -> List[str]:
+    """Get the reasons why the outputs built with one manifest are outdated.
+
+    Parameters
+    ----------
+    old :
+        The manifest the outputs were built with, or None if there is none.
+    new :
+        The current manifest.
+
+    Returns
+    -------
+    :
+        Human readable reasons, empty if nothing changed.
+    """
+    if old is None:
+        return ["no manifest"]
+    reasons = []
+    if old.version != new.version:
+        reasons.append(f"version changed from {old.version} to {new.version}")
+    if old.code != new.code:
+        reasons.append("code changed")
+    if old.config != new.config:
+        reasons.append("config changed")
+    for path in sorted(old.inputs.keys() | new.inputs.keys()):
+        if path not in new.inputs:
+            reasons.append(f"input removed: {path}")
+        elif path not in old.inputs:
+            reasons.append(f"input added: {path}")
+        elif old.inputs[path].sha256 != new.inputs[path].sha256:
+            reasons.append(f"input changed: {path}")
+    for name in sorted(old.dependencies.keys() | new.dependencies.keys()):
+        if old.dependencies.get(name) != new.dependencies.get(name):
+            reasons.append(f"dependency {name} changed")
+    return reasons
+
+
+def get_stale_reasons(
+    processor_cls: Type["Processor"],
+    config: Optional[Mapping[str, Any]] = None,
+    dependency_manifest_paths: Optional[Mapping[str, Path]] = None,
+) -> List[str]:
+    """Get the reasons why the outputs of a processor are outdated.
+
+    Parameters
+    ----------
+    processor_cls :
+        The processor class.
+    config :
+        The keyword arguments the processor would be initialized with.
+    dependency_manifest_paths :
+        The paths to the manifests of the processors it depends on, by their
+        name.
+
+    Returns
+    -------
+    :
+        Human readable reasons, empty if the outputs are up to date.
+    """
+    previous = Manifest.load(processor_cls.manifest_path)
+    current = build_manifest(
+        processor_cls, config, dependency_manifest_paths, previous=previous
+    )
+    reasons = diff_manifests(previous, current)
+    if not reasons and current.inputs != previous.inputs:
+        # Inputs were touched without changing, save their new modification
+        # times so they aren't checksummed again next time
+        previous.inputs = current.inputs
+        previous.dump(processor_cls.manifest_path)
+    return reasons
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""Parallel processing of chunks of input rows in processors.
+
+Processors that decode large files, like the INDRA statements, spend most of
+their time in CPU bound work on each row that doesn't depend on other rows.
+:func:`imap_chunks` runs such work on chunks of rows in a pool of worker
+processes while the calling process keeps reading the input and consumes the
+results in the original order, e.g., to deduplicate them.
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+__all__ = [
+    "imap_chunks",
+]
+
+logger = logging.getLogger(__name__)
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+
+
+def imap_chunks(
+    func: Callable[[X], Y],
+    chunks: Iterable[X],
+    workers: int = 1,
+    max_pending: Optional[int] = None,
+    initializer: Optional[Callable] = None,
+    initargs: Tuple = (),
+) -> Iterator[Y]:
+    """Apply a function to chunks in worker processes and yield the results in order.
+
+    Parameters
+    ----------
+    func :
+        A picklable (i.e., module level) function that gets a chunk.
+    chunks :
+        The chunks, which are read lazily, so they can come from a file.
+    workers :
+        The number of worker processes. If 1, the chunks are processed in
+        this process.
+    max_pending :
+        The maximum number of chunks submitted to the workers and not yet
+        consumed, which bounds the memory of the chunks in flight. By
+        default, twice the number of workers.
+    initializer :
+        An optional function called in each worker process before it
+        processes chunks, e.g., to load resources.
+    initargs :
+        The arguments of the initializer.
+
+    Yields
+    ------
+    :
+        The results of the function in the order of the chunks.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(func, chunks)
+        return
+
+    max_pending = max_pending or 2 * workers
+    logger.info(f"Processing chunks with {workers} worker processes")
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    )
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # If the results aren't all consumed, the chunks that haven't started
+        # are cancelled and the ones running are left to finish in the
+        # background instead of blocking the consumer
+        executor.shutdown(wait=not pending, cancel_futures=True)
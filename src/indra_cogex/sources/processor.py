@@ -3,12 +3,18 @@
 """Base classes for processors."""
 
 import csv
-import gzip
-import json
+import heapq
+import itertools
 import logging
 import pickle
+import random
+import tempfile
+import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
 from typing import (
     ClassVar,
@@ -18,30 +24,41 @@ from typing import (
     Optional,
     Mapping,
     Any,
-    Dict
+    Dict,
+    Sequence,
+    Set,
 )
 
+import bioregistry
 import click
 import pystow
 from more_click import verbose_option
 from tqdm import tqdm
 
-from indra.statements.validate import assert_valid_db_refs, assert_valid_evidence
-from indra.statements import Evidence
-
+from indra_cogex.assembly import dump_arrow_nodes
 from indra_cogex.representation import Node, Relation, dump_norm_id
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.manifest import Manifest, build_manifest
 from indra_cogex.sources.processor_util import (
     NEO4J_DATA_TYPES,
-    data_validator,
     DataTypeError,
     UnknownTypeError,
     NewLineInStringError,
     InfinityValueError,
     LabelNotAllowedError,
 )
+from indra_cogex.sources.validation import (
+    Ref,
+    ValidationPolicy,
+    ValidationReport,
+    get_invalid_ids,
+    get_invalid_values,
+    validate_items,
+)
 
 __all__ = [
     "Processor",
+    "EdgeSchema",
 ]
 
 logger = logging.getLogger(__name__)
@@ -53,6 +70,39 @@ logger = logging.getLogger(__name__)
 # data stored in /usr/local/var/neo4j/data/databases
 
 
+@dataclass(frozen=True)
+class EdgeSchema:
+    """The fixed schema of the edges of a processor that yields edge rows.
+
+    Each edge row is a tuple of the source ID, the target ID and the values
+    of the data columns in the order of :attr:`data_keys`, see
+    :meth:`Processor.get_edge_rows`.
+    """
+
+    source_ns: str
+    target_ns: str
+    rel_type: str
+    #: The data columns as Neo4j headers with their data type, e.g.,
+    #: ``"is_major_topic:boolean"``
+    data_keys: Tuple[str, ...] = ()
+
+    @property
+    def header(self) -> Tuple[str, ...]:
+        """Get the header of the edge file."""
+        return ":START_ID", ":END_ID", ":TYPE", *self.data_keys
+
+    def get_relation(self, row: Sequence) -> Relation:
+        """Get the relation of an edge row."""
+        return Relation(
+            self.source_ns,
+            row[0],
+            self.target_ns,
+            row[1],
+            self.rel_type,
+            data=dict(zip(self.data_keys, row[2:])),
+        )
+
+
 class Processor(ABC):
     """A processor creates nodes and iterables to upload to Neo4j."""
 
@@ -62,8 +112,30 @@ class Processor(ABC):
     nodes_path: ClassVar[Path]
     nodes_indra_path: ClassVar[Path]
     edges_path: ClassVar[Path]
+    manifest_path: ClassVar[Path]
     importable = True
     node_types = ClassVar[Iterable[str]]
+    #: The names of the processors whose outputs this processor reads, which
+    #: have to finish first when processors are run in parallel
+    depends_on: ClassVar[Sequence[str]] = ()
+    #: A rough estimate of the peak memory use in GB while processing, used
+    #: to limit how many processors run in parallel
+    memory: ClassVar[float] = 4.0
+    #: The maximum number of relations sorted in memory when dumping edges,
+    #: more relations are sorted in chunks that are merged from disk
+    edges_chunk_size: ClassVar[int] = 1_000_000
+    #: The version of the processor, which should be increased for changes
+    #: outside of the module of the processor that change its outputs
+    version: ClassVar[str] = "1"
+    #: The schema of the edge rows, for processors that yield edges as rows
+    #: from :meth:`get_edge_rows` rather than as relations
+    edge_schema: ClassVar[Optional[EdgeSchema]] = None
+    #: The fraction of the edge rows that are also validated as relations
+    #: on top of the column checks, see :func:`validate_edge_rows`
+    edge_row_validation_rate: ClassVar[float] = 0.0
+    #: The validation policy of the nodes and relations, by default the
+    #: configured one, see :mod:`indra_cogex.sources.validation`
+    validation_policy: ClassVar[Optional[ValidationPolicy]] = None
 
     def __init_subclass__(cls, **kwargs):
         """Initialize the class attributes."""
@@ -73,8 +145,9 @@ class Processor(ABC):
         cls.nodes_path = cls.module.join(name="nodes.tsv.gz")
         # These are nodes in the original INDRA-oriented representation
         # needed for assembly
-        cls.nodes_indra_path = cls.module.join(name="nodes.pkl")
+        cls.nodes_indra_path = cls.module.join(name="nodes.arrow")
         cls.edges_path = cls.module.join(name="edges.tsv.gz")
+        cls.manifest_path = cls.module.join(name=MANIFEST_NAME)
 
     @abstractmethod
     def get_nodes(self) -> Iterable[Node]:
@@ -84,6 +157,67 @@ class Processor(ABC):
     def get_relations(self) -> Iterable[Relation]:
         """Iterate over the relations to upload."""
 
+    def get_edge_rows(self) -> Iterable[Tuple]:
+        """Iterate over the edges to upload as rows following :attr:`edge_schema`.
+
+        Processors with hundreds of millions of edges can set
+        :attr:`edge_schema` and implement this to yield plain tuples, which
+        are dumped without creating a :class:`Relation` for each edge.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def get_input_paths(cls) -> List[Path]:
+        """Get the input files whose changes make the outputs outdated.
+
+        By default, these are the files in the directory of the processor
+        other than its outputs. Processors that read files from elsewhere
+        should override this.
+        """
+        return [
+            path
+            for path in cls.directory.rglob("*")
+            if path.is_file() and not _is_output_path(cls.directory, path)
+        ]
+
+    @classmethod
+    def write_manifest(
+        cls,
+        config: Optional[Mapping[str, Any]] = None,
+        dependency_manifest_paths: Optional[Mapping[str, Path]] = None,
+        validation_reports: Optional[Mapping[str, ValidationReport]] = None,
+    ) -> Manifest:
+        """Write the manifest of the inputs the outputs were built from.
+
+        Parameters
+        ----------
+        config :
+            The keyword arguments the processor was initialized with.
+        dependency_manifest_paths :
+            The paths to the manifests of the processors it depends on, by
+            their name.
+        validation_reports :
+            The reports of the validation of the outputs, by output file
+            name, see :attr:`validation_reports`.
+
+        Returns
+        -------
+        :
+            The manifest, see :mod:`indra_cogex.sources.manifest`.
+        """
+        manifest = build_manifest(
+            cls,
+            config,
+            dependency_manifest_paths,
+            previous=Manifest.load(cls.manifest_path),
+        )
+        manifest.validation = {
+            name: report.to_json()
+            for name, report in (validation_reports or {}).items()
+        }
+        manifest.dump(cls.manifest_path)
+        return manifest
+
     @classmethod
     def get_cli(cls) -> click.Command:
         """Get the CLI for this processor."""
@@ -94,6 +228,7 @@ class Processor(ABC):
             click.secho(f"Building {cls.name}", fg="green", bold=True)
             processor = cls()
             processor.dump()
+            cls.write_manifest(validation_reports=processor.validation_reports)
 
         return _main
 
@@ -102,6 +237,21 @@ class Processor(ABC):
         """Run the CLI for this processor."""
         cls.get_cli()()
 
+    @classmethod
+    def get_validation_policy(cls) -> ValidationPolicy:
+        """Get the validation policy of the nodes and relations."""
+        return cls.validation_policy or ValidationPolicy.from_config()
+
+    @cached_property
+    def validation_reports(self) -> Dict[str, ValidationReport]:
+        """The reports of the validation of the dumped outputs by file name."""
+        return {}
+
+    def _get_validation_report(self, path, mode: str) -> ValidationReport:
+        return self.validation_reports.setdefault(
+            Path(path).name, ValidationReport(mode=mode)
+        )
+
     def dump(self) -> Tuple[Dict[str, Path], Dict[str, List[Node]], Path]:
         """Dump the contents of this processor to CSV files ready for use in ``neo4-admin import``."""
         node_paths, nodes = self._dump_nodes()
@@ -114,7 +264,7 @@ class Processor(ABC):
         if len(cls.node_types) > 1:
             return (
                 cls.module.join(name=f"nodes_{node_type}.tsv.gz"),
-                cls.module.join(name=f"nodes_{node_type}.pkl"),
+                cls.module.join(name=f"nodes_{node_type}.arrow"),
                 cls.module.join(name=f"nodes_{node_type}_sample.tsv"),
             )
         return (
@@ -143,8 +293,7 @@ class Processor(ABC):
         for node_type in nodes_by_type:
             nodes_path, nodes_indra_path, sample_path = self._get_node_paths(node_type)
             nodes = sorted(nodes_by_type[node_type], key=lambda x: (x.db_ns, x.db_id))
-            with open(nodes_indra_path, "wb") as fh:
-                pickle.dump(nodes, fh)
+            dump_arrow_nodes(nodes, nodes_indra_path)
             self._dump_nodes_to_path(
                 nodes, nodes_path, allowed_labels=[node_type], sample_path=sample_path
             )
@@ -159,6 +308,7 @@ class Processor(ABC):
         sample_path=None,
         write_mode="wt",
     ):
+        policy = self.get_validation_policy()
         return self._dump_nodes_to_path_static(
             self.name,
             nodes,
@@ -166,6 +316,8 @@ class Processor(ABC):
             allowed_labels=allowed_labels,
             sample_path=sample_path,
             write_mode=write_mode,
+            validation_policy=policy,
+            validation_report=self._get_validation_report(nodes_path, policy.mode),
         )
 
     @staticmethod
@@ -175,170 +327,393 @@ class Processor(ABC):
         nodes_path,
         allowed_labels: list[str],
         sample_path=None,
-        write_mode="wt"
+        write_mode="wt",
+        validation_policy: Optional[ValidationPolicy] = None,
+        validation_report: Optional[ValidationReport] = None,
     ):
         # This method is static so it can be used in the node assembly process
         # when running `python -m indra_cogex.sources` without instantiating
         # the processor used (some processors load their data on
         # instantiation and this needs to be avoided in the node assembly
         # proces)
+        #
+        # The nodes can be any iterable, they are validated in a single pass.
+        # If there are more than NODES_CHUNK_SIZE of them, they are spilled to
+        # temporary files in the meantime because the columns of the data are
+        # only known after the last node was seen.
         logger.info(f"Dumping into {nodes_path}...")
-        metadata = sorted(set(key for node in nodes for key in node.data))
-        header = "id:ID", ":LABEL", *metadata
-
-        # Validate the headers
-        try:
-            validate_headers(header)
-        except TypeError as e:
-            logger.error(f"Bad node data type in header for {processor_name}")
-            raise e
-
-        # Validate the nodes
-        try:
-            nodes = list(
-                validate_nodes(nodes, metadata, allowed_labels=allowed_labels)
+        metadata_keys = set()
+        runs = []
+        chunk = []
+        with tempfile.TemporaryDirectory(
+            prefix="node_runs_", dir=Path(nodes_path).parent
+        ) as run_directory:
+            try:
+                for node in validate_nodes(
+                    nodes,
+                    [],
+                    allowed_labels=allowed_labels,
+                    policy=validation_policy,
+                    report=validation_report,
+                ):
+                    metadata_keys.update(node.data)
+                    chunk.append(node)
+                    if len(chunk) >= NODES_CHUNK_SIZE:
+                        runs.append(_dump_run(chunk, run_directory, len(runs)))
+                        chunk = []
+            except (UnknownTypeError, DataTypeError) as e:
+                logger.error(f"Bad node data type in node data values for {processor_name}")
+                raise e
+            except InfinityValueError as e:
+                logger.error(f"Infinity value detected in node data values for {processor_name}")
+                raise e
+            except NewLineInStringError as e:
+                logger.error(f"Newline in string detected in node data values for {processor_name}")
+                raise e
+            except LabelNotAllowedError as e:
+                logger.error(f"Invalid label detected in nodes for {processor_name}")
+                raise e
+
+            metadata = sorted(metadata_keys)
+            header = "id:ID", ":LABEL", *metadata
+
+            # Validate the headers
+            try:
+                validate_headers(header)
+            except TypeError as e:
+                logger.error(f"Bad node data type in header for {processor_name}")
+                raise e
+
+            nodes = itertools.chain(
+                itertools.chain.from_iterable(_iter_run(run) for run in runs), chunk
             )
-        except (UnknownTypeError, DataTypeError) as e:
-            logger.error(f"Bad node data type in node data values for {processor_name}")
-            raise e
-        except InfinityValueError as e:
-            logger.error(f"Infinity value detected in node data values for {processor_name}")
-            raise e
-        except NewLineInStringError as e:
-            logger.error(f"Newline in string detected in node data values for {processor_name}")
-            raise e
-        except LabelNotAllowedError as e:
-            logger.error(f"Invalid label detected in nodes for {processor_name}")
-            raise e
-
-        node_rows = (
-            (
-                dump_norm_id(node.db_ns, node.db_id),
-                ";".join(node.labels),
-                *[node.data.get(key, "") for key in metadata],
+            node_rows = (
+                (
+                    dump_norm_id(node.db_ns, node.db_id),
+                    ";".join(node.labels),
+                    *[node.data.get(key, "") for key in metadata],
+                )
+                for node in tqdm(nodes, desc="Node serialization", unit_scale=True)
             )
-            for node in tqdm(nodes, desc="Node serialization", unit_scale=True)
-        )
 
-        seen_ids = set()
-        with gzip.open(nodes_path, mode=write_mode) as node_file:
-            node_writer = csv.writer(node_file, delimiter="\t")  # type: ignore
-            # Only add header when writing to a new file
-            if write_mode == "wt":
-                node_writer.writerow(header)
-            if sample_path:
-                with sample_path.open("w") as node_sample_file:
-                    node_sample_writer = csv.writer(node_sample_file, delimiter="\t")
-                    node_sample_writer.writerow(header)
-                    for _, node_row in zip(range(10), node_rows):
-                        node_id = node_row[0]  # The id:ID column must be unique
-                        if node_id in seen_ids:
-                            # Neo4j requires unique node IDs
-                            raise ValueError(
-                                f"Duplicate node ID '{node_id}' found when dumping "
-                                f"nodes for {processor_name}."
-                            )
-                        seen_ids.add(node_id)
-                        node_sample_writer.writerow(node_row)
-                        node_writer.writerow(node_row)
-            # Write remaining nodes
-            node_writer.writerows(node_rows)
+            seen_ids = set()
+            with open_gzip(nodes_path, mode=write_mode) as node_file:
+                node_writer = csv.writer(node_file, delimiter="\t")  # type: ignore
+                # Only add header when writing to a new file
+                if write_mode == "wt":
+                    node_writer.writerow(header)
+                if sample_path:
+                    with sample_path.open("w") as node_sample_file:
+                        node_sample_writer = csv.writer(node_sample_file, delimiter="\t")
+                        node_sample_writer.writerow(header)
+                        for _, node_row in zip(range(10), node_rows):
+                            node_id = node_row[0]  # The id:ID column must be unique
+                            if node_id in seen_ids:
+                                # Neo4j requires unique node IDs
+                                raise ValueError(
+                                    f"Duplicate node ID '{node_id}' found when dumping "
+                                    f"nodes for {processor_name}."
+                                )
+                            seen_ids.add(node_id)
+                            node_sample_writer.writerow(node_row)
+                            node_writer.writerow(node_row)
+                # Write remaining nodes
+                node_writer.writerows(node_rows)
 
         return nodes_path
 
     def _dump_edges(self) -> Path:
         sample_path = self.module.join(name="edges_sample.tsv")
+        if self.edge_schema is not None:
+            return self._dump_edge_rows_to_path(
+                self.get_edge_rows(), self.edges_path, sample_path
+            )
         rels = self.get_relations()
         return self._dump_edges_to_path(rels, self.edges_path, sample_path)
 
     def _dump_edges_to_path(self, rels, edges_path, sample_path=None, write_mode="wt"):
+        """Dump relations sorted by their source and target to a TSV file.
+
+        The relations are streamed, so at most :attr:`edges_chunk_size` of
+        them are held in memory. Each chunk is sorted and written to a
+        temporary run file next to the output, and the runs are merged into
+        the output at the end. The columns for the relation data are the
+        union of the data keys of all relations, collected along the way.
+        """
         logger.info(f"Dumping into {edges_path}...")
 
-        rels = list(rels)
-        if len(rels) == 0:
-            raise RuntimeError(f"No relations were generated for {self.name}")
-        metadata = sorted(set(key for rel in rels for key in rel.data))
-        header = ":START_ID", ":END_ID", ":TYPE", *metadata
+        metadata_keys = set()
+        runs = []
+        chunk = []
+        with tempfile.TemporaryDirectory(
+            prefix="edge_runs_", dir=Path(edges_path).parent
+        ) as run_directory:
+            try:
+                policy = self.get_validation_policy()
+                report = self._get_validation_report(edges_path, policy.mode)
+                for rel in validate_relations(
+                    rels, [], policy=policy, report=report
+                ):
+                    metadata_keys.update(rel.data)
+                    chunk.append(_get_edge_record(rel))
+                    if len(chunk) >= self.edges_chunk_size:
+                        chunk.sort(key=_edge_sort_key)
+                        runs.append(_dump_run(chunk, run_directory, len(runs)))
+                        chunk = []
+            except (UnknownTypeError, DataTypeError) as e:
+                logger.error(f"Bad edge data type in edge data values for {self.name}")
+                raise e
+            except InfinityValueError as e:
+                logger.error(f"Infinity value detected in edge data values for {self.name}")
+                raise e
+            except NewLineInStringError as e:
+                logger.error(f"Newline in string detected in edge data values for {self.name}")
+                raise e
+            if not runs and not chunk:
+                raise RuntimeError(f"No relations were generated for {self.name}")
+
+            metadata = sorted(metadata_keys)
+            header = ":START_ID", ":END_ID", ":TYPE", *metadata
+            try:
+                validate_headers(header)
+            except TypeError as e:
+                logger.error(f"Bad edge data type in header for {self.name}")
+                raise e
+
+            # The sort and the merge are both stable, so relations with the
+            # same source and target stay in the order they were generated
+            chunk.sort(key=_edge_sort_key)
+            if runs:
+                logger.info(f"Merging {len(runs) + 1} sorted runs of edges")
+                records = heapq.merge(
+                    *(_iter_run(run) for run in runs), chunk, key=_edge_sort_key
+                )
+            else:
+                records = chunk
+
+            edge_rows = (
+                (
+                    source_curie,
+                    target_curie,
+                    rel_type,
+                    *[data.get(key) for key in metadata],
+                )
+                for _, source_curie, target_curie, rel_type, data in tqdm(
+                    records, desc="Edges", unit_scale=True
+                )
+            )
+
+            _write_edge_rows(edge_rows, header, edges_path, sample_path, write_mode)
+        return edges_path
 
+    def _dump_edge_rows_to_path(
+        self, rows: Iterable[Tuple], edges_path, sample_path=None, write_mode="wt"
+    ):
+        """Dump edge rows sorted by their source and target to a TSV file.
+
+        Like :meth:`_dump_edges_to_path`, but for the edge rows of a
+        processor with an :attr:`edge_schema`. The rows are validated in
+        batches, column by column, see :func:`validate_edge_rows`.
+        """
+        logger.info(f"Dumping edge rows into {edges_path}...")
+        schema = self.edge_schema
         try:
-            validate_headers(header)
+            validate_headers(schema.header)
         except TypeError as e:
             logger.error(f"Bad edge data type in header for {self.name}")
             raise e
-
-        try:
-            rels = validate_relations(rels, metadata)
-        except (UnknownTypeError, DataTypeError) as e:
-            logger.error(f"Bad edge data type in edge data values for {self.name}")
-            raise e
-        except InfinityValueError as e:
-            logger.error(f"Infinity value detected in edge data values for {self.name}")
-            raise e
-        except NewLineInStringError as e:
-            logger.error(f"Newline in string detected in edge data values for {self.name}")
-            raise e
-        rels = sorted(
-            rels, key=lambda r: (r.source_ns, r.source_id, r.target_ns, r.target_id)
+        rng = random.Random(0)
+        report = self._get_validation_report(
+            edges_path, "sample" if self.edge_row_validation_rate > 0 else "columns"
         )
 
-        edge_rows = (
-            (
-                dump_norm_id(rel.source_ns, rel.source_id),
-                dump_norm_id(rel.target_ns, rel.target_id),
-                rel.rel_type,
-                *[rel.data.get(key) for key in metadata],
+        runs = []
+        chunk = []
+        with tempfile.TemporaryDirectory(
+            prefix="edge_runs_", dir=Path(edges_path).parent
+        ) as run_directory:
+            iterator = iter(rows)
+            while batch := list(itertools.islice(iterator, EDGE_ROWS_BATCH_SIZE)):
+                chunk.extend(
+                    validate_edge_rows(
+                        batch,
+                        schema,
+                        self.edge_row_validation_rate,
+                        rng=rng,
+                        report=report,
+                    )
+                )
+                if len(chunk) >= self.edges_chunk_size:
+                    chunk.sort(key=_edge_row_sort_key)
+                    runs.append(_dump_run(chunk, run_directory, len(runs)))
+                    chunk = []
+            if not runs and not chunk:
+                raise RuntimeError(f"No relations were generated for {self.name}")
+
+            # The namespaces are the same for all rows, so sorting by the IDs
+            # gives the same order as for relations
+            chunk.sort(key=_edge_row_sort_key)
+            if runs:
+                logger.info(f"Merging {len(runs) + 1} sorted runs of edge rows")
+                records = heapq.merge(
+                    *(_iter_run(run) for run in runs), chunk, key=_edge_row_sort_key
+                )
+            else:
+                records = chunk
+
+            source_curie = _CurieFormatter(schema.source_ns)
+            target_curie = _CurieFormatter(schema.target_ns)
+            edge_rows = (
+                (source_curie(row[0]), target_curie(row[1]), schema.rel_type, *row[2:])
+                for row in tqdm(records, desc="Edges", unit_scale=True)
+            )
+            _write_edge_rows(
+                edge_rows, schema.header, edges_path, sample_path, write_mode
             )
-            for rel in tqdm(rels, desc="Edges", unit_scale=True)
+        return edges_path
+
+
+#: The name of the manifest file in the directory of each processor
+MANIFEST_NAME = "manifest.json"
+#: The name prefixes of the outputs and temporary files in the directory of
+#: each processor
+OUTPUT_PREFIXES = ("nodes", "edges", "node_runs_", "edge_runs_")
+
+
+def _is_output_path(directory: Path, path: Path) -> bool:
+    first_part = path.relative_to(directory).parts[0]
+    return first_part == MANIFEST_NAME or first_part.startswith(OUTPUT_PREFIXES)
+
+
+#: The maximum number of nodes held in memory when dumping nodes
+NODES_CHUNK_SIZE = 1_000_000
+#: The number of records pickled together in a temporary run file
+RUN_BLOCK_SIZE = 10_000
+#: The number of edge rows validated together
+EDGE_ROWS_BATCH_SIZE = 100_000
+#: The number of IDs whose fast CURIEs are compared with the normalized ones
+CURIE_CHECK_SIZE = 1_000
+
+
+def _write_edge_rows(edge_rows, header, edges_path, sample_path, write_mode):
+    with open_gzip(edges_path, mode=write_mode) as edge_file:
+        edge_writer = csv.writer(edge_file, delimiter="\t")  # type: ignore
+
+        # Only add header when writing to a new file
+        if write_mode == "wt":
+            edge_writer.writerow(header)
+        if sample_path:
+            with sample_path.open("w") as edge_sample_file:
+                edge_sample_writer = csv.writer(edge_sample_file, delimiter="\t")
+                edge_sample_writer.writerow(header)
+                for _, edge_row in zip(range(10), edge_rows):
+                    edge_sample_writer.writerow(edge_row)
+                    edge_writer.writerow(edge_row)
+        # Write remaining edges
+        edge_writer.writerows(edge_rows)
+
+
+_edge_row_sort_key = itemgetter(0, 1)
+
+
+class _CurieFormatter:
+    """Get the normalized CURIEs of IDs in a namespace.
+
+    Normalizing each CURIE with bioregistry takes several microseconds, so
+    the normalized prefix is looked up once and joined with the IDs. IDs
+    with a colon can have a redundant prefix that the normalization removes,
+    so they are still normalized, as are IDs that start with a prefix and an
+    underscore like ``EFO_0000400``. The first IDs are also normalized to
+    check that joining gives the same CURIEs, otherwise all IDs are.
+    """
+
+    def __init__(self, db_ns: str, check_size: int = CURIE_CHECK_SIZE):
+        self.db_ns = db_ns
+        self.prefix = dump_norm_id(db_ns, "0").rsplit(":", 1)[0]
+        self.id_prefixes = tuple(
+            f"{prefix.lower()}_" for prefix in _get_prefix_synonyms(db_ns, self.prefix)
         )
+        self.fast = True
+        self.check_size = check_size
+
+    def __call__(self, db_id: str) -> str:
+        if (
+            not self.fast
+            or ":" in db_id
+            or ("_" in db_id and db_id.lower().startswith(self.id_prefixes))
+        ):
+            return dump_norm_id(self.db_ns, db_id)
+        curie = f"{self.prefix}:{db_id}"
+        if self.check_size:
+            self.check_size -= 1
+            norm_curie = dump_norm_id(self.db_ns, db_id)
+            if curie != norm_curie:
+                logger.warning(
+                    f"Normalizing all {self.db_ns} CURIEs, {db_id} is "
+                    f"normalized to {norm_curie}"
+                )
+                self.fast = False
+                return norm_curie
+        return curie
+
+
+def _get_prefix_synonyms(db_ns: str, prefix: str) -> Set[str]:
+    prefixes = {db_ns, prefix}
+    for name in (db_ns, prefix):
+        resource = bioregistry.get_resource(name)
+        if resource is not None:
+            prefixes.add(resource.prefix)
+            prefixes.add(resource.get_preferred_prefix() or resource.prefix)
+            prefixes.update(resource.get_synonyms())
+    return prefixes
+
+
+def _get_edge_record(rel: Relation):
+    return (
+        (rel.source_ns, rel.source_id, rel.target_ns, rel.target_id),
+        dump_norm_id(rel.source_ns, rel.source_id),
+        dump_norm_id(rel.target_ns, rel.target_id),
+        rel.rel_type,
+        rel.data,
+    )
+
+
+def _edge_sort_key(record):
+    return record[0]
+
+
+def _dump_run(records, directory, index: int) -> Path:
+    path = Path(directory).joinpath(f"run_{index}.pkl")
+    logger.info(f"Writing run of {len(records)} records to {path}")
+    with open(path, "wb") as fh:
+        for start in range(0, len(records), RUN_BLOCK_SIZE):
+            pickle.dump(
+                records[start: start + RUN_BLOCK_SIZE],
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+    return path
 
-        with gzip.open(self.edges_path, mode=write_mode) as edge_file:
-            edge_writer = csv.writer(edge_file, delimiter="\t")  # type: ignore
-
-            # Only add header when writing to a new file
-            if write_mode == "wt":
-                edge_writer.writerow(header)
-            if sample_path:
-                with sample_path.open("w") as edge_sample_file:
-                    edge_sample_writer = csv.writer(edge_sample_file, delimiter="\t")
-                    edge_sample_writer.writerow(header)
-                    for _, edge_row in zip(range(10), edge_rows):
-                        edge_sample_writer.writerow(edge_row)
-                        edge_writer.writerow(edge_row)
-            # Write remaining edges
-            edge_writer.writerows(edge_rows)
-        return edges_path
 
+def _iter_run(path: Path):
+    with open(path, "rb") as fh:
+        while True:
+            try:
+                block = pickle.load(fh)
+            except EOFError:
+                return
+            yield from block
 
-def assert_valid_node(
-    db_ns: str,
-    db_id: str,
-    data: Optional[Mapping[str, Any]] = None,
-    check_data: bool = False,
-) -> Optional[Dict[str, bool]]:
-    if db_ns == "indra_evidence":
-        if data and data.get("evidence:string"):
-            ev = Evidence._from_json(json.loads(data["evidence:string"]))
-            assert_valid_evidence(ev)
-    else:
-        assert_valid_db_refs({db_ns: db_id})
-
-    if check_data and data:
-        checked_keys = {}
-        for key, value in data.items():
-            # Skip None values, mark as not checked
-            if value is None:
-                checked_keys[key] = False
-                continue
-            if ":" in key:
-                dtype = key.split(":")[1]
-            else:
-                # If no data type is specified, string is assumed by Neo4j
-                dtype = "string"
-            data_validator(dtype, value)
 
-            checked_keys[key] = True
+def _get_node_refs(node: Node) -> List[Ref]:
+    return [(node.db_ns, node.db_id, node.data)]
 
-        return checked_keys
+
+def _get_relation_refs(rel: Relation) -> List[Ref]:
+    return [
+        (rel.source_ns, rel.source_id, rel.data),
+        (rel.target_ns, rel.target_id, None),
+    ]
 
 
 def validate_nodes(
@@ -346,6 +721,8 @@ def validate_nodes(
     header: Iterable[str],
     allowed_labels: list[str],
     check_all_data: bool = True,
+    policy: Optional[ValidationPolicy] = None,
+    report: Optional[ValidationReport] = None,
 ) -> Iterable[Node]:
     """Validate the nodes before yielding them.
 
@@ -354,12 +731,19 @@ def validate_nodes(
     nodes :
         The nodes to validate.
     header :
-        The header of the output Neo4j ingest file.
+        The header of the output Neo4j ingest file. Not used, the checked
+        data keys are tracked as they are seen.
     allowed_labels :
         The allowed label for the nodes.
     check_all_data :
         If True, check all data keys in the nodes. If False, stop checking
-        when all data keys have been checked.
+        a data key once one of its values has been checked.
+    policy :
+        The validation policy, see
+        :class:`indra_cogex.sources.validation.ValidationPolicy`. By default,
+        the configured one.
+    report :
+        The validation report the counts are added to.
 
     Yields
     ------
@@ -379,54 +763,42 @@ def validate_nodes(
     LabelNotAllowedError
         If a node has a label that is not in the allowed labels.
     """
-    checked_headers = {key: False for key in header}
-    for idx, node in enumerate(nodes):
-        check_data = not all(checked_headers.values()) or check_all_data
-        try:
-            for label in node.labels:
-                if label not in allowed_labels:
-                    raise LabelNotAllowedError(
-                        f"Label '{label}' not allowed for node {node}. "
-                        f"Allowed labels: {allowed_labels}"
-                    )
-            checked_fields = assert_valid_node(
-                node.db_ns, node.db_id, node.data, check_data
-            )
-            if checked_fields:
-                for key, checked in checked_fields.items():
-                    if checked:
-                        checked_headers[key] = True
-
-            # Check if this was the iteration when all headers were checked
-            if check_data and all(checked_headers.values()) and not check_all_data:
-                logger.info(f"All node data keys checked at index {idx}. "
-                            f"Skipping the rest")
-            yield node
-        except (UnknownTypeError, DataTypeError) as e:
-            logger.error(f"{idx}: {node} - {e}")
-            logger.error("Bad node data type(s) detected")
-            raise e
-        except InfinityValueError as e:
-            logger.error(f"{idx}: {node} - {e}")
-            logger.error("Infinity value detected")
-            raise e
-        except NewLineInStringError as e:
-            logger.error(f"{idx}: {node} - {e}")
-            logger.error("Newline in string detected")
-            raise e
-        except LabelNotAllowedError as e:
-            logger.error(f"{idx}: {node} - {e}")
-            logger.error("Invalid label detected")
-            raise e
-        except Exception as e:
-            logger.info(f"{idx}: {node} - {e}")
-            continue
+
+    def check_labels(node: Node):
+        for label in node.labels:
+            if label not in allowed_labels:
+                logger.error(f"{node} - Invalid label detected")
+                raise LabelNotAllowedError(
+                    f"Label '{label}' not allowed for node {node}. "
+                    f"Allowed labels: {allowed_labels}"
+                )
+
+    try:
+        yield from validate_items(
+            nodes,
+            _get_node_refs,
+            policy=policy,
+            report=report,
+            check_all_data=check_all_data,
+            check_item=check_labels,
+        )
+    except (UnknownTypeError, DataTypeError) as e:
+        logger.error("Bad node data type(s) detected")
+        raise e
+    except InfinityValueError as e:
+        logger.error("Infinity value detected")
+        raise e
+    except NewLineInStringError as e:
+        logger.error("Newline in string detected")
+        raise e
 
 
 def validate_relations(
     relations: Iterable[Relation],
     header: Iterable[str],
     check_all_data: bool = True,
+    policy: Optional[ValidationPolicy] = None,
+    report: Optional[ValidationReport] = None,
 ) -> Iterable[Relation]:
     """Validate the relations before yielding them.
 
@@ -435,10 +807,17 @@ def validate_relations(
     relations :
         The relations to validate.
     header :
-        The header of the output Neo4j ingest file.
+        The header of the output Neo4j ingest file. Not used, the checked
+        data keys are tracked as they are seen.
     check_all_data :
-        If True, check all data keys in the relations. If False, stop checking
-        when all data keys have been checked.
+        If True, check all data keys in the relations. If False, stop
+        checking a data key once one of its values has been checked.
+    policy :
+        The validation policy, see
+        :class:`indra_cogex.sources.validation.ValidationPolicy`. By default,
+        the configured one.
+    report :
+        The validation report the counts are added to.
 
     Yields
     -------
@@ -456,39 +835,130 @@ def validate_relations(
     NewLineInStringError
         If a newline character is detected in a string value.
     """
-    checked_headers = {key: False for key in header}
-    for idx, rel in enumerate(relations):
-        try:
-            check_data = not all(checked_headers.values()) or check_all_data
-            checked_fields = assert_valid_node(
-                rel.source_ns, rel.source_id, rel.data, check_data
-            )
-            assert_valid_node(rel.target_ns, rel.target_id)
-            if checked_fields:
-                for key, checked in checked_fields.items():
-                    if checked:
-                        checked_headers[key] = True
-
-            # Check if this was the iteration when all headers were checked
-            if check_data and all(checked_headers.values()) and not check_all_data:
-                logger.info(f"All relation data keys checked at index {idx}. "
-                            f"Skipping the rest")
-            yield rel
-        except (UnknownTypeError, DataTypeError) as e:
-            logger.error(f"{idx}: {rel} - {e}")
-            logger.error("Bad relation data type(s) detected")
-            raise e
-        except InfinityValueError as e:
-            logger.error(f"{idx}: {rel} - {e}")
-            logger.error("Infinity value detected")
-            raise e
-        except NewLineInStringError as e:
-            logger.error(f"{idx}: {rel} - {e}")
-            logger.error("Newline in string detected")
-            raise e
-        except Exception as e:
-            logger.info(f"{idx}: {rel} - {e}")
+    try:
+        yield from validate_items(
+            relations,
+            _get_relation_refs,
+            policy=policy,
+            report=report,
+            check_all_data=check_all_data,
+        )
+    except (UnknownTypeError, DataTypeError) as e:
+        logger.error("Bad relation data type(s) detected")
+        raise e
+    except InfinityValueError as e:
+        logger.error("Infinity value detected")
+        raise e
+    except NewLineInStringError as e:
+        logger.error("Newline in string detected")
+        raise e
+
+
+def validate_edge_rows(
+    rows: Sequence[Tuple],
+    schema: EdgeSchema,
+    validation_rate: float = 0.0,
+    rng: Optional[random.Random] = None,
+    report: Optional[ValidationReport] = None,
+) -> List[Tuple]:
+    """Validate a batch of edge rows column by column.
+
+    Rather than validating each row like :func:`validate_relations`, the
+    distinct IDs of the source and target columns and the distinct values of
+    each data column are validated once per batch. Rows with invalid IDs are
+    dropped, like invalid relations are.
+
+    Parameters
+    ----------
+    rows :
+        The edge rows, see :meth:`Processor.get_edge_rows`.
+    schema :
+        The schema of the edge rows.
+    validation_rate :
+        The fraction of the rows that are also validated as relations with
+        :func:`validate_relations`, e.g., to check the evidence JSON of
+        ``indra_evidence`` nodes.
+    rng :
+        The random number generator picking the rows validated as
+        relations.
+    report :
+        The validation report the counts are added to.
+
+    Returns
+    -------
+    :
+        The valid rows.
+
+    Raises
+    ------
+    UnknownTypeError
+        If a data type is not recognized.
+    DataTypeError
+        If a data type does not match the value set in the header.
+    InfinityValueError
+        If an infinity value is detected in the data.
+    NewLineInStringError
+        If a newline character is detected in a string value.
+    """
+    start = time.process_time()
+    report = report if report is not None else ValidationReport(mode="columns")
+    report.n_items += len(rows)
+    for index, key in enumerate(schema.data_keys, start=2):
+        # If no data type is specified, string is assumed by Neo4j
+        dtype = key.split(":")[1] if ":" in key else "string"
+        invalid_values = get_invalid_values(dtype, (row[index] for row in rows))
+        if not invalid_values:
             continue
+        report.add_failure(key)
+        e = next(iter(invalid_values.values()))
+        if isinstance(e, InfinityValueError):
+            logger.error(f"Infinity value detected in column {key}")
+        elif isinstance(e, NewLineInStringError):
+            logger.error(f"Newline in string detected in column {key}")
+        else:
+            logger.error(f"Bad edge data type(s) detected in column {key}")
+        raise e
+
+    invalid_sources = get_invalid_ids(schema.source_ns, {row[0] for row in rows})
+    invalid_targets = get_invalid_ids(schema.target_ns, {row[1] for row in rows})
+    for db_ns, invalid in [
+        (schema.source_ns, invalid_sources),
+        (schema.target_ns, invalid_targets),
+    ]:
+        for db_id, e in invalid.items():
+            logger.info(f"{db_ns}:{db_id} - {e}")
+    if invalid_sources or invalid_targets:
+        n_rows = len(rows)
+        rows = [
+            row
+            for row in rows
+            if row[0] not in invalid_sources and row[1] not in invalid_targets
+        ]
+        report.n_dropped += n_rows - len(rows)
+        report.failures["id"] = report.failures.get("id", 0) + n_rows - len(rows)
+    report.seconds += time.process_time() - start
+    if validation_rate > 0 and rows:
+        rng = rng or random.Random()
+        n_sampled = min(len(rows), max(1, round(validation_rate * len(rows))))
+        relations = {
+            index: schema.get_relation(rows[index])
+            for index in sorted(rng.sample(range(len(rows)), n_sampled))
+        }
+        # The sampled rows are validated fully whatever the configured policy
+        valid = {
+            id(rel)
+            for rel in validate_relations(
+                relations.values(), [], policy=ValidationPolicy(), report=report
+            )
+        }
+        # The counts of the sampled rows were added by validate_relations
+        report.n_items -= n_sampled
+        rows = [
+            row
+            for index, row in enumerate(rows)
+            if index not in relations or id(relations[index]) in valid
+        ]
+    return list(rows)
 
 
 def validate_headers(headers: Iterable[str]) -> None:
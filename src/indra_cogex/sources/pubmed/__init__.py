@@ -11,23 +11,33 @@ Processors:
 """
 
 import csv
-import gzip
+import fcntl
 import json
 import logging
 import os
 from abc import abstractmethod
-from typing import Tuple, Mapping, Iterable, List, Set
+from contextlib import contextmanager
+from functools import partial, wraps
+from typing import Tuple, Mapping, Iterable, List, Optional, Set
 
 from pathlib import Path
 
+import numpy as np
 from lxml import etree
 from tqdm.std import tqdm
 from indra.util import batch_iter
 from indra.literature import pubmed_client
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.parallel import imap_chunks
 from indra_cogex.sources.utils import get_bool
 from indra_cogex.representation import Node, Relation
-from indra_cogex.sources.processor import Processor
+from indra_cogex.sources.processor import MANIFEST_NAME, EdgeSchema, Processor
 from indra_cogex.sources.pubmed.locations import *
+from indra_cogex.sources.pubmed.publication_info import get_publication_info_table
+from indra_cogex.sources.pubmed.retractions import (
+    RETRACTED_PUBLICATION_TYPE,
+    merge_retracted_pmids,
+)
 from indra_cogex.sources.indra_db.locations import text_refs_fname
 
 logger = logging.getLogger(__name__)
@@ -48,7 +58,18 @@ class PubmedProcessor(Processor):
     importable = False
     name = "pubmed"
 
-    def __init__(self):
+    def __init__(self, workers: int = 1):
+        """Initialize the PubMed processor.
+
+        Parameters
+        ----------
+        workers :
+            The number of processes processing the PubMed XML files, if they
+            weren't processed yet. Set it with e.g.
+            ``{"publication": {"workers": 16}}`` in the sources CLI
+            ``--config``.
+        """
+        self.workers = workers
         # Maps MeSH terms to PMIDs
         self.mesh_pmid_path = mesh_pmid_path
         # Maps PMIDs to years and publication types
@@ -70,8 +91,19 @@ class PubmedProcessor(Processor):
         cls.nodes_path = cls.module.join(name="nodes.tsv.gz")
         # These are nodes in the original INDRA-oriented representation
         # needed for assembly
-        cls.nodes_indra_path = cls.module.join(name="nodes.pkl")
+        cls.nodes_indra_path = cls.module.join(name="nodes.arrow")
         cls.edges_path = cls.module.join(name="edges.tsv.gz")
+        cls.manifest_path = cls.module.join(name=MANIFEST_NAME)
+
+    @classmethod
+    def get_input_paths(cls) -> List[Path]:  # noqa:D102
+        return [
+            mesh_pmid_path,
+            pmid_year_types_path,
+            pmid_nlm_path,
+            journal_info_path,
+            text_refs_fname,
+        ]
 
     def get_nodes(self) -> Iterable[Node]:
         # Ensure cached files exist
@@ -80,33 +112,28 @@ class PubmedProcessor(Processor):
             pmid_year_types_fpath=self.pmid_year_types_path,
             pmid_nlm_fpath=self.pmid_nlm_path,
             journal_info_fpath=self.journal_info_path,
+            workers=self.workers,
         )
         yield from self._get_nodes()
 
     def get_relations(self) -> Iterable[List[Relation]]:
+        # Yield batches of relations, the edges are dumped from the rows
+        # without creating relations
+        for batch in batch_iter(
+            self.get_edge_rows(), batch_size=1_000_000, return_func=list
+        ):
+            yield [self.edge_schema.get_relation(row) for row in batch]
+
+    def get_edge_rows(self) -> Iterable[Tuple]:
         # Ensure cached files exist
         process_mesh_xml_to_csv(
             mesh_pmid_fpath=self.mesh_pmid_path,
             pmid_year_types_fpath=self.pmid_year_types_path,
             pmid_nlm_fpath=self.pmid_nlm_path,
             journal_info_fpath=self.journal_info_path,
+            workers=self.workers,
         )
-        yield from self._get_relations()
-
-    def _dump_edges(self) -> Path:
-        # This overrides the default implementation in Processor because
-        # we want to process relations in batches
-        for bidx, batch in enumerate(self.get_relations()):
-            logger.info(f"Dumping relations batch {bidx}")
-            sample_path = None
-            write_mode = "at"
-            if bidx == 0:
-                sample_path = self.module.join(name="edges_sample.tsv")
-                write_mode = "wt"
-            edges_path = self._dump_edges_to_path(
-                batch, self.edges_path, sample_path, write_mode
-            )
-        return edges_path
+        yield from self._get_edge_rows()
 
     @abstractmethod
     def _get_nodes(self):
@@ -114,8 +141,8 @@ class PubmedProcessor(Processor):
         return
 
     @abstractmethod
-    def _get_relations(self):
-        """This method should be overridden by subclasses to yield relations."""
+    def _get_edge_rows(self):
+        """This method should be overridden by subclasses to yield edge rows."""
         return
 
 
@@ -123,19 +150,19 @@ class PublicationProcessor(PubmedProcessor):
     importable = True
     name = "publication"
     node_types = [PUBLICATION_NODE_TYPE, "BioEntity"]
+    edge_schema = EdgeSchema(
+        "PUBMED", "MESH", "annotated_with", ("is_major_topic:boolean",)
+    )
+    memory = 16.0
 
     def _get_nodes(self) -> Iterable[Node]:
         yield from self._get_pubmed_nodes()
         yield from self._get_mesh_nodes()
 
     def _get_pubmed_nodes(self) -> Iterable[Node]:
-        logger.info("Loading PMID year info from %s" % self.pmid_year_types_path)
-        with gzip.open(self.pmid_year_types_path, "rt") as fh:
-            pmid_years_pubtypes = {
-                pmid: (year, json.loads(types))
-                for pmid, year, types in csv.reader(fh, delimiter="\t")
-            }
-        logger.info("Loaded PMID year info from %s" % self.pmid_year_types_path)
+        publication_info = get_publication_info_table(
+            pmid_year_types_fpath=self.pmid_year_types_path
+        )
 
         def get_val(val):
             # postgres exports \N for missing values
@@ -147,12 +174,12 @@ class PublicationProcessor(PubmedProcessor):
         # We iterate over text refs to get the nodes and
         # then look up the year to add as a property
         ensure_text_refs(self.text_refs_path.as_posix())
-        with gzip.open(self.text_refs_path, "rt", encoding="utf-8") as fh:
+        with open_gzip(self.text_refs_path, "rt", encoding="utf-8") as fh:
             reader = csv.reader(fh, delimiter="\t")
             for trid, pmid, pmcid, doi, pii, url, manuscript_id in reader:
                 if not get_val(pmid):
                     continue
-                year, pubtypes = pmid_years_pubtypes.get(pmid, (None, []))
+                year, pubtypes = publication_info.get(pmid)
                 data = {
                     "trid": get_val(trid),
                     "pmcid": get_val(pmcid),
@@ -162,7 +189,7 @@ class PublicationProcessor(PubmedProcessor):
                     "manuscript_id": get_val(manuscript_id),
                     "year:int": year,
                     "publication_type:string[]": ";".join(pubtypes) or None,
-                    "retracted:boolean": get_bool("Retracted Publication" in pubtypes)
+                    "retracted:boolean": get_bool(RETRACTED_PUBLICATION_TYPE in pubtypes)
                 }
                 yield Node(
                     "PUBMED",
@@ -173,7 +200,7 @@ class PublicationProcessor(PubmedProcessor):
 
     def _get_mesh_nodes(self):
         mesh_ids = set()
-        with gzip.open(self.mesh_pmid_path, "rt") as fh:
+        with open_gzip(self.mesh_pmid_path, "rt") as fh:
             reader = csv.reader(fh)
             next(reader)  # skip header
             for mesh_id, major_topic, pmid in reader:
@@ -185,38 +212,24 @@ class PublicationProcessor(PubmedProcessor):
                 labels=["BioEntity"],
             )
 
-    def _get_relations(self) -> Iterable[List[Relation]]:
-        with gzip.open(self.mesh_pmid_path, "rt") as fh:
+    def _get_edge_rows(self) -> Iterable[Tuple[str, str, str]]:
+        # There are ~350M annotations, so they are yielded as rows rather
+        # than relations
+        is_major_topic = {"0": get_bool(False), "1": get_bool(True)}
+        with open_gzip(self.mesh_pmid_path, "rt") as fh:
             reader = csv.reader(fh)
             next(reader)  # skip header
-            # Given each line is lightweight and that total is ~350M trying
-            # with larger batch size here. Total time us typically 15-20 hours
-            # if run from scratch.
-            batch_size = 10_000_000
-            for batch in tqdm(
-                batch_iter(reader, batch_size=batch_size, return_func=list)
-            ):
-                relations_batch = []
-                for mesh_id, major_topic, pmid in batch:
-                    relations_batch.append(
-                        Relation(
-                            "PUBMED",
-                            pmid,
-                            "MESH",
-                            mesh_id,
-                            "annotated_with",
-                            data={
-                                "is_major_topic:boolean": get_bool(major_topic == "1")
-                            },
-                        )
-                    )
-                yield relations_batch
+            for mesh_id, major_topic, pmid in reader:
+                yield pmid, mesh_id, is_major_topic[major_topic]
 
 
 class JournalProcessor(PubmedProcessor):
     importable = True
     name = "journal"
     node_types = [JOURNAL_NODE_TYPE, PUBLICATION_NODE_TYPE]
+    edge_schema = EdgeSchema("PUBMED", "NLM", "published_in")
+    # The PubMed files are created by the PublicationProcessor
+    depends_on = ["publication"]
 
     def _get_nodes(self) -> Iterable[Node]:
         yield from self._get_journal_nodes()
@@ -225,7 +238,7 @@ class JournalProcessor(PubmedProcessor):
     def _get_journal_nodes(self) -> Iterable[Node]:
         # Load the journal info
         logger.info("Loading journal info from %s" % self.journal_info_path)
-        with gzip.open(self.journal_info_path, "rt") as fh:
+        with open_gzip(self.journal_info_path, "rt") as fh:
             reader = csv.reader(fh, delimiter="\t")
             next(reader)  # skip header
             for (
@@ -260,7 +273,7 @@ class JournalProcessor(PubmedProcessor):
 
     def _get_pubmed_nodes(self) -> Iterable[Node]:
         logger.info("Loading PMIDs from %s" % self.pmid_nlm_path)
-        with gzip.open(self.pmid_nlm_path, "rt") as fh:
+        with open_gzip(self.pmid_nlm_path, "rt") as fh:
             reader = csv.reader(fh)
             next(reader)  # skip header
             pmids = set()
@@ -273,30 +286,15 @@ class JournalProcessor(PubmedProcessor):
                 labels=[PUBLICATION_NODE_TYPE],
             )
 
-    def _get_relations(self) -> Iterable[List[Relation]]:
-        # Yield batches of relations
-        with gzip.open(self.pmid_nlm_path, "rt") as fh:
+    def _get_edge_rows(self) -> Iterable[Tuple[str, str]]:
+        with open_gzip(self.pmid_nlm_path, "rt") as fh:
             reader = csv.reader(fh)
             # Skip header
             next(reader)
-            # The file has more than 37M lines - a batch size of 1M is
-            # reasonable
-            batch_size = 1_000_000
-            for batch in batch_iter(
-                    reader, batch_size=batch_size, return_func=list
-            ):
-                relations_batch = []
-                for pmid, journal_nlm_id in batch:
-                    relations_batch.append(
-                        Relation(
-                            "PUBMED",
-                            pmid,
-                            "NLM",
-                            journal_nlm_id,
-                            "published_in",
-                        )
-                    )
-                yield relations_batch
+            # The file has more than 37M lines, which are yielded as rows
+            # rather than relations
+            for pmid, journal_nlm_id in reader:
+                yield pmid, journal_nlm_id
 
 
 def ensure_text_refs(fname):
@@ -320,8 +318,22 @@ def ensure_text_refs(fname):
     )
 
 
+def _iter_medline_elements(xml_path: str) -> Iterable[etree._Element]:
+    # Parse the file incrementally and clear the elements that were handled,
+    # so that the tree of a whole file is never in memory
+    with open_gzip(xml_path, "rb") as fh:
+        for _, element in etree.iterparse(
+            fh, events=("end",), tag=("PubmedArticle", "DeleteCitation")
+        ):
+            yield element
+            element.clear(keep_tail=True)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
 def extract_info_from_medline_xml(
     xml_path: str,
+    deleted_pmids: Optional[List[str]] = None,
 ) -> Iterable[Tuple[str, int, Mapping, Mapping, Set[str]]]:
     """Extract info from medline xml file.
 
@@ -329,6 +341,9 @@ def extract_info_from_medline_xml(
     ----------
     xml_path :
         Path to medline xml.gz file.
+    deleted_pmids :
+        If given, the PMIDs of the citations deleted by the file, which only
+        update files have, are appended to it.
 
     Yields
     ------
@@ -340,22 +355,29 @@ def extract_info_from_medline_xml(
             - journal info,
             - publication type tags
     """
-    tree = etree.parse(xml_path)
+    for element in _iter_medline_elements(xml_path):
+        if element.tag == "DeleteCitation":
+            if deleted_pmids is not None:
+                deleted_pmids.extend(pmid.text for pmid in element.findall("PMID"))
+            continue
 
-    for article in tree.findall("PubmedArticle"):
-        meta_data = pubmed_client.get_metadata_from_pubmed_article(article)
+        meta_data = pubmed_client.get_metadata_from_pubmed_article(element)
+        pmid = meta_data["pmid"]
         year = meta_data["publication_date"].get("year")
         if year is None:
             logger.warning(f"Could not find year for PMID {pmid}")
 
-        pmid = meta_data["pmid"]
-
-        medline_citation = article.find("MedlineCitation")
+        medline_citation = element.find("MedlineCitation")
         journal_info = pubmed_client.get_issn_info(
             medline_citation, get_issns_from_nlm="missing"
         )
 
-        pub_tags = meta_data["publication_types"]
+        # Newer versions of INDRA get the publication types with their MeSH
+        # IDs, only their names are used here
+        pub_tags = [
+            pub_type["type"] if isinstance(pub_type, dict) else pub_type
+            for pub_type in meta_data["publication_types"] or []
+        ]
         yield (
             pmid,
             year,
@@ -365,6 +387,160 @@ def extract_info_from_medline_xml(
         )
 
 
+def _get_shard_paths(xml_path: Path, shard_directory: Path) -> Tuple[Path, Path]:
+    stem = xml_path.name.removesuffix(".xml.gz")
+    return (
+        shard_directory.joinpath(f"{stem}.jsonl.gz"),
+        shard_directory.joinpath(f"{stem}_pmids.npy"),
+    )
+
+
+def _is_shard_done(xml_path: Path, shard_directory: Path) -> bool:
+    records_path, pmids_path = _get_shard_paths(xml_path, shard_directory)
+    return (
+        records_path.exists()
+        and pmids_path.exists()
+        and records_path.stat().st_mtime_ns >= xml_path.stat().st_mtime_ns
+    )
+
+
+def process_medline_xml_to_shard(xml_path: Path, shard_directory: Path) -> Path:
+    """Extract the info from a MEDLINE XML file into a shard.
+
+    The shard is a gzipped JSON lines file with one record per article in
+    the file, followed by one record per deleted citation, and a NumPy array
+    of the integer PMIDs of these records. The shard only exists once it is
+    complete, so it serves as the checkpoint of the XML file.
+
+    Parameters
+    ----------
+    xml_path :
+        Path to medline xml.gz file.
+    shard_directory :
+        The directory the shard is written to.
+
+    Returns
+    -------
+    :
+        The path to the records of the shard.
+    """
+    records_path, pmids_path = _get_shard_paths(xml_path, shard_directory)
+    tmp_records_path = records_path.with_name(f"{records_path.name}.tmp")
+    tmp_pmids_path = pmids_path.with_name(f"{pmids_path.name}.tmp")
+    pmids = []
+    deleted_pmids = []
+    # Files are processed in parallel, so each is compressed in one thread
+    with open_gzip(tmp_records_path, "wt", threads=1) as fh:
+        for (
+            pmid, year, mesh_annotations, journal_info, publication_types
+        ) in extract_info_from_medline_xml(xml_path.as_posix(), deleted_pmids):
+            record = {
+                "pmid": pmid,
+                "year": year,
+                "publication_types": sorted(publication_types),
+                "mesh_annotations": [
+                    [annot["mesh"], annot["major_topic"]]
+                    for annot in mesh_annotations
+                ],
+                "journal_info": {
+                    key: journal_info[key]
+                    for key in [
+                        "journal_nlm_id",
+                        "journal_title",
+                        "journal_abbrev",
+                        "issn_dict",
+                    ]
+                },
+            }
+            fh.write(json.dumps(record) + "\n")
+            pmids.append(pmid)
+        for pmid in deleted_pmids:
+            fh.write(json.dumps({"pmid": pmid, "deleted": True}) + "\n")
+            pmids.append(pmid)
+    with open(tmp_pmids_path, "wb") as fh:
+        np.save(fh, np.array(pmids, dtype=np.int64))
+    # Moving the records last marks the shard as complete
+    os.replace(tmp_pmids_path, pmids_path)
+    os.replace(tmp_records_path, records_path)
+    return records_path
+
+
+def get_latest_record_masks(pmid_arrays: List[np.ndarray]) -> List[np.ndarray]:
+    """Get which records of each shard are the latest ones of their PMID.
+
+    Parameters
+    ----------
+    pmid_arrays :
+        The PMIDs of the records of each shard, with the shards in the order
+        of their XML files, i.e., the baseline files followed by the update
+        files.
+
+    Returns
+    -------
+    :
+        A boolean array for each shard, which is True for the records that
+        aren't superseded by a later record of the same PMID.
+    """
+    if not pmid_arrays:
+        return []
+    pmids = np.concatenate(pmid_arrays)
+    # A stable sort keeps the records of each PMID in order, so the last one
+    # of each run of equal PMIDs is the latest
+    order = np.argsort(pmids, kind="stable")
+    sorted_pmids = pmids[order]
+    is_last = np.append(sorted_pmids[1:] != sorted_pmids[:-1], True)
+    is_latest = np.zeros(len(pmids), dtype=bool)
+    is_latest[order[is_last]] = True
+    offsets = np.cumsum([len(pmid_array) for pmid_array in pmid_arrays])[:-1]
+    return np.split(is_latest, offsets)
+
+
+def _iter_latest_records(
+    xml_paths: List[Path], shard_directory: Path
+) -> Iterable[Mapping]:
+    pmid_arrays = []
+    for xml_path in xml_paths:
+        _, pmids_path = _get_shard_paths(xml_path, shard_directory)
+        pmid_arrays.append(np.load(pmids_path))
+    masks = get_latest_record_masks(pmid_arrays)
+    del pmid_arrays
+    for xml_path, mask in zip(
+        tqdm(xml_paths, desc="Merging XML shards", unit="file"), masks
+    ):
+        records_path, _ = _get_shard_paths(xml_path, shard_directory)
+        with open_gzip(records_path, "rt") as fh:
+            for line, is_latest in zip(fh, mask):
+                if not is_latest:
+                    continue
+                record = json.loads(line)
+                # Deleted citations supersede earlier records but have no
+                # info themselves
+                if not record.get("deleted"):
+                    yield record
+
+
+@contextmanager
+def _lock_xml_processing(lock_path: Path = xml_processing_lock_path):
+    # Processors that run in parallel may all need the PubMed source files, so
+    # only one process at a time processes the XML files
+    with open(lock_path, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _with_xml_processing_lock(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _lock_xml_processing():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@_with_xml_processing_lock
 def process_mesh_xml_to_csv(
     mesh_pmid_fpath: Path = mesh_pmid_path,
     pmid_year_types_fpath: Path = pmid_year_types_path,
@@ -373,7 +549,10 @@ def process_mesh_xml_to_csv(
     issn_nlm_map_fpath: Path = issn_nlm_map_path,
     raise_http_error: bool = True,
     raise_checksum_error: bool = True,
-    force: bool = False
+    force: bool = False,
+    retracted_pmids_fpath: Path = retracted_pmids_path,
+    workers: int = 1,
+    shard_directory: Path = xml_shards.base,
 ):
     """Process the pubmed xml and dump to different CSV files
 
@@ -389,6 +568,20 @@ def process_mesh_xml_to_csv(
           e_issn, other
         - issn_nlm_map_fpath - gzipped CSV file with columns:
           issn, nlm_id
+        - retracted_pmids_fpath - numpy array of the sorted integer PMIDs of
+          retracted publications, see
+          :mod:`indra_cogex.sources.pubmed.retractions`
+
+    Only one process at a time runs this function, so processors that run in
+    parallel and find the files missing process the XML files once.
+
+    The XML files are first processed in parallel into one shard per file,
+    see :func:`process_medline_xml_to_shard`. The shards are kept, so an
+    interrupted run, or a run after new update files were downloaded, only
+    processes the XML files without a shard. The shards are then merged in
+    the order of the XML files. If a PMID is in several files, only its
+    record from the last file is used, so update files take precedence over
+    the baseline files, and PMIDs deleted by an update file are left out.
 
     Parameters
     ----------
@@ -411,8 +604,14 @@ def process_mesh_xml_to_csv(
         If True, will raise error instead of skipping the XML file when
         checksums do not match. Default: True.
     force :
-        If True, re-run the download even if the files already exists. Default:
-        False.
+        If True, re-run the download and the processing of all XML files even
+        if the files already exists. Default: False.
+    retracted_pmids_fpath :
+        Path to the retracted PMIDs array
+    workers :
+        The number of processes processing XML files. Default: 1.
+    shard_directory :
+        The directory of the shards of the XML files.
     """
     if not force and mesh_pmid_fpath.exists() and pmid_year_types_fpath.exists() and \
             pmid_nlm_fpath.exists() and journal_info_fpath.exists():
@@ -432,13 +631,54 @@ def process_mesh_xml_to_csv(
         max_workers=4,
     )
 
-    # Loop the stowed xml files
+    # The update files are numbered after the baseline files, so sorting by
+    # name puts all files in the order they were published
+    xml_paths = sorted(raw_xml.base.glob("*.xml.gz"))
+    shard_directory.mkdir(parents=True, exist_ok=True)
+    todo_paths = [
+        xml_path for xml_path in xml_paths
+        if force or not _is_shard_done(xml_path, shard_directory)
+    ]
+    if len(todo_paths) < len(xml_paths):
+        logger.info(
+            f"Reusing the shards of {len(xml_paths) - len(todo_paths)} of "
+            f"{len(xml_paths)} XML files processed before"
+        )
     logger.info("Processing PubMed XML files")
-    with gzip.open(mesh_pmid_fpath, "wt") as fh_mesh, \
-            gzip.open(pmid_year_types_fpath, "wt") as fh_year_types, \
-            gzip.open(pmid_nlm_fpath, "wt") as fh_journal, \
-            gzip.open(journal_info_fpath, "wt") as fh_journal_info, \
-            gzip.open(issn_nlm_map_fpath, "wt") as fh_issn_nlm_map:
+    for _ in tqdm(
+        imap_chunks(
+            partial(process_medline_xml_to_shard, shard_directory=shard_directory),
+            todo_paths,
+            workers=workers,
+        ),
+        total=len(todo_paths),
+        desc="Processing XML",
+        unit="file",
+    ):
+        pass
+
+    # Merge the shards. The files are written under temporary names, so that
+    # the files of an interrupted merge are never taken as complete
+    out_paths = [
+        mesh_pmid_fpath,
+        pmid_year_types_fpath,
+        pmid_nlm_fpath,
+        journal_info_fpath,
+        issn_nlm_map_fpath,
+    ]
+    tmp_paths = [path.with_name(f"{path.name}.tmp") for path in out_paths]
+    (
+        tmp_mesh_pmid_fpath,
+        tmp_pmid_year_types_fpath,
+        tmp_pmid_nlm_fpath,
+        tmp_journal_info_fpath,
+        tmp_issn_nlm_map_fpath,
+    ) = tmp_paths
+    with open_gzip(tmp_mesh_pmid_fpath, "wt") as fh_mesh, \
+            open_gzip(tmp_pmid_year_types_fpath, "wt") as fh_year_types, \
+            open_gzip(tmp_pmid_nlm_fpath, "wt") as fh_journal, \
+            open_gzip(tmp_journal_info_fpath, "wt") as fh_journal_info, \
+            open_gzip(tmp_issn_nlm_map_fpath, "wt") as fh_issn_nlm_map:
 
         # Get the CSV writers
         writer_mesh = csv.writer(fh_mesh, delimiter=",")
@@ -459,102 +699,111 @@ def process_mesh_xml_to_csv(
         )
         writer_issn_nlm_map.writerow(["issn", "nlm_id"])
         used_nlm_ids = set()
-        yielded_pmid_nlm_links = set()
+        retracted_pmids = []
         yielded_issn_nlm_links = set()
-        for xml_path in tqdm(
-            list(raw_xml.glob("*.xml.gz")),
-            description="Processing XML",
-            unit="file",
-        ):
-            for (
-                    pmid, year, mesh_annotations, journal_info, publication_types
-            ) in extract_info_from_medline_xml(xml_path.as_posix()):
-                # Write one row per mesh annotation
-                for annot in mesh_annotations:
-                    writer_mesh.writerow(
-                        [
-                            annot["mesh"],
-                            1 if annot["major_topic"] else 0,
-                            pmid
-                        ]
-                    )
-
-                # One row per pmid,year,publication type
-                writer_year_types.writerow(
-                    [pmid, year, json.dumps(sorted(publication_types))]
+        # Each PMID has one record, so its rows are only written once
+        for record in _iter_latest_records(xml_paths, shard_directory):
+            pmid = record["pmid"]
+            publication_types = record["publication_types"]
+            journal_info = record["journal_info"]
+
+            # Write one row per mesh annotation
+            for mesh_id, major_topic in record["mesh_annotations"]:
+                writer_mesh.writerow(
+                    [
+                        mesh_id,
+                        1 if major_topic else 0,
+                        pmid
+                    ]
                 )
 
-                # One row per nlm_id-pmid connection
-                # issn_dict structure:
-                # {
-                #    "issn": "1234-5678",
-                #    "issn_l": "1234-5678",
-                #    "issn_type": "electronic"|"print"|"other",
-                #    "alternate_issns": [
-                #        ("linking"|"electronic"|"print"|"other", "1234-5678"),
-                #        ...
-                #    ],
-                issn_dict = journal_info["issn_dict"]
-                nlm_id = journal_info["journal_nlm_id"]
-                pmid_nlm_link = (pmid, nlm_id)
-                if pmid_nlm_link not in yielded_pmid_nlm_links:
-                    writer_journal.writerow(pmid_nlm_link)
-                    yielded_pmid_nlm_links.add(pmid_nlm_link)
-
-                # Get all issns
-                issn_set = {issn_dict.get("issn"), issn_dict.get("issn_l")}
+            # One row per pmid,year,publication type
+            writer_year_types.writerow(
+                [pmid, record["year"], json.dumps(publication_types)]
+            )
+            if RETRACTED_PUBLICATION_TYPE in publication_types:
+                retracted_pmids.append(pmid)
+
+            # One row per nlm_id-pmid connection
+            # issn_dict structure:
+            # {
+            #    "issn": "1234-5678",
+            #    "issn_l": "1234-5678",
+            #    "issn_type": "electronic"|"print"|"other",
+            #    "alternate_issns": [
+            #        ("linking"|"electronic"|"print"|"other", "1234-5678"),
+            #        ...
+            #    ],
+            issn_dict = journal_info["issn_dict"]
+            nlm_id = journal_info["journal_nlm_id"]
+            writer_journal.writerow((pmid, nlm_id))
+
+            # Get all issns
+            issn_set = {issn_dict.get("issn"), issn_dict.get("issn_l")}
+            if issn_dict.get("alternate_issns"):
+                issn_set |= {
+                    issn for _, issn in issn_dict["alternate_issns"]
+                }
+
+            # Remove None
+            issn_set -= {None}
+
+            # One row per issn-nlm_id connection
+            for issn in issn_set:
+                issn_nlm_link = (issn, nlm_id)
+                if issn_nlm_link not in yielded_issn_nlm_links:
+                    writer_issn_nlm_map.writerow(issn_nlm_link)
+                    yielded_issn_nlm_links.add(issn_nlm_link)
+
+            # One row per journal, i.e. nlm id
+            if nlm_id not in used_nlm_ids:
+                issn_type = issn_dict.get("issn_type", "other")
+                issn = issn_dict.get("issn")
+                issn_l = issn_dict.get("issn_l")
+                if issn_type == "electronic":
+                    e_issn = issn
+                    p_issn = None
+                elif issn_type == "print":
+                    e_issn = None
+                    p_issn = issn
+                else:
+                    e_issn = None
+                    p_issn = None
+
                 if issn_dict.get("alternate_issns"):
-                    issn_set |= {
-                        issn for _, issn in issn_dict["alternate_issns"]
-                    }
-
-                # Remove None
-                issn_set -= {None}
-
-                # One row per issn-nlm_id connection
-                for issn in issn_set:
-                    issn_nlm_link = (issn, nlm_id)
-                    if issn_nlm_link not in yielded_issn_nlm_links:
-                        writer_issn_nlm_map.writerow(issn_nlm_link)
-                        yielded_issn_nlm_links.add(issn_nlm_link)
-
-                # One row per journal, i.e. nlm id
-                if nlm_id not in used_nlm_ids:
-                    issn_type = issn_dict.get("issn_type", "other")
-                    issn = issn_dict.get("issn")
-                    issn_l = issn_dict.get("issn_l")
-                    if issn_type == "electronic":
-                        e_issn = issn
-                        p_issn = None
-                    elif issn_type == "print":
-                        e_issn = None
-                        p_issn = issn
-                    else:
-                        e_issn = None
-                        p_issn = None
-
-                    if issn_dict.get("alternate_issns"):
-                        other_issns = set()
-                        for issn_type, issn_val in issn_dict["alternate_issns"]:
-                            if issn_type == "electronic" and not e_issn:
-                                e_issn = issn_val
-                            elif issn_type == "print" and not p_issn:
-                                p_issn = issn_val
-                            elif issn_type not in ("electronic", "print"):
-                                other_issns.add(issn_val)
-                        other_issns -= {issn, issn_l, None}
-                    else:
-                        other_issns = set()
-                    writer_journal_info.writerow(
-                        [
-                            nlm_id,
-                            journal_info["journal_title"],
-                            journal_info["journal_abbrev"],
-                            issn,
-                            issn_l,
-                            p_issn,
-                            e_issn,
-                            json.dumps(list(other_issns))
-                        ]
-                    )
-                    used_nlm_ids.add(journal_info["journal_nlm_id"])
+                    other_issns = set()
+                    for issn_type, issn_val in issn_dict["alternate_issns"]:
+                        if issn_type == "electronic" and not e_issn:
+                            e_issn = issn_val
+                        elif issn_type == "print" and not p_issn:
+                            p_issn = issn_val
+                        elif issn_type not in ("electronic", "print"):
+                            other_issns.add(issn_val)
+                    other_issns -= {issn, issn_l, None}
+                else:
+                    other_issns = set()
+                writer_journal_info.writerow(
+                    [
+                        nlm_id,
+                        journal_info["journal_title"],
+                        journal_info["journal_abbrev"],
+                        issn,
+                        issn_l,
+                        p_issn,
+                        e_issn,
+                        json.dumps(list(other_issns))
+                    ]
+                )
+                used_nlm_ids.add(nlm_id)
+
+    # The retraction index is built in the same pass so that processors
+    # don't have to read the publication types again
+    tmp_retracted_pmids_fpath = retracted_pmids_fpath.with_name(
+        f"{retracted_pmids_fpath.name}.tmp"
+    )
+    with open(tmp_retracted_pmids_fpath, "wb") as fh:
+        np.save(fh, merge_retracted_pmids(retracted_pmids))
+    for tmp_path, out_path in zip(tmp_paths, out_paths):
+        os.replace(tmp_path, out_path)
+    # Moved last, so the index is never older than the publication types
+    os.replace(tmp_retracted_pmids_fpath, retracted_pmids_fpath)
@@ -1,13 +1,23 @@
 import pystow
 
 __all__ = ["resources", "raw_xml", "issn_nlm_map_path", "mesh_pmid_path",
-           "pmid_year_types_path", "pmid_nlm_path", "journal_info_path"]
+           "pmid_year_types_path", "pmid_year_types_table_path",
+           "pmid_nlm_path", "journal_info_path",
+           "retracted_pmids_path", "xml_processing_lock_path", "xml_shards"]
 
 resources = pystow.module("indra", "cogex", "pubmed")
 raw_xml = pystow.module("indra", "cogex", "pubmed", "raw_xml")
+# The info extracted from each XML file, see process_mesh_xml_to_csv
+xml_shards = pystow.module("indra", "cogex", "pubmed", "xml_shards")
 # For mapping ISSN to NLM (many-to-one mapping)
 issn_nlm_map_path = resources.join(name="issn_nlm_map.csv.gz")
 mesh_pmid_path = resources.join(name="mesh_pmids.csv.gz")
 pmid_year_types_path = resources.join(name="pmid_years_types.tsv.gz")
+# The columns of pmid_year_types_path, see publication_info
+pmid_year_types_table_path = resources.join(name="pmid_years_types.npz")
 pmid_nlm_path = resources.join(name="pmid_nlm.csv.gz")
 journal_info_path = resources.join(name="journal_info.tsv.gz")
+# Sorted integer PMIDs of retracted publications
+retracted_pmids_path = resources.join(name="retracted_pmids.npy")
+# Held while the XML files are processed, see process_mesh_xml_to_csv
+xml_processing_lock_path = resources.join(name="xml_processing.lock")
@@ -0,0 +1,235 @@
+"""A compact table of the year and publication types of PubMed articles.
+
+The year and publication types of each PMID in the processed PubMed XML are
+used for the Publication nodes of both
+:class:`indra_cogex.sources.pubmed.PublicationProcessor` and
+:class:`indra_cogex.sources.indra_db.EvidenceProcessor`. With tens of
+millions of articles, a dict of strings to tuples of decoded lists takes
+many GB, so the table is kept as columns instead:
+
+- the sorted integer PMIDs, which are looked up with binary search,
+- the year of each PMID, and
+- the index of the publication types of each PMID in the list of distinct
+  combinations of publication types, of which there are only a few thousand.
+
+The columns are saved next to the other PubMed source files so that they are
+only built from the TSV file once.
+"""
+
+import csv
+import json
+import logging
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.pubmed.locations import (
+    pmid_year_types_path,
+    pmid_year_types_table_path,
+)
+
+__all__ = [
+    "PublicationInfoTable",
+    "build_publication_info_table",
+    "get_publication_info_table",
+]
+
+logger = logging.getLogger(__name__)
+
+#: The year of the PMIDs without one
+MISSING_YEAR = -1
+
+
+class PublicationInfoTable:
+    """Look up the year and publication types of PubMed articles."""
+
+    def __init__(
+        self,
+        pmids: np.ndarray,
+        years: np.ndarray,
+        type_ids: np.ndarray,
+        publication_types: Sequence[Sequence[str]],
+    ):
+        """Initialize the table.
+
+        Parameters
+        ----------
+        pmids :
+            The sorted, unique integer PMIDs.
+        years :
+            The year of each PMID, :data:`MISSING_YEAR` if it has none.
+        type_ids :
+            The index of the publication types of each PMID in
+            ``publication_types``.
+        publication_types :
+            The distinct lists of publication types.
+        """
+        self.pmids = pmids
+        self.years = years
+        self.type_ids = type_ids
+        self.publication_types = [tuple(types) for types in publication_types]
+
+    def __len__(self) -> int:
+        return len(self.pmids)
+
+    def get(
+        self, pmid: Union[None, int, str]
+    ) -> Tuple[Optional[int], Tuple[str, ...]]:
+        """Get the year and publication types of an article.
+
+        Parameters
+        ----------
+        pmid :
+            The PMID of the article.
+
+        Returns
+        -------
+        :
+            The year, or None if it isn't known, and the publication types,
+            which are empty if they aren't known.
+        """
+        if isinstance(pmid, str):
+            if not (pmid.isascii() and pmid.isdigit()):
+                return None, ()
+            pmid = int(pmid)
+        elif pmid is None:
+            return None, ()
+        position = int(np.searchsorted(self.pmids, pmid))
+        if position == len(self.pmids) or self.pmids[position] != pmid:
+            return None, ()
+        year = int(self.years[position])
+        return (
+            None if year == MISSING_YEAR else year,
+            self.publication_types[self.type_ids[position]],
+        )
+
+    def save(self, path: Path):
+        """Save the table to a ``.npz`` file.
+
+        Parameters
+        ----------
+        path :
+            The path to write to.
+        """
+        np.savez(
+            path,
+            pmids=self.pmids,
+            years=self.years,
+            type_ids=self.type_ids,
+            publication_types=np.array(
+                [json.dumps(types) for types in self.publication_types], dtype=str
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "PublicationInfoTable":
+        """Load a table saved with :meth:`save`.
+
+        Parameters
+        ----------
+        path :
+            The path to the ``.npz`` file.
+
+        Returns
+        -------
+        :
+            The table.
+        """
+        with np.load(path) as arrays:
+            return cls(
+                arrays["pmids"],
+                arrays["years"],
+                arrays["type_ids"],
+                [json.loads(types) for types in arrays["publication_types"]],
+            )
+
+
+def build_publication_info_table(
+    pmid_year_types_fpath: Path = pmid_year_types_path,
+) -> PublicationInfoTable:
+    """Get the table of publication info from the PubMed source files.
+
+    Parameters
+    ----------
+    pmid_year_types_fpath :
+        The gzipped TSV file with the columns pmid, year and the json list of
+        publication types, created by
+        :func:`indra_cogex.sources.pubmed.process_mesh_xml_to_csv`.
+
+    Returns
+    -------
+    :
+        The table. Rows whose PMID isn't an integer are left out, and the
+        last row of a PMID is used if there is more than one.
+    """
+    logger.info(f"Building the publication info table from {pmid_year_types_fpath}")
+    pmids, years, type_ids = array("q"), array("h"), array("i")
+    # The json lists are only decoded once for each distinct combination
+    type_ids_by_json = {}
+    with open_gzip(pmid_year_types_fpath, "rt") as fh:
+        for pmid, year, publication_types in csv.reader(fh, delimiter="\t"):
+            if not (pmid.isascii() and pmid.isdigit()):
+                continue
+            pmids.append(int(pmid))
+            years.append(
+                int(year) if year.isascii() and year.isdigit() else MISSING_YEAR
+            )
+            type_ids.append(
+                type_ids_by_json.setdefault(publication_types, len(type_ids_by_json))
+            )
+    pmids = np.frombuffer(pmids, dtype=np.int64)
+    # Keep the last row of each PMID, like a dict would
+    order = np.argsort(pmids, kind="stable")
+    sorted_pmids = pmids[order]
+    order = order[np.append(sorted_pmids[1:] != sorted_pmids[:-1], True)]
+    publication_types: List[List[str]] = [
+        json.loads(types) for types in type_ids_by_json
+    ]
+    return PublicationInfoTable(
+        pmids[order],
+        np.frombuffer(years, dtype=np.int16)[order],
+        np.frombuffer(type_ids, dtype=np.int32)[order],
+        publication_types,
+    )
+
+
+def get_publication_info_table(
+    path: Path = pmid_year_types_table_path,
+    pmid_year_types_fpath: Path = pmid_year_types_path,
+    force: bool = False,
+) -> PublicationInfoTable:
+    """Load the table of publication info, building it if needed.
+
+    Parameters
+    ----------
+    path :
+        The path to the saved table.
+    pmid_year_types_fpath :
+        The PubMed source file to build the table from. If it is missing, the
+        PubMed XML is processed first.
+    force :
+        If True, rebuild the table even if it is up to date.
+
+    Returns
+    -------
+    :
+        The publication info table.
+    """
+    if not pmid_year_types_fpath.exists():
+        from indra_cogex.sources.pubmed import process_mesh_xml_to_csv
+
+        process_mesh_xml_to_csv()
+    if (
+        force
+        or not path.exists()
+        or path.stat().st_mtime < pmid_year_types_fpath.stat().st_mtime
+    ):
+        table = build_publication_info_table(pmid_year_types_fpath)
+        table.save(path)
+    else:
+        table = PublicationInfoTable.load(path)
+    logger.info(f"Loaded the publication info of {len(table)} PMIDs from {path}")
+    return table
@@ -0,0 +1,210 @@
+"""A compact index of retracted PubMed articles.
+
+The index is a sorted array of the integer PMIDs of the articles with the
+"Retracted Publication" publication type in the processed PubMed XML, which
+is what :class:`indra_cogex.sources.pubmed.PublicationProcessor` uses for the
+``retracted`` property of Publication nodes, and of the retractions listed in
+INDRA's resources. It is saved next to the other PubMed source files so that
+processors load it once instead of checking each PMID against a list of
+strings.
+"""
+
+import csv
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from indra.literature.pubmed_client import RETRACTIONS_FILE
+
+from indra_cogex.sources.gzip_io import open_gzip
+from indra_cogex.sources.pubmed.locations import (
+    pmid_year_types_path,
+    retracted_pmids_path,
+)
+
+__all__ = [
+    "RETRACTED_PUBLICATION_TYPE",
+    "RetractionIndex",
+    "build_retracted_pmids",
+    "merge_retracted_pmids",
+    "get_retraction_index",
+]
+
+logger = logging.getLogger(__name__)
+
+RETRACTED_PUBLICATION_TYPE = "Retracted Publication"
+
+
+class RetractionIndex:
+    """Look up whether PubMed articles have been retracted."""
+
+    def __init__(self, pmids: np.ndarray):
+        """Initialize the index.
+
+        Parameters
+        ----------
+        pmids :
+            The integer PMIDs of the retracted articles.
+        """
+        self.pmids = np.unique(np.asarray(pmids, dtype=np.int64))
+        self._pmid_set = frozenset(self.pmids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.pmids)
+
+    def __contains__(self, pmid: Union[None, int, str]) -> bool:
+        return self.is_retracted(pmid)
+
+    def is_retracted(self, pmid: Union[None, int, str]) -> bool:
+        """Return True if the article with the given PMID has been retracted.
+
+        Parameters
+        ----------
+        pmid :
+            The PMID to check. PMIDs that aren't integers are never retracted.
+
+        Returns
+        -------
+        :
+            True if the article has been retracted, False otherwise.
+        """
+        if isinstance(pmid, str):
+            if not (pmid.isascii() and pmid.isdigit()):
+                return False
+            pmid = int(pmid)
+        return pmid in self._pmid_set
+
+    def retracted_mask(self, pmids: np.ndarray) -> np.ndarray:
+        """Check an array of integer PMIDs at once.
+
+        Parameters
+        ----------
+        pmids :
+            The integer PMIDs to check.
+
+        Returns
+        -------
+        :
+            A boolean array that is True for the retracted PMIDs.
+        """
+        return np.isin(pmids, self.pmids)
+
+
+def build_retracted_pmids(
+    pmid_year_types_fpath: Path = pmid_year_types_path,
+    retractions_fpath: Optional[str] = RETRACTIONS_FILE,
+) -> np.ndarray:
+    """Get the PMIDs of the retracted articles from the PubMed source files.
+
+    Parameters
+    ----------
+    pmid_year_types_fpath :
+        The gzipped TSV file with the columns pmid, year and the json list of
+        publication types, created by
+        :func:`indra_cogex.sources.pubmed.process_mesh_xml_to_csv`.
+    retractions_fpath :
+        An optional file with one retracted PMID per line, by default INDRA's
+        list of retractions.
+
+    Returns
+    -------
+    :
+        The sorted, unique integer PMIDs of the retracted articles.
+    """
+    logger.info(f"Getting retracted PMIDs from {pmid_year_types_fpath}")
+    pmids = []
+    with open_gzip(pmid_year_types_fpath, "rt") as fh:
+        for pmid, _, publication_types in csv.reader(fh, delimiter="\t"):
+            # The publication types are a json list, a substring check is
+            # enough to find the retraction type
+            if RETRACTED_PUBLICATION_TYPE in publication_types:
+                pmids.append(pmid)
+    return merge_retracted_pmids(pmids, retractions_fpath)
+
+
+def merge_retracted_pmids(
+    pmids: Iterable[str],
+    retractions_fpath: Optional[str] = RETRACTIONS_FILE,
+) -> np.ndarray:
+    """Get a sorted array of retracted PMIDs, including a list of retractions.
+
+    Parameters
+    ----------
+    pmids :
+        The retracted PMIDs. The ones that aren't integers are left out.
+    retractions_fpath :
+        An optional file with one retracted PMID per line to add, by default
+        INDRA's list of retractions.
+
+    Returns
+    -------
+    :
+        The sorted, unique integer PMIDs of the retracted articles.
+    """
+    pmids = list(pmids)
+    if retractions_fpath and os.path.exists(retractions_fpath):
+        with open(retractions_fpath) as fh:
+            pmids.extend(fh.read().split())
+    return np.unique(
+        np.array(
+            [int(pmid) for pmid in pmids if pmid.isascii() and pmid.isdigit()],
+            dtype=np.int64,
+        )
+    )
+
+
+def get_retraction_index(
+    path: Path = retracted_pmids_path,
+    pmid_year_types_fpath: Path = pmid_year_types_path,
+    retractions_fpath: Optional[str] = RETRACTIONS_FILE,
+    force: bool = False,
+) -> RetractionIndex:
+    """Load the index of retracted articles, building it if needed.
+
+    Parameters
+    ----------
+    path :
+        The path to the saved array of retracted PMIDs.
+    pmid_year_types_fpath :
+        The PubMed source file to build the array from. If it is missing, the
+        PubMed XML is processed first.
+    retractions_fpath :
+        An optional file with one retracted PMID per line, by default INDRA's
+        list of retractions. The array is rebuilt if this file is newer.
+    force :
+        If True, rebuild the array even if it is up to date.
+
+    Returns
+    -------
+    :
+        The retraction index.
+    """
+    if not pmid_year_types_fpath.exists():
+        from indra_cogex.sources.pubmed import process_mesh_xml_to_csv
+
+        process_mesh_xml_to_csv()
+    source_paths = [pmid_year_types_fpath]
+    if retractions_fpath and os.path.exists(retractions_fpath):
+        source_paths.append(Path(retractions_fpath))
+    if (
+        force
+        or not path.exists()
+        or any(
+            path.stat().st_mtime < source_path.stat().st_mtime
+            for source_path in source_paths
+        )
+    ):
+        pmids = build_retracted_pmids(pmid_year_types_fpath, retractions_fpath)
+        # Written under a temporary name, so that an interrupted write isn't
+        # loaded later
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "wb") as fh:
+            np.save(fh, pmids)
+        os.replace(tmp_path, path)
+    else:
+        pmids = np.load(path)
+    logger.info(f"Loaded {len(pmids)} retracted PMIDs from {path}")
+    return RetractionIndex(pmids)
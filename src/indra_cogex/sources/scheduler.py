@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""Run processors and node assembly as a dependency graph of parallel tasks.
+
+Most processors are independent of each other, so they can run at the same
+time in separate processes. The ones that read the outputs of others declare
+them in :attr:`indra_cogex.sources.processor.Processor.depends_on`, and
+assembling the nodes of a label only waits for the processors contributing
+that label. A full build is then bounded by the longest chain of tasks rather
+than the sum of all of them.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+__all__ = [
+    "Task",
+    "Outcome",
+    "DependencyError",
+    "run_tasks",
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Task:
+    """A unit of work in the dependency graph.
+
+    Parameters
+    ----------
+    func :
+        A picklable (i.e., module level) function to run.
+    args :
+        The positional arguments of the function.
+    dependencies :
+        The names of the tasks that have to finish first.
+    memory :
+        The estimated peak memory use of the task in GB, see
+        :func:`run_tasks`.
+    require_dependencies :
+        If True, the task is skipped when one of its dependencies fails,
+        otherwise it runs once they all finished either way.
+    resolve_args :
+        An optional function run in the main process right before the task
+        is started that gets the outcomes of the dependencies and returns the
+        positional arguments, e.g., to leave out the outputs of failed
+        dependencies.
+    """
+
+    func: Callable
+    args: Tuple = ()
+    dependencies: Sequence[str] = ()
+    memory: float = 0.0
+    require_dependencies: bool = True
+    resolve_args: Optional[Callable[[Mapping[str, "Outcome"]], Tuple]] = None
+
+
+@dataclass
+class Outcome:
+    """The result of running a task."""
+
+    result: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if the task finished without an error."""
+        return self.error is None
+
+
+class DependencyError(RuntimeError):
+    """Raised for tasks that are skipped because a dependency failed."""
+
+
+@dataclass
+class _Running:
+    future: Future
+    executor: Optional[ProcessPoolExecutor]
+    start: float = field(default_factory=time.time)
+
+
+def _check_graph(tasks: Mapping[str, Task]):
+    for name, task in tasks.items():
+        missing = set(task.dependencies).difference(tasks)
+        if missing:
+            raise ValueError(f"Task {name} depends on unknown tasks {sorted(missing)}")
+    # Check for cycles by removing the tasks without dependencies left
+    remaining = {name: set(task.dependencies) for name, task in tasks.items()}
+    while remaining:
+        ready = {name for name, dependencies in remaining.items() if not dependencies}
+        if not ready:
+            raise ValueError(f"Dependency cycle between tasks {sorted(remaining)}")
+        remaining = {
+            name: dependencies - ready
+            for name, dependencies in remaining.items()
+            if name not in ready
+        }
+
+
+def run_tasks(
+    tasks: Mapping[str, Task],
+    workers: int = 1,
+    memory_budget: Optional[float] = None,
+    on_error: Optional[Callable[[str, BaseException], bool]] = None,
+    on_done: Optional[Callable[[str, Outcome], None]] = None,
+) -> Dict[str, Outcome]:
+    """Run the tasks as soon as their dependencies have finished.
+
+    Parameters
+    ----------
+    tasks :
+        The tasks by name.
+    workers :
+        The maximum number of tasks running at the same time. Each task runs
+        in a new process so that its memory is released when it finishes. If
+        1, the tasks run one after another in this process.
+    memory_budget :
+        The maximum total estimated memory in GB of the tasks running at the
+        same time. A task that doesn't fit waits for others to finish, but
+        it is always started if nothing else is running. No limit if None.
+    on_error :
+        A function called in the main process with the name and the error of
+        a failed task. If it returns True, the tasks that require the failed
+        one are skipped and the others continue, otherwise the error is
+        raised after the running tasks finished. By default, errors are
+        raised.
+    on_done :
+        A function called in the main process with the name and outcome of
+        each task that finished successfully.
+
+    Returns
+    -------
+    :
+        The outcomes by task name. Skipped tasks have a
+        :class:`DependencyError`.
+    """
+    _check_graph(tasks)
+    outcomes: Dict[str, Outcome] = {}
+    pending = dict(tasks)
+    running: Dict[str, _Running] = {}
+    error: Optional[BaseException] = None
+
+    def _finish(name: str, outcome: Outcome):
+        nonlocal error
+        outcomes[name] = outcome
+        if outcome.ok:
+            logger.info("Finished %s in %.1f seconds", name, outcome.seconds)
+            if on_done is not None:
+                on_done(name, outcome)
+        elif isinstance(outcome.error, DependencyError):
+            logger.warning("Skipped %s: %s", name, outcome.error)
+        elif on_error is None or not on_error(name, outcome.error):
+            error = error or outcome.error
+
+    def _ready() -> Optional[str]:
+        memory_used = sum(tasks[name].memory for name in running)
+        for name, task in pending.items():
+            if not all(dependency in outcomes for dependency in task.dependencies):
+                continue
+            failed = [
+                dependency
+                for dependency in task.dependencies
+                if not outcomes[dependency].ok
+            ]
+            if failed and task.require_dependencies:
+                return name
+            if (
+                running
+                and memory_budget is not None
+                and memory_used + task.memory > memory_budget
+            ):
+                continue
+            return name
+        return None
+
+    while (pending or running) and error is None:
+        # Start every task whose dependencies are done while there is room
+        while pending and len(running) < workers:
+            name = _ready()
+            if name is None:
+                break
+            task = pending.pop(name)
+            failed = [
+                dependency
+                for dependency in task.dependencies
+                if not outcomes[dependency].ok
+            ]
+            if failed and task.require_dependencies:
+                _finish(name, Outcome(error=DependencyError(f"failed dependencies {failed}")))
+                continue
+            args = task.args
+            if task.resolve_args is not None:
+                args = task.resolve_args(
+                    {dependency: outcomes[dependency] for dependency in task.dependencies}
+                )
+            logger.info("Starting %s", name)
+            if workers == 1:
+                start = time.time()
+                try:
+                    result = task.func(*args)
+                except Exception as err:
+                    _finish(name, Outcome(error=err, seconds=time.time() - start))
+                else:
+                    _finish(name, Outcome(result=result, seconds=time.time() - start))
+                if error is not None:
+                    break
+                continue
+            executor = ProcessPoolExecutor(max_workers=1)
+            running[name] = _Running(executor.submit(task.func, *args), executor)
+
+        if not running:
+            if pending and error is None and _ready() is None:
+                raise RuntimeError(f"Tasks can't be scheduled: {sorted(pending)}")
+            continue
+
+        done, _ = wait([r.future for r in running.values()], return_when=FIRST_COMPLETED)
+        for name in [name for name, r in running.items() if r.future in done]:
+            r = running.pop(name)
+            r.executor.shutdown()
+            seconds = time.time() - r.start
+            exc = r.future.exception()
+            _finish(name, Outcome(
+                result=None if exc else r.future.result(),
+                error=exc,
+                seconds=seconds,
+            ))
+
+    if error is not None:
+        # Let the tasks that already started finish before raising
+        for name, r in running.items():
+            r.future.exception()
+            r.executor.shutdown()
+        raise error
+    return outcomes
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+"""Validation of the nodes and relations of processors before dumping them.
+
+The namespace and ID of each node and relation, the evidence JSON of
+``indra_evidence`` nodes and the data values against the data types of
+their keys are validated. Which of these checks run is chosen with a
+:class:`ValidationPolicy`, with one of the modes:
+
+- ``full`` checks every item. With more than one worker, the batches of
+  items are checked in a pool of worker processes.
+- ``sample`` checks the distinct IDs of each namespace and the distinct
+  values of each data key in a batch of items, like ``columns``, and checks
+  a random sample of the items fully.
+- ``columns`` only checks the distinct IDs and data values of each batch,
+  which doesn't load the evidence JSON.
+
+Items with an invalid ID or evidence are dropped and bad data values raise
+an error. What was checked is counted in a :class:`ValidationReport`, which
+is written to the manifest of the processor, see
+:mod:`indra_cogex.sources.manifest`.
+
+The policy of all processors is set with the
+``INDRA_COGEX_VALIDATION_MODE``, ``INDRA_COGEX_VALIDATION_RATE`` and
+``INDRA_COGEX_VALIDATION_WORKERS`` environment variables, or the matching
+keys of the ``indra_cogex`` section of the pystow configuration. A processor
+can set its own with
+:attr:`indra_cogex.sources.processor.Processor.validation_policy`.
+"""
+
+import itertools
+import json
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+import pystow
+from indra.statements import Evidence
+from indra.statements.validate import assert_valid_db_refs, assert_valid_evidence
+
+from indra_cogex.sources.parallel import imap_chunks
+from indra_cogex.sources.processor_util import (
+    DataTypeError,
+    InfinityValueError,
+    NewLineInStringError,
+    UnknownTypeError,
+    data_validator,
+)
+
+__all__ = [
+    "ValidationPolicy",
+    "ValidationReport",
+    "assert_valid_node",
+    "find_problems",
+    "get_invalid_ids",
+    "get_invalid_values",
+    "validate_items",
+]
+
+logger = logging.getLogger(__name__)
+
+X = TypeVar("X")
+
+FULL = "full"
+SAMPLE = "sample"
+COLUMNS = "columns"
+VALIDATION_MODES = (FULL, SAMPLE, COLUMNS)
+#: The number of items validated together
+VALIDATION_BATCH_SIZE = 10_000
+#: The errors of bad data values, which are raised rather than dropping the
+#: items with them
+DATA_ERRORS = (UnknownTypeError, DataTypeError, InfinityValueError, NewLineInStringError)
+
+#: The namespace, ID and data of a node, or of the source or target of a
+#: relation
+Ref = Tuple[str, str, Optional[Mapping[str, Any]]]
+#: The index of an item in its batch, the column with the problem, the type
+#: of the error and its message
+Problem = Tuple[int, str, Type[Exception], str]
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """The checks run when validating nodes and relations."""
+
+    #: One of "full", "sample" or "columns"
+    mode: str = FULL
+    #: The fraction of the items checked fully in the "sample" mode
+    rate: float = 0.01
+    #: The number of processes checking items
+    workers: int = 1
+    #: The seed of the random sample
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.mode not in VALIDATION_MODES:
+            raise ValueError(
+                f"Invalid validation mode {self.mode!r}, should be one of "
+                f"{', '.join(VALIDATION_MODES)}"
+            )
+        if not 0 <= self.rate <= 1:
+            raise ValueError(f"Invalid validation rate {self.rate}")
+
+    @classmethod
+    def from_config(cls) -> "ValidationPolicy":
+        """Get the configured policy."""
+        return cls(
+            mode=pystow.get_config("indra_cogex", "validation_mode", default=FULL),
+            rate=pystow.get_config(
+                "indra_cogex", "validation_rate", dtype=float, default=0.01
+            ),
+            workers=pystow.get_config(
+                "indra_cogex", "validation_workers", dtype=int, default=1
+            ),
+        )
+
+
+@dataclass
+class ValidationReport:
+    """A summary of the validation of the items dumped to one file."""
+
+    mode: str = FULL
+    n_items: int = 0
+    #: The number of items all of whose values were checked
+    n_fully_validated: int = 0
+    #: The number of invalid items that were left out
+    n_dropped: int = 0
+    #: The number of problems by column, "id" for the namespaces and IDs
+    failures: Dict[str, int] = field(default_factory=dict)
+    #: The time spent checking items, summed over the processes
+    seconds: float = 0.0
+
+    def add_failure(self, column: str):
+        """Count a problem in a column."""
+        self.failures[column] = self.failures.get(column, 0) + 1
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the JSON representation of the report."""
+        return {**asdict(self), "seconds": round(self.seconds, 3)}
+
+
+def assert_valid_node(
+    db_ns: str,
+    db_id: str,
+    data: Optional[Mapping[str, Any]] = None,
+    check_data: bool = False,
+) -> Optional[Dict[str, bool]]:
+    if db_ns == "indra_evidence":
+        if data and data.get("evidence:string"):
+            ev = Evidence._from_json(json.loads(data["evidence:string"]))
+            assert_valid_evidence(ev)
+    else:
+        assert_valid_db_refs({db_ns: db_id})
+
+    if check_data and data:
+        checked_keys = {}
+        for key, value in data.items():
+            # Skip None values, mark as not checked
+            if value is None:
+                checked_keys[key] = False
+                continue
+            data_validator(_get_dtype(key), value)
+
+            checked_keys[key] = True
+
+        return checked_keys
+
+
+def _get_dtype(key: str) -> str:
+    # If no data type is specified, string is assumed by Neo4j
+    return key.split(":")[1] if ":" in key else "string"
+
+
+def _get_id_column(db_ns: str) -> str:
+    return "evidence:string" if db_ns == "indra_evidence" else "id"
+
+
+def _check_ref(
+    db_ns: str,
+    db_id: str,
+    data: Optional[Mapping[str, Any]],
+    skip_keys: FrozenSet[str] = frozenset(),
+) -> Optional[Tuple[str, Exception]]:
+    try:
+        assert_valid_node(db_ns, db_id, data)
+    except Exception as e:
+        return _get_id_column(db_ns), e
+    for key, value in (data or {}).items():
+        if value is None or key in skip_keys:
+            continue
+        try:
+            data_validator(_get_dtype(key), value)
+        except Exception as e:
+            return key, e
+    return None
+
+
+def get_invalid_ids(db_ns: str, db_ids: Iterable[str]) -> Dict[str, Exception]:
+    """Check distinct IDs of a namespace.
+
+    Parameters
+    ----------
+    db_ns :
+        The namespace.
+    db_ids :
+        The distinct IDs.
+
+    Returns
+    -------
+    :
+        The error of each invalid ID.
+    """
+    invalid = {}
+    for db_id in db_ids:
+        try:
+            assert_valid_node(db_ns, db_id)
+        except Exception as e:
+            invalid[db_id] = e
+    return invalid
+
+
+def get_invalid_values(dtype: str, values: Iterable[Any]) -> Dict[Any, Exception]:
+    """Check the values of a data column.
+
+    Parameters
+    ----------
+    dtype :
+        The Neo4j data type of the column.
+    values :
+        The values. Each distinct hashable value is only checked once, None
+        values aren't checked.
+
+    Returns
+    -------
+    :
+        The error of each invalid value, by the value or by its repr if it
+        isn't hashable.
+    """
+    distinct = set()
+    unhashable = []
+    for value in values:
+        if value is None:
+            continue
+        try:
+            distinct.add(value)
+        except TypeError:
+            unhashable.append(value)
+    invalid = {}
+    for value in itertools.chain(distinct, unhashable):
+        try:
+            data_validator(dtype, value)
+        except Exception as e:
+            invalid[_get_value_key(value)] = e
+    return invalid
+
+
+def _check_columns(refs_batch: Sequence[Sequence[Ref]]) -> List[Problem]:
+    # Check the distinct IDs of each namespace and the distinct values of
+    # each data key once, then find the items that have the bad ones
+    ids = defaultdict(set)
+    values = defaultdict(list)
+    for refs in refs_batch:
+        for db_ns, db_id, data in refs:
+            ids[db_ns].add(db_id)
+            for key, value in (data or {}).items():
+                values[key].append(value)
+
+    bad_ids = {}
+    for db_ns, ns_ids in ids.items():
+        invalid = get_invalid_ids(db_ns, ns_ids)
+        if invalid:
+            bad_ids[db_ns] = invalid
+    bad_values = {}
+    for key, key_values in values.items():
+        invalid = get_invalid_values(_get_dtype(key), key_values)
+        if invalid:
+            bad_values[key] = invalid
+    if not bad_ids and not bad_values:
+        return []
+
+    problems = []
+    for index, refs in enumerate(refs_batch):
+        problem = _find_bad_column(refs, bad_ids, bad_values)
+        if problem is not None:
+            column, e = problem
+            problems.append((index, column, type(e), str(e)))
+    return problems
+
+
+def _get_value_key(value: Any) -> Any:
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _find_bad_column(refs: Sequence[Ref], bad_ids, bad_values):
+    for db_ns, db_id, data in refs:
+        if db_id in bad_ids.get(db_ns, ()):
+            return "id", bad_ids[db_ns][db_id]
+        for key, value in (data or {}).items():
+            if key in bad_values and _get_value_key(value) in bad_values[key]:
+                return key, bad_values[key][_get_value_key(value)]
+    return None
+
+
+def find_problems(
+    refs_batch: Sequence[Sequence[Ref]],
+    mode: str = FULL,
+    rate: float = 0.0,
+    seed: int = 0,
+    skip_keys: FrozenSet[str] = frozenset(),
+) -> Tuple[List[Problem], int]:
+    """Find the problems of a batch of items.
+
+    Parameters
+    ----------
+    refs_batch :
+        The namespaces, IDs and data of each item.
+    mode :
+        The validation mode, see :class:`ValidationPolicy`.
+    rate :
+        The fraction of the items checked fully in the "sample" mode.
+    seed :
+        The seed of the random sample.
+    skip_keys :
+        The data keys whose values aren't checked in the items checked
+        fully.
+
+    Returns
+    -------
+    :
+        The problems, as the index of the item, the column, the type of the
+        error and its message, and the number of items checked fully.
+    """
+    if mode == FULL:
+        problems = []
+        indices = range(len(refs_batch))
+    else:
+        problems = _check_columns(refs_batch)
+        if mode == COLUMNS:
+            return problems, 0
+        rng = random.Random(seed)
+        with_problems = {problem[0] for problem in problems}
+        indices = [
+            index
+            for index in range(len(refs_batch))
+            if rng.random() < rate and index not in with_problems
+        ]
+    for index in indices:
+        for db_ns, db_id, data in refs_batch[index]:
+            problem = _check_ref(db_ns, db_id, data, skip_keys)
+            if problem is not None:
+                column, e = problem
+                problems.append((index, column, type(e), str(e)))
+                break
+    problems.sort(key=lambda problem: problem[0])
+    return problems, len(indices)
+
+
+def _find_chunk_problems(chunk, mode: str, rate: float):
+    refs_batch, seed, skip_keys = chunk
+    start = time.process_time()
+    problems, n_fully_validated = find_problems(
+        refs_batch, mode=mode, rate=rate, seed=seed, skip_keys=skip_keys
+    )
+    return problems, n_fully_validated, time.process_time() - start
+
+
+def validate_items(
+    items: Iterable[X],
+    get_refs: Callable[[X], List[Ref]],
+    policy: Optional[ValidationPolicy] = None,
+    report: Optional[ValidationReport] = None,
+    check_all_data: bool = True,
+    check_item: Optional[Callable[[X], None]] = None,
+    batch_size: int = VALIDATION_BATCH_SIZE,
+) -> Iterable[X]:
+    """Validate nodes or relations in batches and yield the valid ones.
+
+    Parameters
+    ----------
+    items :
+        The nodes or relations.
+    get_refs :
+        A function getting the namespaces, IDs and data of an item, i.e.,
+        one for a node and two for a relation.
+    policy :
+        The validation policy. By default, the configured one, see
+        :meth:`ValidationPolicy.from_config`.
+    report :
+        The report the counts are added to.
+    check_all_data :
+        If False, the values of a data key aren't checked anymore in the
+        items checked fully once a value of the key was checked.
+    check_item :
+        A function run on every item in this process, which raises if the
+        item is invalid, e.g., to check the labels of nodes.
+    batch_size :
+        The number of items validated together.
+
+    Yields
+    ------
+    :
+        The valid items, in order.
+
+    Raises
+    ------
+    UnknownTypeError
+        If a data type is not recognized.
+    DataTypeError
+        If a data type does not match the value set in the header.
+    InfinityValueError
+        If an infinity value is detected in the data.
+    NewLineInStringError
+        If a newline character is detected in a string value.
+    """
+    policy = policy or ValidationPolicy.from_config()
+    if report is None:
+        report = ValidationReport(mode=policy.mode)
+    pending = deque()
+    checked_keys = set()
+
+    def _iter_chunks():
+        iterator = iter(items)
+        for batch_index in itertools.count():
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                return
+            refs_batch = []
+            for item in batch:
+                if check_item is not None:
+                    check_item(item)
+                refs_batch.append(get_refs(item))
+            pending.append((batch, refs_batch))
+            skip_keys = frozenset() if check_all_data else frozenset(checked_keys)
+            yield refs_batch, policy.seed + batch_index, skip_keys
+
+    for problems, n_fully_validated, seconds in imap_chunks(
+        partial(_find_chunk_problems, mode=policy.mode, rate=policy.rate),
+        _iter_chunks(),
+        workers=policy.workers,
+    ):
+        batch, refs_batch = pending.popleft()
+        report.n_items += len(batch)
+        report.n_fully_validated += n_fully_validated
+        report.seconds += seconds
+        dropped = set()
+        for index, column, error_type, message in problems:
+            report.add_failure(column)
+            if issubclass(error_type, DATA_ERRORS):
+                logger.error(f"{batch[index]} - {message}")
+                raise error_type(message)
+            logger.info(f"{batch[index]} - {message}")
+            dropped.add(index)
+        report.n_dropped += len(dropped)
+        if not check_all_data:
+            for refs in refs_batch:
+                for _, _, data in refs:
+                    checked_keys.update(
+                        key for key, value in (data or {}).items() if value is not None
+                    )
+        for index, item in enumerate(batch):
+            if index not in dropped:
+                yield item
@@ -19,7 +19,6 @@ console and check for 429 errors. If you see them, you have to wait at least
 #  the journals beyond the first 1000.
 
 import csv
-import gzip
 import logging
 from collections import namedtuple
 from textwrap import dedent
@@ -31,6 +30,8 @@ import tqdm
 
 from indra_cogex.representation import Relation, Node
 from indra_cogex.sources import Processor
+from indra_cogex.sources.processor import MANIFEST_NAME
+from indra_cogex.sources.gzip_io import open_gzip
 from indra_cogex.sources.pubmed import issn_nlm_map_path, \
     process_mesh_xml_to_csv
 
@@ -85,8 +86,9 @@ class WikiDataProcessor(Processor):
         cls.nodes_path = cls.module.join(name="nodes.tsv.gz")
         # These are nodes in the original INDRA-oriented representation
         # needed for assembly
-        cls.nodes_indra_path = cls.module.join(name="nodes.pkl")
+        cls.nodes_indra_path = cls.module.join(name="nodes.arrow")
         cls.edges_path = cls.module.join(name="edges.tsv.gz")
+        cls.manifest_path = cls.module.join(name=MANIFEST_NAME)
 
     def get_nodes(self) -> Iterable[Node]:
         raise NotImplementedError(
@@ -112,6 +114,9 @@ class WikiDataProcessor(Processor):
 class JournalPublisherProcessor(WikiDataProcessor):
     """Processor for the Journal Publisher relations"""
     name = "journal_publisher"
+    # The ISSN to NLM ID map is created along with the PubMed files by the
+    # PublicationProcessor
+    depends_on = ["publication"]
     importable = True
     journal_node_type = "Journal"
     publisher_node_type = "Publisher"
@@ -156,7 +161,7 @@ class JournalPublisherProcessor(WikiDataProcessor):
     def _load_issn_nlm_map():
         # First ensure the pre-processing has been done
         process_mesh_xml_to_csv()
-        with gzip.open(issn_nlm_map_path, 'rt') as fh:
+        with open_gzip(issn_nlm_map_path, 'rt') as fh:
             reader = csv.reader(fh, delimiter=',')
             logger.info("Loading ISSN NLM map")
             issn_nlm_map = {issn: nlm_id for issn, nlm_id in reader}
@@ -300,9 +305,9 @@ class JournalPublisherProcessor(WikiDataProcessor):
             logger.info("Files already exist, skipping dump.")
             return
 
-        with gzip.open(self.publisher_data_path, 'wt') as publisher_fh, \
-                gzip.open(self.journal_data_path, 'wt') as journal_fh, \
-                gzip.open(self.pub_jour_relations_data_path, 'wt') as \
+        with open_gzip(self.publisher_data_path, 'wt') as publisher_fh, \
+                open_gzip(self.journal_data_path, 'wt') as journal_fh, \
+                open_gzip(self.pub_jour_relations_data_path, 'wt') as \
                         relations_fh:
             publisher_writer = csv.writer(publisher_fh, delimiter='\t')
             journal_writer = csv.writer(journal_fh, delimiter='\t')
@@ -383,7 +388,7 @@ class JournalPublisherProcessor(WikiDataProcessor):
         yield from self._get_publisher_nodes()
 
     def _get_journal_nodes(self) -> Iterable[Node]:
-        with gzip.open(self.journal_data_path, 'rt') as fh:
+        with open_gzip(self.journal_data_path, 'rt') as fh:
             reader = csv.reader(fh, delimiter='\t')
             # journal_wd_id, journal_name, issn_list, journal_issn_l, nlm_id,
             # citescore, category_rank, percentile, category,
@@ -428,7 +433,7 @@ class JournalPublisherProcessor(WikiDataProcessor):
                 )
 
     def _get_publisher_nodes(self) -> Iterable[Node]:
-        with gzip.open(self.publisher_data_path, 'rt') as fh:
+        with open_gzip(self.publisher_data_path, 'rt') as fh:
             reader = csv.reader(fh, delimiter='\t')
             for row in reader:
                 publisher_wd_id, publisher_name, publisher_isni = row
@@ -448,7 +453,7 @@ class JournalPublisherProcessor(WikiDataProcessor):
         self.process_data()
 
         # Get journal-publisher relations
-        with gzip.open(self.pub_jour_relations_data_path, 'rt') as fh:
+        with open_gzip(self.pub_jour_relations_data_path, 'rt') as fh:
             reader = csv.reader(fh, delimiter='\t')
             for nlm_id, publisher_isni in reader:
                 yield Relation(
@@ -1,11 +1,80 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+#: Maps the digits of a utf-8 encoded json string to "0" and all other bytes
+#: to " " to find runs of digits quickly
+DIGITS_TABLE = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+#: The shortest run of digits of an integer that may not fit into 64 bits
+LONG_DIGITS_RUN = b"0" * 19
+#: The absolute value of the smallest negative 64 bit integer
+INT64_MIN_ABS = b"9223372036854775808"
 
 
 class UnicodeEscapeError(Exception):
     pass
 
 
+def json_loads(json_str: str) -> Any:
+    """Load a json string, with orjson if it is installed
+
+    orjson is only used as a faster path: if it can't load the string, e.g.,
+    because it has NaN values or lone surrogates that the standard library
+    accepts, or if it has integers that may not fit into 64 bits, the string
+    is loaded with :func:`json.loads` so that the result and the errors are
+    the same either way.
+
+    Parameters
+    ----------
+    json_str :
+        The json string to load.
+
+    Returns
+    -------
+    :
+        The loaded json object
+    """
+    if orjson is None:
+        return json.loads(json_str)
+    try:
+        json_bytes = json_str.encode()
+    except UnicodeEncodeError:
+        # E.g., lone surrogates, which orjson doesn't load either
+        return json.loads(json_str)
+    if not _has_long_ints(json_bytes):
+        try:
+            return orjson.loads(json_bytes)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
+
+
+def _has_long_ints(json_bytes: bytes) -> bool:
+    # orjson loads integers that don't fit into 64 bits (signed if negative,
+    # unsigned otherwise) as floats, look for runs of digits long enough to
+    # be one of them. Runs in strings are included, they only make the load
+    # fall back to the standard library.
+    digits = json_bytes.translate(DIGITS_TABLE)
+    start = digits.find(LONG_DIGITS_RUN)
+    while start != -1:
+        end = start + len(LONG_DIGITS_RUN)
+        if end < len(digits) and digits[end] == 0x30:
+            return True
+        if (
+            start > 0
+            and json_bytes[start - 1] == 0x2D  # "-"
+            and json_bytes[start:end] > INT64_MIN_ABS
+        ):
+            return True
+        start = digits.find(LONG_DIGITS_RUN, end)
+    return False
+
+
 def clean_stmt_json_str(stmt_json_str: str) -> str:
     """Cleans up a stmt json string by removing double escapes
 
@@ -75,20 +144,72 @@ def load_stmt_json_str(
     # Try clean+load first. If there is no error (this is the vast majority
     # of cases), return the cleaned json (case 1, 2 and 3 above). Otherwise,
     # return the uncleaned json (case 4 above).
-
-    # Cleaned load
-    try:
-        cleaned_str = clean_stmt_json_str(stmt_json_str)
-        stmt_json = json.loads(cleaned_str)
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        # Uncleaned load
+    if orjson is None:
+        # Cleaned load
         try:
-            stmt_json = json.loads(stmt_json_str)
-        except Exception as err:
-            raise UnicodeEscapeError(
-                f"Could not load statement json string:{err}"
-            ) from err
+            cleaned_str = clean_stmt_json_str(stmt_json_str)
+            stmt_json = json.loads(cleaned_str)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Uncleaned load
+            try:
+                stmt_json = json.loads(stmt_json_str)
+            except Exception as err:
+                raise UnicodeEscapeError(
+                    f"Could not load statement json string:{err}"
+                ) from err
+    else:
+        stmt_json = _load_stmt_json_str_fast(stmt_json_str)
 
     if remove_evidence:
         stmt_json["evidence"] = []
     return stmt_json
+
+
+def _load_stmt_json_str_fast(stmt_json_str: str) -> Dict[str, Any]:
+    # The same loads as in load_stmt_json_str with orjson. Most strings don't
+    # have double escapes, and cleaning them wouldn't change them, so they
+    # are only loaded once and without a cleaned copy.
+    has_double_escapes = "\\\\" in stmt_json_str
+
+    # Cleaned load
+    try:
+        if has_double_escapes:
+            return json_loads(clean_stmt_json_str(stmt_json_str))
+        return json_loads(stmt_json_str)
+    except (json.JSONDecodeError, UnicodeDecodeError) as cleaned_err:
+        if not has_double_escapes:
+            # The uncleaned load is the same load, so it fails the same way
+            raise UnicodeEscapeError(
+                f"Could not load statement json string:{cleaned_err}"
+            ) from cleaned_err
+    # Uncleaned load
+    try:
+        return json_loads(stmt_json_str)
+    except Exception as err:
+        raise UnicodeEscapeError(
+            f"Could not load statement json string:{err}"
+        ) from err
+
+
+def load_stmt_json_strs(
+    stmt_json_strs: Iterable[str],
+    remove_evidence: bool = False
+) -> List[Dict[str, Any]]:
+    """Load many statement json strings with :func:`load_stmt_json_str`
+
+    Parameters
+    ----------
+    stmt_json_strs :
+        The statement json strings to load.
+    remove_evidence :
+        If True, remove the evidence from the statement jsons. Default: False.
+
+    Returns
+    -------
+    :
+        The loaded json objects in the order of the strings
+    """
+    return [
+        load_stmt_json_str(stmt_json_str, remove_evidence=remove_evidence)
+        for stmt_json_str in stmt_json_strs
+    ]
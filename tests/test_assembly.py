@@ -1,4 +1,11 @@
-from indra_cogex.assembly import NodeAssembler
+import pytest
+
+from indra_cogex.assembly import (
+    NodeAssembler,
+    StreamingNodeAssembler,
+    dump_pickled_nodes,
+    iter_pickled_nodes,
+)
 from indra_cogex.representation import Node
 
 
@@ -38,3 +45,85 @@ def test_merge_conflict():
     assert na.conflicts[0].key == "k1"
     assert na.conflicts[0].val1 == "v1"
     assert na.conflicts[0].val2 == "v2"
+
+
+def test_streaming_assembly(tmp_path):
+    streams = [
+        [Node("a", "1", ["l1"], {"k1": "v1"}), Node("b", "2", ["l1"])],
+        [Node("a", "1", ["l2"], {"k1": "v2", "k2": "v"}), Node("a", "3", ["l1"])],
+    ]
+    paths = []
+    for idx, nodes in enumerate(streams):
+        paths.append(tmp_path / f"nodes_{idx}.pkl")
+        dump_pickled_nodes(nodes, paths[-1])
+    assert [str(n) for n in iter_pickled_nodes(paths[0])] == [str(n) for n in streams[0]]
+
+    conflicts = []
+    na = StreamingNodeAssembler(
+        [iter_pickled_nodes(path) for path in paths], on_conflict=conflicts.append
+    )
+    ans = list(na.iter_assembled_nodes())
+    assert [(n.db_ns, n.db_id) for n in ans] == [("a", "1"), ("a", "3"), ("b", "2")]
+    assert ans[0].labels == ["l1", "l2"]
+    assert ans[0].data == {"k1": "v1", "k2": "v"}
+    assert [c.key for c in conflicts] == ["k1"] and not na.conflicts
+
+    # The result is the same as for the in-memory assembler, up to the order
+    expected = NodeAssembler([n for nodes in streams for n in nodes]).assemble_nodes()
+    assert sorted(str(n) for n in expected) == sorted(str(n) for n in ans)
+
+
+def test_streaming_assembly_unsorted():
+    na = StreamingNodeAssembler([[Node("b", "1", ["l"]), Node("a", "1", ["l"])]])
+    with pytest.raises(ValueError):
+        na.assemble_nodes()
+
+
+def test_arrow_nodes(tmp_path):
+    pytest.importorskip("pyarrow")
+    from indra_cogex.assembly import dump_arrow_nodes, iter_nodes_from_path
+
+    nodes = [
+        Node("a", "1", ["l1", "l2"], {"name": "x", "count:int": 3, "mixed": 1}),
+        Node("a", "2", ["l1"], {"score:float": 0.5, "mixed": "y", "big:int": 2**70}),
+        Node("b", "3", ["l1"]),
+    ]
+    path = tmp_path / "nodes.arrow"
+    dump_arrow_nodes(nodes, path)
+    loaded = list(iter_nodes_from_path(path))
+    assert [(n.db_ns, n.db_id) for n in loaded] == [(n.db_ns, n.db_id) for n in nodes]
+    assert [n.data for n in loaded] == [n.data for n in nodes]
+    assert [list(n.labels) for n in loaded] == [list(n.labels) for n in nodes]
+    assert type(loaded[0].data["mixed"]) is int
+
+
+def test_arrow_nodes_none_values(tmp_path):
+    pytest.importorskip("pyarrow")
+    from indra_cogex.assembly import dump_arrow_nodes, iter_nodes_from_path
+
+    # Keys set to None are kept, and nodes without them don't get them
+    nodes = [
+        Node("a", "1", ["l"], {"name": "x", "year:int": None}),
+        Node("a", "2", ["l"], {"name": None}),
+        Node("a", "3", ["l"], {"year:int": 7}),
+        Node("a", "4", ["l"]),
+    ]
+    path = tmp_path / "nodes.arrow"
+    dump_arrow_nodes(nodes, path)
+    assert [n.data for n in iter_nodes_from_path(path)] == [n.data for n in nodes]
+
+    # Missing keys don't conflict with the values of other sources
+    other_path = tmp_path / "other_nodes.arrow"
+    other_nodes = [Node("a", "2", ["l"], {"year:int": 7})]
+    dump_arrow_nodes(other_nodes, other_path)
+    conflicts = []
+    na = StreamingNodeAssembler(
+        [iter_nodes_from_path(path), iter_nodes_from_path(other_path)],
+        on_conflict=conflicts.append,
+    )
+    ans = list(na.iter_assembled_nodes())
+    expected = NodeAssembler(nodes + other_nodes)
+    assert sorted(str(n) for n in expected.assemble_nodes()) == sorted(
+        str(n) for n in ans
+    )
+    assert not conflicts and not expected.conflicts
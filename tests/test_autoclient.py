@@ -1,11 +1,20 @@
 """Tests for the autoclient decorator."""
 
+import asyncio
+import os
 from collections import Counter
 from typing import Tuple
 
 import pytest
 
-from indra_cogex.client.neo4j_client import Neo4jClient, autoclient
+from indra_cogex.client.neo4j_client import (
+    AsyncNeo4jClient,
+    Neo4jClient,
+    async_autoclient,
+    autoclient,
+    get_shared_client,
+    run_coroutine,
+)
 from indra_cogex.representation import Node
 
 
@@ -78,3 +87,80 @@ def test_autoclient_cached():
     assert "BioEntity" in node_counts
     assert all(isinstance(key, str) for key in node_counts.keys())
     assert all(isinstance(key, int) for key in node_counts.values())
+
+
+@pytest.mark.nonpublic
+def test_autoclient_shared_client():
+    """Test that autoclient reuses the process-wide client."""
+
+    @autoclient()
+    def get_client(*, client: Neo4jClient) -> Neo4jClient:
+        return client
+
+    client = get_client()
+    assert client is get_shared_client()
+    assert get_client() is client
+    assert client.ping()
+
+    # A forked process gets a new driver for the same client
+    driver = client.driver
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = get_client().driver is not driver and get_client().ping()
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    assert client.driver is driver
+
+
+def test_async_autoclient_exceptions():
+    """Test failure when async_autoclient is misapplied."""
+    with pytest.raises(ValueError):
+
+        @async_autoclient()
+        def func(*, client):
+            pass
+
+    with pytest.raises(ValueError):
+
+        @async_autoclient()
+        async def func_with_positional_client(client):
+            pass
+
+
+def test_async_autoclient():
+    """Test that async_autoclient fills in the client of a coroutine function."""
+
+    @async_autoclient()
+    async def get_client(*, client: AsyncNeo4jClient) -> AsyncNeo4jClient:
+        return client
+
+    client = AsyncNeo4jClient("bolt://localhost:7687", auth=("neo4j", "neo4j"))
+
+    async def main():
+        return await asyncio.gather(get_client(), get_client(client=client))
+
+    shared_client, given_client = run_coroutine(main())
+    assert isinstance(shared_client, AsyncNeo4jClient)
+    assert given_client is client
+
+    # Each event loop gets its own driver
+    async def get_driver():
+        return client.driver
+
+    driver = run_coroutine(get_driver())
+    assert run_coroutine(get_driver()) is not driver
+    # The driver is closed when its loop shuts down
+    assert driver._closed
+    assert not client._drivers
+
+
+def test_run_coroutine_in_running_loop():
+    """Test running a coroutine from synchronous code inside an event loop."""
+
+    async def outer():
+        return run_coroutine(asyncio.sleep(0, result="done"))
+
+    assert asyncio.run(outer()) == "done"
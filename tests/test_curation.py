@@ -0,0 +1,25 @@
+import json
+
+import pandas as pd
+
+from indra_cogex.client.curation import get_entity_source_counts
+
+
+class _SourceCountsClient:
+    """A stand-in client returning a fixed data frame of source counts."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query_df(self, query):
+        return pd.DataFrame(self.rows, columns=["stmt_hash", "source_counts"])
+
+
+def test_get_entity_source_counts():
+    client = _SourceCountsClient(
+        [(-5, json.dumps({"reach": 2})), (7, json.dumps({"sparser": 1, "tas": 1}))]
+    )
+    source_counts = get_entity_source_counts("hgnc", "6871", client=client)
+    assert source_counts == {-5: {"reach": 2}, 7: {"sparser": 1, "tas": 1}}
+    assert all(type(stmt_hash) is int for stmt_hash in source_counts)
+    assert get_entity_source_counts("hgnc", "6871", client=_SourceCountsClient([])) == {}
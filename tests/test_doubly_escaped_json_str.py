@@ -4,7 +4,12 @@ import pytest
 
 from indra.statements import stmt_from_json
 from indra.tools import assemble_corpus as ac
-from indra_cogex.util import load_stmt_json_str
+from indra_cogex.util import (
+    UnicodeEscapeError,
+    json_loads,
+    load_stmt_json_str,
+    load_stmt_json_strs,
+)
 
 
 def test_escaped_unicode():
@@ -149,3 +154,47 @@ def test_escaped_db_refs_grounding_mapping():
     # Relies on that the assemble_corpus pipeline doesn't fix the escaped
     # characters
     assert unesc_subj_db_refs != esc_subj_db_refs
+
+
+def test_json_loads_matches_stdlib():
+    # Strings that orjson rejects but the standard library loads
+    for json_str in [
+        '{"a": NaN, "b": [1.5, -0.0, 1e400]}',
+        '{"big": 123456789012345678901234567890, "neg": -9223372036854775809}',
+        '{"hash": -4455644815662527647, "u": 18446744073709551615}',
+        '{"min": -9223372036854775808, "s": "\\u00e9", "max": 9999999999999999999}',
+        '{"s": "\\ud800", "s2": "\\u03b2"}',
+    ]:
+        assert repr(json_loads(json_str)) == repr(json.loads(json_str))
+    with pytest.raises(json.JSONDecodeError):
+        json_loads('{"a": ')
+
+
+def test_load_stmt_json_strs():
+    # Case 4 in load_stmt_json_str: the cleaned string doesn't load, so the
+    # uncleaned one is used
+    uncleaned = '{"type": "Activation", "text": "a\\\\\\"b", "evidence": [1]}'
+    assert load_stmt_json_str(uncleaned)["text"] == 'a\\"b'
+    sjs = ['{"type": "Activation", "evidence": [1]}', uncleaned]
+    assert load_stmt_json_strs(sjs) == [load_stmt_json_str(sj) for sj in sjs]
+    assert [sj["evidence"] for sj in load_stmt_json_strs(sjs, remove_evidence=True)] == [
+        [], []
+    ]
+    with pytest.raises(UnicodeEscapeError):
+        load_stmt_json_str('{"type": ')
+
+
+def test_load_stmt_json_str_without_orjson(monkeypatch):
+    import indra_cogex.util
+
+    sjs = [
+        '{"type": "Activation", "evidence": [1]}',
+        '{"type": "Activation", "text": "a\\\\\\"b", "evidence": [1]}',
+        '{"type": "Activation", "name": "\\\\u03b2", "hash": 123456789012345678901}',
+    ]
+    expected = [load_stmt_json_str(sj) for sj in sjs]
+    monkeypatch.setattr(indra_cogex.util, "orjson", None)
+    assert [load_stmt_json_str(sj) for sj in sjs] == expected
+    assert json_loads('{"a": NaN}').keys() == {"a"}
+    with pytest.raises(UnicodeEscapeError):
+        load_stmt_json_str('{"type": ')
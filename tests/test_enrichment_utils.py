@@ -26,3 +26,92 @@ def test_extend_by_ontology():
     assert (
         sum(map(lambda x: len(x), gene_set_mapping.values())) > len_before
     ), gene_set_mapping
+
+
+def _make_confidences(members):
+    import random
+
+    rng = random.Random(0)
+    data = {}
+    for i in range(50):
+        data[f"hgnc:{i}", f"G{i}"] = {
+            member: (rng.choice([0.25, 0.5, 0.75, 1.0]), rng.randint(1, 5))
+            for member in rng.sample(members, rng.randint(0, 10))
+        }
+    return data
+
+
+def test_filter_confidence_gene_sets():
+    """Test that vectorized confidence filtering matches filtering dicts."""
+    from indra_cogex.client.enrichment.gene_set_matrix import ConfidenceGeneSets
+    from indra_cogex.client.enrichment.utils import filter_gene_set_confidences
+
+    data = _make_confidences([str(i) for i in range(100)])
+    confidence_gene_sets = ConfidenceGeneSets.from_gene_sets(data)
+    for minimum_belief, minimum_evidence_count in [
+        (None, None), (0.0, 1), (0.5, 1), (0.75, 3), (0.5, 1),
+    ]:
+        expected = filter_gene_set_confidences(
+            data, minimum_belief, minimum_evidence_count
+        )
+        assert expected == filter_gene_set_confidences(
+            confidence_gene_sets, minimum_belief, minimum_evidence_count
+        )
+    # The matrix of a repeated threshold combination is reused
+    assert confidence_gene_sets.get_matrix(0.5, 1) is (
+        confidence_gene_sets.get_matrix(0.5, 1)
+    )
+
+    restricted = confidence_gene_sets.restrict(lambda gene: int(gene) < 20)
+    expected = {
+        key: {gene: v for gene, v in genes.items() if int(gene) < 20}
+        for key, genes in data.items()
+    }
+    expected = {key: genes for key, genes in expected.items() if genes}
+    assert filter_gene_set_confidences(restricted, 0.5, 2) == (
+        filter_gene_set_confidences(expected, 0.5, 2)
+    )
+
+
+def test_confidence_gene_sets_threads():
+    """Test that the cached matrices are shared safely between threads."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from indra_cogex.client.enrichment.gene_set_matrix import (
+        MAX_CACHED_THRESHOLDS,
+        ConfidenceGeneSets,
+    )
+
+    data = _make_confidences([str(i) for i in range(100)])
+    confidence_gene_sets = ConfidenceGeneSets.from_gene_sets(data)
+    thresholds = [(i / 40, i % 4) for i in range(40)] * 20
+    with ThreadPoolExecutor(8) as executor:
+        matrices = list(
+            executor.map(confidence_gene_sets.get_matrix, *zip(*thresholds))
+        )
+    for (minimum_belief, minimum_evidence_count), matrix in zip(thresholds, matrices):
+        expected = confidence_gene_sets.mask(minimum_belief, minimum_evidence_count)
+        assert matrix.matrix.nnz == expected.sum()
+    assert len(confidence_gene_sets._matrices) == MAX_CACHED_THRESHOLDS
+
+
+def test_filter_phosphosite_confidence_gene_sets():
+    """Test vectorized filtering of phosphosites merging substrate IDs."""
+    from indra_cogex.client.enrichment.gene_set_matrix import ConfidenceGeneSets
+    from indra_cogex.client.enrichment.utils import (
+        _phosphosite_label,
+        filter_phosphosite_set_confidences,
+    )
+
+    # Two substrate IDs share the same name so their sites are merged
+    members = [(str(i), f"S{i % 7}", f"S{i % 3}") for i in range(40)]
+    data = _make_confidences(members)
+    confidence_gene_sets = ConfidenceGeneSets.from_gene_sets(
+        data, member_key=_phosphosite_label
+    )
+    for minimum_belief, minimum_evidence_count in [(0.0, 0), (0.5, 2), (1.0, 5)]:
+        assert filter_phosphosite_set_confidences(
+            data, minimum_belief, minimum_evidence_count
+        ) == filter_phosphosite_set_confidences(
+            confidence_gene_sets, minimum_belief, minimum_evidence_count
+        )
@@ -1,9 +1,20 @@
+import asyncio
+
+import neo4j
 import pytest
 
 from indra.config import get_config
 from indra.statements import Agent
 
-from indra_cogex.client.neo4j_client import Neo4jClient, process_identifier
+from indra_cogex.client.neo4j_client import (
+    AsyncNeo4jClient,
+    Neo4jClient,
+    async_autoclient,
+    run_coroutine,
+    _records_to_arrow,
+    _records_to_df,
+    process_identifier,
+)
 
 
 def _get_client():
@@ -72,3 +83,84 @@ def test_get_source_relations():
     )
 
     assert relations[0].target_name == "RASGRF1"
+
+
+@pytest.mark.nonpublic
+def test_query_iter_batches():
+    nc = _get_client()
+    query = "MATCH (n:BioEntity) RETURN n.id LIMIT 25"
+    expected = nc.query_tx(query, squeeze=True)
+    assert list(nc.query_iter(query, squeeze=True, fetch_size=10)) == expected
+    batches = list(nc.query_batches(query, batch_size=10, squeeze=True))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [value for batch in batches for value in batch] == expected
+
+
+@pytest.mark.nonpublic
+def test_async_query():
+    nc = _get_client()
+    anc = AsyncNeo4jClient(
+        get_config("INDRA_NEO4J_URL"),
+        auth=(get_config("INDRA_NEO4J_USER"), get_config("INDRA_NEO4J_PASSWORD")),
+    )
+    query = "MATCH (n:BioEntity) RETURN n.id LIMIT 25"
+    expected = nc.query_tx(query, squeeze=True)
+
+    async def main():
+        async with anc:
+            values, df = await asyncio.gather(
+                anc.query_tx(query, squeeze=True), anc.query_df(query)
+            )
+            iterated = [value async for value in anc.query_iter(query, squeeze=True)]
+            return values, df, iterated
+
+    values, df, iterated = run_coroutine(main())
+    assert values == expected
+    assert iterated == expected
+    assert df["n.id"].tolist() == expected
+
+
+@pytest.mark.nonpublic
+def test_async_autoclient_query():
+    @async_autoclient()
+    async def get_targets(*, client: AsyncNeo4jClient):
+        return await client.query_relations(
+            "MATCH p=(:BioEntity {id: $id})-[:isa]->(:BioEntity) RETURN p",
+            id="hgnc:6871",
+        )
+
+    relations = run_coroutine(get_targets())
+    assert [relation.target_id for relation in relations] == (
+        [relation.target_id for relation in _get_client().get_target_relations(
+            ("HGNC", "6871"), relation="isa"
+        )]
+    )
+
+
+def _make_records():
+    keys = ["id", "name", "belief"]
+    rows = [("hgnc:6871", "MAPK1", 0.5), ("hgnc:1097", "BRAF", 0.9)]
+    return keys, [neo4j.Record(zip(keys, row)) for row in rows]
+
+
+def test_records_to_df():
+    keys, records = _make_records()
+    df = _records_to_df(keys, records)
+    assert list(df.columns) == keys
+    assert df["name"].tolist() == ["MAPK1", "BRAF"]
+    assert df["belief"].dtype == "float64"
+    empty = _records_to_df(keys, [])
+    assert list(empty.columns) == keys and len(empty) == 0
+
+
+def test_records_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    keys, records = _make_records()
+    table = _records_to_arrow(keys, records)
+    assert table.column_names == keys
+    assert table.column("id").to_pylist() == ["hgnc:6871", "hgnc:1097"]
+    schema = pa.schema(
+        [("id", pa.string()), ("name", pa.string()), ("belief", pa.float32())]
+    )
+    assert _records_to_arrow(keys, records, schema=schema).schema == schema
+    assert _records_to_arrow(keys, [], schema=schema).num_rows == 0
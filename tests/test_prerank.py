@@ -0,0 +1,99 @@
+"""Tests for the NumPy pre-ranked GSEA implementation."""
+
+import numpy as np
+import pytest
+
+from indra_cogex.client.enrichment.prerank import (
+    _enrichment_scores,
+    _significance,
+    prerank,
+    running_enrichment_score,
+)
+
+
+def _make_data(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    genes = [str(i) for i in range(1, 1001)]
+    scores = dict(zip(genes, rng.normal(size=len(genes))))
+    gene_sets = {
+        f"go:{i:07}": set(rng.choice(genes, size=size, replace=False))
+        for i, size in enumerate(rng.choice([3, 10, 40, 60, 200], size=50))
+    }
+    # A gene set enriched at the top of the ranking
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    gene_sets["go:9999999"] = set(ranked[:30])
+    return scores, gene_sets
+
+
+def test_enrichment_scores_match_running_sum():
+    """Test that enrichment scores match the extrema of the running sum."""
+    rng = np.random.default_rng(1)
+    n = 500
+    weights = np.abs(rng.normal(size=n))
+    for size in [1, 2, 15, 100]:
+        positions = np.sort(
+            np.vstack([rng.choice(n, size=size, replace=False) for _ in range(20)]),
+            axis=1,
+        )
+        es, leading_edge = _enrichment_scores(positions, weights, n)
+        for row, hits in enumerate(positions):
+            res = running_enrichment_score(hits, weights)
+            expected = res.max() if abs(res.max()) > abs(res.min()) else res.min()
+            assert es[row] == pytest.approx(expected)
+            if expected >= 0:
+                expected_edge = (hits <= res.argmax()).sum()
+            else:
+                expected_edge = (hits >= res.argmin()).sum()
+            assert leading_edge[row] == expected_edge
+
+
+def test_significance_matches_gseapy():
+    """Test the normalization, p-values and FDRs against gseapy."""
+    algorithm = pytest.importorskip("gseapy.algorithm")
+    rng = np.random.default_rng(2)
+    es = rng.normal(scale=0.4, size=30)
+    nulls = rng.normal(scale=0.3, size=(30, 200))
+    # Each gene set has its own null distribution
+    nes, pvalues, fdrs = _significance(es, nulls, np.arange(30))
+    expected = list(algorithm.gsea_significance(es, nulls))
+    assert nes == pytest.approx([row[1] for row in expected])
+    assert pvalues == pytest.approx([row[2] for row in expected])
+    assert fdrs == pytest.approx([row[3] for row in expected])
+
+
+def test_prerank():
+    """Test running GSEA with parallel and serial null sampling."""
+    scores, gene_sets = _make_data()
+    serial = prerank(scores, gene_sets, permutation_num=300, min_size=1, threads=1)
+    parallel = prerank(scores, gene_sets, permutation_num=300, min_size=1, threads=2)
+    assert serial.equals(parallel)
+    assert set(serial["Term"]) == set(gene_sets)
+    assert serial["NES"].abs().is_monotonic_decreasing
+    top = serial.set_index("Term").loc["go:9999999"]
+    assert top["ES"] > 0.9
+    assert top["NOM p-val"] == 0.0
+    assert top["geneset_size"] == 30
+    assert top["matched_size"] == 30
+
+    # Gene set size limits
+    limited = prerank(scores, gene_sets, permutation_num=10, min_size=20, max_size=100)
+    assert limited["geneset_size"].between(20, 100).all()
+
+
+def test_gsea_output():
+    """Test that the gsea output has the columns and types of the gseapy one."""
+    from indra_cogex.client.enrichment.continuous import GSEA_RETURN_COLUMNS, gsea
+
+    scores, gene_sets = _make_data()
+    rv = gsea(
+        scores,
+        {(curie, f"name {curie}"): genes for curie, genes in gene_sets.items()},
+        permutation_num=10,
+    )
+    assert list(rv.columns) == GSEA_RETURN_COLUMNS[:-1]
+    assert rv["Name"].tolist() == [f"name {curie}" for curie in rv["Term"]]
+    for column in ["geneset_size", "matched_size"]:
+        assert rv[column].dtype == object
+        assert all(isinstance(value, str) for value in rv[column])
+    top = rv.set_index("Term").loc["go:9999999"]
+    assert (top["matched_size"], top["geneset_size"]) == ("30", "30")
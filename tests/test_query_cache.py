@@ -0,0 +1,155 @@
+"""Tests for the query result cache."""
+
+import pickle
+
+from indra_cogex.client.query_cache import (
+    GRAPH_VERSION_QUERY,
+    MemoryCacheBackend,
+    QueryCache,
+    SqliteCacheBackend,
+    get_cache_key,
+    get_query_cache_from_config,
+    normalize_query,
+)
+
+
+def test_normalize_query():
+    query = """
+    MATCH (n:BioEntity {id: $id})
+        WHERE n.name = 'two  spaces'
+    RETURN n
+    """
+    assert normalize_query(query) == (
+        "MATCH (n:BioEntity {id: $id}) WHERE n.name = 'two  spaces' RETURN n"
+    )
+
+
+def test_cache_key():
+    key = get_cache_key("v1", "MATCH (n)\n RETURN n", {"ids": ("a", "b"), "x": 1})
+    assert key == get_cache_key("v1", "MATCH (n) RETURN n", {"x": 1, "ids": ["a", "b"]})
+    assert key != get_cache_key("v2", "MATCH (n) RETURN n", {"x": 1, "ids": ["a", "b"]})
+    assert key != get_cache_key("v1", "MATCH (n) RETURN n", {"x": 1.5, "ids": ["a", "b"]})
+
+
+def test_memory_backend_eviction():
+    backend = MemoryCacheBackend(max_size=10)
+    backend.set("a", b"1234", "v1")
+    backend.set("b", b"1234", "v1")
+    assert backend.get("a") == b"1234"
+    # "b" is the least recently used
+    backend.set("c", b"1234", "v1")
+    assert backend.get("b") is None
+    assert backend.size == 8
+    # Values larger than the cache aren't stored
+    backend.set("d", b"12345678901", "v1")
+    assert backend.get("d") is None
+    backend.set("e", b"12", "v2")
+    backend.discard_stale("v2")
+    assert len(backend) == 1 and backend.size == 2
+
+
+def test_sqlite_backend(tmp_path):
+    backend = SqliteCacheBackend(tmp_path / "cache.db", max_size=10)
+    backend.set("a", b"1234", "v1")
+    backend.set("b", b"1234", "v1")
+    assert backend.get("a") == b"1234"
+    backend.set("c", b"1234", "v1")
+    assert backend.get("b") is None
+    assert backend.get("c") == b"1234"
+    # The cache is shared through the file
+    other = SqliteCacheBackend(tmp_path / "cache.db")
+    assert other.get("a") == b"1234"
+    other.discard_stale("v2")
+    assert backend.get("a") is None
+
+
+class _Database:
+    def __init__(self):
+        self.version = "v1"
+        self.queries = []
+
+    def run_query(self, query, **query_params):
+        if query == GRAPH_VERSION_QUERY:
+            return ["version"], [[self.version]]
+        self.queries.append((query, query_params))
+        return ["id"], [[query_params["id"]]]
+
+
+def test_query_cache(tmp_path):
+    database = _Database()
+    memory = MemoryCacheBackend()
+    cache = QueryCache(
+        [memory, SqliteCacheBackend(tmp_path / "cache.db")], version_ttl=0
+    )
+    query = "MATCH (n {id: $id}) RETURN n.id"
+    assert cache.get_or_run(query, {"id": "a"}, database.run_query) == (
+        ["id"], [["a"]]
+    )
+    result = cache.get_or_run(query, {"id": "a"}, database.run_query)
+    assert result == (["id"], [["a"]])
+    assert len(database.queries) == 1
+    # Each hit returns a copy
+    result[1].append(["b"])
+    assert cache.get_or_run(query, {"id": "a"}, database.run_query)[1] == [["a"]]
+
+    # Results are promoted from the on-disk tier
+    memory.clear()
+    cache.get_or_run(query, {"id": "a"}, database.run_query)
+    assert len(database.queries) == 1 and len(memory) == 1
+
+    # A new graph build invalidates the results
+    database.version = "v2"
+    cache.get_or_run(query, {"id": "a"}, database.run_query)
+    assert len(database.queries) == 2
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_uncacheable_results(monkeypatch):
+    memory = MemoryCacheBackend(max_size=2000)
+    cache = QueryCache([memory], version_ttl=0, max_rows=100)
+
+    def run_query(query, **query_params):
+        if query == GRAPH_VERSION_QUERY:
+            return ["version"], [["v1"]]
+        return ["id"], [
+            [str(i) * query_params["width"]] for i in range(query_params["rows"])
+        ]
+
+    pickled = []
+    dumps = pickle.dumps
+    monkeypatch.setattr(
+        "indra_cogex.client.query_cache.pickle.dumps",
+        lambda obj, **kwargs: pickled.append(obj) or dumps(obj, **kwargs),
+    )
+    # Too many rows, or too large going by a sample of the rows, and the
+    # results aren't pickled
+    for params in [{"rows": 101, "width": 1}, {"rows": 50, "width": 100}]:
+        result = cache.get_or_run("MATCH (n) RETURN n", params, run_query)
+        assert len(memory) == 0
+        assert not any(obj is result for obj in pickled)
+    cache.get_or_run("MATCH (n) RETURN n", {"rows": 50, "width": 1}, run_query)
+    assert len(memory) == 1
+
+
+def test_query_cache_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "indra_cogex.client.query_cache.get_config", lambda key: None
+    )
+    # The in-memory tier is opt-in
+    assert get_query_cache_from_config() is None
+    config = {
+        "INDRA_NEO4J_QUERY_CACHE_PATH": str(tmp_path / "cache.db"),
+        "INDRA_NEO4J_QUERY_CACHE_MAX_ROWS": "5",
+    }
+    monkeypatch.setattr(
+        "indra_cogex.client.query_cache.get_config", config.get
+    )
+    cache = get_query_cache_from_config()
+    assert [type(backend) for backend in cache.backends] == [SqliteCacheBackend]
+    assert cache.max_rows == 5
+    config["INDRA_NEO4J_QUERY_CACHE_SIZE"] = "1000"
+    cache = get_query_cache_from_config()
+    assert [type(backend) for backend in cache.backends] == [
+        MemoryCacheBackend,
+        SqliteCacheBackend,
+    ]
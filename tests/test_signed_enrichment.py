@@ -0,0 +1,78 @@
+"""Tests for the matrix-based reverse causal reasoning."""
+
+import random
+
+import numpy as np
+import scipy.stats
+from scipy.stats import binom
+
+from indra_cogex.client.enrichment.gene_set_matrix import GeneSetMatrix
+from indra_cogex.client.enrichment.signed import _count_rcr_predictions
+
+
+def _reference_counts(database_positive, database_negative, positive, negative):
+    rv = {}
+    for entity in set(database_positive).union(database_negative):
+        entity_positive = database_positive.get(entity, set())
+        entity_negative = database_negative.get(entity, set())
+        if len(entity_positive) + len(entity_negative) < 4:
+            continue
+        correct, incorrect, ambiguous = 0, 0, 0
+        for hgnc_ids, agree, disagree in [
+            (positive, entity_positive, entity_negative),
+            (negative, entity_negative, entity_positive),
+        ]:
+            for hgnc_id in hgnc_ids:
+                if hgnc_id in agree and hgnc_id in disagree:
+                    ambiguous += 1
+                elif hgnc_id in agree:
+                    correct += 1
+                elif hgnc_id in disagree:
+                    incorrect += 1
+                else:
+                    ambiguous += 1
+        rv[entity] = (correct, incorrect, ambiguous)
+    return rv
+
+
+def test_rcr_counts():
+    """Test the RCR counts against a per-entity loop."""
+    rng = random.Random(0)
+    universe = [str(i) for i in range(1, 300)]
+    database_positive = {
+        (f"hgnc:{i}", f"G{i}"): set(rng.sample(universe, rng.choice([0, 2, 5, 30])))
+        for i in range(200)
+    }
+    database_negative = {
+        (f"hgnc:{i}", f"G{i}"): set(rng.sample(universe, rng.choice([1, 3, 10, 50])))
+        for i in range(100, 300)
+    }
+    # Genes in both lists and genes not in any gene set are counted as well
+    positive = sorted(rng.sample(universe, 40) + ["100000"])
+    negative = sorted(rng.sample(universe, 40))
+
+    entities, correct, incorrect, ambiguous = _count_rcr_predictions(
+        GeneSetMatrix.from_gene_sets(database_positive),
+        GeneSetMatrix.from_gene_sets(database_negative),
+        positive_hgnc_ids=positive,
+        negative_hgnc_ids=negative,
+        minimum_size=4,
+    )
+    result = {
+        entity: (c, i, a)
+        for entity, c, i, a in zip(entities, correct, incorrect, ambiguous)
+    }
+    assert result == _reference_counts(
+        database_positive, database_negative, positive, negative
+    )
+
+
+def test_binomial_pvalues():
+    """Test that the vectorized p-values are the same as binomtest."""
+    correct = np.array([0, 1, 5, 12, 30])
+    total = np.array([3, 1, 9, 20, 31])
+    expected = [
+        scipy.stats.binomtest(int(k), int(n), alternative="greater").pvalue
+        for k, n in zip(correct, total)
+    ]
+    assert binom.sf(correct - 1, total, 0.5).tolist() == expected
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from indra_cogex.sources.depmap.correlations import (
+    get_correlations,
+    get_significant_pairs,
+    get_z_scores,
+)
+
+
+def _gene_effects(n_cell_lines, genes, missing, seed):
+    rng = np.random.default_rng(seed)
+    shared = rng.normal(size=(n_cell_lines, 1))
+    values = rng.normal(size=(n_cell_lines, len(genes)))
+    # Make the first genes codependent
+    values[:, :4] += 2 * shared
+    values[rng.random(values.shape) < missing] = np.nan
+    return pd.DataFrame(values, columns=genes)
+
+
+def test_correlations():
+    df = _gene_effects(40, list("abcdef"), missing=0.2, seed=1)
+    values = df.to_numpy(np.float32).T
+    r, n = get_correlations(values[:2], values)
+    expected = df.corr().to_numpy()[:2]
+    assert np.allclose(r, expected, atol=1e-5)
+    assert (n == df.notna().T.astype(int).to_numpy()[:2] @ df.notna().to_numpy()).all()
+
+    complete = df.fillna(0)
+    r, _ = get_correlations(complete.to_numpy(np.float32).T[:2], complete.T.to_numpy())
+    assert np.allclose(r, complete.corr().to_numpy()[:2], atol=1e-5)
+
+
+def test_z_scores():
+    x = np.arange(10)
+    result = stats.pearsonr(x, x**3)
+    z = get_z_scores(np.array([result.statistic]), np.array([10]))
+    assert z[0] == pytest.approx(stats.norm.isf(result.pvalue / 2))
+
+    z = get_z_scores(np.array([0.5, -0.5, 0.0, np.nan, 0.9]), np.array([10] * 4 + [2]))
+    assert z[0] == -z[1] > 0
+    assert z[2] == 0
+    assert np.isnan(z[3:]).all()
+
+
+def _reference_pairs(crispr_df, rnai_df, mitogenes, alpha):
+    # Correlate each pair of genes separately
+    genes = sorted(set(crispr_df.columns) & set(rnai_df.columns))
+    pairs, tested = {}, 0
+    for i, a in enumerate(genes):
+        for b in genes[i + 1:]:
+            z = 0
+            for df in (crispr_df, rnai_df):
+                both = df[[a, b]].dropna()
+                result = stats.pearsonr(both[a], both[b])
+                z += np.sign(result.statistic) * stats.norm.isf(result.pvalue / 2)
+            logp = np.log(2) + stats.norm.logcdf(-abs(z) / np.sqrt(2))
+            tested += 1
+            if logp < np.log(alpha) and not (a in mitogenes and b in mitogenes):
+                pairs[a, b] = logp
+    return pairs, tested - len(set(mitogenes) & set(genes)) ** 2
+
+
+@pytest.mark.parametrize("block_size,workers", [(3, 1), (4, 2), (100, 1)])
+def test_significant_pairs(block_size, workers):
+    genes = [f"G{i}" for i in range(10)]
+    crispr_df = _gene_effects(60, genes, missing=0, seed=2)
+    # Different cell lines and an extra gene only in the RNAi screen
+    rnai_df = _gene_effects(50, genes + ["X"], missing=0.1, seed=3)
+    mitogenes = ["G0", "G1", "G9"]
+    df = get_significant_pairs(
+        crispr_df, rnai_df, mitogenes, block_size=block_size, workers=workers
+    )
+    expected, num_comps = _reference_pairs(crispr_df, rnai_df, mitogenes, 0.05)
+    assert ("G0", "G1") not in expected
+    assert ("G2", "G3") in expected
+    assert set(df.index) == set(expected)
+    for pair, logp in expected.items():
+        assert df.loc[pair, "logp"] == pytest.approx(logp, rel=1e-3)
+    assert df.logp.is_monotonic_increasing
+    assert (df["rank"] == np.arange(1, len(df) + 1)).all()
+    assert np.allclose(df.bc_cutoff, np.log(0.05 / num_comps))
+    assert (df.by_crit_val < df.bh_crit_val).all()
@@ -0,0 +1,127 @@
+import csv
+import gzip
+import random
+
+import pytest
+
+from indra_cogex.representation import Relation, dump_norm_id
+from indra_cogex.sources.processor import (
+    CURIE_CHECK_SIZE,
+    EdgeSchema,
+    Processor,
+    _CurieFormatter,
+    validate_edge_rows,
+)
+from indra_cogex.sources.processor_util import DataTypeError
+
+
+class EdgeDumpProcessor(Processor):
+    name = "test_edge_dump"
+    node_types = ["BioEntity"]
+    edges_chunk_size = 7
+
+    def get_nodes(self):
+        return []
+
+    def get_relations(self):
+        return []
+
+
+def _relations(n=50):
+    rng = random.Random(0)
+    for i in range(n):
+        data = {"count:int": i}
+        if i % 5 == 0:
+            data["source"] = "x"
+        yield Relation(
+            "HGNC", str(rng.randint(1, 10)), "GO", f"GO:000000{rng.randint(1, 3)}",
+            "related", data,
+        )
+
+
+class EdgeRowsProcessor(EdgeDumpProcessor):
+    name = "test_edge_rows"
+    edge_schema = EdgeSchema("HGNC", "GO", "related", ("count:int", "source"))
+    edge_row_validation_rate = 0.5
+
+    def get_edge_rows(self):
+        for rel in _relations():
+            yield (
+                rel.source_id,
+                rel.target_id,
+                rel.data["count:int"],
+                rel.data.get("source"),
+            )
+
+
+def _read(path):
+    with gzip.open(path, "rt") as fh:
+        return list(csv.reader(fh, delimiter="\t"))
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000])
+def test_dump_edges_sorted(tmp_path, chunk_size):
+    processor = EdgeDumpProcessor()
+    processor.edges_chunk_size = chunk_size
+    edges_path = tmp_path / "edges.tsv.gz"
+    sample_path = tmp_path / "edges_sample.tsv"
+    processor._dump_edges_to_path(_relations(), edges_path, sample_path)
+
+    rows = _read(edges_path)
+    assert rows[0] == [":START_ID", ":END_ID", ":TYPE", "count:int", "source"]
+    assert len(rows) == 51
+    # The sort is stable across the chunks, and the data columns cover all
+    # relations even if the first ones don't have them
+    expected = sorted(
+        _relations(),
+        key=lambda r: (r.source_ns, r.source_id, r.target_ns, r.target_id),
+    )
+    assert [row[3] for row in rows[1:]] == [str(r.data["count:int"]) for r in expected]
+    assert sample_path.read_text().splitlines()[1].split("\t") == rows[1]
+    # No run files are left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "edges.tsv.gz", "edges_sample.tsv",
+    ]
+
+
+def test_dump_edges_empty(tmp_path):
+    with pytest.raises(RuntimeError):
+        EdgeDumpProcessor()._dump_edges_to_path([], tmp_path / "edges.tsv.gz")
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000])
+def test_dump_edge_rows(tmp_path, chunk_size):
+    processor = EdgeRowsProcessor()
+    processor.edges_chunk_size = chunk_size
+    rows_path = tmp_path / "rows.tsv.gz"
+    processor._dump_edge_rows_to_path(processor.get_edge_rows(), rows_path)
+    relations_path = tmp_path / "relations.tsv.gz"
+    processor._dump_edges_to_path(_relations(), relations_path)
+    # Rows give the same file as the relations they stand for
+    assert _read(rows_path) == _read(relations_path)
+
+
+def test_validate_edge_rows():
+    schema = EdgeSchema("PUBMED", "MESH", "annotated_with", ("major:boolean",))
+    rows = [
+        ("1", "D000001", "true"),
+        ("x", "D000001", "true"),
+        ("2", "D000002", None),
+    ]
+    assert validate_edge_rows(rows, schema) == [rows[0], rows[2]]
+    assert validate_edge_rows(rows, schema, validation_rate=1.0) == [
+        rows[0], rows[2],
+    ]
+    with pytest.raises(DataTypeError):
+        validate_edge_rows([("1", "D000001", "yes")], schema)
+
+
+def test_curie_formatter_after_check():
+    curie = _CurieFormatter("EFO")
+    ids = [f"{i:07}" for i in range(CURIE_CHECK_SIZE)]
+    ids += ["EFO_0000400", "efo_0000401", "EFO:0000402", "0000403"]
+    # IDs with a prefix after the checked ones are still normalized
+    assert [curie(db_id) for db_id in ids] == [
+        dump_norm_id("EFO", db_id) for db_id in ids
+    ]
+    assert curie.fast
@@ -0,0 +1,90 @@
+import csv
+import gc
+import gzip
+
+import pytest
+
+from indra_cogex.sources.gzip_io import (
+    ParallelGzipWriter,
+    ReadAheadGzipReader,
+    open_gzip,
+)
+
+
+def _rows(n=1000):
+    return [[str(i), "é" * (i % 5), "x\ty" if i % 7 == 0 else ""] for i in range(n)]
+
+
+def test_write_multi_member(tmp_path):
+    path = tmp_path / "edges.tsv.gz"
+    with open_gzip(path, "wt") as fh:
+        # Use small blocks to get many gzip members
+        fh.buffer.raw.block_size = 100
+        csv.writer(fh, delimiter="\t").writerows(_rows())
+    data = path.read_bytes()
+    assert data.count(b"\x1f\x8b\x08") > 1
+
+    # The members are read as one stream by the gzip module
+    with gzip.open(path, "rt") as fh:
+        assert list(csv.reader(fh, delimiter="\t")) == _rows()
+    with open_gzip(path, "rt") as fh:
+        assert list(csv.reader(fh, delimiter="\t")) == _rows()
+
+
+def test_append_and_read_gzip(tmp_path):
+    path = tmp_path / "nodes.tsv.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.write("id:ID\n")
+    with open_gzip(path, "at", compresslevel=1, threads=2) as fh:
+        fh.write("a\nb\n")
+    with open_gzip(path, "rb") as fh:
+        assert fh.read() == b"id:ID\na\nb\n"
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.gz"
+    with open_gzip(path, "wb"):
+        pass
+    assert gzip.decompress(path.read_bytes()) == b""
+
+
+def test_close_early(tmp_path):
+    path = tmp_path / "lines.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.writelines(f"{i}\n" for i in range(100_000))
+    # Closing before the end stops the decompression thread
+    with open_gzip(path, "rt") as fh:
+        assert fh.readline() == "0\n"
+        thread = fh.buffer.raw._thread
+    assert not thread.is_alive()
+
+
+def test_abandoned_reader(tmp_path):
+    path = tmp_path / "lines.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.writelines(f"{i}\n" for i in range(1000))
+    # A reader that isn't closed is collected, which stops its thread
+    reader = ReadAheadGzipReader(path, block_size=16, max_blocks=1)
+    assert reader.read(2) == b"0\n"
+    thread = reader._thread
+    del reader
+    gc.collect()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_gzip(tmp_path / "missing.gz", "rt")
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(ValueError):
+        open_gzip(tmp_path / "x.gz", "x")
+
+
+def test_write_after_close(tmp_path):
+    writer = ParallelGzipWriter(open(tmp_path / "x.gz", "wb"), threads=1)
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.write(b"x")
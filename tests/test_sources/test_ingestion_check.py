@@ -0,0 +1,121 @@
+import csv
+import gzip
+
+import numpy as np
+import pytest
+
+from indra_cogex.sources import ingestion_check
+from indra_cogex.sources.ingestion_check import (
+    check_ingestion_files,
+    fingerprint_ids,
+    hash_ids,
+)
+from indra_cogex.sources.processor_util import (
+    DuplicateNodeIDError,
+    MissingNodeIDError,
+)
+
+
+def _write(path, header, rows):
+    with gzip.open(path, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+@pytest.fixture
+def node_paths(tmp_path):
+    return [
+        _write(
+            tmp_path / "nodes_a.tsv.gz",
+            ["id:ID", ":LABEL"],
+            [["ns:1", "A"], ["ns:2", "A"], ["ns:1", "A"]],
+        ),
+        _write(
+            tmp_path / "nodes_b.tsv.gz",
+            ["id:ID", ":LABEL", "name"],
+            [["ns:3", "B", "x"], ["ns:2", "B", "y"]],
+        ),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_check_ingestion_files(tmp_path, node_paths, workers):
+    edges_path = _write(
+        tmp_path / "edges.tsv.gz",
+        [":START_ID", ":END_ID", ":TYPE"],
+        [["ns:1", "ns:2", "r"], ["ns:4", "ns:3", "r"], ["ns:3", "ns:5", "r"]],
+    )
+    report = check_ingestion_files(node_paths, [edges_path], workers=workers)
+    assert not report.ok
+    assert (report.n_nodes, report.n_edges, report.n_problems) == (5, 3, 4)
+    # All problems are listed, not only the first one
+    assert [
+        (problem.error_type, problem.path.name, problem.row)
+        for problem in report.problems
+    ] == [
+        (DuplicateNodeIDError, "nodes_a.tsv.gz", 3),
+        (DuplicateNodeIDError, "nodes_b.tsv.gz", 2),
+        (MissingNodeIDError, "edges.tsv.gz", 2),
+        (MissingNodeIDError, "edges.tsv.gz", 3),
+    ]
+    assert "ns:4" in report.problems[2].message
+    assert "ns:5" in report.problems[3].message
+
+
+def test_check_ingestion_files_ok(tmp_path, node_paths):
+    edges_path = _write(
+        tmp_path / "edges.tsv.gz", [":START_ID", ":END_ID", ":TYPE"], [["ns:2", "ns:3", "r"]]
+    )
+    report = check_ingestion_files(node_paths[1:], [edges_path])
+    assert report.ok
+    assert report.problems == []
+
+
+def test_max_problems(tmp_path, node_paths):
+    edges_path = _write(
+        tmp_path / "edges.tsv.gz",
+        [":START_ID", ":END_ID", ":TYPE"],
+        [[f"ns:{i}", f"ns:{i}", "r"] for i in range(10, 20)],
+    )
+    report = check_ingestion_files(node_paths, [edges_path], max_problems=3)
+    assert report.n_problems == 2 + 20
+    assert len(report.problems) == 2 + 3
+
+
+def test_hash_collisions_are_not_duplicates(tmp_path, node_paths, monkeypatch):
+    # Map all IDs to the same hash to check that collisions are verified
+    monkeypatch.setattr(
+        ingestion_check, "hash_ids", lambda ids: np.zeros(len(list(ids)), np.int64)
+    )
+    report = check_ingestion_files(node_paths[1:], [])
+    assert report.ok
+
+
+def test_hash_collisions_are_not_present(tmp_path, node_paths, monkeypatch):
+    # Map all IDs to the same hash, so that edge IDs that aren't node IDs are
+    # only told apart by their fingerprints
+    monkeypatch.setattr(
+        ingestion_check, "hash_ids", lambda ids: np.zeros(len(list(ids)), np.int64)
+    )
+    edges_path = _write(
+        tmp_path / "edges.tsv.gz",
+        [":START_ID", ":END_ID", ":TYPE"],
+        [["ns:2", "ns:3", "r"], ["ns:2", "ns:9", "r"]],
+    )
+    report = check_ingestion_files(node_paths[1:], [edges_path])
+    assert report.n_problems == 1
+    assert [(p.error_type, p.row) for p in report.problems] == [
+        (MissingNodeIDError, 2)
+    ]
+    assert "ns:9" in report.problems[0].message
+
+
+def test_hash_ids():
+    hashes = hash_ids(["ns:1", "ns:2", "ns:1"])
+    assert hashes.dtype == np.int64
+    assert hashes[0] == hashes[2] != hashes[1]
+    fingerprints = fingerprint_ids(["ns:1", "ns:2", "ns:1"])
+    assert fingerprints[0] == fingerprints[2] != fingerprints[1]
+    assert not np.array_equal(fingerprints, hashes)
@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+from indra_cogex.sources.cli import _get_ingestion_changes
+from indra_cogex.sources.manifest import (
+    Manifest,
+    build_manifest,
+    diff_manifests,
+    get_stale_reasons,
+)
+from indra_cogex.sources.processor import Processor
+
+
+class ManifestProcessor(Processor):
+    name = "test_manifest"
+    node_types = ["BioEntity"]
+    input_paths = []
+
+    @classmethod
+    def get_input_paths(cls):
+        return cls.input_paths
+
+    def get_nodes(self):
+        return []
+
+    def get_relations(self):
+        return []
+
+
+class DefaultInputsProcessor(Processor):
+    name = "test_manifest_default_inputs"
+    node_types = ["BioEntity"]
+
+    def get_nodes(self):
+        return []
+
+    def get_relations(self):
+        return []
+
+
+@pytest.fixture
+def processor_cls(tmp_path, monkeypatch):
+    input_path = tmp_path / "input.tsv"
+    input_path.write_text("a\tb\n")
+    monkeypatch.setattr(ManifestProcessor, "input_paths", [input_path])
+    monkeypatch.setattr(ManifestProcessor, "manifest_path", tmp_path / "manifest.json")
+    return ManifestProcessor
+
+
+def test_stale_reasons(tmp_path, processor_cls):
+    assert get_stale_reasons(processor_cls) == ["no manifest"]
+    processor_cls.write_manifest({"workers": 2})
+    assert get_stale_reasons(processor_cls, {"workers": 2}) == []
+    assert get_stale_reasons(processor_cls, {"workers": 4}) == ["config changed"]
+
+    # Touching an input doesn't make the outputs stale, and the new time is
+    # saved so the input isn't checksummed again
+    input_path = processor_cls.input_paths[0]
+    stat = input_path.stat()
+    os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert get_stale_reasons(processor_cls, {"workers": 2}) == []
+    manifest = Manifest.load(processor_cls.manifest_path)
+    assert manifest.inputs[str(input_path)].mtime_ns == stat.st_mtime_ns + 10**9
+
+    input_path.write_text("a\tc\n")
+    assert get_stale_reasons(processor_cls, {"workers": 2}) == [
+        f"input changed: {input_path}"
+    ]
+
+
+def test_dependencies_and_version(tmp_path, processor_cls, monkeypatch):
+    dependency_path = tmp_path / "dependency.json"
+    Manifest("dependency", "1", "abc").dump(dependency_path)
+    dependencies = {"dependency": dependency_path}
+    processor_cls.write_manifest(dependency_manifest_paths=dependencies)
+    assert get_stale_reasons(processor_cls, None, dependencies) == []
+
+    Manifest("dependency", "2", "abc").dump(dependency_path)
+    monkeypatch.setattr(ManifestProcessor, "version", "2")
+    assert get_stale_reasons(processor_cls, None, dependencies) == [
+        "version changed from 1 to 2",
+        "dependency dependency changed",
+    ]
+
+
+def test_manifest_json_round_trip(processor_cls):
+    manifest = build_manifest(processor_cls, {"path": processor_cls.manifest_path})
+    loaded = Manifest.from_json(json.loads(json.dumps(manifest.to_json())))
+    assert loaded == manifest
+    assert loaded.digest == manifest.digest
+    assert diff_manifests(loaded, manifest) == []
+
+
+def test_default_input_paths(tmp_path, monkeypatch):
+    for name in [
+        "nodes.tsv.gz",
+        "nodes_Publication.arrow",
+        "edges_sample.tsv",
+        "manifest.json",
+        "edge_runs_123/run_0.pkl",
+        "raw/data.csv",
+        "download.json",
+    ]:
+        tmp_path.joinpath(name).parent.mkdir(exist_ok=True)
+        tmp_path.joinpath(name).touch()
+    monkeypatch.setattr(DefaultInputsProcessor, "directory", tmp_path)
+    assert sorted(
+        path.relative_to(tmp_path).as_posix()
+        for path in DefaultInputsProcessor.get_input_paths()
+    ) == ["download.json", "raw/data.csv"]
+
+
+def test_ingestion_changes(tmp_path, processor_cls):
+    new = build_manifest(processor_cls)
+    old = Manifest("test_manifest", "0", new.code)
+    previous_path = tmp_path / "ingestion.json"
+    assert _get_ingestion_changes(previous_path, {"a": new}) == {}
+    previous_path.write_text(
+        json.dumps({"processors": {"test_manifest": old.to_json(), "b": None}})
+    )
+    assert _get_ingestion_changes(
+        previous_path, {"test_manifest": new, "c": new}
+    ) == {
+        "b": ["removed"],
+        "c": ["added"],
+        "test_manifest": [
+            "version changed from 0 to 1",
+            f"input added: {processor_cls.input_paths[0]}",
+        ],
+    }
@@ -0,0 +1,45 @@
+import os
+import time
+
+import pytest
+
+from indra_cogex.sources.parallel import imap_chunks
+
+
+def _square_chunk(chunk):
+    return [x * x for x in chunk], os.getpid()
+
+
+def _slow_chunk(chunk):
+    time.sleep(chunk)
+    return chunk
+
+
+def _fail_chunk(chunk):
+    raise ValueError(chunk)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_imap_chunks(workers):
+    chunks = ([x, x + 1] for x in range(0, 40, 2))
+    results = list(imap_chunks(_square_chunk, chunks, workers=workers, max_pending=4))
+    assert [y for squares, _ in results for y in squares] == [x * x for x in range(40)]
+    pids = {pid for _, pid in results}
+    if workers == 1:
+        assert pids == {os.getpid()}
+    else:
+        assert os.getpid() not in pids
+
+
+def test_imap_chunks_error():
+    with pytest.raises(ValueError):
+        list(imap_chunks(_fail_chunk, [[1], [2]], workers=2))
+
+
+def test_imap_chunks_stop_early():
+    # The first chunk is consumed while a slow one is running
+    results = imap_chunks(_slow_chunk, [0, 5, 5], workers=2, max_pending=2)
+    assert next(results) == 0
+    start = time.monotonic()
+    results.close()
+    assert time.monotonic() - start < 2
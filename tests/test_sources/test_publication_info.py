@@ -0,0 +1,72 @@
+import csv
+import gzip
+import json
+import os
+
+import numpy as np
+
+from indra_cogex.sources.indra_db import _filter_chunk_hashes, get_included_hashes
+from indra_cogex.sources.pubmed.publication_info import (
+    PublicationInfoTable,
+    build_publication_info_table,
+    get_publication_info_table,
+)
+
+
+def _write_year_types(path, rows):
+    with gzip.open(path, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        for pmid, year, types in rows:
+            writer.writerow([pmid, year, json.dumps(types)])
+
+
+def test_publication_info_table(tmp_path):
+    year_types = tmp_path / "pmid_years.tsv.gz"
+    _write_year_types(
+        year_types,
+        [
+            ("30", "2001", ["Journal Article"]),
+            ("10", "", ["Journal Article", "Review"]),
+            ("abc", "2003", []),
+            ("20", "2002", ["Journal Article"]),
+            ("30", "2004", ["Retracted Publication"]),
+        ],
+    )
+    table = build_publication_info_table(year_types)
+    assert table.pmids.tolist() == [10, 20, 30]
+    # The publication types are stored once for each combination
+    assert len(table.publication_types) == 3
+    assert table.get("20") == (2002, ("Journal Article",))
+    assert table.get(10) == (None, ("Journal Article", "Review"))
+    # The last row of a PMID is used
+    assert table.get("30") == (2004, ("Retracted Publication",))
+    for pmid in ["15", 40, "abc", None]:
+        assert table.get(pmid) == (None, ())
+
+    path = tmp_path / "pmid_years.npz"
+    loaded = get_publication_info_table(path, year_types)
+    assert path.exists()
+    assert loaded.get("30") == table.get("30")
+    assert PublicationInfoTable.load(path).publication_types == table.publication_types
+
+    # The saved table is rebuilt when the source file is newer
+    _write_year_types(year_types, [("5", "1999", [])])
+    stat = path.stat()
+    os.utime(year_types, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert get_publication_info_table(path, year_types).pmids.tolist() == [5]
+
+
+def test_included_hashes(tmp_path):
+    edges = tmp_path / "edges.tsv.gz"
+    with gzip.open(edges, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow([":START_ID", ":END_ID", ":TYPE", "stmt_hash:int", "x"])
+        for stmt_hash in [3, -7, 3, 12]:
+            writer.writerow(["a", "b", "indra_rel", stmt_hash, '{"a": "\t"}'])
+    hashes = get_included_hashes(edges)
+    assert hashes.dtype == np.int64
+    assert hashes.tolist() == [-7, 3, 12]
+
+    rows = [[str(stmt_hash), "{}"] for stmt_hash in [12, 4, -7, 20, 3]]
+    assert _filter_chunk_hashes(rows, hashes) == [rows[0], rows[2], rows[4]]
+    assert _filter_chunk_hashes(rows, np.array([], np.int64)) == []
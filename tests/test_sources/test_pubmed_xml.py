@@ -0,0 +1,161 @@
+import csv
+import gzip
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from indra_cogex.sources import pubmed
+from indra_cogex.sources.pubmed import (
+    get_latest_record_masks,
+    process_medline_xml_to_shard,
+    process_mesh_xml_to_csv,
+)
+
+ARTICLE = """
+<PubmedArticle>
+  <MedlineCitation Status="MEDLINE" Owner="NLM">
+    <PMID Version="1">{pmid}</PMID>
+    <Article PubModel="Print">
+      <Journal>
+        <ISSN IssnType="Print">0000-0001</ISSN>
+        <JournalIssue CitedMedium="Print">
+          <Volume>1</Volume>
+          <Issue>1</Issue>
+          <PubDate><Year>{year}</Year></PubDate>
+        </JournalIssue>
+        <Title>Journal of Tests</Title>
+        <ISOAbbreviation>J Tests</ISOAbbreviation>
+      </Journal>
+      <ArticleTitle>{title}</ArticleTitle>
+      <PublicationTypeList>
+        <PublicationType UI="D016428">{publication_type}</PublicationType>
+      </PublicationTypeList>
+    </Article>
+    <MedlineJournalInfo>
+      <NlmUniqueID>123</NlmUniqueID>
+      <ISSNLinking>0000-0001</ISSNLinking>
+    </MedlineJournalInfo>
+    <MeshHeadingList>
+      <MeshHeading>
+        <DescriptorName UI="{mesh}" MajorTopicYN="Y">Term</DescriptorName>
+      </MeshHeading>
+    </MeshHeadingList>
+  </MedlineCitation>
+  <PubmedData>
+    <History>
+      <PubMedPubDate PubStatus="pubmed">
+        <Year>{year}</Year><Month>1</Month><Day>1</Day>
+      </PubMedPubDate>
+    </History>
+    <ArticleIdList>
+      <ArticleId IdType="pubmed">{pmid}</ArticleId>
+    </ArticleIdList>
+  </PubmedData>
+</PubmedArticle>
+"""
+
+
+def _write_xml(path, articles, deleted=()):
+    content = "".join(
+        ARTICLE.format(
+            pmid=pmid,
+            title=f"Article {pmid}",
+            publication_type=publication_type,
+            mesh=mesh,
+            year=year,
+        )
+        for pmid, year, mesh, publication_type in articles
+    )
+    if deleted:
+        content += "<DeleteCitation>%s</DeleteCitation>" % "".join(
+            f'<PMID Version="1">{pmid}</PMID>' for pmid in deleted
+        )
+    with gzip.open(path, "wt") as fh:
+        fh.write(f"<PubmedArticleSet>{content}</PubmedArticleSet>")
+
+
+def test_process_shard(tmp_path):
+    xml_path = tmp_path / "pubmed24n0001.xml.gz"
+    _write_xml(
+        xml_path, [("1", 2000, "D000001", "Journal Article")], deleted=["2"]
+    )
+    records_path = process_medline_xml_to_shard(xml_path, tmp_path)
+    assert records_path == tmp_path / "pubmed24n0001.jsonl.gz"
+    with gzip.open(records_path, "rt") as fh:
+        records = [json.loads(line) for line in fh]
+    assert records[0]["pmid"] == "1"
+    assert records[0]["year"] == 2000
+    assert records[0]["mesh_annotations"] == [["D000001", True]]
+    assert records[1] == {"pmid": "2", "deleted": True}
+    assert np.load(tmp_path / "pubmed24n0001_pmids.npy").tolist() == [1, 2]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_latest_record_masks():
+    masks = get_latest_record_masks(
+        [np.array([1, 2, 3]), np.array([], dtype=np.int64), np.array([2, 4, 2])]
+    )
+    assert [mask.tolist() for mask in masks] == [
+        [True, False, True],
+        [],
+        [False, True, True],
+    ]
+
+
+def test_update_precedence(tmp_path, monkeypatch):
+    xml_directory = tmp_path / "raw_xml"
+    xml_directory.mkdir()
+    _write_xml(
+        xml_directory / "pubmed24n0001.xml.gz",
+        [
+            ("1", 2000, "D000001", "Journal Article"),
+            ("2", 2001, "D000002", "Journal Article"),
+            ("3", 2002, "D000003", "Journal Article"),
+        ],
+    )
+    _write_xml(
+        xml_directory / "pubmed24n0002.xml.gz",
+        [("1", 2005, "D000005", "Retracted Publication")],
+        deleted=["3"],
+    )
+    monkeypatch.setattr(pubmed, "raw_xml", SimpleNamespace(base=xml_directory))
+    monkeypatch.setattr(
+        pubmed.pubmed_client, "ensure_xml_files", lambda *args, **kwargs: None
+    )
+    paths = {
+        "mesh_pmid_fpath": tmp_path / "mesh_pmids.csv.gz",
+        "pmid_year_types_fpath": tmp_path / "pmid_years_types.tsv.gz",
+        "pmid_nlm_fpath": tmp_path / "pmid_nlm.csv.gz",
+        "journal_info_fpath": tmp_path / "journal_info.tsv.gz",
+        "issn_nlm_map_fpath": tmp_path / "issn_nlm_map.csv.gz",
+        "retracted_pmids_fpath": tmp_path / "retracted_pmids.npy",
+    }
+    shard_directory = tmp_path / "shards"
+    process_mesh_xml_to_csv(**paths, shard_directory=shard_directory, workers=2)
+
+    with gzip.open(paths["mesh_pmid_fpath"], "rt") as fh:
+        assert list(csv.reader(fh)) == [
+            ["mesh_id", "major_topic", "pmid"],
+            ["D000002", "1", "2"],
+            ["D000005", "1", "1"],
+        ]
+    with gzip.open(paths["pmid_year_types_fpath"], "rt") as fh:
+        assert list(csv.reader(fh, delimiter="\t")) == [
+            ["2", "2001", '["Journal Article"]'],
+            ["1", "2005", '["Retracted Publication"]'],
+        ]
+    with gzip.open(paths["journal_info_fpath"], "rt") as fh:
+        assert len(list(csv.reader(fh, delimiter="\t"))) == 2
+    assert 1 in np.load(paths["retracted_pmids_fpath"]).tolist()
+
+    # The shards are checkpoints, only new or changed XML files are
+    # processed again
+    shard_path = shard_directory / "pubmed24n0001.jsonl.gz"
+    mtime = shard_path.stat().st_mtime_ns
+    _write_xml(
+        xml_directory / "pubmed24n0003.xml.gz",
+        [("2", 2010, "D000010", "Journal Article")],
+    )
+    process_mesh_xml_to_csv(**paths, shard_directory=shard_directory, force=False)
+    assert shard_path.stat().st_mtime_ns == mtime
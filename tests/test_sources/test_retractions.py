@@ -0,0 +1,88 @@
+import csv
+import gzip
+import json
+import os
+
+import numpy as np
+
+from indra_cogex.sources.indra_db import get_stmt_hash_pmids
+from indra_cogex.sources.pubmed.retractions import (
+    RetractionIndex,
+    build_retracted_pmids,
+    get_retraction_index,
+)
+
+
+def test_retraction_index():
+    index = RetractionIndex(np.array([30, 10, 20, 10]))
+    assert len(index) == 3
+    assert index.pmids.tolist() == [10, 20, 30]
+    assert "20" in index
+    assert 20 in index
+    assert "21" not in index
+    assert "PMC20" not in index
+    assert None not in index
+    assert index.retracted_mask(np.array([5, 10, 30])).tolist() == [
+        False, True, True,
+    ]
+
+
+def test_build_retracted_pmids(tmp_path):
+    year_types = tmp_path / "pmid_years.tsv.gz"
+    with gzip.open(year_types, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow(["3", "2001", json.dumps(["Journal Article"])])
+        writer.writerow(["1", "2002", json.dumps(["Retracted Publication"])])
+    retractions = tmp_path / "retractions.tsv"
+    retractions.write_text("7\n1\n")
+    assert build_retracted_pmids(year_types, retractions).tolist() == [1, 7]
+
+
+def test_get_retraction_index_stale_retractions(tmp_path):
+    year_types = tmp_path / "pmid_years.tsv.gz"
+    with gzip.open(year_types, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow(["1", "2002", json.dumps(["Retracted Publication"])])
+    retractions = tmp_path / "retractions.tsv"
+    retractions.write_text("7\n")
+    path = tmp_path / "retracted_pmids.npy"
+    index = get_retraction_index(path, year_types, retractions)
+    assert index.pmids.tolist() == [1, 7]
+
+    # A newer list of retractions rebuilds the index
+    retractions.write_text("7\n8\n")
+    mtime = path.stat().st_mtime
+    os.utime(retractions, (mtime + 10, mtime + 10))
+    index = get_retraction_index(path, year_types, retractions)
+    assert index.pmids.tolist() == [1, 7, 8]
+    assert np.load(path).tolist() == [1, 7, 8]
+    assert [p.name for p in tmp_path.glob("*.tmp")] == []
+
+
+def _stmt_row(stmt_hash, pmid=None, tr_pmid=None):
+    evidence = {"source_api": "reach"}
+    if pmid:
+        evidence["pmid"] = pmid
+    if tr_pmid:
+        evidence["text_refs"] = {"PMID": tr_pmid}
+    return [str(stmt_hash), json.dumps({"evidence": [evidence]})]
+
+
+def test_get_stmt_hash_pmids(tmp_path):
+    processed = tmp_path / "processed_statements.tsv.gz"
+    with gzip.open(processed, "wt") as fh:
+        writer = csv.writer(fh, delimiter="\t")
+        writer.writerow(_stmt_row(1, pmid="10"))
+        writer.writerow(_stmt_row(1, pmid="11", tr_pmid="12"))
+        writer.writerow(_stmt_row(-2))
+        writer.writerow(_stmt_row(3, pmid="PMC5"))
+        writer.writerow(_stmt_row(4, tr_pmid="13"))
+    sidecar = tmp_path / "stmt_hash_pmids.npz"
+    hashes, pmids = get_stmt_hash_pmids(processed, sidecar)
+    assert hashes.tolist() == [1, 1, 4]
+    assert pmids.tolist() == [10, 12, 13]
+    assert sidecar.exists()
+
+    # Statements have retracted evidence if any of their PMIDs is retracted
+    index = RetractionIndex(np.array([12]))
+    assert set(hashes[index.retracted_mask(pmids)].tolist()) == {1}
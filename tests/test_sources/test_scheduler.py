@@ -0,0 +1,80 @@
+import os
+import time
+
+import pytest
+
+from indra_cogex.sources.scheduler import DependencyError, Task, run_tasks
+
+
+def _sleep(seconds, value):
+    time.sleep(seconds)
+    return value, os.getpid(), time.time()
+
+
+def _fail(message):
+    raise FileNotFoundError(message)
+
+
+def _collect(*values):
+    return values
+
+
+def _graph():
+    return {
+        "a": Task(_sleep, (0.3, "a")),
+        "b": Task(_sleep, (0.3, "b")),
+        "c": Task(_sleep, (0.1, "c"), dependencies=["a"]),
+    }
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_tasks(workers):
+    outcomes = run_tasks(_graph(), workers=workers)
+    assert {name: outcome.result[0] for name, outcome in outcomes.items()} == {
+        "a": "a", "b": "b", "c": "c",
+    }
+    pids = {outcome.result[1] for outcome in outcomes.values()}
+    if workers == 1:
+        assert pids == {os.getpid()}
+    else:
+        # Each task runs in its own process, and independent ones overlap
+        assert len(pids) == 3
+        assert abs(outcomes["a"].result[2] - outcomes["b"].result[2]) < 0.2
+    assert outcomes["c"].result[2] > outcomes["a"].result[2]
+
+
+def test_memory_budget():
+    tasks = _graph()
+    tasks["a"].memory = tasks["b"].memory = 3
+    outcomes = run_tasks(tasks, workers=3, memory_budget=4)
+    assert abs(outcomes["a"].result[2] - outcomes["b"].result[2]) >= 0.25
+
+
+def test_failures():
+    tasks = {
+        "a": Task(_fail, ("missing",)),
+        "b": Task(_sleep, (0, "b")),
+        "c": Task(_sleep, (0, "c"), dependencies=["a"]),
+        "d": Task(
+            _collect,
+            dependencies=["a", "b"],
+            require_dependencies=False,
+            resolve_args=lambda outcomes: tuple(
+                name for name, outcome in outcomes.items() if outcome.ok
+            ),
+        ),
+    }
+    with pytest.raises(FileNotFoundError):
+        run_tasks(tasks, workers=2)
+
+    outcomes = run_tasks(tasks, workers=2, on_error=lambda name, error: True)
+    assert isinstance(outcomes["c"].error, DependencyError)
+    assert outcomes["d"].result == ("b",)
+
+
+def test_cycle():
+    with pytest.raises(ValueError):
+        run_tasks({
+            "a": Task(_collect, dependencies=["b"]),
+            "b": Task(_collect, dependencies=["a"]),
+        })
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+from indra_cogex.representation import Node, Relation
+from indra_cogex.sources.manifest import Manifest
+from indra_cogex.sources.processor import (
+    Processor,
+    validate_nodes,
+    validate_relations,
+)
+from indra_cogex.sources.processor_util import DataTypeError
+from indra_cogex.sources.validation import ValidationPolicy, ValidationReport
+
+
+def _evidence_node(pmid):
+    evidence = json.dumps({"source_api": "reach", "pmid": pmid})
+    return Node(
+        "indra_evidence",
+        pmid,
+        labels=["Evidence"],
+        data={"evidence:string": evidence, "stmt_hash:long": 1},
+    )
+
+
+def _nodes():
+    return [
+        Node("HGNC", "6407", labels=["BioEntity"], data={"count:int": 1}),
+        Node("HGNC", "x", labels=["BioEntity"], data={"count:int": 2}),
+        Node("GO", "GO:0000001", labels=["BioEntity"], data={"count:int": None}),
+    ]
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        ValidationPolicy(),
+        ValidationPolicy(workers=2),
+        ValidationPolicy(mode="sample", rate=0.5),
+        ValidationPolicy(mode="columns"),
+    ],
+)
+def test_validate_nodes(policy):
+    report = ValidationReport(mode=policy.mode)
+    nodes = _nodes()
+    valid = list(
+        validate_nodes(nodes, [], ["BioEntity"], policy=policy, report=report)
+    )
+    assert [node.db_id for node in valid] == ["6407", "GO:0000001"]
+    assert report.n_items == 3
+    assert report.n_dropped == 1
+    assert report.failures == {"id": 1}
+
+
+def test_validate_bad_data():
+    nodes = [Node("HGNC", "6407", labels=["BioEntity"], data={"count:int": "a"})]
+    for mode in ["full", "sample", "columns"]:
+        with pytest.raises(DataTypeError):
+            list(
+                validate_nodes(
+                    nodes, [], ["BioEntity"], policy=ValidationPolicy(mode=mode)
+                )
+            )
+
+
+def test_validate_evidence():
+    nodes = [_evidence_node("123"), _evidence_node("abc")]
+    full_report = ValidationReport()
+    valid = list(
+        validate_nodes(
+            nodes, [], ["Evidence"], policy=ValidationPolicy(), report=full_report
+        )
+    )
+    assert [node.db_id for node in valid] == ["123"]
+    assert full_report.failures == {"evidence:string": 1}
+    assert full_report.n_fully_validated == 2
+
+    # Only checking the columns doesn't load the evidences
+    columns_report = ValidationReport(mode="columns")
+    valid = list(
+        validate_nodes(
+            nodes,
+            [],
+            ["Evidence"],
+            policy=ValidationPolicy(mode="columns"),
+            report=columns_report,
+        )
+    )
+    assert len(valid) == 2
+    assert columns_report.n_fully_validated == 0
+
+
+def test_validate_relations_batches():
+    relations = [
+        Relation("HGNC", str(i), "GO", "GO:0000001", "related", {"count:int": i})
+        for i in range(1, 26)
+    ]
+    relations.append(Relation("HGNC", "1", "GO", "x", "related", {"count:int": 0}))
+    report = ValidationReport(mode="sample")
+    policy = ValidationPolicy(mode="sample", rate=0.5, workers=2)
+    valid = list(validate_relations(relations, [], policy=policy, report=report))
+    assert valid == relations[:-1]
+    assert report.n_items == 26
+    assert 0 < report.n_fully_validated < 26
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        ValidationPolicy(mode="none")
+    with pytest.raises(ValueError):
+        ValidationPolicy(rate=2)
+
+
+def test_policy_from_config(monkeypatch):
+    monkeypatch.setenv("INDRA_COGEX_VALIDATION_MODE", "sample")
+    monkeypatch.setenv("INDRA_COGEX_VALIDATION_RATE", "0.1")
+    assert ValidationPolicy.from_config() == ValidationPolicy(mode="sample", rate=0.1)
+
+
+class ValidationProcessor(Processor):
+    name = "test_validation"
+    node_types = ["BioEntity"]
+
+    def get_nodes(self):
+        return []
+
+    def get_relations(self):
+        return []
+
+
+def test_report_in_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(ValidationProcessor, "manifest_path", tmp_path / "m.json")
+    monkeypatch.setattr(
+        ValidationProcessor, "get_input_paths", classmethod(lambda cls: [])
+    )
+    processor = ValidationProcessor()
+    processor.validation_reports["nodes.tsv.gz"] = ValidationReport(
+        n_items=3, n_dropped=1, failures={"id": 1}
+    )
+    manifest = processor.write_manifest(
+        validation_reports=processor.validation_reports
+    )
+    loaded = Manifest.load(ValidationProcessor.manifest_path)
+    assert loaded.validation["nodes.tsv.gz"]["failures"] == {"id": 1}
+    # The validation isn't part of what the outputs were built from
+    assert loaded.digest == manifest.digest == Manifest.from_json(
+        {**manifest.to_json(), "validation": {}}
+    ).digest
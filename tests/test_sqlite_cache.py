@@ -1,4 +1,4 @@
-"""These tests require connection to the INDRA CoGEx graph database"""
+"""Tests for the SQLite cache. Most of these tests require connection to the INDRA CoGEx graph database"""
 import pytest
 
 from indra_cogex.client.enrichment.utils import (
@@ -191,3 +191,144 @@ def test_kinase_phosphosites_cache(db_data):
         sqlite_kinase_phosphosites_data,
         queried_cache=db_data,
     )
+
+
+def _write_sqlite_cache(db_path, rows):
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        f"CREATE TABLE {SQLITE_GENE_SET_TABLE} (cache_name TEXT NOT NULL, "
+        f"curie TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL, "
+        f"PRIMARY KEY (cache_name, curie, name, value));"
+    )
+    conn.execute(
+        f"CREATE TABLE {SQLITE_GENES_WITH_CONFIDENCE_TABLE} (cache_name TEXT, "
+        f"curie TEXT, name TEXT, inner_key TEXT, belief REAL, ev_count INTEGER, "
+        f"PRIMARY KEY (cache_name, curie, name, inner_key));"
+    )
+    conn.executemany(
+        f"INSERT INTO {SQLITE_GENE_SET_TABLE} VALUES (?, ?, ?, ?);", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_gene_set_index(tmp_path):
+    """Test that the binary gene set index matches the SQLite cache."""
+    from indra_cogex.client.enrichment.gene_set_index import (
+        get_gene_set_index_path,
+        load_gene_set_index,
+    )
+    from indra_cogex.client.enrichment.utils import (
+        build_gene_set_index,
+        get_gene_set_matrix,
+        get_sqlite_gene_set_cache,
+    )
+
+    rows = [
+        ("go", "go:0000002", "b term", "5"),
+        ("go", "go:0000002", "b term", "6"),
+        ("go", "go:0000001", "a term", "5"),
+        ("go", "go:0000003", "go:0000003", "7"),
+        ("reactome", "reactome:R-HSA-1", "pathway", "8"),
+    ]
+    for cache_name in gene_set_table_datasets:
+        if cache_name not in {"go", "reactome"}:
+            rows.append((cache_name, f"{cache_name}:1", "x", "1"))
+    db_path = tmp_path / "cache.db"
+    _write_sqlite_cache(db_path, rows)
+    build_gene_set_index(db_path)
+    index_path = get_gene_set_index_path(db_path)
+    assert index_path.exists()
+
+    for background in [None, frozenset({"5", "7"}), frozenset({"7"})]:
+        for cache_name in gene_set_table_datasets:
+            from_sqlite = get_sqlite_gene_set_cache(
+                cache_name, background, sqlite_db_path=db_path, use_index=False
+            )
+            from_index = get_sqlite_gene_set_cache(
+                cache_name, background, sqlite_db_path=db_path
+            )
+            assert from_index == from_sqlite
+            assert list(from_index) == list(from_sqlite)
+
+    index = load_gene_set_index(index_path)
+    assert index is load_gene_set_index(index_path)
+    matrix = get_gene_set_matrix(
+        "go", client=object(), background_gene_ids=frozenset({"5"}),
+        sqlite_db_path=db_path,
+    )
+    assert matrix.keys == [("go:0000001", "a term"), ("go:0000002", "b term")]
+    assert matrix.overlaps({"5", "6"}).tolist() == [1, 1]
+
+
+def test_confidence_gene_set_index(tmp_path):
+    """Test that confidence gene sets from the index match the SQLite cache."""
+    import sqlite3
+
+    from indra_cogex.client.enrichment.utils import (
+        build_gene_set_index,
+        filter_gene_set_confidences,
+        filter_phosphosite_set_confidences,
+        get_confidence_gene_set_matrix,
+        get_confidence_gene_sets,
+        get_sqlite_genes_with_confidence_cache,
+    )
+
+    db_path = tmp_path / "cache.db"
+    _write_sqlite_cache(
+        db_path, [(name, "x:1", "x", "1") for name in gene_set_table_datasets]
+    )
+    rows = [
+        ("entity_to_targets", "hgnc:2", "B", "5", 0.5, 1),
+        ("entity_to_targets", "hgnc:1", "A", "5", 0.75, 3),
+        ("entity_to_targets", "hgnc:1", "A", "6", 0.25, 10),
+        ("entity_to_targets", "hgnc:3", "C", "7", 1.0, 2),
+        ("kinase_phosphosites", "hgnc:1", "A", "5|B|S10", 0.5, 2),
+        ("kinase_phosphosites", "hgnc:1", "A", "9|B|S10", 0.75, 1),
+        ("kinase_phosphosites", "hgnc:1", "A", "6|C|T3", 0.25, 1),
+    ]
+    for cache_name in genes_with_confidence_datasets:
+        if cache_name not in {"entity_to_targets", "kinase_phosphosites"}:
+            rows.append((cache_name, "hgnc:1", "A", "5", 0.5, 1))
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        f"INSERT INTO {SQLITE_GENES_WITH_CONFIDENCE_TABLE} "
+        f"VALUES (?, ?, ?, ?, ?, ?);",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    build_gene_set_index(db_path)
+
+    for background in [None, {"5", "6"}, {"7"}]:
+        from_sqlite = get_sqlite_genes_with_confidence_cache(
+            "entity_to_targets", background, sqlite_db_path=db_path
+        )
+        from_index = get_confidence_gene_sets(
+            "entity_to_targets", background, sqlite_db_path=db_path
+        )
+        assert from_index.keys == list(from_sqlite)
+        for thresholds in [(0.0, 1), (0.5, 2), (0.75, 1)]:
+            assert filter_gene_set_confidences(from_index, *thresholds) == (
+                filter_gene_set_confidences(from_sqlite, *thresholds)
+            )
+
+    matrix = get_confidence_gene_set_matrix(
+        "entity_to_targets", client=object(), minimum_belief=0.5,
+        sqlite_db_path=db_path,
+    )
+    assert matrix.overlaps({"5"}).tolist() == [1, 1, 0]
+
+    for background in [None, {("B", "S10")}, {("6", "T3")}]:
+        from_sqlite = get_sqlite_genes_with_confidence_cache(
+            "kinase_phosphosites", background, sqlite_db_path=db_path
+        )
+        from_index = get_confidence_gene_sets(
+            "kinase_phosphosites", background, sqlite_db_path=db_path
+        )
+        for thresholds in [(0.0, 0), (0.5, 2), (0.75, 1), (1.0, 1)]:
+            assert filter_phosphosite_set_confidences(from_index, *thresholds) == (
+                filter_phosphosite_set_confidences(from_sqlite, *thresholds)
+            )